@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · memory-mapped data bundle
+===========================================
+One prebuilt file holding every table the dashboard reads at start-up: the
+composite / district / prime histories, the test-set evaluations, every
+scenario forecast, and the derived aggregates (per-scenario averages,
+monthly means, the prime aggregate joined to the macro columns, the dense
+December cubes behind the calculators) plus the map snapshots and
+animation colour bounds.
+
+The file is a JSON header followed by raw, 64-byte-aligned column arrays.
+load() maps it read-only and wraps the columns in DataFrames without
+copying, so a worker boots without parsing a CSV, pages are read from disk
+on first touch, and every worker on the host shares one page-cache copy.
+Each table is materialised on first access, or all at once by
+materialize() when gunicorn preloads the app before forking its workers.
+
+The bundle is versioned by a content hash of its source files (data/*.csv,
+forecasts/*.csv and this module), which is part of its file name.  load()
+rebuilds it when the sources change; the training scripts rebuild it when
+they finish (accra_chart_render.warm_after_training) and the deploy build
+step runs `python accra_bundle.py build`.
+
+Outputs
+-------
+  .cache/bundle/ahpi-<version>.bundle
+
+Usage
+-----
+  python accra_bundle.py build      # (re)build for the current sources
+  python accra_bundle.py info       # tables, rows and size
+
+  from accra_bundle import load
+  bundle = load()
+  DF     = bundle.table("df")
+  PRIME_FC = bundle.group("prime_fc")        # {(scenario, area): DataFrame}
+"""
+
+import argparse
+import glob
+import json
+import os
+import tempfile
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from accra_fig_cache import CACHE_DIR, data_version
+
+BASE_DIR      = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR      = os.path.join(BASE_DIR, "data")
+FORECASTS_DIR = os.path.join(BASE_DIR, "forecasts")
+BUNDLE_DIR    = os.path.join(CACHE_DIR, "bundle")
+
+MAGIC     = b"AHPIBND1"
+ALIGN     = 64
+SCENARIOS = ("bear", "base", "bull")
+
+# Files the bundle is built from (its version is a hash of these)
+SOURCE_GLOBS = [
+    os.path.join(DATA_DIR, "*.csv"),
+    os.path.join(FORECASTS_DIR, "*.csv"),
+    os.path.abspath(__file__),
+]
+
+PRIME_AREA_SLUGS: dict[str, str] = {
+    "East Legon":           "east_legon",
+    "Cantonments":          "cantonments",
+    "Airport Residential":  "airport_residential",
+    "Labone / Roman Ridge": "labone_roman_ridge",
+    "Dzorwulu / Abelenkpe": "dzorwulu_abelenkpe",
+    "Trasacco Valley":      "trasacco_valley",
+}
+
+DISTRICT_SLUGS: dict[str, str] = {
+    "Spintex Road": "spintex_road",
+    "Adenta":       "adenta",
+    "Tema":         "tema",
+    "Dome":         "dome",
+    "Kasoa":        "kasoa",
+}
+
+EVAL_COLS = ["y", "yhat", "yhat_lower", "yhat_upper", "residual"]
+FC_COLS   = ["yhat", "yhat_lower", "yhat_upper", "trend"]
+
+# Fields of the December cubes read by the calculators, cards and map layers
+DEC_HIST_FIELDS = ["y", "price_ghs_per_sqm", "price_usd_per_sqm", "exchange_rate_ghs_usd"]
+DEC_FC_FIELDS   = ["yhat", "yhat_lower", "yhat_upper"]
+
+
+# ── source tables ─────────────────────────────────────────────────────────────
+
+def _csv(*parts: str, dates: bool = True) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(*parts), parse_dates=["ds"] if dates else None)
+
+
+def _avg_dfs(dfs: list[pd.DataFrame], val_cols: list[str]) -> pd.DataFrame:
+    """
+    Average val_cols across DataFrames, month by month.  The frames may
+    cover different months (a segment extended to a longer horizon than
+    the rest of its family); each month averages the frames that have it.
+    """
+    stacked = pd.concat([df[["ds"] + val_cols] for df in dfs], ignore_index=True)
+    return stacked.groupby("ds", sort=True)[val_cols].mean().reset_index()
+
+
+def _make_snapshots(df: pd.DataFrame) -> dict:
+    """Jan 2010 → Dec 2024 snapshot per location, for the map hover tooltips."""
+    first = df.groupby("district").first()
+    last  = df.groupby("district").last()
+    out: dict = {}
+    for loc in last.index:
+        usd0 = first.loc[loc, "price_usd_per_sqm"]
+        usd1 = last.loc[loc, "price_usd_per_sqm"]
+        out[loc] = dict(
+            ahpi    = float(last.loc[loc, "y"]),
+            ghs_sqm = float(last.loc[loc, "price_ghs_per_sqm"]),
+            usd_sqm = float(usd1),
+            usd_pct = float((usd1 - usd0) / usd0 * 100),
+        )
+    return out
+
+
+def _panel_tables(family: str, slugs: dict[str, str]) -> tuple[dict, dict, dict]:
+    """Test evals, scenario forecasts and their aggregates for one model family."""
+    evals = {area: _csv(FORECASTS_DIR, f"{family}_test_eval_{slug}.csv")
+             for area, slug in slugs.items()}
+    fcs   = {(sc, area): _csv(FORECASTS_DIR, f"{family}_forecast_{sc}_{slug}.csv")
+             for sc in SCENARIOS for area, slug in slugs.items()}
+    aggs  = {"test_eval_agg": _avg_dfs(list(evals.values()), EVAL_COLS)}
+    for sc in SCENARIOS:
+        aggs[f"fc_agg_{sc}"] = _avg_dfs([fcs[(sc, area)] for area in slugs], FC_COLS)
+    return evals, fcs, aggs
+
+
+def dec_cube(frames: dict[tuple[str, str], pd.DataFrame], fields: list[str],
+             last_slot: bool) -> tuple[pd.DataFrame, dict]:
+    """
+    The December rows of frames {(scenario, market): frame} as one dense
+    table: a row per (market, scenario, year) in C order, a column per
+    field (NaN where a frame lacks it) and a "found" flag.  With last_slot
+    an extra year slot after the last year holds each frame's final row,
+    which is what a forecast lookup past the horizon returns; a frame with
+    a shorter horizon than the others also gets its final row in every
+    year it has no December for.  Returns (table, axes) with axes the
+    JSON-serialisable axis labels.
+    """
+    markets   = list(dict.fromkeys(m for _, m in frames))
+    scenarios = list(dict.fromkeys(sc for sc, _ in frames))
+    decs      = {key: f[f["ds"].dt.month == 12] for key, f in frames.items()}
+    years     = sorted({int(y) for d in decs.values() for y in d["ds"].dt.year})
+    y_pos     = {y: i for i, y in enumerate(years)}
+    shape     = (len(markets), len(scenarios), len(years) + last_slot)
+
+    values = np.full(shape + (len(fields),), np.nan)
+    found  = np.zeros(shape, dtype=np.int8)
+    for (sc, market), dec in decs.items():
+        m, s = markets.index(market), scenarios.index(sc)
+        cols = [f for f in fields if f in dec.columns]
+        idx  = [fields.index(f) for f in cols]
+        for year, row in zip(dec["ds"].dt.year, dec[cols].to_numpy(float)):
+            values[m, s, y_pos[int(year)], idx] = row
+            found[m, s, y_pos[int(year)]] = 1
+        if last_slot and len(frames[(sc, market)]):
+            last = frames[(sc, market)][cols].iloc[-1].to_numpy(float)
+            for y in np.flatnonzero(found[m, s] == 0):     # incl. the last slot
+                values[m, s, y, idx] = last
+                found[m, s, y] = 1
+
+    table = pd.DataFrame(values.reshape(-1, len(fields)), columns=fields)
+    table["found"] = found.reshape(-1)
+    axes = {"markets": markets, "scenarios": scenarios, "years": years,
+            "fields": fields, "last_slot": last_slot}
+    return table, axes
+
+
+def build_tables() -> tuple[dict, dict, dict]:
+    """
+    Read every source CSV and derive the aggregates.  Returns (tables,
+    groups, meta): named DataFrames, {group: {key: table name}} for the
+    keyed families, and JSON-serialisable extras.
+    """
+    df       = _csv(DATA_DIR, "accra_home_price_index.csv")
+    district = _csv(DATA_DIR, "accra_district_prices.csv")
+    prime    = _csv(DATA_DIR, "accra_prime_prices.csv")
+
+    tables = {
+        "df": df, "district": district, "prime": prime,
+        "test_eval": _csv(FORECASTS_DIR, "ahpi_test_eval.csv"),
+        **{f"fc_{sc}": _csv(FORECASTS_DIR, f"ahpi_forecast_{sc}.csv") for sc in SCENARIOS},
+        "prime_test_summary":    _csv(FORECASTS_DIR, "prime_test_summary.csv", dates=False),
+        "district_test_summary": _csv(FORECASTS_DIR, "district_test_summary.csv", dates=False),
+        "prime_hist_agg":    prime.groupby("ds")[["y"]].mean().reset_index(),
+        "district_hist_agg": district.groupby("ds")[["y"]].mean().reset_index(),
+    }
+    # Prime aggregate: mean of all six areas per month, with macro columns joined
+    # so the KPI callback can read exchange_rate / inflation / gold from one place.
+    prime_agg = (prime.groupby("ds")[["y", "price_ghs_per_sqm", "price_usd_per_sqm"]]
+                 .mean().round(2).reset_index())
+    tables["prime_full"] = prime_agg.merge(
+        df[["ds", "exchange_rate_ghs_usd", "inflation_cpi_pct", "gold_price_usd"]],
+        on="ds", how="left",
+    )
+
+    groups: dict[str, dict] = {}
+    hist_frames = {("hist", "composite"): df}
+    hist_frames.update({("hist", area): grp for panel in (district, prime)
+                        for area, grp in panel.groupby("district", sort=False)})
+    fc_frames = {(sc, "composite"): tables[f"fc_{sc}"] for sc in SCENARIOS}
+    for family, slugs in (("prime", PRIME_AREA_SLUGS), ("district", DISTRICT_SLUGS)):
+        evals, fcs, aggs = _panel_tables(family, slugs)
+        fc_frames.update({(sc, area): frame for (sc, area), frame in fcs.items()})
+        fc_frames.update({(sc, f"{family}/all"): aggs[f"fc_agg_{sc}"] for sc in SCENARIOS})
+        groups[f"{family}_test_eval"] = {}
+        for i, (area, frame) in enumerate(evals.items()):
+            tables[f"{family}_test_eval.{i}"] = frame
+            groups[f"{family}_test_eval"][area] = f"{family}_test_eval.{i}"
+        groups[f"{family}_fc"] = {}
+        for i, (key, frame) in enumerate(fcs.items()):
+            tables[f"{family}_fc.{i}"] = frame
+            groups[f"{family}_fc"][key] = f"{family}_fc.{i}"
+        tables.update({f"{family}_{name}": frame for name, frame in aggs.items()})
+
+    # December cubes: O(1) (market, scenario, year) lookups for the calculators
+    tables["dec_hist"], dec_hist = dec_cube(hist_frames, DEC_HIST_FIELDS, last_slot=False)
+    tables["dec_fc"],   dec_fc   = dec_cube(fc_frames, DEC_FC_FIELDS, last_slot=True)
+
+    # Global bounds across the full 2010-2029 timeline for a consistent animation
+    # colour scale.  AHPI upper bound is set above the max forecast value (~928).
+    both = pd.concat([district, prime])
+    meta = {
+        "dec_hist":      dec_hist,
+        "dec_fc":        dec_fc,
+        "district_snap": _make_snapshots(district),
+        "prime_snap":    _make_snapshots(prime),
+        "anim_bounds": {
+            "ahpi":    [float(both["y"].min()), 950.0],
+            "usd_sqm": [float(both["price_usd_per_sqm"].min()),
+                        float(both["price_usd_per_sqm"].max())],
+            "ghs_sqm": [float(both["price_ghs_per_sqm"].min()),
+                        float(both["price_ghs_per_sqm"].max())],
+        },
+    }
+    return tables, groups, meta
+
+
+# ── file format ───────────────────────────────────────────────────────────────
+
+def _encode(frame: pd.DataFrame, offset: int) -> tuple[dict, list[np.ndarray], int]:
+    """Column specs and contiguous arrays for one table, laid out from offset."""
+    cols, blobs = [], []
+    for name in frame.columns:
+        s    = frame[name]
+        spec = {"name": name}
+        if s.dtype == object:
+            codes, cats = pd.factorize(s, use_na_sentinel=True)
+            arr = codes.astype(np.int32)
+            spec.update(kind="str", categories=[str(c) for c in cats])
+        else:
+            arr = np.ascontiguousarray(s.to_numpy())
+            spec["kind"] = "num"
+        offset = -(-offset // ALIGN) * ALIGN
+        spec.update(dtype=arr.dtype.str, offset=offset)
+        cols.append(spec)
+        blobs.append(arr)
+        offset += arr.nbytes
+    return {"nrows": len(frame), "columns": cols}, blobs, offset
+
+
+def write(path: str, tables: dict, groups: dict, meta: dict, version: str) -> None:
+    """Write the bundle atomically (temp file + rename), safe across workers."""
+    specs, blobs, offset = {}, [], 0
+    for name, frame in tables.items():
+        specs[name], arrays, offset = _encode(frame, offset)
+        blobs.extend(zip((c["offset"] for c in specs[name]["columns"]), arrays))
+    header = json.dumps({
+        "version": version,
+        "tables":  specs,
+        "groups":  {g: [[list(k) if isinstance(k, tuple) else k, t] for k, t in m.items()]
+                    for g, m in groups.items()},
+        "meta":    meta,
+    }).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(MAGIC)
+            fh.write(len(header).to_bytes(8, "little"))
+            fh.write(header)
+            for off, arr in blobs:
+                fh.seek(data_start + off)
+                fh.write(arr.tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class _LazyGroup(Mapping):
+    """{key: DataFrame} view of a keyed table family; tables load on access."""
+
+    def __init__(self, bundle: "Bundle", names: dict):
+        self._bundle = bundle
+        self._names  = names
+
+    def __getitem__(self, key) -> pd.DataFrame:
+        return self._bundle.table(self._names[key])
+
+    def __contains__(self, key) -> bool:
+        return key in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class Bundle:
+    """Tables of one bundle; backed by a read-only memory map or by in-memory frames."""
+
+    def __init__(self, header: dict, mm: np.memmap | None = None,
+                 data_start: int = 0, frames: dict | None = None):
+        self.version     = header["version"]
+        self.meta        = header["meta"]
+        self._specs      = header["tables"]
+        self._groups     = {g: {tuple(k) if isinstance(k, list) else k: t for k, t in pairs}
+                            for g, pairs in header["groups"].items()}
+        self._mm         = mm
+        self._data_start = data_start
+        self._frames     = dict(frames or {})
+
+    def table(self, name: str) -> pd.DataFrame:
+        """The named table, wrapping the mapped columns on first access."""
+        frame = self._frames.get(name)
+        if frame is None:
+            spec = self._specs[name]
+            cols = {}
+            for c in spec["columns"]:
+                dtype = np.dtype(c["dtype"])
+                arr   = np.ndarray((spec["nrows"],), dtype=dtype, buffer=self._mm,
+                                   offset=self._data_start + c["offset"])
+                if c["kind"] == "str":
+                    cats = np.asarray(c["categories"] + [np.nan], dtype=object)
+                    arr  = cats[arr]                # code -1 → NaN
+                cols[c["name"]] = arr
+            frame = self._frames[name] = pd.DataFrame(cols, copy=False)
+        return frame
+
+    def group(self, name: str) -> Mapping:
+        return _LazyGroup(self, self._groups[name])
+
+    def materialize(self) -> None:
+        """
+        Wrap every table now.  Called in the gunicorn master before it forks,
+        so the workers inherit the frames (and the decoded string columns)
+        instead of each building its own copy.
+        """
+        for name in self._specs:
+            self.table(name)
+
+    @property
+    def tables(self) -> list[str]:
+        return list(self._specs)
+
+
+# ── load / build ──────────────────────────────────────────────────────────────
+
+def source_version() -> str:
+    return data_version(SOURCE_GLOBS)
+
+
+def bundle_path(version: str) -> str:
+    return os.path.join(BUNDLE_DIR, f"ahpi-{version}.bundle")
+
+
+def open_bundle(path: str) -> Bundle:
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(mm[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not an AHPI bundle")
+    n      = int.from_bytes(bytes(mm[len(MAGIC):len(MAGIC) + 8]), "little")
+    start  = len(MAGIC) + 8
+    header = json.loads(bytes(mm[start:start + n]))
+    return Bundle(header, mm, -(-(start + n) // ALIGN) * ALIGN)
+
+
+def build(version: str | None = None) -> str:
+    """Build the bundle for the current sources; returns its path."""
+    version = version or source_version()
+    tables, groups, meta = build_tables()
+    path = bundle_path(version)
+    write(path, tables, groups, meta, version)
+    for stale in glob.glob(os.path.join(BUNDLE_DIR, "ahpi-*.bundle")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return path
+
+
+def load() -> Bundle:
+    """
+    The bundle for the current sources: mapped from disk, built first if
+    missing.  If the cache directory is not writable the tables are built
+    in memory instead.
+    """
+    version = source_version()
+    path    = bundle_path(version)
+    if not os.path.exists(path):
+        try:
+            build(version)
+        except OSError:
+            tables, groups, meta = build_tables()
+            header = {"version": version, "meta": meta, "tables": {},
+                      "groups": {g: list(m.items()) for g, m in groups.items()}}
+            return Bundle(header, frames=tables)
+    return open_bundle(path)
+
+
+def main() -> None:
+    ap  = argparse.ArgumentParser(description="AHPI dashboard data bundle")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="(re)build the bundle for the current sources")
+    sub.add_parser("info", help="tables, rows and size")
+    args = ap.parse_args()
+
+    sep = "─" * 50
+    print(f"\n  AHPI · Data Bundle\n  {sep}")
+    if args.cmd == "build":
+        path = build()
+        print(f"  Saved → {os.path.relpath(path, BASE_DIR)}")
+    else:
+        load()
+        path = bundle_path(source_version())
+    bundle = open_bundle(path)
+    for name in bundle.tables:
+        print(f"  {name:<28} {len(bundle.table(name)):>6} rows")
+    print(f"  version    {bundle.version}")
+    print(f"  size       {os.path.getsize(path) / 1024:>8.1f} kB\n")
+
+
+if __name__ == "__main__":
+    main()
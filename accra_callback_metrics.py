@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · callback latency metrics
+==========================================
+Times every server-side Dash callback and serves the counters in the
+Prometheus text format at /metrics on the dashboard's Flask server.
+instrument(app) wraps each callback registered after it (background
+callbacks run in their own process and are left out):
+
+  calls      invocations by outcome: ok, prevented (PreventUpdate) or
+             error (any other exception, re-raised unchanged)
+  duration   handler time, from the call to the return or raise
+  bytes      size of the /_dash-update-component response the call
+             produced (Serverside outputs count as their key)
+  slow       calls at or above the slow threshold; each one also appends
+             a JSON line to the slow log with the triggering prop ids and
+             the callback's input and state values (long values cut short)
+
+Each gunicorn worker keeps its own counters in memory and writes them to
+METRICS_DIR/<pid>.json at most every FLUSH_S seconds.  A scrape flushes
+the serving worker and sums every worker's file, so the counters are the
+same whichever worker answers.  prepare_fork() clears the directory before
+the workers start.
+
+Exported series (label callback; calls also by outcome)
+--------------------------------------------------------
+  ahpi_callback_calls_total             counter
+  ahpi_callback_duration_seconds        histogram (LATENCY_BUCKETS)
+  ahpi_callback_response_bytes          histogram (BYTES_BUCKETS)
+  ahpi_callback_slow_total              counter
+
+Configuration (environment)
+---------------------------
+  AHPI_METRICS_DIR       per-worker counters   (default .cache/metrics)
+  AHPI_SLOW_CALLBACK_MS  slow threshold in ms  (default 500)
+  AHPI_SLOW_LOG          slow-call log         (default .cache/slow_callbacks.jsonl)
+
+Usage
+-----
+  from accra_callback_metrics import instrument
+  app = DashProxy(__name__, ...)
+  instrument(app)                              # before any @app.callback
+
+  python accra_callback_metrics.py report                 # per-callback table
+  python accra_callback_metrics.py report --sort errors
+  python accra_callback_metrics.py slow -n 20             # latest slow calls
+  python accra_callback_metrics.py clear
+"""
+
+import argparse
+import bisect
+import functools
+import glob
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from dash import callback_context
+from dash.exceptions import MissingCallbackContextException, PreventUpdate
+from flask import Response, g, has_request_context
+
+from accra_fig_cache import CACHE_DIR
+
+METRICS_DIR   = os.environ.get("AHPI_METRICS_DIR", os.path.join(CACHE_DIR, "metrics"))
+SLOW_LOG_PATH = os.environ.get("AHPI_SLOW_LOG", os.path.join(CACHE_DIR, "slow_callbacks.jsonl"))
+SLOW_MS       = float(os.environ.get("AHPI_SLOW_CALLBACK_MS", "500"))
+SLOW_LOG_MB   = 16            # the log is rotated to <path>.1 above this size
+FLUSH_S       = 5.0
+VALUE_CHARS   = 200           # longest input value kept in the slow log
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS   = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+OUTCOMES        = ("ok", "prevented", "error")
+CONTENT_TYPE    = "text/plain; version=0.0.4; charset=utf-8"
+
+_lock    = threading.Lock()
+_stats: dict[str, dict] = {}
+_flushed = 0.0
+
+
+# ── counters ──────────────────────────────────────────────────────────────────
+
+def _new_entry() -> dict:
+    return {
+        "calls":       dict.fromkeys(OUTCOMES, 0),
+        "latency":     [0] * (len(LATENCY_BUCKETS) + 1),     # per bucket; last is +Inf
+        "latency_sum": 0.0,
+        "bytes":       [0] * (len(BYTES_BUCKETS) + 1),
+        "bytes_sum":   0,
+        "slow":        0,
+    }
+
+
+def observe(name: str, seconds: float, outcome: str, slow: bool = False) -> None:
+    """Count one call of callback name."""
+    with _lock:
+        e = _stats.get(name) or _stats.setdefault(name, _new_entry())
+        e["calls"][outcome] += 1
+        e["latency"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        e["latency_sum"] += seconds
+        e["slow"] += slow
+    if time.monotonic() - _flushed >= FLUSH_S:
+        flush()
+
+
+def observe_bytes(name: str, size: int) -> None:
+    """Count one response of size bytes produced by callback name."""
+    with _lock:
+        e = _stats.get(name) or _stats.setdefault(name, _new_entry())
+        e["bytes"][bisect.bisect_left(BYTES_BUCKETS, size)] += 1
+        e["bytes_sum"] += size
+
+
+def flush() -> None:
+    """Write this worker's counters to METRICS_DIR/<pid>.json (atomically)."""
+    global _flushed
+    with _lock:
+        text     = json.dumps(_stats)
+        _flushed = time.monotonic()
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with open(path + ".part", "w") as fh:
+            fh.write(text)
+        os.replace(path + ".part", path)
+    except OSError:
+        pass
+
+
+def _merge(into: dict, entry: dict) -> None:
+    for outcome, n in entry["calls"].items():
+        into["calls"][outcome] += n
+    for key in ("latency", "bytes"):
+        into[key] = [a + b for a, b in zip(into[key], entry[key])]
+    for key in ("latency_sum", "bytes_sum", "slow"):
+        into[key] += entry[key]
+
+
+def collect() -> dict[str, dict]:
+    """Every worker's counters summed per callback (flushes this worker first)."""
+    flush()
+    merged: dict[str, dict] = {}
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+        try:
+            with open(path) as fh:
+                worker = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        for name, entry in worker.items():
+            _merge(merged.setdefault(name, _new_entry()), entry)
+    if not merged:                                   # METRICS_DIR not writable
+        with _lock:
+            for name, entry in _stats.items():
+                _merge(merged.setdefault(name, _new_entry()), entry)
+    return merged
+
+
+def reset() -> None:
+    """Drop every worker's counters (the master calls this before forking)."""
+    global _flushed
+    with _lock:
+        _stats.clear()
+        _flushed = 0.0
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.json*")):
+        os.remove(path)
+
+
+# ── Prometheus text format ────────────────────────────────────────────────────
+
+def _histogram(lines: list[str], metric: str, name: str, counts: list[int],
+               bounds: tuple, total: float) -> None:
+    cum = 0
+    for bound, n in zip(bounds + ("+Inf",), counts):
+        cum += n
+        lines.append(f'{metric}_bucket{{callback="{name}",le="{bound}"}} {cum}')
+    lines.append(f'{metric}_sum{{callback="{name}"}} {total}')
+    lines.append(f'{metric}_count{{callback="{name}"}} {cum}')
+
+
+def render(stats: dict[str, dict]) -> str:
+    """stats (collect()) as Prometheus text exposition format 0.0.4."""
+    names = sorted(stats)
+    lines = ["# HELP ahpi_callback_calls_total Dash callback calls by outcome.",
+             "# TYPE ahpi_callback_calls_total counter"]
+    for name in names:
+        for outcome in OUTCOMES:
+            lines.append(f'ahpi_callback_calls_total{{callback="{name}",outcome="{outcome}"}} '
+                         f'{stats[name]["calls"][outcome]}')
+    lines += ["# HELP ahpi_callback_duration_seconds Dash callback handler time.",
+              "# TYPE ahpi_callback_duration_seconds histogram"]
+    for name in names:
+        _histogram(lines, "ahpi_callback_duration_seconds", name, stats[name]["latency"],
+                   LATENCY_BUCKETS, stats[name]["latency_sum"])
+    lines += ["# HELP ahpi_callback_response_bytes Dash callback response size.",
+              "# TYPE ahpi_callback_response_bytes histogram"]
+    for name in names:
+        _histogram(lines, "ahpi_callback_response_bytes", name, stats[name]["bytes"],
+                   BYTES_BUCKETS, stats[name]["bytes_sum"])
+    lines += [f"# HELP ahpi_callback_slow_total Dash callback calls of {SLOW_MS:g} ms or more.",
+              "# TYPE ahpi_callback_slow_total counter"]
+    for name in names:
+        lines.append(f'ahpi_callback_slow_total{{callback="{name}"}} {stats[name]["slow"]}')
+    return "\n".join(lines) + "\n"
+
+
+def quantile(counts: list[int], bounds: tuple, q: float) -> float:
+    """q-quantile of a bucketed distribution, interpolated within its bucket."""
+    total = sum(counts)
+    if not total:
+        return float("nan")
+    rank, cum = q * total, 0
+    for i, n in enumerate(counts):
+        if cum + n >= rank and n:
+            if i == len(bounds):                     # +Inf bucket: its lower bound
+                return bounds[-1]
+            lo = bounds[i - 1] if i else 0
+            return lo + (bounds[i] - lo) * (rank - cum) / n
+        cum += n
+    return bounds[-1]
+
+
+# ── slow-call log ─────────────────────────────────────────────────────────────
+
+def _short(value):
+    text = json.dumps(value, default=str)
+    return value if len(text) <= VALUE_CHARS else text[:VALUE_CHARS] + "…"
+
+
+def log_slow(name: str, seconds: float, outcome: str) -> None:
+    """Append one slow call, with its triggering inputs, to SLOW_LOG_PATH."""
+    try:
+        triggered = [t["prop_id"] for t in callback_context.triggered]
+        inputs    = {k: _short(v) for k, v in callback_context.inputs.items()}
+        states    = {k: _short(v) for k, v in callback_context.states.items()}
+    except MissingCallbackContextException:
+        triggered, inputs, states = [], {}, {}
+    line = json.dumps({
+        "ts":        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "pid":       os.getpid(),
+        "callback":  name,
+        "ms":        round(seconds * 1000, 1),
+        "outcome":   outcome,
+        "triggered": triggered,
+        "inputs":    inputs,
+        "states":    states,
+    }, default=str)
+    try:
+        if os.path.getsize(SLOW_LOG_PATH) > SLOW_LOG_MB * 1024 ** 2:
+            os.replace(SLOW_LOG_PATH, SLOW_LOG_PATH + ".1")
+    except OSError:
+        pass
+    try:
+        with open(SLOW_LOG_PATH, "a") as fh:
+            fh.write(line + "\n")
+    except OSError:
+        pass
+
+
+# ── instrumentation ───────────────────────────────────────────────────────────
+
+def timed(fn):
+    """Wrap callback fn to count its calls, time them and log slow ones."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        outcome = "ok"
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except PreventUpdate:
+            outcome = "prevented"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            slow    = elapsed * 1000 >= SLOW_MS
+            observe(name, elapsed, outcome, slow)
+            if slow:
+                log_slow(name, elapsed, outcome)
+            if has_request_context():
+                g.ahpi_callback = name
+
+    # DashProxy's transforms read the callback's argument names with
+    # inspect.getfullargspec, which ignores __wrapped__ but honours
+    # __signature__: without it the wrapper looks like (*args, **kwargs)
+    wrapper.__signature__ = inspect.signature(fn)
+    wrapper.ahpi_timed    = True
+    return wrapper
+
+
+def _record_response(response):
+    name = g.pop("ahpi_callback", None)
+    if name is not None:
+        size = response.calculate_content_length()
+        if size is not None:
+            observe_bytes(name, size)
+    return response
+
+
+def metrics_view() -> Response:
+    """GET /metrics: every worker's callback counters."""
+    return Response(render(collect()), content_type=CONTENT_TYPE)
+
+
+def instrument(app) -> None:
+    """
+    Time every callback registered on app from now on (the module-level
+    functions stay unwrapped, so direct calls are not counted), size their
+    responses and serve the counters at /metrics.
+    """
+    register = app.callback
+
+    def callback(*args, **kwargs):
+        decorator = register(*args, **kwargs)
+        if kwargs.get("background"):
+            return decorator
+
+        def wrap(fn):
+            decorator(fn if getattr(fn, "ahpi_timed", False) else timed(fn))
+            return fn
+        return wrap
+
+    app.callback = callback
+    app.server.after_request(_record_response)
+    app.server.add_url_rule("/metrics", "metrics", metrics_view)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap  = argparse.ArgumentParser(description="Dashboard callback metrics")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rep = sub.add_parser("report", help="calls, errors, latency and size per callback")
+    rep.add_argument("--sort", choices=["p95", "mean", "calls", "errors", "kb"], default="p95")
+    slw = sub.add_parser("slow", help="latest entries of the slow-call log")
+    slw.add_argument("-n", type=int, default=20)
+    sub.add_parser("clear", help="reset every worker's counters")
+    args = ap.parse_args()
+
+    sep = "─" * 78
+    if args.cmd == "clear":
+        reset()
+        print(f"\n  Cleared {METRICS_DIR}\n")
+        return
+
+    if args.cmd == "slow":
+        try:
+            with open(SLOW_LOG_PATH) as fh:
+                records = [json.loads(line) for line in fh.readlines()[-args.n:]]
+        except OSError:
+            records = []
+        print(f"\n  AHPI · Slow Callbacks (≥ {SLOW_MS:g} ms)\n  {sep}")
+        for r in records:
+            print(f"  {r['ts']}  {r['callback']:<32} {r['ms']:>9.1f} ms  {r['outcome']}")
+            print(f"      triggered {', '.join(r['triggered']) or '—'}")
+            for k, v in r["inputs"].items():
+                print(f"      {k:<36} {json.dumps(v, default=str)[:60]}")
+        print(f"\n  {len(records)} record(s) from {SLOW_LOG_PATH}\n")
+        return
+
+    rows = []
+    for name, e in collect().items():
+        calls = sum(e["calls"].values())
+        sized = sum(e["bytes"])
+        rows.append({
+            "name":   name,
+            "calls":  calls,
+            "errors": e["calls"]["error"],
+            "mean":   e["latency_sum"] / calls * 1000 if calls else 0.0,
+            "p95":    quantile(e["latency"], LATENCY_BUCKETS, 0.95) * 1000,
+            "kb":     e["bytes_sum"] / sized / 1024 if sized else 0.0,
+            "slow":   e["slow"],
+        })
+    rows.sort(key=lambda r: -(r[args.sort] if r[args.sort] == r[args.sort] else 0))
+    print(f"\n  AHPI · Callback Metrics\n  {sep}")
+    print(f"  {'callback':<34} {'calls':>8} {'errors':>7} {'mean ms':>9} "
+          f"{'p95 ms':>9} {'mean kB':>8} {'slow':>6}")
+    for r in rows:
+        print(f"  {r['name']:<34} {r['calls']:>8,} {r['errors']:>7,} {r['mean']:>9.1f} "
+              f"{r['p95']:>9.1f} {r['kb']:>8.1f} {r['slow']:>6,}")
+    print(f"\n  {len(rows)} callback(s) · workers' files in {METRICS_DIR}\n")
+
+
+if __name__ == "__main__":
+    main()
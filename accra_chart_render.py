@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · report chart renderer
+=======================================
+Static PNG rendering for the PDF market reports.  Figures are rendered by a
+small pool of long-lived worker processes; each worker starts its kaleido
+renderer once, in the pool initializer, so later renders skip the Chromium
+start-up that dominates a cold pio.to_image() call.  With kaleido 1.x
+(pio.to_image → kaleido.calc_fig_sync) that renderer is kaleido's sync
+server: without it every call launches and closes its own Chromium.
+
+Under gunicorn the pool lives in a render server (serve(), started by the
+master in gunicorn.conf.py, or run as a sidecar) that listens on a Unix
+socket.  Reports are built in DiskcacheManager job processes, which come and
+go; render_png() / render_many() send their figures to the server, so a job
+never starts a pool of its own.  Without a server (the warm-up command,
+training scripts, local runs) they fall back to a pool in the calling
+process.
+
+Finished PNGs live in the shared figure cache (accra_fig_cache) keyed by
+(market, width, height, data version).  warm() renders every market's chart
+in one pool batch, and the training scripts call warm_after_training() when
+they finish (which also rebuilds the data bundle, see accra_bundle.py), so
+report generation reads the chart from the cache instead of starting a
+renderer.
+
+Configuration (environment)
+---------------------------
+  AHPI_KALEIDO_POOL      renderer processes       (default 2)
+  AHPI_KALEIDO_SOCKET    render server socket     (default .cache/kaleido.sock)
+  AHPI_RENDER_SERVER=0   gunicorn: don't start the render server
+  AHPI_WARM_CHARTS=0     skip the post-training warm-up
+
+Usage
+-----
+  from accra_chart_render import render_png, render_many
+  png  = render_png(fig, 900, 360)
+  pngs = render_many({"composite": (fig, 900, 360), ...})
+
+  python accra_chart_render.py warm      # render every report chart into the cache
+  python accra_chart_render.py serve     # run the render server (sidecar)
+"""
+
+import argparse
+import atexit
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.connection import Client, Listener
+from multiprocessing.util import Finalize
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+BASE_DIR  = os.path.dirname(os.path.abspath(__file__))
+POOL_SIZE = int(os.environ.get("AHPI_KALEIDO_POOL", "2"))
+SOCKET    = os.environ.get("AHPI_KALEIDO_SOCKET",
+                           os.path.join(BASE_DIR, ".cache", "kaleido.sock"))
+
+_SERVER_GRACE_S = 1.0        # a sync server missing Chromium has died by then
+
+_pool: ProcessPoolExecutor | None = None
+
+
+# ── pool workers ──────────────────────────────────────────────────────────────
+
+def _start_renderer() -> None:
+    """
+    Pool initializer: start this worker's kaleido renderer and load it with
+    a blank figure.  kaleido 1.x keeps one Chromium for the worker's life
+    in its sync server, stopped by a finalizer when the worker exits
+    (pool workers do not run atexit handlers); 0.x keeps its own.
+
+    The sync server's thread dies at once when Chromium cannot be found,
+    yet kaleido still counts the server as running and every later render
+    would wait on it forever; such a server is stopped again, so renders
+    fall back to per-call kaleido and raise instead.
+    """
+    try:
+        import kaleido
+        if hasattr(kaleido, "start_sync_server"):
+            kaleido.start_sync_server(silence_warnings=True)
+            thread = getattr(kaleido._global_server, "_thread", None)
+            if thread is not None:
+                thread.join(timeout=_SERVER_GRACE_S)
+            if thread is not None and not thread.is_alive():
+                kaleido.stop_sync_server(silence_warnings=True)
+            else:
+                Finalize(None, kaleido.stop_sync_server,
+                         kwargs={"silence_warnings": True}, exitpriority=10)
+        pio.to_image(go.Figure(), format="png", width=16, height=16)
+    except Exception:
+        pass                                  # surfaced again by the first real render
+
+
+def _render(fig_json: str, width: int, height: int) -> bytes:
+    fig = pio.from_json(fig_json, skip_invalid=True)
+    return pio.to_image(fig, format="png", width=width, height=height)
+
+
+# ── pool ──────────────────────────────────────────────────────────────────────
+
+def get_pool() -> ProcessPoolExecutor:
+    """Start (once per process) the renderer pool."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=POOL_SIZE, initializer=_start_renderer)
+        atexit.register(shutdown)
+    return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _results(futures: list[Future]) -> list[tuple[bool, bytes | str]]:
+    """(True, png) or (False, error message) for each future, in order."""
+    out = []
+    for fut in futures:
+        try:
+            out.append((True, fut.result()))
+        except Exception as exc:
+            out.append((False, f"{type(exc).__name__}: {exc}"))
+    return out
+
+
+def _submit(jobs: list[tuple[str, int, int]]) -> list[tuple[bool, bytes | str]]:
+    """Render (fig_json, width, height) jobs on the render server, else on a local pool."""
+    try:
+        with Client(SOCKET, family="AF_UNIX") as conn:
+            conn.send(jobs)
+            return conn.recv()
+    except (OSError, EOFError):
+        pass                                  # no server, or it went away mid-request
+    pool = get_pool()
+    return _results([pool.submit(_render, *job) for job in jobs])
+
+
+def render_png(fig, width: int, height: int) -> bytes:
+    """Render one figure to PNG bytes."""
+    [(ok, result)] = _submit([(pio.to_json(fig, validate=False), width, height)])
+    if not ok:
+        raise RuntimeError(f"chart render failed: {result}")
+    return result
+
+
+def render_many(jobs: dict) -> dict:
+    """
+    Render {key: (fig, width, height)} concurrently.  Returns {key: bytes},
+    with None for any figure that failed to render.
+    """
+    keys    = list(jobs)
+    results = _submit([(pio.to_json(fig, validate=False), w, h)
+                       for fig, w, h in jobs.values()])
+    return {key: png if ok else None for key, (ok, png) in zip(keys, results)}
+
+
+# ── render server ─────────────────────────────────────────────────────────────
+
+def _handle(conn, pool: ProcessPoolExecutor) -> None:
+    with conn:
+        try:
+            jobs = conn.recv()
+        except (EOFError, OSError):
+            return
+        conn.send(_results([pool.submit(_render, *job) for job in jobs]))
+
+
+def serve(address: str = SOCKET) -> None:
+    """
+    Run the render server: one pool, its renderers started up front, and a
+    thread per connection.  Blocks until the process is stopped.
+    """
+    os.makedirs(os.path.dirname(address), exist_ok=True)
+    if os.path.exists(address):
+        os.unlink(address)                    # stale socket from a previous run
+    with Listener(address, family="AF_UNIX") as listener:
+        pool = get_pool()
+        for fut in [pool.submit(_start_renderer) for _ in range(POOL_SIZE)]:
+            fut.result()                      # connections queue meanwhile
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_handle, args=(conn, pool), daemon=True).start()
+
+
+def start_server() -> subprocess.Popen | None:
+    """Start serve() in a subprocess (gunicorn master).  None when disabled."""
+    if os.environ.get("AHPI_RENDER_SERVER", "1") == "0":
+        return None
+    return subprocess.Popen([sys.executable, os.path.join(BASE_DIR, "accra_chart_render.py"),
+                             "serve"])
+
+
+# ── warm-up ───────────────────────────────────────────────────────────────────
+
+def warm() -> dict:
+    """Render every missing report chart into the figure cache."""
+    import accra_dashboard                  # loads data and forecasts at import
+    return accra_dashboard.warm_chart_cache()
+
+
+def warm_after_training() -> None:
+    """
+    Rebuild the dashboard data bundle and re-warm the report charts in
+    subprocesses (the new forecasts change the data version).  Never raises:
+    a missing renderer must not fail training.
+    """
+    steps = [("Data bundle", "accra_bundle.py", "build")]
+    if os.environ.get("AHPI_WARM_CHARTS", "1") != "0":
+        steps.append(("Chart warm-up", "accra_chart_render.py", "warm"))
+    for label, script, cmd in steps:
+        try:
+            subprocess.run([sys.executable, os.path.join(BASE_DIR, script), cmd], check=True)
+        except Exception as exc:
+            print(f"  {label} skipped: {exc}\n")
+
+
+def main() -> None:
+    ap  = argparse.ArgumentParser(description="Report chart renderer")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("warm", help="render every report chart into the figure cache")
+    sub.add_parser("serve", help="run the render server on AHPI_KALEIDO_SOCKET")
+    args = ap.parse_args()
+
+    if args.cmd == "serve":
+        serve()
+        return
+
+    sep = "─" * 50
+    print(f"\n  AHPI · Report Chart Warm-up\n  {sep}")
+    t0    = time.perf_counter()
+    stats = warm()
+    print(f"  rendered   {stats['rendered']:>6}")
+    print(f"  cached     {stats['cached']:>6}")
+    print(f"  failed     {stats['failed']:>6}")
+    print(f"  time       {time.perf_counter() - t0:>6.1f} s  ({POOL_SIZE} renderers)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ Run
   python accra_dashboard.py --port 8080
 """
 
-import io
+import base64
 import json
 import math
 import zipfile
@@ -28,61 +28,58 @@ import os
 import sys
 import warnings
 import datetime
+import logging
+from collections.abc import Mapping
+from functools import lru_cache
 import numpy as np
 import pandas as pd
 import dash
-from dash import dcc, html, Input, Output, State, ALL
+import diskcache
+from dash import dcc, html, ALL, DiskcacheManager, Patch
+from dash.exceptions import MissingCallbackContextException, PreventUpdate
+from dash_extensions.enrich import (
+    DashProxy, Input, Output, State,
+    FileSystemBackend, Serverside, ServersideOutputTransform,
+)
 import dash_bootstrap_components as dbc
+from flask import abort, request, send_file
 import plotly.graph_objects as go
-import plotly.io as pio
-from plotly.subplots import make_subplots
 
 # dash-leaflet — GIS choropleth maps
 import dash_leaflet as dl
 from dash_extensions.javascript import assign
 
-# reportlab — PDF generation
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors as rl_colors
-from reportlab.lib.units import mm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    HRFlowable, Image as RLImage,
+from accra_bundle import DISTRICT_SLUGS, PRIME_AREA_SLUGS, load as load_bundle
+from accra_callback_metrics import instrument, reset as reset_callback_metrics
+from accra_fig_cache import (
+    CACHE_DIR, cached_bytes, cached_figure, cached_file, contains, data_version,
+    close as close_fig_cache,
+)
+from accra_mortgage_book import BREACH_LTV, WATCH_LTV, MortgageBookEngine, read_loans
+from accra_portfolio import (
+    MonthlyHistory, PortfolioEngine, ReturnSurface, by_market, read_holdings, summarise,
 )
-from reportlab.platypus import KeepTogether
 
 warnings.filterwarnings("ignore")
+_log = logging.getLogger(__name__)
 
 # ── data ──────────────────────────────────────────────────────────────────────
-DATA_PATH = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)),
-    "data", "accra_home_price_index.csv",
-)
-DISTRICT_DATA_PATH = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)),
-    "data", "accra_district_prices.csv",
-)
-PRIME_DATA_PATH = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)),
-    "data", "accra_prime_prices.csv",
-)
-DF = pd.read_csv(DATA_PATH, parse_dates=["ds"])
-DF_DISTRICT = pd.read_csv(DISTRICT_DATA_PATH, parse_dates=["ds"])
-DF_PRIME = pd.read_csv(PRIME_DATA_PATH, parse_dates=["ds"])
+# Every base and derived table comes from one memory-mapped bundle
+# (accra_bundle.py), rebuilt from the CSVs whenever they change.  Tables are
+# read-only views over the mapping: callbacks must copy before modifying.
+_BUNDLE = load_bundle()
+DF          = _BUNDLE.table("df")
+DF_DISTRICT = _BUNDLE.table("district")
+DF_PRIME    = _BUNDLE.table("prime")
+# Content hash of every input file — part of every figure-cache key
+DATA_VERSION = data_version()
 YEARS = list(range(DF["ds"].dt.year.min(), DF["ds"].dt.year.max() + 1))
 
 # ── Prophet forecast outputs ───────────────────────────────────────────────────
-_FORECASTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forecasts")
-DF_TEST_EVAL = pd.read_csv(
-    os.path.join(_FORECASTS_DIR, "ahpi_test_eval.csv"), parse_dates=["ds"])
-DF_FC_BEAR = pd.read_csv(
-    os.path.join(_FORECASTS_DIR, "ahpi_forecast_bear.csv"), parse_dates=["ds"])
-DF_FC_BASE = pd.read_csv(
-    os.path.join(_FORECASTS_DIR, "ahpi_forecast_base.csv"), parse_dates=["ds"])
-DF_FC_BULL = pd.read_csv(
-    os.path.join(_FORECASTS_DIR, "ahpi_forecast_bull.csv"), parse_dates=["ds"])
+DF_TEST_EVAL = _BUNDLE.table("test_eval")
+DF_FC_BEAR   = _BUNDLE.table("fc_bear")
+DF_FC_BASE   = _BUNDLE.table("fc_base")
+DF_FC_BULL   = _BUNDLE.table("fc_bull")
 
 # Pre-compute test-set accuracy metrics (used in the static info card)
 _TEST_MAE  = (DF_TEST_EVAL["y"] - DF_TEST_EVAL["yhat"]).abs().mean()
@@ -94,112 +91,29 @@ DISTRICTS   = DF_DISTRICT["district"].unique().tolist()
 PRIME_AREAS = DF_PRIME["district"].unique().tolist()
 
 # ── Prime areas forecast outputs ───────────────────────────────────────────────
-PRIME_AREA_SLUGS: dict[str, str] = {
-    "East Legon":           "east_legon",
-    "Cantonments":          "cantonments",
-    "Airport Residential":  "airport_residential",
-    "Labone / Roman Ridge": "labone_roman_ridge",
-    "Dzorwulu / Abelenkpe": "dzorwulu_abelenkpe",
-    "Trasacco Valley":      "trasacco_valley",
-}
-
-_PRIME_TEST_EVALS: dict[str, pd.DataFrame] = {
-    area: pd.read_csv(
-        os.path.join(_FORECASTS_DIR, f"prime_test_eval_{slug}.csv"),
-        parse_dates=["ds"],
-    )
-    for area, slug in PRIME_AREA_SLUGS.items()
-}
-
-_PRIME_FC: dict[tuple[str, str], pd.DataFrame] = {
-    (sc, area): pd.read_csv(
-        os.path.join(_FORECASTS_DIR, f"prime_forecast_{sc}_{slug}.csv"),
-        parse_dates=["ds"],
-    )
-    for sc in ("bear", "base", "bull")
-    for area, slug in PRIME_AREA_SLUGS.items()
-}
-
-_PRIME_TEST_SUMMARY = pd.read_csv(
-    os.path.join(_FORECASTS_DIR, "prime_test_summary.csv"))
-
-
-def _avg_dfs(dfs: list[pd.DataFrame], val_cols: list[str]) -> pd.DataFrame:
-    """Average val_cols across a list of same-length DataFrames."""
-    base = dfs[0][["ds"]].copy()
-    for col in val_cols:
-        base[col] = sum(df[col].values for df in dfs) / len(dfs)
-    return base
-
-
-_PRIME_TEST_EVAL_AGG = _avg_dfs(
-    list(_PRIME_TEST_EVALS.values()),
-    ["y", "yhat", "yhat_lower", "yhat_upper", "residual"],
-)
+# Keyed families are lazy mappings: each forecast table is wrapped on first use.
+_PRIME_TEST_EVALS: Mapping[str, pd.DataFrame]            = _BUNDLE.group("prime_test_eval")
+_PRIME_FC:         Mapping[tuple[str, str], pd.DataFrame] = _BUNDLE.group("prime_fc")
+_PRIME_TEST_SUMMARY  = _BUNDLE.table("prime_test_summary")
+_PRIME_TEST_EVAL_AGG = _BUNDLE.table("prime_test_eval_agg")
 _PRIME_FC_AGG: dict[str, pd.DataFrame] = {
-    sc: _avg_dfs(
-        [_PRIME_FC[(sc, area)] for area in PRIME_AREA_SLUGS],
-        ["yhat", "yhat_lower", "yhat_upper", "trend"],
-    )
-    for sc in ("bear", "base", "bull")
+    sc: _BUNDLE.table(f"prime_fc_agg_{sc}") for sc in ("bear", "base", "bull")
 }
-_PRIME_HIST_AGG = DF_PRIME.groupby("ds")[["y"]].mean().reset_index()
+_PRIME_HIST_AGG = _BUNDLE.table("prime_hist_agg")
 
 # ── District forecast outputs ──────────────────────────────────────────────────
-DISTRICT_SLUGS: dict[str, str] = {
-    "Spintex Road": "spintex_road",
-    "Adenta":       "adenta",
-    "Tema":         "tema",
-    "Dome":         "dome",
-    "Kasoa":        "kasoa",
-}
-
-_DISTRICT_TEST_EVALS: dict[str, pd.DataFrame] = {
-    d: pd.read_csv(
-        os.path.join(_FORECASTS_DIR, f"district_test_eval_{slug}.csv"),
-        parse_dates=["ds"],
-    )
-    for d, slug in DISTRICT_SLUGS.items()
-}
-
-_DISTRICT_FC: dict[tuple[str, str], pd.DataFrame] = {
-    (sc, d): pd.read_csv(
-        os.path.join(_FORECASTS_DIR, f"district_forecast_{sc}_{slug}.csv"),
-        parse_dates=["ds"],
-    )
-    for sc in ("bear", "base", "bull")
-    for d, slug in DISTRICT_SLUGS.items()
-}
-
-_DISTRICT_TEST_SUMMARY = pd.read_csv(
-    os.path.join(_FORECASTS_DIR, "district_test_summary.csv"))
-
-_DISTRICT_TEST_EVAL_AGG = _avg_dfs(
-    list(_DISTRICT_TEST_EVALS.values()),
-    ["y", "yhat", "yhat_lower", "yhat_upper", "residual"],
-)
+_DISTRICT_TEST_EVALS: Mapping[str, pd.DataFrame]            = _BUNDLE.group("district_test_eval")
+_DISTRICT_FC:         Mapping[tuple[str, str], pd.DataFrame] = _BUNDLE.group("district_fc")
+_DISTRICT_TEST_SUMMARY  = _BUNDLE.table("district_test_summary")
+_DISTRICT_TEST_EVAL_AGG = _BUNDLE.table("district_test_eval_agg")
 _DISTRICT_FC_AGG: dict[str, pd.DataFrame] = {
-    sc: _avg_dfs(
-        [_DISTRICT_FC[(sc, d)] for d in DISTRICT_SLUGS],
-        ["yhat", "yhat_lower", "yhat_upper", "trend"],
-    )
-    for sc in ("bear", "base", "bull")
+    sc: _BUNDLE.table(f"district_fc_agg_{sc}") for sc in ("bear", "base", "bull")
 }
-_DISTRICT_HIST_AGG = DF_DISTRICT.groupby("ds")[["y"]].mean().reset_index()
+_DISTRICT_HIST_AGG = _BUNDLE.table("district_hist_agg")
 
 # Prime aggregate: mean of all six areas per month, with macro columns joined
 # so the KPI callback can read exchange_rate / inflation / gold from one place.
-_prime_agg = (
-    DF_PRIME.groupby("ds")[["y", "price_ghs_per_sqm", "price_usd_per_sqm"]]
-    .mean()
-    .round(2)
-    .reset_index()
-)
-DF_PRIME_FULL = _prime_agg.merge(
-    DF[["ds", "exchange_rate_ghs_usd", "inflation_cpi_pct", "gold_price_usd"]],
-    on="ds",
-    how="left",
-)
+DF_PRIME_FULL = _BUNDLE.table("prime_full")
 
 # ── palette ───────────────────────────────────────────────────────────────────
 C = {
@@ -277,41 +191,14 @@ PRIME_COORDS: dict[str, tuple[float, float]] = {
     "Trasacco Valley":      (5.662, -0.135),
 }
 
-# Pre-compute Jan 2010 → Dec 2024 snapshots for map hover tooltips
-def _make_snapshots(df: pd.DataFrame) -> dict:
-    first = df.groupby("district").first()
-    last  = df.groupby("district").last()
-    out: dict = {}
-    for loc in last.index:
-        usd0 = first.loc[loc, "price_usd_per_sqm"]
-        usd1 = last.loc[loc, "price_usd_per_sqm"]
-        out[loc] = dict(
-            ahpi    = last.loc[loc, "y"],
-            ghs_sqm = last.loc[loc, "price_ghs_per_sqm"],
-            usd_sqm = usd1,
-            usd_pct = (usd1 - usd0) / usd0 * 100,
-        )
-    return out
-
-DISTRICT_SNAP = _make_snapshots(DF_DISTRICT)
-PRIME_SNAP    = _make_snapshots(DF_PRIME)
+# Jan 2010 → Dec 2024 snapshots for map hover tooltips (built with the bundle)
+DISTRICT_SNAP: dict = _BUNDLE.meta["district_snap"]
+PRIME_SNAP:    dict = _BUNDLE.meta["prime_snap"]
 
 # Global bounds across the full 2010-2029 timeline for a consistent animation
 # color scale (prevents each frame from looking the same due to per-frame rescaling).
-# AHPI upper bound is set above the max forecast value (~928) for headroom.
 _ANIM_BOUNDS: dict[str, tuple[float, float]] = {
-    "ahpi": (
-        float(min(DF_DISTRICT["y"].min(), DF_PRIME["y"].min())),
-        950.0,
-    ),
-    "usd_sqm": (
-        float(min(DF_DISTRICT["price_usd_per_sqm"].min(), DF_PRIME["price_usd_per_sqm"].min())),
-        float(max(DF_DISTRICT["price_usd_per_sqm"].max(), DF_PRIME["price_usd_per_sqm"].max())),
-    ),
-    "ghs_sqm": (
-        float(min(DF_DISTRICT["price_ghs_per_sqm"].min(), DF_PRIME["price_ghs_per_sqm"].min())),
-        float(max(DF_DISTRICT["price_ghs_per_sqm"].max(), DF_PRIME["price_ghs_per_sqm"].max())),
-    ),
+    k: tuple(v) for k, v in _BUNDLE.meta["anim_bounds"].items()
 }
 
 # ── GeoJSON boundaries ─────────────────────────────────────────────────────────
@@ -326,6 +213,17 @@ _BOUNDARY_IDX: dict[str, int] = {
     for i, feat in enumerate(BOUNDARIES_GEOJSON["features"])
 }
 
+# Static geometry for the Leaflet layer: sent once with the layout; per-year
+# values are delivered separately (see the GIS frame table below).
+_GIS_GEOMETRY: dict = {
+    "type": "FeatureCollection",
+    "features": [
+        {"type": "Feature", "geometry": feat["geometry"],
+         "properties": {k: feat["properties"][k] for k in ("name", "type")}}
+        for feat in BOUNDARIES_GEOJSON["features"]
+    ],
+}
+
 # ── GIS colour scales ──────────────────────────────────────────────────────────
 # Continuous colour ramps for choropleth use (8-stop tuples)
 _CS_GOLD_TO_RED = [
@@ -386,7 +284,23 @@ def _normalise(val: float, lo: float, hi: float) -> float:
     return (val - lo) / (hi - lo + 1e-9) if hi > lo else 0.5
 
 
-def _build_price_geojson(metric: str = "price_usd_per_sqm") -> dict:
+def _boundaries_copy() -> dict:
+    """
+    Copy of BOUNDARIES_GEOJSON with fresh properties dicts.  Geometry is
+    shared, not copied — it is never modified.
+    """
+    return {
+        **BOUNDARIES_GEOJSON,
+        "features": [{**feat, "properties": dict(feat["properties"])}
+                     for feat in BOUNDARIES_GEOJSON["features"]],
+    }
+
+
+# The GeoJSON builders below are memoised: the frame space is finite
+# (metric × scenario × year) and the data is fixed for the process lifetime.
+# Returned dicts are shared between callers and must not be modified.
+@lru_cache(maxsize=None)
+def _build_price_geojson(metric: str = "usd_sqm") -> dict:
     """
     Return a copy of BOUNDARIES_GEOJSON with price data injected into
     each feature's properties (for Plotly choropleth and Leaflet styling).
@@ -395,7 +309,7 @@ def _build_price_geojson(metric: str = "price_usd_per_sqm") -> dict:
     vals = [all_snaps[n].get(metric, 0) for n in all_snaps]
     lo, hi = min(vals), max(vals)
 
-    gj = json.loads(json.dumps(BOUNDARIES_GEOJSON))   # deep copy
+    gj = _boundaries_copy()
     for feat in gj["features"]:
         name = feat["properties"]["name"]
         snap = all_snaps.get(name, {})
@@ -411,12 +325,13 @@ def _build_price_geojson(metric: str = "price_usd_per_sqm") -> dict:
     return gj, lo, hi
 
 
+@lru_cache(maxsize=None)
 def _build_forecast_geojson(scenario: str = "base", year: int = 2027) -> dict:
     """
     Return a copy of BOUNDARIES_GEOJSON annotated with forecast AHPI and
     % growth vs Dec 2024 for the chosen scenario/year.
     """
-    gj = json.loads(json.dumps(BOUNDARIES_GEOJSON))   # deep copy
+    gj = _boundaries_copy()
     growths = []
     for feat in gj["features"]:
         name = feat["properties"]["name"]
@@ -446,6 +361,15 @@ def _build_forecast_geojson(scenario: str = "base", year: int = 2027) -> dict:
 
 def _build_timeline_geojson(year: int, metric: str = "usd_sqm",
                              scenario: str = "base") -> tuple[dict, float, float]:
+    # Historical frames do not depend on the scenario, forecast frames do
+    # not depend on the metric — normalise so each frame is built once.
+    if year >= 2025:
+        return _timeline_frame(int(year), "ahpi", scenario or "base")
+    return _timeline_frame(int(year), metric or "usd_sqm", "-")
+
+
+@lru_cache(maxsize=None)
+def _timeline_frame(year: int, metric: str, scenario: str) -> tuple[dict, float, float]:
     """
     Build a GeoJSON snapshot for a specific year.
 
@@ -466,15 +390,13 @@ def _build_timeline_geojson(year: int, metric: str = "usd_sqm",
     col        = col_map.get(eff_metric, "price_usd_per_sqm")
     lo, hi     = _ANIM_BOUNDS.get(eff_metric, _ANIM_BOUNDS["ahpi"])
 
-    gj = json.loads(json.dumps(BOUNDARIES_GEOJSON))   # deep copy
+    gj = _boundaries_copy()
     for feat in gj["features"]:
         name = feat["properties"]["name"]
 
         if year <= 2024:
-            if name in DISTRICTS:
-                row = _HIST_DEC_DISTRICT.get(name, {}).get(year)
-            elif name in PRIME_AREAS:
-                row = _HIST_DEC_PRIME.get(name, {}).get(year)
+            if name in DISTRICTS or name in PRIME_AREAS:
+                row = _get_hist_dec(name, year)
             else:
                 row = None
 
@@ -506,83 +428,57 @@ def _build_timeline_geojson(year: int, metric: str = "usd_sqm",
     return gj, lo, hi
 
 
-# JavaScript style functions for dash-leaflet GeoJSON layers
-_style_price = assign("""function(feature) {
+# JavaScript functions for the dash-leaflet GIS layer.  Geometry is sent once;
+# the per-year values of the current frame reach the browser through the
+# GeoJSON hideout prop (styling) and window.ahpiGisFrame (tooltips), both set
+# by a clientside callback — see "GIS choropleth callbacks".
+_style_frame = assign("""function(feature, context) {
+    // Per-frame values arrive through the GeoJSON hideout prop
+    var h = context.hideout || (context.props && context.props.hideout) || {};
+    var v = (h.values || {})[feature.properties.name] || {};
+    var line = h.layer === 'forecast'
+        ? (v.growth_pct >= 0 ? '#3fb950' : '#f85149')
+        : '#d4a017';
     return {
-        fillColor:   feature.properties.fill || '#30363d',
+        fillColor:   v.fill || '#30363d',
         fillOpacity: 0.72,
-        color:       '#d4a017',
+        color:       line,
         weight:      1.5,
         opacity:     0.9,
         dashArray:   feature.properties.type === 'prime' ? '4 3' : null,
     };
 }""")
 
-_style_forecast = assign("""function(feature) {
-    return {
-        fillColor:   feature.properties.fill || '#30363d',
-        fillOpacity: 0.72,
-        color:       feature.properties.growth_pct >= 0 ? '#3fb950' : '#f85149',
-        weight:      1.5,
-        opacity:     0.9,
-        dashArray:   feature.properties.type === 'prime' ? '4 3' : null,
-    };
-}""")
-
-_on_each_feature_price = assign("""function(feature, layer) {
-    var p = feature.properties;
-    layer.bindTooltip(
-        '<div style="background:#161b22;border:1px solid #30363d;padding:8px 12px;border-radius:6px;font-family:monospace;min-width:180px;">' +
-        '<div style="color:#d4a017;font-weight:700;font-size:13px;margin-bottom:4px;">' + p.name + '</div>' +
-        '<div style="color:#8b949e;font-size:11px;text-transform:uppercase;letter-spacing:0.06em;">' + p.type + '</div>' +
-        '<hr style="border-color:#30363d;margin:5px 0"/>' +
-        '<div style="color:#e6edf3;font-size:12px;">AHPI Dec 2024: <b>' + p.ahpi.toFixed(1) + '</b></div>' +
-        '<div style="color:#e6edf3;font-size:12px;">GHS/sqm: <b>' + p.ghs_sqm.toLocaleString() + '</b></div>' +
-        '<div style="color:#e6edf3;font-size:12px;">USD/sqm: <b>' + p.usd_sqm.toLocaleString() + '</b></div>' +
-        '<div style="color:#3fb950;font-size:12px;">USD gain 2010–24: <b>+' + p.usd_pct.toFixed(1) + '%</b></div>' +
-        '</div>',
-        {sticky: true, opacity: 1}
-    );
-    layer.on('mouseover', function(e) { layer.setStyle({fillOpacity: 0.92, weight: 3}); });
-    layer.on('mouseout',  function(e) { layer.setStyle({fillOpacity: 0.72, weight: 1.5}); });
-}""")
-
-_on_each_feature_forecast = assign("""function(feature, layer) {
-    var p = feature.properties;
-    var growthColor = p.growth_pct >= 0 ? '#3fb950' : '#f85149';
-    var sign = p.growth_pct >= 0 ? '+' : '';
-    layer.bindTooltip(
-        '<div style="background:#161b22;border:1px solid #30363d;padding:8px 12px;border-radius:6px;font-family:monospace;min-width:190px;">' +
-        '<div style="color:#d4a017;font-weight:700;font-size:13px;margin-bottom:4px;">' + p.name + '</div>' +
-        '<div style="color:#8b949e;font-size:11px;text-transform:uppercase;letter-spacing:0.06em;">' + p.type + '</div>' +
-        '<hr style="border-color:#30363d;margin:5px 0"/>' +
-        '<div style="color:#e6edf3;font-size:12px;">Forecast AHPI: <b>' + (p.fc_ahpi ? p.fc_ahpi.toFixed(1) : "—") + '</b></div>' +
-        '<div style="font-size:13px;font-weight:700;color:' + growthColor + ';">Growth vs 2024: ' + sign + p.growth_pct.toFixed(1) + '%</div>' +
-        '</div>',
-        {sticky: true, opacity: 1}
-    );
-    layer.on('mouseover', function(e) { layer.setStyle({fillOpacity: 0.92, weight: 3}); });
-    layer.on('mouseout',  function(e) { layer.setStyle({fillOpacity: 0.72, weight: 1.5}); });
-}""")
-
-
-_on_each_feature_timeline = assign("""function(feature, layer) {
-    var p = feature.properties;
-    var proj = p.projected;
-    var priceRows = proj
-        ? '<div style="color:#58a6ff;font-size:11px;font-style:italic;margin-top:3px;">Projected — AHPI only</div>'
-        : '<div style="color:#e6edf3;font-size:12px;">GHS/sqm: <b>' + (p.ghs_sqm ? p.ghs_sqm.toLocaleString() : '—') + '</b></div>' +
-          '<div style="color:#e6edf3;font-size:12px;">USD/sqm: <b>' + (p.usd_sqm ? p.usd_sqm.toLocaleString() : '—') + '</b></div>';
-    layer.bindTooltip(
-        '<div style="background:#161b22;border:1px solid #30363d;padding:8px 12px;border-radius:6px;font-family:monospace;min-width:180px;">' +
-        '<div style="color:#d4a017;font-weight:700;font-size:13px;margin-bottom:4px;">' + p.name + '</div>' +
-        '<div style="color:#8b949e;font-size:11px;text-transform:uppercase;letter-spacing:0.06em;">' + p.type + ' · ' + p.year + '</div>' +
-        '<hr style="border-color:#30363d;margin:5px 0"/>' +
-        '<div style="color:#e6edf3;font-size:12px;">AHPI' + (proj ? ' (proj)' : '') + ': <b>' + p.ahpi.toFixed(1) + '</b></div>' +
-        priceRows +
-        '</div>',
-        {sticky: true, opacity: 1}
-    );
+_on_each_feature_frame = assign("""function(feature, layer) {
+    // Tooltip content is resolved on open from the current frame
+    layer.bindTooltip(function() {
+        var f = window.ahpiGisFrame || {};
+        var p = feature.properties;
+        var v = (f.values || {})[p.name] || {};
+        var rows;
+        if (f.layer === 'forecast') {
+            var growthColor = v.growth_pct >= 0 ? '#3fb950' : '#f85149';
+            var sign = v.growth_pct >= 0 ? '+' : '';
+            rows =
+                '<div style="color:#8b949e;font-size:11px;text-transform:uppercase;letter-spacing:0.06em;">' + p.type + '</div>' +
+                '<hr style="border-color:#30363d;margin:5px 0"/>' +
+                '<div style="color:#e6edf3;font-size:12px;">Forecast AHPI: <b>' + (v.fc_ahpi ? v.fc_ahpi.toFixed(1) : '—') + '</b></div>' +
+                '<div style="font-size:13px;font-weight:700;color:' + growthColor + ';">Growth vs 2024: ' + sign + (v.growth_pct || 0).toFixed(1) + '%</div>';
+        } else {
+            var priceRows = v.projected
+                ? '<div style="color:#58a6ff;font-size:11px;font-style:italic;margin-top:3px;">Projected — AHPI only</div>'
+                : '<div style="color:#e6edf3;font-size:12px;">GHS/sqm: <b>' + (v.ghs_sqm ? v.ghs_sqm.toLocaleString() : '—') + '</b></div>' +
+                  '<div style="color:#e6edf3;font-size:12px;">USD/sqm: <b>' + (v.usd_sqm ? v.usd_sqm.toLocaleString() : '—') + '</b></div>';
+            rows =
+                '<div style="color:#8b949e;font-size:11px;text-transform:uppercase;letter-spacing:0.06em;">' + p.type + ' · ' + f.year + '</div>' +
+                '<hr style="border-color:#30363d;margin:5px 0"/>' +
+                '<div style="color:#e6edf3;font-size:12px;">AHPI' + (v.projected ? ' (proj)' : '') + ': <b>' + (v.ahpi || 0).toFixed(1) + '</b></div>' +
+                priceRows;
+        }
+        return '<div style="background:#161b22;border:1px solid #30363d;padding:8px 12px;border-radius:6px;font-family:monospace;min-width:180px;">' +
+            '<div style="color:#d4a017;font-weight:700;font-size:13px;margin-bottom:4px;">' + p.name + '</div>' +
+            rows + '</div>';
+    }, {sticky: true, opacity: 1});
     layer.on('mouseover', function(e) { layer.setStyle({fillOpacity: 0.92, weight: 3}); });
     layer.on('mouseout',  function(e) { layer.setStyle({fillOpacity: 0.72, weight: 1.5}); });
 }""")
@@ -633,30 +529,215 @@ BASE_LEGEND = dict(bgcolor="rgba(0,0,0,0)", bordercolor=C["border"],
                    borderwidth=1, font_size=10)
 
 # ── helpers ───────────────────────────────────────────────────────────────────
+class YearIndex:
+    """
+    Frame sorted by ds plus the row offset where each calendar year starts,
+    so a year range is a positional slice (no mask, no copy).  Slices are
+    views of the shared frame — callers must treat them as read-only.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.sort_values("ds", kind="stable").reset_index(drop=True)
+        years   = self.df["ds"].dt.year.to_numpy()
+        self.y0 = int(years[0])
+        # bounds[i] = first row of year y0 + i; last entry = len(df)
+        self.bounds = np.searchsorted(years, np.arange(self.y0, years[-1] + 2))
+
+    def _pos(self, year: int) -> int:
+        i = min(max(int(year) - self.y0, 0), len(self.bounds) - 1)
+        return int(self.bounds[i])
+
+    def rows(self, start_yr, end_yr) -> tuple[int, int]:
+        """Half-open row range [lo, hi) covering start_yr … end_yr."""
+        return self._pos(start_yr), self._pos(int(end_yr) + 1)
+
+    def slice(self, start_yr, end_yr) -> pd.DataFrame:
+        lo, hi = self.rows(start_yr, end_yr)
+        return self.df.iloc[lo:hi]
+
+
+def _panel_index(df: pd.DataFrame) -> dict[str, YearIndex]:
+    """YearIndex over the whole panel ("all") and over each area."""
+    idx = {"all": YearIndex(df)}
+    for name, grp in df.groupby("district", sort=False):
+        idx[name] = YearIndex(grp)
+    return idx
+
+
+_DF_IDX         = YearIndex(DF)
+_DISTRICT_IDX   = _panel_index(DF_DISTRICT)
+_PRIME_IDX      = _panel_index(DF_PRIME)
+_PRIME_FULL_IDX = YearIndex(DF_PRIME_FULL)
+
+
+class RangeMoments:
+    """
+    Prefix sums of x and x·y for every pair of numeric columns of a frame
+    sorted by ds, so the correlation matrix and the OLS fit of any row range
+    come out in O(vars²) without rescanning rows.  Columns are standardised
+    over the whole frame first so differences of large sums stay accurate.
+    """
+
+    # Co-moments below this (in whole-frame standardised units, per row)
+    # are treated as exact zeros — a column constant over the range.
+    ZERO_VAR = 1e-10
+
+    def __init__(self, df: pd.DataFrame, cols: list[str]):
+        self.cols = list(cols)
+        self.pos  = {c: i for i, c in enumerate(self.cols)}
+        self.X    = df[self.cols].to_numpy(float)
+        self.has_nan = bool(np.isnan(self.X).any())
+        self.mu   = self.X.mean(axis=0)
+        sd        = self.X.std(axis=0)
+        sd[sd == 0] = 1.0
+        self.sd   = sd
+        Z = (self.X - self.mu) / sd
+        k = len(self.cols)
+        self.s1 = np.vstack([np.zeros((1, k)), np.cumsum(Z, axis=0)])
+        self.s2 = np.concatenate([np.zeros((1, k, k)),
+                                  np.cumsum(Z[:, :, None] * Z[:, None, :], axis=0)])
+
+    def _comoments(self, lo: int, hi: int, idx: list[int]):
+        """(n, standardised means, co-moment matrix Σ(z−z̄)(z−z̄)ᵀ) over [lo, hi)."""
+        n  = hi - lo
+        s1 = self.s1[hi, idx] - self.s1[lo, idx]
+        s2 = self.s2[hi][np.ix_(idx, idx)] - self.s2[lo][np.ix_(idx, idx)]
+        return n, s1 / n, s2 - np.outer(s1, s1) / n
+
+    def corr(self, lo: int, hi: int, cols: list[str]) -> np.ndarray:
+        """Pearson matrix over rows [lo, hi); NaN where a column is constant."""
+        idx = [self.pos[c] for c in cols]
+        if self.has_nan or hi - lo < 2:
+            return pd.DataFrame(self.X[lo:hi, idx]).corr().to_numpy()
+        n, _, M = self._comoments(lo, hi, idx)
+        var = np.diag(M).copy()
+        var[var <= self.ZERO_VAR * n] = np.nan
+        sd  = np.sqrt(var)
+        out = np.clip(M / np.outer(sd, sd), -1.0, 1.0)
+        np.fill_diagonal(out, np.where(np.isnan(sd), np.nan, 1.0))
+        return out
+
+    def linreg(self, lo: int, hi: int, x: str, y: str):
+        """Same (slope, intercept, r²) as linreg() on rows [lo, hi)."""
+        i, j = self.pos[x], self.pos[y]
+        n    = hi - lo
+        if self.has_nan:
+            return linreg(self.X[lo:hi, i], self.X[lo:hi, j])
+        if n < 3:
+            return None, None, None
+        _, m, M = self._comoments(lo, hi, [i, j])
+        sxx, syy, sxy = M[0, 0], M[1, 1], M[0, 1]
+        if sxx <= self.ZERO_VAR * n:
+            # Degenerate x: defer to polyfit's rank-deficient behaviour
+            return linreg(self.X[lo:hi, i], self.X[lo:hi, j])
+        slope     = sxy / sxx * self.sd[j] / self.sd[i]
+        x_bar     = self.mu[i] + m[0] * self.sd[i]
+        y_bar     = self.mu[j] + m[1] * self.sd[j]
+        intercept = y_bar - slope * x_bar
+        r2        = sxy * sxy / (sxx * syy) if syy > self.ZERO_VAR * n else 0
+        return slope, intercept, r2
+
+
+_DF_MOMENTS = RangeMoments(_DF_IDX.df, [c for c in DF.columns if c != "ds"])
+
+
+class DecRow(Mapping):
+    """
+    One (market, scenario, year) December record of a DecemberCube.  Reads
+    like the DataFrame row it replaces: row["yhat"], row.get("y", default);
+    get() also falls back to default for a field the market does not have.
+    """
+
+    __slots__ = ("_fields", "_values")
+
+    def __init__(self, fields: dict[str, int], values: np.ndarray):
+        self._fields = fields
+        self._values = values
+
+    def __getitem__(self, key: str) -> float:
+        return float(self._values[self._fields[key]])
+
+    def get(self, key: str, default=None):
+        i = self._fields.get(key)
+        if i is None or np.isnan(self._values[i]):
+            return default
+        return float(self._values[i])
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+
+class DecemberCube:
+    """
+    December values[market, scenario, year, field] as one dense array, from
+    a cube table in the data bundle (accra_bundle.dec_cube), so it is built
+    once per data version.  row() is three dict lookups and an index — the
+    calculator callbacks, snapshot card, target cards and map layers do no
+    DataFrame work.  A cube with a last slot answers years past its horizon
+    with each frame's final row, also for a frame whose horizon ends before
+    the cube's (and for bundles built before dec_cube filled those years).
+    """
+
+    def __init__(self, table: pd.DataFrame, axes: dict):
+        shape        = (len(axes["markets"]), len(axes["scenarios"]),
+                        len(axes["years"]) + bool(axes["last_slot"]))
+        self.markets = list(axes["markets"])
+        self.fields  = {f: i for i, f in enumerate(axes["fields"])}
+        self.values  = table[axes["fields"]].to_numpy(float).reshape(shape + (len(self.fields),))
+        self.found   = table["found"].to_numpy(bool).reshape(shape)
+        self._m      = {m: i for i, m in enumerate(self.markets)}
+        self._s      = {sc: i for i, sc in enumerate(axes["scenarios"])}
+        self._y      = {y: i for i, y in enumerate(axes["years"])}
+        self._last   = len(axes["years"]) if axes["last_slot"] else None
+
+    def row(self, market: str, scenario: str, year: int) -> DecRow | None:
+        m, sc = self._m.get(market), self._s.get(scenario)
+        if m is None or sc is None:
+            return None
+        y = self._y.get(int(year), self._last)
+        if y is not None and not self.found[m, sc, y]:
+            y = self._last
+        if y is None or not self.found[m, sc, y]:
+            return None
+        return DecRow(self.fields, self.values[m, sc, y])
+
+    def slab(self, scenario: str, year: int, field: str) -> np.ndarray:
+        """field at (scenario, year) for every market, in self.markets order (NaN if absent)."""
+        out = np.full(len(self.markets), np.nan)
+        sc  = self._s.get(scenario)
+        y   = self._y.get(int(year), self._last)
+        if sc is None or y is None:
+            return out
+        f     = self.fields[field]
+        found = self.found[:, sc, y]
+        out[found] = self.values[found, sc, y, f]
+        if self._last is not None:
+            last = ~found & self.found[:, sc, self._last]
+            out[last] = self.values[last, sc, self._last, f]
+        return out
+
+
 def filter_df(start_yr, end_yr):
-    return DF[(DF["ds"].dt.year >= start_yr) & (DF["ds"].dt.year <= end_yr)].copy()
+    return _DF_IDX.slice(start_yr, end_yr)
 
 
 def filter_df_district(start_yr, end_yr, district="all"):
-    mask = (
-        (DF_DISTRICT["ds"].dt.year >= start_yr) &
-        (DF_DISTRICT["ds"].dt.year <= end_yr)
-    )
-    dff = DF_DISTRICT[mask].copy()
-    if district != "all":
-        dff = dff[dff["district"] == district]
-    return dff
+    if district not in _DISTRICT_IDX:
+        return DF_DISTRICT.iloc[0:0]
+    return _DISTRICT_IDX[district].slice(start_yr, end_yr)
 
 
 def filter_df_prime(start_yr, end_yr, area="all"):
-    mask = (
-        (DF_PRIME["ds"].dt.year >= start_yr) &
-        (DF_PRIME["ds"].dt.year <= end_yr)
-    )
-    dff = DF_PRIME[mask].copy()
-    if area != "all":
-        dff = dff[dff["district"] == area]
-    return dff
+    if area not in _PRIME_IDX:
+        return DF_PRIME.iloc[0:0]
+    return _PRIME_IDX[area].slice(start_yr, end_yr)
+
+
+def filter_df_prime_full(start_yr, end_yr):
+    return _PRIME_FULL_IDX.slice(start_yr, end_yr)
 
 
 def add_event_lines(fig, dff):
@@ -671,8 +752,10 @@ def add_event_lines(fig, dff):
             line_width=1, line_dash="dot",
             line_color=C["muted"],
             opacity=0.5,
+            name="events",
         )
         fig.add_annotation(
+            name="events",
             x=dt, y=ypos,
             xref="x", yref="paper",
             text=label.replace("\n", "<br>"),
@@ -688,6 +771,66 @@ def add_event_lines(fig, dff):
     return fig
 
 
+# ── switchable figure parts ───────────────────────────────────────────────────
+# Parts a switch shows or hides are tagged when the figure is built: traces
+# with meta=<group>, shapes and annotations with name=<group>.  Callbacks
+# cache the figure with every part present and set the visibility per
+# request; when only a switch changed they send a dash.Patch that flips the
+# tagged parts' "visible" flags instead of resending the whole figure.
+
+def _toggle_paths(fig: dict, group: str) -> list[tuple]:
+    """Locations of every part of fig tagged with group."""
+    paths  = [("data", i) for i, tr in enumerate(fig.get("data", []))
+              if tr.get("meta") == group]
+    layout = fig.get("layout", {})
+    for key in ("shapes", "annotations"):
+        paths += [("layout", key, i) for i, item in enumerate(layout.get(key, []))
+                  if item.get("name") == group]
+    return paths
+
+
+def _with_toggles(fig: dict, toggles: dict[str, bool]) -> dict:
+    """fig with each group's parts shown or hidden (modifies fig)."""
+    for group, on in toggles.items():
+        for path in _toggle_paths(fig, group):
+            node = fig
+            for key in path:
+                node = node[key]
+            node["visible"] = bool(on)
+    return fig
+
+
+def _toggle_patch(fig: dict, toggles: dict[str, bool]) -> Patch:
+    """A Patch that gives the figure already on screen the visibility in toggles."""
+    patch = Patch()
+    for group, on in toggles.items():
+        for path in _toggle_paths(fig, group):
+            node = patch
+            for key in path:
+                node = node[key]
+            node["visible"] = bool(on)
+    return patch
+
+
+def _only_switched(*switch_ids: str) -> bool:
+    """True when the running callback was fired by switch_ids alone."""
+    try:
+        fired = set(dash.ctx.triggered_prop_ids.values())
+    except MissingCallbackContextException:         # called directly, not by Dash
+        return False
+    return bool(fired) and fired <= set(switch_ids)
+
+
+def _switched_figure(name: str, args: tuple, build, toggles: dict[str, bool],
+                     switched: bool) -> dict | Patch:
+    """
+    The cached figure (name, args) with toggles applied, or only the Patch
+    for them when switched (a switch changed, everything else is on screen).
+    """
+    fig = cached_figure(name, args, DATA_VERSION, build)
+    return _toggle_patch(fig, toggles) if switched else _with_toggles(fig, toggles)
+
+
 def linreg(x, y):
     """Return slope, intercept, r_squared for two arrays."""
     mask = ~(np.isnan(x) | np.isnan(y))
@@ -763,6 +906,7 @@ def build_ahpi_fig(dff, overlays, show_events, segment="mid", dff_prime_full=Non
                 x=main_dff["ds"], y=main_dff["price_ghs_per_sqm"],
                 line=dict(color=C["green"], width=1.6, dash="dash"),
                 name="GHS / sqm",
+                meta="ghs",
                 yaxis="y2",
                 hovertemplate="GHS %{y:,.0f}<extra>GHS/sqm</extra>",
             ))
@@ -771,6 +915,7 @@ def build_ahpi_fig(dff, overlays, show_events, segment="mid", dff_prime_full=Non
                 x=main_dff["ds"], y=main_dff["price_usd_per_sqm"],
                 line=dict(color=C["blue"], width=1.6, dash="dot"),
                 name="USD / sqm",
+                meta="usd",
                 yaxis="y3",
                 hovertemplate="$%{y:,.0f}<extra>USD/sqm</extra>",
             ))
@@ -835,6 +980,7 @@ def build_macro_grid(dff):
     nrows  = int(np.ceil(len(keys) / ncols))
     titles = [MACRO_META[k][0] for k in keys]
 
+    from plotly.subplots import make_subplots
     fig = make_subplots(rows=nrows, cols=ncols, subplot_titles=titles,
                         vertical_spacing=0.12, horizontal_spacing=0.08)
     for i, key in enumerate(keys):
@@ -867,6 +1013,7 @@ def build_macro_grid(dff):
 
 
 def build_commodity_fig(dff):
+    from plotly.subplots import make_subplots
     fig = make_subplots(
         rows=1, cols=2,
         subplot_titles=("Gold & Brent Crude Oil", "Cocoa Prices"),
@@ -918,12 +1065,13 @@ def build_commodity_fig(dff):
     return fig
 
 
-def build_scatter_fig(dff, x_var, y_var):
+def build_scatter_fig(dff, x_var, y_var, fit=None):
+    """fit: precomputed (slope, intercept, r²); computed from dff if omitted."""
     x_arr = dff[x_var].values.astype(float)
     y_arr = dff[y_var].values.astype(float)
     years = dff["ds"].dt.year.values
 
-    slope, intercept, r2 = linreg(x_arr, y_arr)
+    slope, intercept, r2 = fit if fit is not None else linreg(x_arr, y_arr)
     x_line = np.linspace(np.nanmin(x_arr), np.nanmax(x_arr), 200)
     y_line = slope * x_line + intercept if slope is not None else None
 
@@ -977,10 +1125,11 @@ def build_scatter_fig(dff, x_var, y_var):
     return fig
 
 
-def build_heatmap_fig(dff):
+def build_heatmap_fig(dff, corr_fn=None):
+    """corr_fn(cols) → correlation matrix; defaults to dff[cols].corr()."""
     cols = [c for c in dff.columns if c not in ("ds", "population_total")]
     labels = [ALL_VARS.get(c, c) for c in cols]
-    corr = dff[cols].corr().values
+    corr = corr_fn(cols) if corr_fn is not None else dff[cols].corr().values
 
     fig = go.Figure(go.Heatmap(
         z=corr,
@@ -993,8 +1142,7 @@ def build_heatmap_fig(dff):
             [1.0,  "#7b241c"],
         ],
         zmid=0, zmin=-1, zmax=1,
-        text=[[f"{v:.2f}" for v in row] for row in corr],
-        texttemplate="%{text}",
+        texttemplate="%{z:.2f}",
         textfont=dict(size=8, color=C["text"]),
         colorbar=dict(title="ρ", thickness=12,
                       tickfont=dict(size=9), outlinecolor=C["border"]),
@@ -1102,16 +1250,14 @@ def build_district_single_fig(dff, district):
     return fig
 
 
-def build_district_price_table(yr_range):
+def build_district_price_table(dff):
     """Summary table: latest GHS/sqm and USD/sqm per district."""
-    dff = filter_df_district(*yr_range)
-    latest_date = dff["ds"].max()
+    latest = dff[dff["ds"] == dff["ds"].max()].set_index("district")
     rows = []
     for district in DISTRICTS:
-        row = dff[(dff["district"] == district) & (dff["ds"] == latest_date)]
-        if row.empty:
+        if district not in latest.index:
             continue
-        r = row.iloc[0]
+        r = latest.loc[district]
         dot = html.Span("●", style={"color": DISTRICT_COLORS[district],
                                     "marginRight": "6px", "fontSize": "1.1rem"})
         rows.append(html.Tr([
@@ -1229,16 +1375,14 @@ def build_prime_single_fig(dff, area):
     return fig
 
 
-def build_prime_price_table(yr_range):
+def build_prime_price_table(dff):
     """Summary table showing latest prices across all prime areas."""
-    dff = filter_df_prime(*yr_range)
-    latest_date = dff["ds"].max()
+    latest = dff[dff["ds"] == dff["ds"].max()].set_index("district")
     rows = []
     for area in PRIME_AREAS:
-        row = dff[(dff["district"] == area) & (dff["ds"] == latest_date)]
-        if row.empty:
+        if area not in latest.index:
             continue
-        r = row.iloc[0]
+        r = latest.loc[area]
         dot = html.Span("●", style={"color": PRIME_COLORS[area],
                                     "marginRight": "6px", "fontSize": "1.1rem"})
         rows.append(html.Tr([
@@ -1355,13 +1499,6 @@ FC_YEARS     = list(range(2025, 2030))
 FC_YEAR_OPTS = [{"label": str(y), "value": y} for y in FC_YEARS]
 
 
-def _fc_dec(df_fc: pd.DataFrame, year: int) -> pd.Series:
-    """Return the December row for a given forecast year."""
-    mask = (df_fc["ds"].dt.year == year) & (df_fc["ds"].dt.month == 12)
-    rows = df_fc[mask]
-    return rows.iloc[0] if len(rows) else df_fc.iloc[-1]
-
-
 def build_forecast_fig(show_ci: bool = True) -> go.Figure:
     """
     Two-panel figure:
@@ -1369,6 +1506,7 @@ def build_forecast_fig(show_ci: bool = True) -> go.Figure:
                + three scenario forecasts (2025-2026) with 90% CI bands
       row 2 — test-period residuals (bar chart, 2023-2024)
     """
+    from plotly.subplots import make_subplots
     fig = make_subplots(
         rows=2, cols=1,
         row_heights=[0.72, 0.28],
@@ -1397,6 +1535,7 @@ def build_forecast_fig(show_ci: bool = True) -> go.Figure:
             fill="toself",
             fillcolor="rgba(88,166,255,0.15)",
             line=dict(color="rgba(0,0,0,0)"),
+            meta="ci",
             name="Test 90% CI",
             hoverinfo="skip",
         ), row=1, col=1)
@@ -1419,6 +1558,7 @@ def build_forecast_fig(show_ci: bool = True) -> go.Figure:
                 fill="toself",
                 fillcolor=f"rgba({r},{g},{b},0.10)",
                 line=dict(color="rgba(0,0,0,0)"),
+                meta="ci",
                 showlegend=False,
                 hoverinfo="skip",
             ), row=1, col=1)
@@ -1521,6 +1661,7 @@ def build_prime_forecast_fig(area: str = "all", show_ci: bool = True) -> go.Figu
         hist_name  = f"Actual AHPI  ({area})"
         area_label = area
 
+    from plotly.subplots import make_subplots
     fig = make_subplots(
         rows=2, cols=1,
         row_heights=[0.72, 0.28],
@@ -1548,6 +1689,7 @@ def build_prime_forecast_fig(area: str = "all", show_ci: bool = True) -> go.Figu
             y=list(test_eval["yhat_upper"]) + list(test_eval["yhat_lower"])[::-1],
             fill="toself", fillcolor="rgba(88,166,255,0.15)",
             line=dict(color="rgba(0,0,0,0)"),
+            meta="ci",
             name="Test 90% CI", hoverinfo="skip",
         ), row=1, col=1)
     fig.add_trace(go.Scatter(
@@ -1567,6 +1709,7 @@ def build_prime_forecast_fig(area: str = "all", show_ci: bool = True) -> go.Figu
                 y=list(fc_df["yhat_upper"]) + list(fc_df["yhat_lower"])[::-1],
                 fill="toself", fillcolor=f"rgba({r2},{g2},{b2},0.10)",
                 line=dict(color="rgba(0,0,0,0)"),
+                meta="ci",
                 showlegend=False, hoverinfo="skip",
             ), row=1, col=1)
         fig.add_trace(go.Scatter(
@@ -1659,8 +1802,7 @@ def _build_prime_targets_div(area: str, year: int = 2026) -> html.Div:
     rows = []
     for sc in ("bear", "base", "bull"):
         color, _, label = SCENARIO_STYLES[sc]
-        fc_df = _PRIME_FC_AGG[sc] if area == "all" else _PRIME_FC[(sc, area)]
-        dec   = _fc_dec(fc_df, year)
+        dec = _get_fc_dec("prime/all" if area == "all" else area, sc, year)
         rows.append(html.Div([
             html.Span("● ", style={"color": color, "fontSize": "1rem"}),
             html.Span(f"{label}: ", style={"color": C["muted"], "fontSize": "0.8rem"}),
@@ -1701,6 +1843,7 @@ def build_district_forecast_fig(district: str = "all", show_ci: bool = True) ->
         hist_name  = f"Actual AHPI  ({district})"
         area_label = district
 
+    from plotly.subplots import make_subplots
     fig = make_subplots(
         rows=2, cols=1,
         row_heights=[0.72, 0.28],
@@ -1728,6 +1871,7 @@ def build_district_forecast_fig(district: str = "all", show_ci: bool = True) ->
             y=list(test_eval["yhat_upper"]) + list(test_eval["yhat_lower"])[::-1],
             fill="toself", fillcolor="rgba(88,166,255,0.15)",
             line=dict(color="rgba(0,0,0,0)"),
+            meta="ci",
             name="Test 90% CI", hoverinfo="skip",
         ), row=1, col=1)
     fig.add_trace(go.Scatter(
@@ -1747,6 +1891,7 @@ def build_district_forecast_fig(district: str = "all", show_ci: bool = True) ->
                 y=list(fc_df["yhat_upper"]) + list(fc_df["yhat_lower"])[::-1],
                 fill="toself", fillcolor=f"rgba({r2},{g2},{b2},0.10)",
                 line=dict(color="rgba(0,0,0,0)"),
+                meta="ci",
                 showlegend=False, hoverinfo="skip",
             ), row=1, col=1)
         fig.add_trace(go.Scatter(
@@ -1839,8 +1984,7 @@ def _build_district_targets_div(district: str, year: int = 2026) -> html.Div:
     rows = []
     for sc in ("bear", "base", "bull"):
         color, _, label = SCENARIO_STYLES[sc]
-        fc_df = _DISTRICT_FC_AGG[sc] if district == "all" else _DISTRICT_FC[(sc, district)]
-        dec   = _fc_dec(fc_df, year)
+        dec = _get_fc_dec("district/all" if district == "all" else district, sc, year)
         rows.append(html.Div([
             html.Span("● ", style={"color": color, "fontSize": "1rem"}),
             html.Span(f"{label}: ", style={"color": C["muted"], "fontSize": "0.8rem"}),
@@ -1901,24 +2045,16 @@ def toggle_btn(btn_id, label, active=True):
     )
 
 
-def _dl_btn(btn_id, label="⬇  Download CSV"):
-    """Small right-aligned download trigger button."""
+def _dl_btn(btn_id, label="⬇  Download CSV", href=None):
+    """Small right-aligned download link (href set by a clientside callback)."""
     return html.Div(
-        dbc.Button(label, id=btn_id, size="sm", outline=True, color="secondary",
+        dbc.Button(label, id=btn_id, href=href, external_link=True, size="sm",
+                   outline=True, color="secondary",
                    style={"fontSize": "0.72rem", "padding": "2px 10px"}),
         className="text-end mb-1",
     )
 
 
-def _zip_dfs(files: dict) -> bytes:
-    """Zip a {filename: DataFrame} dict into a bytes object."""
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for fname, df in files.items():
-            zf.writestr(fname, df.to_csv(index=False))
-    return buf.getvalue()
-
-
 # ── methodology modal ──────────────────────────────────────────────────────────
 _METHODOLOGY_MODAL = dbc.Modal([
     dbc.ModalHeader(dbc.ModalTitle("About the Accra Home Price Index (AHPI)"),
@@ -2119,7 +2255,6 @@ tab_overview = html.Div([
                              "fontStyle": "italic", "display": "none"}),
         ], className="d-flex align-items-center flex-wrap mb-2"),
         _dl_btn("dl-overview-btn"),
-        dcc.Download(id="dl-overview"),
         dcc.Graph(id="ahpi-chart", config={"displayModeBar": True,
                                             "modeBarButtonsToRemove": ["lasso2d"],
                                             "toImageButtonOptions": {"scale": 2}}),
@@ -2152,7 +2287,6 @@ tab_macro = html.Div([
             ], md=3, className="d-flex flex-column justify-content-start"),
         ], className="mb-2"),
         _dl_btn("dl-macro-btn"),
-        dcc.Download(id="dl-macro"),
         dcc.Graph(id="macro-chart", config={"displayModeBar": True,
                                              "modeBarButtonsToRemove": ["lasso2d"],
                                              "toImageButtonOptions": {"scale": 2}}),
@@ -2168,7 +2302,6 @@ tab_macro = html.Div([
 tab_commodities = html.Div([
     section_card(
         _dl_btn("dl-commodities-btn"),
-        dcc.Download(id="dl-commodities"),
         dcc.Graph(id="commodity-chart",
                   config={"displayModeBar": True,
                           "modeBarButtonsToRemove": ["lasso2d"],
@@ -2252,7 +2385,6 @@ tab_districts = html.Div([
             ], md=2, className="d-flex flex-column justify-content-start"),
         ], className="mb-2"),
         _dl_btn("dl-districts-btn"),
-        dcc.Download(id="dl-districts"),
         dcc.Graph(id="district-chart",
                   config={"displayModeBar": True,
                           "modeBarButtonsToRemove": ["lasso2d"],
@@ -2297,7 +2429,6 @@ tab_prime = html.Div([
             style={"fontSize": "0.78rem", "color": C["muted"], "marginBottom": "10px"},
         ),
         _dl_btn("dl-prime-btn"),
-        dcc.Download(id="dl-prime"),
         dcc.Graph(id="prime-chart",
                   config={"displayModeBar": True,
                           "modeBarButtonsToRemove": ["lasso2d"],
@@ -2336,30 +2467,33 @@ def _tile_layer(tile_key: str) -> dl.TileLayer:
     return dl.TileLayer(url=url, attribution=attr, maxZoom=19)
 
 
-def _legend_strip(stops: list, lo: float, hi: float, label: str,
-                  unit: str = "") -> html.Div:
-    """Inline colour-bar legend as a horizontal gradient strip."""
+def _legend_bar_style(stops: list) -> dict:
     gradient = ", ".join(c for _, c in stops)
-    ticks = [lo, (lo + hi) / 2, hi]
-    tick_divs = html.Div([
-        html.Span(f"{v:,.0f}{unit}", style={"position": "absolute",
-                                             "left": f"{(v - lo) / (hi - lo + 1e-9) * 100:.0f}%",
-                                             "transform": "translateX(-50%)",
-                                             "fontSize": "0.65rem", "color": C["muted"],
-                                             "whiteSpace": "nowrap"})
-        for v in ticks
-    ], style={"position": "relative", "height": "16px", "marginTop": "2px"})
+    return {
+        "background": f"linear-gradient(to right, {gradient})",
+        "height": "10px", "borderRadius": "4px",
+        "border": f"1px solid {C['border']}",
+    }
+
+
+def _gis_legend() -> html.Div:
+    """
+    Colour-bar legend skeleton.  The gradient is set per layer on the server;
+    the label and lo / mid / hi ticks are set per frame in the browser.
+    """
+    tick_style = {"position": "absolute", "transform": "translateX(-50%)",
+                  "fontSize": "0.65rem", "color": C["muted"], "whiteSpace": "nowrap"}
     return html.Div([
-        html.Div(label, style={"fontSize": "0.7rem", "color": C["muted"],
-                               "marginBottom": "3px",
-                               "textTransform": "uppercase",
-                               "letterSpacing": "0.06em"}),
-        html.Div(style={
-            "background": f"linear-gradient(to right, {gradient})",
-            "height": "10px", "borderRadius": "4px",
-            "border": f"1px solid {C['border']}",
-        }),
-        tick_divs,
+        html.Div(id="gis-legend-label",
+                 style={"fontSize": "0.7rem", "color": C["muted"],
+                        "marginBottom": "3px",
+                        "textTransform": "uppercase",
+                        "letterSpacing": "0.06em"}),
+        html.Div(id="gis-legend-bar", style=_legend_bar_style(_CS_GOLD_TO_RED)),
+        html.Div([
+            html.Span(id=f"gis-legend-{pos}", style={**tick_style, "left": left})
+            for pos, left in (("lo", "0%"), ("mid", "50%"), ("hi", "100%"))
+        ], style={"position": "relative", "height": "16px", "marginTop": "2px"}),
     ], style={"width": "260px"})
 
 
@@ -2478,16 +2612,15 @@ tab_map = html.Div([
             dbc.Col([
                 html.Div("Export", style={"fontSize": "0.75rem", "color": C["muted"],
                                            "marginBottom": "3px"}),
-                dbc.Button("⬇ GeoJSON", id="gis-dl-btn", size="sm", outline=True,
-                           color="secondary",
+                dbc.Button("⬇ GeoJSON", id="gis-dl-btn", external_link=True,
+                           size="sm", outline=True, color="secondary",
                            style={"fontSize": "0.72rem", "padding": "2px 10px",
                                   "width": "100%"}),
-                dcc.Download(id="gis-dl"),
             ], md=1),
         ], className="mb-2 g-2"),
 
         # Legend
-        html.Div(id="gis-legend", style={"marginBottom": "8px"}),
+        html.Div(_gis_legend(), id="gis-legend", style={"marginBottom": "8px"}),
 
         # Leaflet map
         dl.Map(
@@ -2505,9 +2638,10 @@ tab_map = html.Div([
                 ),
                 dl.GeoJSON(
                     id="gis-geojson",
-                    data=None,
-                    style=_style_price,
-                    onEachFeature=_on_each_feature_price,
+                    data=_GIS_GEOMETRY,
+                    hideout=None,
+                    style=_style_frame,
+                    onEachFeature=_on_each_feature_frame,
                     zoomToBounds=False,
                     zoomToBoundsOnClick=True,
                     options=dict(preferCanvas=False),
@@ -2525,6 +2659,7 @@ tab_map = html.Div([
         # ── Time-slider animation controls ───────────────────────────────────
         dcc.Interval(id="gis-anim-interval", interval=900,
                      n_intervals=0, disabled=True),
+        dcc.Store(id="gis-frames"),
         dbc.Row([
             dbc.Col(
                 dbc.Button("▶", id="gis-anim-btn", size="sm", color="secondary",
@@ -2591,13 +2726,9 @@ _forecast_metrics_div = html.Div([
     _METRIC_GLOSSARY,
 ])
 
-def _build_fc_targets_div(year: int, fc_bear=None, fc_base=None, fc_bull=None) -> html.Div:
+def _build_fc_targets_div(year: int) -> html.Div:
     """Scenario targets card for the mid-market composite forecast tab."""
-    if fc_bear is None:
-        fc_bear, fc_base, fc_bull = DF_FC_BEAR, DF_FC_BASE, DF_FC_BULL
-    decs = {"bear": _fc_dec(fc_bear, year),
-            "base": _fc_dec(fc_base, year),
-            "bull": _fc_dec(fc_bull, year)}
+    decs = {sc: _get_fc_dec("composite", sc, year) for sc in ("bear", "base", "bull")}
     rows = [
         html.Div([
             html.Span("● ", style={"color": SCENARIO_STYLES[n][0], "fontSize": "1rem"}),
@@ -2644,8 +2775,7 @@ tab_forecast = html.Div([
                 ),
             ], md=8),
         ], className="mb-2"),
-        _dl_btn("dl-forecast-btn", "⬇  Download ZIP"),
-        dcc.Download(id="dl-forecast"),
+        _dl_btn("dl-forecast-btn", "⬇  Download ZIP", href="/downloads/forecast"),
         dcc.Graph(
             id="forecast-chart",
             config={
@@ -2718,7 +2848,6 @@ tab_prime_forecast = html.Div([
             ], md=3),
         ], className="mb-2"),
         _dl_btn("dl-prime-forecast-btn", "⬇  Download ZIP"),
-        dcc.Download(id="dl-prime-forecast"),
         dcc.Graph(
             id="prime-forecast-chart",
             config={
@@ -2791,7 +2920,6 @@ tab_district_forecast = html.Div([
             ], md=3),
         ], className="mb-2"),
         _dl_btn("dl-district-forecast-btn", "⬇  Download ZIP"),
-        dcc.Download(id="dl-district-forecast"),
         dcc.Graph(
             id="district-forecast-chart",
             config={
@@ -2821,26 +2949,26 @@ tab_district_forecast = html.Div([
     ]),
 ])
 
-# ── Phase 2: pre-computed historical December snapshots ───────────────────────
-# Each dict: { year: pd.Series (row from the dataset at Dec of that year) }
-
-_HIST_DEC_COMPOSITE: dict[int, pd.Series] = {
-    int(row["ds"].year): row
-    for _, row in DF[DF["ds"].dt.month == 12].iterrows()
-}
-_HIST_DEC_DISTRICT: dict[str, dict[int, pd.Series]] = {
-    d: {int(row["ds"].year): row
-        for _, row in grp[grp["ds"].dt.month == 12].iterrows()}
-    for d, grp in DF_DISTRICT.groupby("district")
-}
-_HIST_DEC_PRIME: dict[str, dict[int, pd.Series]] = {
-    a: {int(row["ds"].year): row
-        for _, row in grp[grp["ds"].dt.month == 12].iterrows()}
-    for a, grp in DF_PRIME.groupby("district")
-}
+# ── Phase 2: pre-computed December snapshots ──────────────────────────────────
+# Dense (market, scenario, year, field) cubes from the data bundle: history
+# (scenario "hist") and every scenario forecast, including the prime and
+# district aggregates as markets "prime/all" and "district/all".
+_DEC_HIST = DecemberCube(_BUNDLE.table("dec_hist"), _BUNDLE.meta["dec_hist"])
+_DEC_FC   = DecemberCube(_BUNDLE.table("dec_fc"), _BUNDLE.meta["dec_fc"])
+
+# Portfolio and mortgage-book engines: monthly history of every market as
+# dense arrays (accra_portfolio.MonthlyHistory)
+_HISTORY = MonthlyHistory(
+    {"composite": DF,
+     **dict(tuple(DF_DISTRICT.groupby("district", sort=False))),
+     **dict(tuple(DF_PRIME.groupby("district", sort=False)))},
+    DF,
+)
+_PORTFOLIO = PortfolioEngine(_HISTORY, _DEC_FC, SCENARIO_FX, SCENARIO_TBILL, USD_DEPOSIT_RATE)
 
 # Median monthly household income proxy (GHS, 2024 estimate) for affordability
 GHANA_MEDIAN_INCOME_GHS = 4_000
+_MORTGAGE_BOOK = MortgageBookEngine(_HISTORY, _DEC_FC, FC_YEARS, GHANA_MEDIAN_INCOME_GHS)
 
 # Market label → lookup key (used by both calculator tabs)
 _MARKET_OPTS = (
@@ -2849,21 +2977,12 @@ _MARKET_OPTS = (
     [{"label": f"🔶  {a}", "value": a} for a in PRIME_AREAS]
 )
 
-def _get_hist_dec(market: str, year: int) -> pd.Series | None:
-    if market == "composite":
-        return _HIST_DEC_COMPOSITE.get(year)
-    if market in DISTRICTS:
-        return _HIST_DEC_DISTRICT.get(market, {}).get(year)
-    return _HIST_DEC_PRIME.get(market, {}).get(year)
+def _get_hist_dec(market: str, year: int) -> DecRow | None:
+    return _DEC_HIST.row(market, "hist", year)
 
-def _get_fc_dec(market: str, scenario: str, year: int) -> pd.Series | None:
-    if market == "composite":
-        df_fc = {"bear": DF_FC_BEAR, "base": DF_FC_BASE, "bull": DF_FC_BULL}[scenario]
-    elif market in DISTRICTS:
-        df_fc = _DISTRICT_FC.get((scenario, market))
-    else:
-        df_fc = _PRIME_FC.get((scenario, market))
-    return None if df_fc is None else _fc_dec(df_fc, year)
+def _get_fc_dec(market: str, scenario: str, year: int) -> DecRow | None:
+    """December forecast row; past the horizon, the forecast's last row."""
+    return _DEC_FC.row(market, scenario, year)
 
 def _result_card(label: str, value: str, sub: str = "", color: str = C["gold"]) -> html.Div:
     return html.Div([
@@ -2885,279 +3004,107 @@ def _scenario_col(sc: str, label: str, color: str, content: list) -> dbc.Col:
 
 # ── PDF report generation ─────────────────────────────────────────────────────
 
-_PDF_BG       = rl_colors.HexColor("#0d1117")
-_PDF_CARD     = rl_colors.HexColor("#161b22")
-_PDF_GOLD     = rl_colors.HexColor("#d4a017")
-_PDF_TEXT     = rl_colors.HexColor("#e6edf3")
-_PDF_MUTED    = rl_colors.HexColor("#8b949e")
-_PDF_GREEN    = rl_colors.HexColor("#3fb950")
-_PDF_RED      = rl_colors.HexColor("#f85149")
-_PDF_BLUE     = rl_colors.HexColor("#58a6ff")
-_PDF_BORDER   = rl_colors.HexColor("#30363d")
+REPORT_CHART_SIZE = (900, 360)
+
 
+def _chart_fig(market: str, width_px: int, height_px: int) -> go.Figure:
+    """The forecast figure for *market*, styled for the PDF report."""
+    if market == "composite":
+        fig = build_forecast_fig(show_ci=True)
+    elif market in DISTRICTS:
+        fig = build_district_forecast_fig(market, show_ci=True)
+    else:
+        fig = build_prime_forecast_fig(market, show_ci=True)
+    fig.update_layout(
+        paper_bgcolor="#161b22",
+        plot_bgcolor="#0d1117",
+        width=width_px, height=height_px,
+        margin=dict(l=40, r=20, t=30, b=40),
+    )
+    return fig
 
-def _chart_png(market: str, width_px: int = 900, height_px: int = 360) -> bytes | None:
-    """Render the forecast figure for *market* as a PNG byte string."""
+
+def _chart_png(market: str, width_px: int = REPORT_CHART_SIZE[0],
+               height_px: int = REPORT_CHART_SIZE[1]) -> bytes | None:
+    """
+    The report chart for *market* as PNG bytes, from the figure cache when
+    warm, else rendered on the persistent kaleido pool (accra_chart_render).
+    A failed render is logged and returns None; nothing is cached for it.
+    """
     try:
-        if market == "composite":
-            fig = build_forecast_fig(show_ci=True)
-        elif market in DISTRICTS:
-            fig = build_district_forecast_fig(market, show_ci=True)
-        else:
-            fig = build_prime_forecast_fig(market, show_ci=True)
-        fig.update_layout(
-            paper_bgcolor="#161b22",
-            plot_bgcolor="#0d1117",
-            width=width_px, height=height_px,
-            margin=dict(l=40, r=20, t=30, b=40),
-        )
-        return pio.to_image(fig, format="png", engine="kaleido")
+        from accra_chart_render import render_png
+        return cached_bytes(
+            "chart_png", (market, width_px, height_px), DATA_VERSION,
+            lambda: render_png(_chart_fig(market, width_px, height_px), width_px, height_px))
     except Exception:
+        _log.exception("Report chart for %s failed to render", market)
         return None
 
 
-def _pdf_styles():
-    base = getSampleStyleSheet()
-    styles = {
-        "title": ParagraphStyle("title", fontName="Helvetica-Bold", fontSize=18,
-                                textColor=_PDF_GOLD, alignment=TA_LEFT, spaceAfter=4),
-        "subtitle": ParagraphStyle("subtitle", fontName="Helvetica", fontSize=10,
-                                   textColor=_PDF_MUTED, alignment=TA_LEFT, spaceAfter=10),
-        "section": ParagraphStyle("section", fontName="Helvetica-Bold", fontSize=11,
-                                  textColor=_PDF_GOLD, alignment=TA_LEFT,
-                                  spaceBefore=10, spaceAfter=4),
-        "body": ParagraphStyle("body", fontName="Helvetica", fontSize=8.5,
-                               textColor=_PDF_TEXT, alignment=TA_LEFT, spaceAfter=3),
-        "small": ParagraphStyle("small", fontName="Helvetica", fontSize=7.5,
-                                textColor=_PDF_MUTED, alignment=TA_LEFT),
-        "cell": ParagraphStyle("cell", fontName="Helvetica", fontSize=8,
-                               textColor=_PDF_TEXT),
-        "cell_bold": ParagraphStyle("cell_bold", fontName="Helvetica-Bold", fontSize=8,
-                                    textColor=_PDF_GOLD),
-        "right": ParagraphStyle("right", fontName="Helvetica", fontSize=8,
-                                textColor=_PDF_TEXT, alignment=TA_RIGHT),
-        "disclaimer": ParagraphStyle("disclaimer", fontName="Helvetica-Oblique", fontSize=7,
-                                     textColor=_PDF_MUTED, alignment=TA_CENTER, spaceAfter=4),
-    }
-    return styles
-
-
-def generate_market_pdf(market: str, report_year: int) -> bytes:
-    """Generate a 2-3 page PDF market report for the given market and forecast year."""
-    buf = io.BytesIO()
-    W, H = A4
-    doc = SimpleDocTemplate(
-        buf, pagesize=A4,
-        leftMargin=18*mm, rightMargin=18*mm,
-        topMargin=16*mm, bottomMargin=16*mm,
-    )
-
-    styles = _pdf_styles()
-    story  = []
-
-    # Determine display label
+def warm_chart_cache(sizes: list[tuple[int, int]] | None = None) -> dict:
+    """
+    Render every market's report chart that is not yet cached for this data
+    version, in one batch on the renderer pool.
+    """
+    keys = [(m["value"], w, h) for m in _MARKET_OPTS
+            for w, h in (sizes or [REPORT_CHART_SIZE])]
+    todo = [k for k in keys if not contains("chart_png", k, DATA_VERSION)]
+    from accra_chart_render import render_many
+    pngs = render_many({k: (_chart_fig(*k), k[1], k[2]) for k in todo})
+    for k, png in pngs.items():
+        if png is not None:
+            cached_bytes("chart_png", k, DATA_VERSION, lambda png=png: png)
+    failed = sum(png is None for png in pngs.values())
+    return {"rendered": len(todo) - failed, "cached": len(keys) - len(todo), "failed": failed}
+
+
+def _report_inputs(market: str, report_year: int) -> dict:
+    """The figures accra_report lays out for *market* and *report_year*."""
     if market == "composite":
-        label = "Composite Mid-Market"
-        family = "mid-market"
+        label, family = "Composite Mid-Market", "mid-market"
     elif market in DISTRICTS:
-        label = market
-        family = "mid-market district"
+        label, family = market, "mid-market district"
     else:
-        label = market
-        family = "prime area"
-
-    # ── Header ──────────────────────────────────────────────────────────────────
-    story.append(Paragraph("ACCRA HOME PRICE INDEX", styles["title"]))
-    story.append(Paragraph(
-        f"Market Report — {label} ({family.title()}) · Forecast Horizon: Dec {report_year}",
-        styles["subtitle"]))
-    story.append(Paragraph(
-        f"Generated: {datetime.date.today().strftime('%d %B %Y')}  ·  "
-        "Source: AHPI Prophet v2.1  ·  Base year: 2015 = 100",
-        styles["small"]))
-    story.append(HRFlowable(width="100%", thickness=0.5,
-                            color=_PDF_GOLD, spaceAfter=8))
-
-    # ── Current snapshot (latest historical Dec) ─────────────────────────────
-    story.append(Paragraph("Current Market Snapshot (Dec 2024)", styles["section"]))
-
-    hist_2024 = _get_hist_dec(market, 2024)
-    hist_2023 = _get_hist_dec(market, 2023)
-
-    if hist_2024 is not None:
-        ahpi_now  = float(hist_2024.get("y", "—"))
-        ghs_sqm   = hist_2024.get("price_ghs_per_sqm")
-        usd_sqm   = hist_2024.get("price_usd_per_sqm")
-        if hist_2023 is not None:
-            ahpi_prev = float(hist_2023.get("y", ahpi_now))
-            yoy_pct   = (ahpi_now - ahpi_prev) / ahpi_prev * 100 if ahpi_prev else 0
-            yoy_str   = f"{yoy_pct:+.1f}% YoY"
-        else:
-            yoy_str = "—"
-
-        snap_data = [
-            [Paragraph("Metric", styles["cell_bold"]),
-             Paragraph("Value", styles["cell_bold"]),
-             Paragraph("Note", styles["cell_bold"])],
-            [Paragraph("AHPI (Dec 2024)", styles["cell"]),
-             Paragraph(f"{ahpi_now:.1f}", styles["cell"]),
-             Paragraph(yoy_str, styles["cell"])],
-        ]
-        if ghs_sqm is not None:
-            snap_data.append([
-                Paragraph("GHS / sqm", styles["cell"]),
-                Paragraph(f"GHS {float(ghs_sqm):,.0f}", styles["cell"]),
-                Paragraph("", styles["cell"]),
-            ])
-        if usd_sqm is not None:
-            snap_data.append([
-                Paragraph("USD / sqm", styles["cell"]),
-                Paragraph(f"USD {float(usd_sqm):,.0f}", styles["cell"]),
-                Paragraph("At 2024 GHS/USD rate", styles["cell"]),
-            ])
-
-        col_w = [(W - 36*mm) * f for f in (0.45, 0.25, 0.30)]
-        snap_tbl = Table(snap_data, colWidths=col_w, repeatRows=1)
-        snap_tbl.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), _PDF_GOLD),
-            ("TEXTCOLOR",  (0, 0), (-1, 0), _PDF_BG),
-            ("BACKGROUND", (0, 1), (-1, -1), _PDF_CARD),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [_PDF_CARD, _PDF_BG]),
-            ("GRID",       (0, 0), (-1, -1), 0.3, _PDF_BORDER),
-            ("TOPPADDING",  (0, 0), (-1, -1), 4),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ]))
-        story.append(snap_tbl)
-        story.append(Spacer(1, 8))
-    else:
-        story.append(Paragraph("No historical data available for Dec 2024.", styles["body"]))
-
-    # ── Scenario Forecast Table ──────────────────────────────────────────────
-    story.append(Paragraph(f"Scenario Forecasts — Dec {report_year}", styles["section"]))
-    story.append(Paragraph(
-        "Three economic scenarios modelled with Facebook Prophet. "
-        "Bear assumes continued GHS/USD depreciation (→ 20). "
-        "Base assumes gradual stabilisation (→ 15). "
-        "Bull assumes cedi recovery (→ 12). 90% credible interval shown.",
-        styles["small"]))
-    story.append(Spacer(1, 4))
-
-    fc_rows = [
-        [Paragraph("Scenario", styles["cell_bold"]),
-         Paragraph(f"Dec {report_year} AHPI", styles["cell_bold"]),
-         Paragraph("Lower (90%)", styles["cell_bold"]),
-         Paragraph("Upper (90%)", styles["cell_bold"]),
-         Paragraph("GHS/USD Assumption", styles["cell_bold"])],
-    ]
-    sc_label_map = {"bear": "Bear", "base": "Base", "bull": "Bull"}
-    sc_color_map = {"bear": _PDF_RED, "base": _PDF_BLUE, "bull": _PDF_GREEN}
-    for sc in ("bear", "base", "bull"):
-        fc_row = _get_fc_dec(market, sc, report_year)
-        if fc_row is not None:
-            fc_rows.append([
-                Paragraph(sc_label_map[sc], styles["cell"]),
-                Paragraph(f"{float(fc_row['yhat']):.1f}", styles["cell"]),
-                Paragraph(f"{float(fc_row['yhat_lower']):.1f}", styles["cell"]),
-                Paragraph(f"{float(fc_row['yhat_upper']):.1f}", styles["cell"]),
-                Paragraph(f"{SCENARIO_FX[sc]:.1f}", styles["cell"]),
-            ])
-        else:
-            fc_rows.append([Paragraph(sc_label_map[sc], styles["cell"])] + [Paragraph("—", styles["cell"])] * 4)
-
-    fc_col_w = [(W - 36*mm) * f for f in (0.18, 0.20, 0.20, 0.20, 0.22)]
-    fc_tbl = Table(fc_rows, colWidths=fc_col_w, repeatRows=1)
-    fc_style = [
-        ("BACKGROUND", (0, 0), (-1, 0), _PDF_GOLD),
-        ("TEXTCOLOR",  (0, 0), (-1, 0), _PDF_BG),
-        ("GRID",       (0, 0), (-1, -1), 0.3, _PDF_BORDER),
-        ("TOPPADDING",  (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-    ]
-    for i, sc in enumerate(("bear", "base", "bull"), start=1):
-        fc_style.append(("BACKGROUND", (0, i), (0, i), sc_color_map[sc]))
-        fc_style.append(("TEXTCOLOR",  (0, i), (0, i), _PDF_BG))
-        row_bg = _PDF_CARD if i % 2 == 1 else _PDF_BG
-        fc_style.append(("BACKGROUND", (1, i), (-1, i), row_bg))
-    fc_tbl.setStyle(TableStyle(fc_style))
-    story.append(fc_tbl)
-    story.append(Spacer(1, 8))
-
-    # ── Model accuracy metrics ───────────────────────────────────────────────
-    story.append(Paragraph("Model Accuracy (2023–2024 Test Set)", styles["section"]))
+        label, family = market, "prime area"
 
     if market == "composite":
-        mae  = _TEST_MAE
-        rmse = _TEST_RMSE
-        mape = _TEST_MAPE
+        accuracy = (_TEST_MAE, _TEST_RMSE, _TEST_MAPE)
     elif market in DISTRICTS and market in _DISTRICT_TEST_EVALS:
-        te   = _DISTRICT_TEST_EVALS[market]
-        mae  = (te["y"] - te["yhat"]).abs().mean()
-        rmse = ((te["y"] - te["yhat"]) ** 2).mean() ** 0.5
-        mape = ((te["y"] - te["yhat"]).abs() / te["y"]).mean() * 100
+        te       = _DISTRICT_TEST_EVALS[market]
+        accuracy = ((te["y"] - te["yhat"]).abs().mean(),
+                    ((te["y"] - te["yhat"]) ** 2).mean() ** 0.5,
+                    ((te["y"] - te["yhat"]).abs() / te["y"]).mean() * 100)
     elif market in _PRIME_TEST_EVALS:
-        te   = _PRIME_TEST_EVALS[market]
-        mae  = (te["y"] - te["yhat"]).abs().mean()
-        rmse = ((te["y"] - te["yhat"]) ** 2).mean() ** 0.5
-        mape = ((te["y"] - te["yhat"]).abs() / te["y"]).mean() * 100
-    else:
-        mae = rmse = mape = None
-
-    if mae is not None:
-        acc_data = [
-            [Paragraph("MAE", styles["cell_bold"]),
-             Paragraph("RMSE", styles["cell_bold"]),
-             Paragraph("MAPE", styles["cell_bold"])],
-            [Paragraph(f"{mae:.2f} pts", styles["cell"]),
-             Paragraph(f"{rmse:.2f} pts", styles["cell"]),
-             Paragraph(f"{mape:.1f}%", styles["cell"])],
-        ]
-        acc_col_w = [(W - 36*mm) / 3] * 3
-        acc_tbl = Table(acc_data, colWidths=acc_col_w, repeatRows=1)
-        acc_tbl.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), _PDF_GOLD),
-            ("TEXTCOLOR",  (0, 0), (-1, 0), _PDF_BG),
-            ("BACKGROUND", (0, 1), (-1, -1), _PDF_CARD),
-            ("GRID",       (0, 0), (-1, -1), 0.3, _PDF_BORDER),
-            ("TOPPADDING",  (0, 0), (-1, -1), 4),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ("LEFTPADDING", (0, 0), (-1, -1), 6),
-            ("ALIGN",      (0, 0), (-1, -1), "CENTER"),
-        ]))
-        story.append(acc_tbl)
+        te       = _PRIME_TEST_EVALS[market]
+        accuracy = ((te["y"] - te["yhat"]).abs().mean(),
+                    ((te["y"] - te["yhat"]) ** 2).mean() ** 0.5,
+                    ((te["y"] - te["yhat"]).abs() / te["y"]).mean() * 100)
     else:
-        story.append(Paragraph("Accuracy metrics unavailable.", styles["body"]))
+        accuracy = None
 
-    story.append(Spacer(1, 10))
+    return {
+        "label":       label,
+        "family":      family,
+        "report_year": report_year,
+        "hist_now":    _get_hist_dec(market, 2024),
+        "hist_prev":   _get_hist_dec(market, 2023),
+        "forecasts":   {sc: _get_fc_dec(market, sc, report_year)
+                        for sc in ("bear", "base", "bull")},
+        "scenario_fx": SCENARIO_FX,
+        "accuracy":    accuracy,
+        "chart_size":  REPORT_CHART_SIZE,
+    }
 
-    # ── Forecast chart ───────────────────────────────────────────────────────
-    story.append(Paragraph("Historical AHPI & Scenario Forecasts", styles["section"]))
 
-    png_bytes = _chart_png(market)
-    if png_bytes:
-        img_buf = io.BytesIO(png_bytes)
-        chart_w = W - 36*mm
-        chart_h = chart_w * 360 / 900
-        story.append(RLImage(img_buf, width=chart_w, height=chart_h))
-    else:
-        story.append(Paragraph("Chart unavailable (kaleido not configured).", styles["small"]))
-
-    story.append(Spacer(1, 10))
-
-    # ── Disclaimer ───────────────────────────────────────────────────────────
-    story.append(HRFlowable(width="100%", thickness=0.4, color=_PDF_BORDER, spaceAfter=4))
-    story.append(Paragraph(
-        "This report is generated from the Accra Home Price Index (AHPI) model for informational purposes only. "
-        "Forecasts are probabilistic outputs of a Facebook Prophet model trained on historical data. "
-        "They do not constitute financial, investment, or legal advice. "
-        "Past performance does not guarantee future results. "
-        "Always conduct independent due diligence before making property investment decisions.",
-        styles["disclaimer"],
-    ))
-
-    doc.build(story)
-    return buf.getvalue()
+def generate_market_pdf(market: str, report_year: int, progress=None) -> bytes:
+    """
+    Generate a 2-3 page PDF market report for the given market and forecast year.
+    progress, if given, is called as progress(step, total, label) before each
+    stage in accra_report.PDF_STEPS.  reportlab loads on the first report.
+    """
+    from accra_report import build_market_pdf
+    return build_market_pdf(_report_inputs(market, report_year),
+                            lambda: _chart_png(market), progress=progress)
 
 
 # ── tab: Market Report (Phase 3.1) ────────────────────────────────────────────
@@ -3190,6 +3137,10 @@ tab_report = html.Div([
                     id="report-pdf-btn", color="warning", outline=True, size="sm",
                     style={"fontWeight": "600", "fontSize": "0.82rem", "width": "100%"},
                 ),
+                dbc.Progress(id="report-progress", value=0, striped=True, animated=True,
+                             color="warning",
+                             style={"display": "none", "height": "14px", "marginTop": "10px",
+                                    "fontSize": "0.7rem"}),
                 dcc.Download(id="report-pdf-dl"),
             ], md=4),
             dbc.Col([
@@ -3233,9 +3184,24 @@ tab_snapshot = html.Div([
 
 
 # ── tab: Investment Return Calculator ─────────────────────────────────────────
-_INV_BUY_OPTS = [{"label": str(y), "value": y} for y in range(2010, 2025)]
+_INV_BUY_YEARS = list(range(2010, 2025))
+_INV_BUY_OPTS  = [{"label": str(y), "value": y} for y in _INV_BUY_YEARS]
 _INV_SELL_OPTS = FC_YEAR_OPTS
 
+# Every market × buy year × sell year × scenario of the calculator, precomputed
+_INV_SURFACE = ReturnSurface(
+    _DEC_HIST, _DEC_FC, [m["value"] for m in _MARKET_OPTS], _INV_BUY_YEARS, FC_YEARS,
+    SCENARIO_FX, SCENARIO_TBILL, USD_DEPOSIT_RATE,
+)
+_INV_SURFACE_METRICS = {
+    "ghs_cagr": ("GHS CAGR",            "% p.a."),
+    "usd_cagr": ("USD CAGR",            "% p.a."),
+    "ghs_ret":  ("GHS total return",    "%"),
+    "usd_ret":  ("USD total return",    "%"),
+    "vs_tbill": ("GHS return − T-bill", "pp"),
+}
+_PF_MAX_UPLOAD = 50 * 1024 * 1024   # holdings CSV upload limit (bytes)
+
 tab_invest = html.Div([
     section_card(
         html.P(
@@ -3309,6 +3275,61 @@ tab_invest = html.Div([
             ], md=9),
         ]),
     ),
+
+    # ── return surface: every buy / sell combination ────────────────────────
+    section_card(
+        dbc.Row([
+            dbc.Col(html.Div("All buy / sell combinations", style={
+                "fontWeight": "700", "color": C["gold"], "fontSize": "0.9rem"}), md=5),
+            dbc.Col(dbc.RadioItems(
+                id="inv-surface-metric",
+                options=[{"label": label, "value": key}
+                         for key, (label, _) in _INV_SURFACE_METRICS.items()],
+                value="ghs_cagr", inline=True,
+                style={"fontSize": "0.78rem", "color": C["muted"]},
+            ), md=7, className="text-end"),
+        ], className="mb-1"),
+        dcc.Graph(id="inv-surface-chart", config={"displayModeBar": False}),
+    ),
+
+    # ── portfolio valuation ─────────────────────────────────────────────────
+    section_card(
+        html.Div("Portfolio valuation", style={"fontWeight": "700", "color": C["gold"],
+                                               "fontSize": "0.9rem", "marginBottom": "4px"}),
+        html.P(
+            "Value a book of holdings under each scenario. Upload a CSV with columns "
+            "market, sqm, purchase_month (YYYY-MM) and, optionally, price (GHS paid — "
+            "blank uses sqm × the market's GHS/sqm in the purchase month).",
+            style={"color": C["muted"], "fontSize": "0.8rem", "marginBottom": "10px"},
+        ),
+        dbc.Row([
+            dbc.Col(dcc.Upload(
+                id="pf-upload", accept=".csv,text/csv", max_size=_PF_MAX_UPLOAD,
+                children=html.Div(["Drop a holdings CSV here or ",
+                                   html.A("select a file", style={"color": C["gold"]})]),
+                style={"border": f"1px dashed {C['border']}", "borderRadius": "6px",
+                       "padding": "10px", "textAlign": "center", "cursor": "pointer",
+                       "color": C["muted"], "fontSize": "0.8rem"},
+            ), md=6),
+            dbc.Col([
+                html.Div("Sell year", style={"fontSize": "0.75rem", "color": C["muted"],
+                                              "marginBottom": "3px"}),
+                dcc.Dropdown(id="pf-sell-year", options=_INV_SELL_OPTS, value=2027,
+                             clearable=False,
+                             style={"backgroundColor": C["bg"], "fontSize": "0.82rem"}),
+            ], md=3),
+            dbc.Col([
+                dbc.Button("⬇  Download results", id="pf-dl-btn", size="sm", outline=True,
+                           color="secondary", disabled=True,
+                           style={"fontSize": "0.72rem", "padding": "2px 10px",
+                                  "marginTop": "22px"}),
+                dcc.Download(id="pf-dl"),
+            ], md=3, className="text-end"),
+        ], className="g-2 mb-2"),
+        dcc.Store(id="pf-holdings"),
+        html.Div(id="pf-status", style={"fontSize": "0.78rem", "marginBottom": "8px"}),
+        html.Div(id="pf-results"),
+    ),
 ])
 
 # ── tab: Mortgage Stress Test ─────────────────────────────────────────────────
@@ -3391,6 +3412,46 @@ tab_mortgage = html.Div([
             ], md=9),
         ]),
     ),
+
+    # ── mortgage book ───────────────────────────────────────────────────────
+    section_card(
+        html.Div("Mortgage book stress test", style={"fontWeight": "700", "color": C["gold"],
+                                                     "fontSize": "0.9rem", "marginBottom": "4px"}),
+        html.P(
+            "Run the stress test across a whole loan book. Upload a CSV with columns district, "
+            "sqm, value (GHS at origination — blank uses sqm × the district's GHS/sqm), ltv (%), "
+            "term (years), rate (% p.a.), origination (YYYY-MM) and, optionally, loan_id. "
+            "Collateral is the origination value indexed by the district AHPI; LTV is the "
+            "amortised balance over collateral at each December.",
+            style={"color": C["muted"], "fontSize": "0.8rem", "marginBottom": "10px"},
+        ),
+        dbc.Row([
+            dbc.Col(dcc.Upload(
+                id="mb-upload", accept=".csv,text/csv", max_size=_PF_MAX_UPLOAD,
+                children=html.Div(["Drop a loans CSV here or ",
+                                   html.A("select a file", style={"color": C["gold"]})]),
+                style={"border": f"1px dashed {C['border']}", "borderRadius": "6px",
+                       "padding": "10px", "textAlign": "center", "cursor": "pointer",
+                       "color": C["muted"], "fontSize": "0.8rem"},
+            ), md=6),
+            dbc.Col([
+                html.Div("Check year", style={"fontSize": "0.75rem", "color": C["muted"],
+                                               "marginBottom": "3px"}),
+                dcc.Dropdown(id="mb-year", options=FC_YEAR_OPTS, value=2027, clearable=False,
+                             style={"backgroundColor": C["bg"], "fontSize": "0.82rem"}),
+            ], md=3),
+            dbc.Col([
+                dbc.Button("⬇  Download per-loan results", id="mb-dl-btn", size="sm",
+                           outline=True, color="secondary", disabled=True,
+                           style={"fontSize": "0.72rem", "padding": "2px 10px",
+                                  "marginTop": "22px"}),
+                dcc.Download(id="mb-dl"),
+            ], md=3, className="text-end"),
+        ], className="g-2 mb-2"),
+        dcc.Store(id="mb-loans"),
+        html.Div(id="mb-status", style={"fontSize": "0.78rem", "marginBottom": "8px"}),
+        html.Div(id="mb-results"),
+    ),
 ])
 
 # ── stakeholder role configuration ────────────────────────────────────────────
@@ -3466,8 +3527,18 @@ ROLES: dict[str, dict] = {
 }
 
 # ── app layout ────────────────────────────────────────────────────────────────
-app = dash.Dash(
+# Serverside outputs are pickled to a directory shared by both gunicorn
+# workers; the browser only receives a key.  Background callbacks (PDF
+# reports) run in a separate process queued through a diskcache directory,
+# so the request worker returns at once and the browser polls for progress.
+_JOBS_CACHE = diskcache.Cache(os.path.join(CACHE_DIR, "jobs"))
+app = DashProxy(
     __name__,
+    background_callback_manager=DiskcacheManager(_JOBS_CACHE),
+    transforms=[ServersideOutputTransform(
+        backends=[FileSystemBackend(cache_dir=os.path.join(CACHE_DIR, "serverside"),
+                                    threshold=1000)],
+    )],
     external_stylesheets=[dbc.themes.DARKLY,
                            "https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap"],
     title="Accra Home Price Index",
@@ -3475,6 +3546,31 @@ app = dash.Dash(
     suppress_callback_exceptions=True,
 )
 server = app.server
+# Every callback below is timed and sized; counters are served at /metrics
+instrument(app)
+
+
+def prepare_fork() -> None:
+    """
+    Ready the preloaded app for gunicorn to fork its workers (see
+    gunicorn.conf.py): build every bundle frame and the map layers in the
+    master so the workers share them copy-on-write, and close the SQLite
+    handles of the figure and job caches, which must not cross a fork
+    (each worker reopens them on first use).  Callback counters left by a
+    previous run are cleared.
+    """
+    _BUNDLE.materialize()
+    for metric in _GIS_METRICS:
+        _build_price_geojson(metric)
+    for scenario in ("bear", "base", "bull"):
+        for year in FC_YEARS:
+            _build_forecast_geojson(scenario, year)
+    for year in YEARS:
+        for metric in _GIS_METRICS:
+            _build_timeline_geojson(year, metric)
+    close_fig_cache()
+    _JOBS_CACHE.close()
+    reset_callback_metrics()
 
 # ── landing page ───────────────────────────────────────────────────────────────
 _HERO_STATS = [
@@ -3733,6 +3829,17 @@ def _make_role_banner(role_key: str | None) -> html.Div:
     )
 
 
+# ── lazy tabs ─────────────────────────────────────────────────────────────────
+# Tabs whose content is built by server callbacks.  Each has a boolean
+# "<tab_id>-open" store that flips to True the first time the tab is shown;
+# the tab's callbacks take it as an input and raise PreventUpdate until then,
+# so first load builds only the active tab and a revisited tab is not rebuilt.
+LAZY_TABS = [
+    "tab-overview", "tab-macro", "tab-commodities", "tab-explorer", "tab-districts",
+    "tab-prime", "tab-map", "tab-forecast", "tab-prime-forecast",
+    "tab-district-forecast", "tab-invest", "tab-mortgage", "tab-snapshot",
+]
+
 _DASHBOARD_LAYOUT = html.Div(
     style={"backgroundColor": C["bg"], "minHeight": "100vh",
            "fontFamily": "'Inter', 'Segoe UI', Arial, sans-serif"},
@@ -3875,6 +3982,7 @@ _DASHBOARD_LAYOUT = html.Div(
         # ── hidden stores ───────────────────────────────────────────────────
         dcc.Store(id="gis-resize-store"),
         dcc.Store(id="gis-anim-playing", data=False),
+        *[dcc.Store(id=f"{tab_id}-open", data=False) for tab_id in LAZY_TABS],
     ],
 )
 
@@ -3947,6 +4055,23 @@ def set_active_tab(role, _tab_btn_clicks):
     return "tab-overview"
 
 
+# ── Lazy tabs: mark the active tab as opened (once) ───────────────────────────
+app.clientside_callback(
+    """
+    function(active_tab) {
+        var tabs   = %s;
+        var opened = Array.prototype.slice.call(arguments, 1);
+        return tabs.map(function(tab, i) {
+            return (tab === active_tab && !opened[i]) ? true : window.dash_clientside.no_update;
+        });
+    }
+    """ % json.dumps(LAZY_TABS),
+    [Output(f"{tab_id}-open", "data") for tab_id in LAZY_TABS],
+    Input("main-tabs", "active_tab"),
+    [State(f"{tab_id}-open", "data") for tab_id in LAZY_TABS],
+)
+
+
 # ── Animation: play / pause toggle ───────────────────────────────────────────
 # Flips the playing state, enables/disables the interval, and updates the button label.
 app.clientside_callback(
@@ -4021,6 +4146,15 @@ def update_range_label(yr_range):
     return f"{yr_range[0]}  →  {yr_range[1]}"
 
 
+# ── year-range callbacks ─────────────────────────────────────────────────────
+# Each slider-driven callback takes the slider value and slices only the
+# frames it builds from (YearIndex row ranges: views, no filtering pass), and
+# only after its tab-open and figure-cache checks.  rng is the [start, end]
+# list used in figure-cache keys.
+def _year_range(yr_range) -> list[int]:
+    return [int(yr_range[0]), int(yr_range[1])]
+
+
 @app.callback(
     Output("kpi-ahpi",      "children"),
     Output("kpi-ahpi-sub",  "children"),
@@ -4041,15 +4175,9 @@ def update_range_label(yr_range):
 def update_kpis(yr_range, segment):
     # For the AHPI / price KPIs, switch to prime aggregate when prime is selected.
     # Macro KPIs (FX, inflation, gold) are national data — same for all segments.
-    if segment == "prime":
-        price_src = DF_PRIME_FULL[
-            (DF_PRIME_FULL["ds"].dt.year >= yr_range[0]) &
-            (DF_PRIME_FULL["ds"].dt.year <= yr_range[1])
-        ].copy()
-    else:
-        price_src = filter_df(*yr_range)
-
-    macro_src = filter_df(*yr_range)
+    rng       = _year_range(yr_range)
+    macro_src = filter_df(*rng)
+    price_src = filter_df_prime_full(*rng) if segment == "prime" else macro_src
 
     latest_p = price_src.iloc[-1]
     prev_p   = price_src.iloc[-13] if len(price_src) > 13 else price_src.iloc[0]
@@ -4080,23 +4208,30 @@ def update_kpis(yr_range, segment):
     Input("ahpi-overlays",     "value"),
     Input("ahpi-events",       "value"),
     Input("overview-segment",  "value"),
+    Input("tab-overview-open", "data"),
     prevent_initial_call=False,
 )
-def update_ahpi(yr_range, overlays, events, segment):
-    dff = filter_df(*yr_range)
-    dff_prime_full = DF_PRIME_FULL[
-        (DF_PRIME_FULL["ds"].dt.year >= yr_range[0]) &
-        (DF_PRIME_FULL["ds"].dt.year <= yr_range[1])
-    ].copy()
-    note_style = ({"color": C["muted"], "fontSize": "0.75rem", "fontStyle": "italic"}
-                  if segment == "both"
-                  else {"display": "none"})
-    return (
-        build_ahpi_fig(dff, overlays or [], bool(events),
-                       segment=segment or "mid",
-                       dff_prime_full=dff_prime_full),
-        note_style,
+def update_ahpi(yr_range, overlays, events, segment, opened):
+    if not opened:
+        raise PreventUpdate
+    rng      = _year_range(yr_range)
+    overlays = overlays or []
+    toggles  = {"ghs": "ghs" in overlays, "usd": "usd" in overlays, "events": bool(events)}
+    if _only_switched("ahpi-overlays", "ahpi-events"):
+        switched, note_style = True, dash.no_update
+    else:
+        switched   = False
+        note_style = ({"color": C["muted"], "fontSize": "0.75rem", "fontStyle": "italic"}
+                      if segment == "both"
+                      else {"display": "none"})
+    fig = _switched_figure(
+        "ahpi", (rng, segment or "mid"),
+        lambda: build_ahpi_fig(filter_df(*rng), ["ghs", "usd"], True,
+                               segment=segment or "mid",
+                               dff_prime_full=filter_df_prime_full(*rng)),
+        toggles, switched,
     )
+    return fig, note_style
 
 
 @app.callback(
@@ -4105,23 +4240,34 @@ def update_ahpi(yr_range, overlays, events, segment):
     Input("year-range",       "value"),
     Input("macro-vars",       "value"),
     Input("macro-normalise",  "value"),
+    Input("tab-macro-open",   "data"),
     prevent_initial_call=False,
 )
-def update_macro(yr_range, selected_vars, normalise):
-    dff = filter_df(*yr_range)
+def update_macro(yr_range, selected_vars, normalise, opened):
+    if not opened:
+        raise PreventUpdate
+    rng = _year_range(yr_range)
     return (
-        build_macro_fig(dff, selected_vars or [], normalise),
-        build_macro_grid(dff),
+        cached_figure("macro", (rng, selected_vars or [], bool(normalise)),
+                      DATA_VERSION,
+                      lambda: build_macro_fig(filter_df(*rng), selected_vars or [], normalise)),
+        cached_figure("macro_grid", (rng,), DATA_VERSION,
+                      lambda: build_macro_grid(filter_df(*rng))),
     )
 
 
 @app.callback(
     Output("commodity-chart", "figure"),
     Input("year-range", "value"),
+    Input("tab-commodities-open", "data"),
     prevent_initial_call=False,
 )
-def update_commodities(yr_range):
-    return build_commodity_fig(filter_df(*yr_range))
+def update_commodities(yr_range, opened):
+    if not opened:
+        raise PreventUpdate
+    rng = _year_range(yr_range)
+    return cached_figure("commodity", (rng,), DATA_VERSION,
+                         lambda: build_commodity_fig(filter_df(*rng)))
 
 
 @app.callback(
@@ -4130,14 +4276,18 @@ def update_commodities(yr_range):
     Input("year-range", "value"),
     Input("scatter-x",  "value"),
     Input("scatter-y",  "value"),
+    Input("tab-explorer-open", "data"),
     prevent_initial_call=False,
 )
-def update_scatter(yr_range, x_var, y_var):
-    dff   = filter_df(*yr_range)
-    fig   = build_scatter_fig(dff, x_var, y_var)
+def update_scatter(yr_range, x_var, y_var, opened):
+    if not opened:
+        raise PreventUpdate
+    rng   = _year_range(yr_range)
+    dff   = filter_df(*rng)
+    slope, intercept, r2 = _DF_MOMENTS.linreg(*_DF_IDX.rows(*rng), x_var, y_var)
+    fig   = build_scatter_fig(dff, x_var, y_var, fit=(slope, intercept, r2))
     x_arr = dff[x_var].values.astype(float)
     y_arr = dff[y_var].values.astype(float)
-    slope, intercept, r2 = linreg(x_arr, y_arr)
     if r2 is not None:
         direction = "positive" if slope > 0 else "negative"
         strength  = ("strong" if abs(r2) > 0.7 else
@@ -4161,10 +4311,17 @@ def update_scatter(yr_range, x_var, y_var):
 @app.callback(
     Output("heatmap-chart", "figure"),
     Input("year-range", "value"),
+    Input("tab-explorer-open", "data"),
     prevent_initial_call=False,
 )
-def update_heatmap(yr_range):
-    return build_heatmap_fig(filter_df(*yr_range))
+def update_heatmap(yr_range, opened):
+    if not opened:
+        raise PreventUpdate
+    rng  = _year_range(yr_range)
+    rows = _DF_IDX.rows(*rng)
+    return cached_figure("heatmap", (rng,), DATA_VERSION,
+                         lambda: build_heatmap_fig(
+                             filter_df(*rng), corr_fn=lambda cols: _DF_MOMENTS.corr(*rows, cols)))
 
 
 @app.callback(
@@ -4173,16 +4330,27 @@ def update_heatmap(yr_range):
     Input("year-range",         "value"),
     Input("district-selector",  "value"),
     Input("district-events",    "value"),
+    Input("tab-districts-open", "data"),
     prevent_initial_call=False,
 )
-def update_district(yr_range, district, show_events):
-    dff = filter_df_district(*yr_range)
+def update_district(yr_range, district, show_events, opened):
+    if not opened:
+        raise PreventUpdate
+    rng = _year_range(yr_range)
+    if _only_switched("district-events"):
+        if district != "all":
+            raise PreventUpdate                     # single-district chart has no events
+        return _switched_figure("district_all", (rng,),
+                                lambda: build_district_comparison_fig(filter_df_district(*rng)),
+                                {"events": bool(show_events)}, True), dash.no_update
+    dff = filter_df_district(*rng)
     if district == "all":
-        fig = build_district_comparison_fig(dff, show_events=bool(show_events))
+        fig = _switched_figure("district_all", (rng,),
+                               lambda: build_district_comparison_fig(dff),
+                               {"events": bool(show_events)}, False)
     else:
-        dff_single = dff[dff["district"] == district]
-        fig = build_district_single_fig(dff_single, district)
-    return fig, build_district_price_table(yr_range)
+        fig = build_district_single_fig(filter_df_district(*rng, district), district)
+    return fig, build_district_price_table(dff)
 
 
 @app.callback(
@@ -4191,34 +4359,53 @@ def update_district(yr_range, district, show_events):
     Input("year-range",      "value"),
     Input("prime-selector",  "value"),
     Input("prime-events",    "value"),
+    Input("tab-prime-open",  "data"),
     prevent_initial_call=False,
 )
-def update_prime(yr_range, area, show_events):
-    dff = filter_df_prime(*yr_range)
+def update_prime(yr_range, area, show_events, opened):
+    if not opened:
+        raise PreventUpdate
+    rng = _year_range(yr_range)
+    if _only_switched("prime-events"):
+        if area != "all":
+            raise PreventUpdate                     # single-area chart has no events
+        return _switched_figure("prime_all", (rng,),
+                                lambda: build_prime_comparison_fig(filter_df_prime(*rng)),
+                                {"events": bool(show_events)}, True), dash.no_update
+    dff = filter_df_prime(*rng)
     if area == "all":
-        fig = build_prime_comparison_fig(dff, show_events=bool(show_events))
+        fig = _switched_figure("prime_all", (rng,),
+                               lambda: build_prime_comparison_fig(dff),
+                               {"events": bool(show_events)}, False)
     else:
-        dff_single = dff[dff["district"] == area]
-        fig = build_prime_single_fig(dff_single, area)
-    return fig, build_prime_price_table(yr_range)
+        fig = build_prime_single_fig(filter_df_prime(*rng, area), area)
+    return fig, build_prime_price_table(dff)
 
 
 @app.callback(
     Output("map-chart", "figure"),
     Input("map-segment", "value"),
+    Input("tab-map-open", "data"),
     prevent_initial_call=False,
 )
-def update_map(segment):
-    return build_map_fig(segment or "both")
+def update_map(segment, opened):
+    if not opened:
+        raise PreventUpdate
+    return cached_figure("map", (segment or "both",), DATA_VERSION,
+                         lambda: build_map_fig(segment or "both"))
 
 
 @app.callback(
     Output("forecast-chart", "figure"),
     Input("forecast-ci", "value"),
+    Input("tab-forecast-open", "data"),
     prevent_initial_call=False,
 )
-def update_forecast(show_ci):
-    return build_forecast_fig(show_ci=bool(show_ci))
+def update_forecast(show_ci, opened):
+    if not opened:
+        raise PreventUpdate
+    return _switched_figure("forecast", (), lambda: build_forecast_fig(show_ci=True),
+                            {"ci": bool(show_ci)}, _only_switched("forecast-ci"))
 
 
 # ── methodology modal toggle ──────────────────────────────────────────────────
@@ -4233,144 +4420,254 @@ def toggle_methodology_modal(open_clicks, close_clicks, is_open):
     return not is_open
 
 
-# ── download: Overview ────────────────────────────────────────────────────────
-@app.callback(
-    Output("dl-overview", "data"),
-    Input("dl-overview-btn", "n_clicks"),
-    State("year-range",       "value"),
-    State("overview-segment", "value"),
-    prevent_initial_call=True,
-)
-def dl_overview(_, yr_range, segment):
-    if segment == "prime":
-        dff = filter_df_prime(yr_range[0], yr_range[1])
-        cols = ["ds", "district", "y", "price_ghs_per_sqm", "price_usd_per_sqm"]
-    else:
-        dff  = filter_df(yr_range[0], yr_range[1])
-        cols = ["ds", "y", "price_ghs_per_sqm", "price_usd_per_sqm",
-                "exchange_rate_ghs_usd", "inflation_cpi_pct"]
-    return dcc.send_data_frame(dff[cols].to_csv, "ahpi_overview.csv", index=False)
+# ── bulk downloads ────────────────────────────────────────────────────────────
+# Every export is written once per data version and stored as a file-backed
+# figure-cache entry (accra_fig_cache.cached_file), so it is evicted with the
+# cache; the /downloads/<export> route streams it from disk.  Query arguments
+# are validated against fixed lists, so the set of entries is bounded.  The download
+# buttons are plain links; clientside callbacks keep their query strings in
+# step with the controls, so building an href costs no server round-trip.
 
+def _year_args(q) -> tuple[int, int]:
+    start, end = int(q.get("start", YEARS[0])), int(q.get("end", YEARS[-1]))
+    if not YEARS[0] <= start <= end <= YEARS[-1]:
+        raise ValueError(f"bad year range {start}–{end}")
+    return start, end
 
-# ── download: Macro ───────────────────────────────────────────────────────────
-@app.callback(
-    Output("dl-macro", "data"),
-    Input("dl-macro-btn", "n_clicks"),
-    State("year-range",  "value"),
-    State("macro-vars",  "value"),
-    prevent_initial_call=True,
-)
-def dl_macro(_, yr_range, macro_vars):
-    dff  = filter_df(yr_range[0], yr_range[1])
-    cols = ["ds"] + [v for v in (macro_vars or []) if v in dff.columns]
-    return dcc.send_data_frame(dff[cols].to_csv, "ahpi_macro.csv", index=False)
 
+def _choice(q, name: str, allowed, default: str = "all") -> str:
+    value = q.get(name, default)
+    if value != default and value not in allowed:
+        raise ValueError(f"unknown {name} '{value}'")
+    return value
 
-# ── download: Commodities ─────────────────────────────────────────────────────
-@app.callback(
-    Output("dl-commodities", "data"),
-    Input("dl-commodities-btn", "n_clicks"),
-    State("year-range", "value"),
-    prevent_initial_call=True,
-)
-def dl_commodities(_, yr_range):
-    dff  = filter_df(yr_range[0], yr_range[1])
+
+def _write_csv(frame_fn, cols: list[str]):
+    return lambda path: frame_fn()[cols].to_csv(path, index=False)
+
+
+def _export_overview(q):
+    start, end = _year_args(q)
+    if q.get("segment") == "prime":
+        cols = ["ds", "district", "y", "price_ghs_per_sqm", "price_usd_per_sqm"]
+        return ((start, end, "prime"), "ahpi_overview.csv",
+                _write_csv(lambda: filter_df_prime(start, end), cols))
+    cols = ["ds", "y", "price_ghs_per_sqm", "price_usd_per_sqm",
+            "exchange_rate_ghs_usd", "inflation_cpi_pct"]
+    return ((start, end, "mid"), "ahpi_overview.csv",
+            _write_csv(lambda: filter_df(start, end), cols))
+
+
+def _export_macro(q):
+    start, end = _year_args(q)
+    wanted  = {v for v in q.get("vars", "").split(",") if v}
+    unknown = wanted - MACRO_META.keys()
+    if unknown:
+        raise ValueError(f"unknown vars {', '.join(sorted(unknown))}")
+    # Deduplicated and in MACRO_META order: one cache entry per indicator set
+    cols = ["ds"] + [v for v in MACRO_META if v in wanted]
+    return ((start, end, cols), "ahpi_macro.csv",
+            _write_csv(lambda: filter_df(start, end), cols))
+
+
+def _export_commodities(q):
+    start, end = _year_args(q)
     cols = ["ds", "gold_price_usd", "oil_brent_usd", "cocoa_price_usd"]
-    return dcc.send_data_frame(dff[cols].to_csv, "ahpi_commodities.csv", index=False)
+    return ((start, end), "ahpi_commodities.csv",
+            _write_csv(lambda: filter_df(start, end), cols))
 
 
-# ── download: Districts ───────────────────────────────────────────────────────
-@app.callback(
-    Output("dl-districts", "data"),
-    Input("dl-districts-btn",  "n_clicks"),
-    State("year-range",         "value"),
-    State("district-selector",  "value"),
-    prevent_initial_call=True,
-)
-def dl_districts(_, yr_range, district):
-    dff  = filter_df_district(yr_range[0], yr_range[1], district or "all")
+def _export_districts(q):
+    start, end = _year_args(q)
+    district   = _choice(q, "district", DISTRICTS)
     cols = ["ds", "district", "y", "price_ghs_per_sqm", "price_usd_per_sqm"]
-    return dcc.send_data_frame(dff[cols].to_csv, "ahpi_districts.csv", index=False)
+    return ((start, end, district), "ahpi_districts.csv",
+            _write_csv(lambda: filter_df_district(start, end, district), cols))
 
 
-# ── download: Prime Areas ─────────────────────────────────────────────────────
-@app.callback(
-    Output("dl-prime", "data"),
-    Input("dl-prime-btn",    "n_clicks"),
-    State("year-range",       "value"),
-    State("prime-selector",   "value"),
-    prevent_initial_call=True,
-)
-def dl_prime(_, yr_range, area):
-    dff  = filter_df_prime(yr_range[0], yr_range[1], area or "all")
+def _export_prime(q):
+    start, end = _year_args(q)
+    area       = _choice(q, "area", PRIME_AREAS)
     cols = ["ds", "district", "y", "price_ghs_per_sqm", "price_usd_per_sqm"]
-    return dcc.send_data_frame(dff[cols].to_csv, "ahpi_prime_areas.csv", index=False)
+    return ((start, end, area), "ahpi_prime_areas.csv",
+            _write_csv(lambda: filter_df_prime(start, end, area), cols))
 
 
-# ── download: Forecast ZIP (mid-market) ───────────────────────────────────────
-@app.callback(
-    Output("dl-forecast", "data"),
-    Input("dl-forecast-btn", "n_clicks"),
-    prevent_initial_call=True,
-)
-def dl_forecast(_):
-    files = {
+def _write_zip(files_fn):
+    """Writer for a ZIP of {filename: DataFrame}; members are deflated one at a time."""
+    def write(path: str) -> None:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for fname, df in files_fn().items():
+                zf.writestr(fname, df.to_csv(index=False))
+    return write
+
+
+def _export_forecast(q):
+    files = lambda: {
         "ahpi_test_eval.csv":        DF_TEST_EVAL,
         "ahpi_forecast_bear.csv":    DF_FC_BEAR,
         "ahpi_forecast_base.csv":    DF_FC_BASE,
         "ahpi_forecast_bull.csv":    DF_FC_BULL,
     }
-    return dcc.send_bytes(_zip_dfs(files), "ahpi_midmarket_forecasts.zip")
+    return (), "ahpi_midmarket_forecasts.zip", _write_zip(files)
 
 
-# ── download: Prime Forecast ZIP ──────────────────────────────────────────────
-@app.callback(
-    Output("dl-prime-forecast", "data"),
-    Input("dl-prime-forecast-btn", "n_clicks"),
-    State("prime-fc-area", "value"),
-    prevent_initial_call=True,
-)
-def dl_prime_forecast(_, area):
-    area = area or "all"
+def _panel_forecast_files(family: str, area: str, slugs: dict, test_evals: dict,
+                          fc: dict, summary: pd.DataFrame) -> dict:
+    areas = list(slugs) if area == "all" else [area]
+    files = {f"{family}_test_eval_{slugs[a]}.csv": test_evals[a] for a in areas}
+    for sc in ("bear", "base", "bull"):
+        for a in areas:
+            files[f"{family}_forecast_{sc}_{slugs[a]}.csv"] = fc[(sc, a)]
     if area == "all":
-        files = {f"prime_test_eval_{slug}.csv": _PRIME_TEST_EVALS[a]
-                 for a, slug in PRIME_AREA_SLUGS.items()}
-        for sc in ("bear", "base", "bull"):
-            for a, slug in PRIME_AREA_SLUGS.items():
-                files[f"prime_forecast_{sc}_{slug}.csv"] = _PRIME_FC[(sc, a)]
-        files["prime_test_summary.csv"] = _PRIME_TEST_SUMMARY
-    else:
-        slug  = PRIME_AREA_SLUGS[area]
-        files = {f"prime_test_eval_{slug}.csv": _PRIME_TEST_EVALS[area]}
-        for sc in ("bear", "base", "bull"):
-            files[f"prime_forecast_{sc}_{slug}.csv"] = _PRIME_FC[(sc, area)]
+        files[f"{family}_test_summary.csv"] = summary
+    return files
+
+
+def _export_prime_forecast(q):
+    area  = _choice(q, "area", PRIME_AREA_SLUGS)
     label = "all_areas" if area == "all" else PRIME_AREA_SLUGS[area]
-    return dcc.send_bytes(_zip_dfs(files), f"ahpi_prime_forecast_{label}.zip")
+    files = lambda: _panel_forecast_files("prime", area, PRIME_AREA_SLUGS, _PRIME_TEST_EVALS,
+                                          _PRIME_FC, _PRIME_TEST_SUMMARY)
+    return (area,), f"ahpi_prime_forecast_{label}.zip", _write_zip(files)
 
 
-# ── download: District Forecast ZIP ──────────────────────────────────────────
-@app.callback(
-    Output("dl-district-forecast", "data"),
-    Input("dl-district-forecast-btn", "n_clicks"),
-    State("district-fc-area", "value"),
-    prevent_initial_call=True,
-)
-def dl_district_forecast(_, district):
-    district = district or "all"
-    if district == "all":
-        files = {f"district_test_eval_{slug}.csv": _DISTRICT_TEST_EVALS[d]
-                 for d, slug in DISTRICT_SLUGS.items()}
-        for sc in ("bear", "base", "bull"):
-            for d, slug in DISTRICT_SLUGS.items():
-                files[f"district_forecast_{sc}_{slug}.csv"] = _DISTRICT_FC[(sc, d)]
-        files["district_test_summary.csv"] = _DISTRICT_TEST_SUMMARY
+def _export_district_forecast(q):
+    district = _choice(q, "district", DISTRICT_SLUGS)
+    label    = "all_districts" if district == "all" else DISTRICT_SLUGS[district]
+    files = lambda: _panel_forecast_files("district", district, DISTRICT_SLUGS,
+                                          _DISTRICT_TEST_EVALS, _DISTRICT_FC,
+                                          _DISTRICT_TEST_SUMMARY)
+    return (district,), f"ahpi_district_forecast_{label}.zip", _write_zip(files)
+
+
+def _export_geojson(q):
+    layer = _choice(q, "layer", ("forecast",), default="price")
+    if layer == "price":
+        metric = _choice(q, "metric", ("ghs_sqm", "ahpi"), default="usd_sqm")
+        build  = lambda: _build_price_geojson(metric)[0]
+        args, fname = ("price", metric), f"accra_price_heatmap_{metric}.geojson"
     else:
-        slug  = DISTRICT_SLUGS[district]
-        files = {f"district_test_eval_{slug}.csv": _DISTRICT_TEST_EVALS[district]}
-        for sc in ("bear", "base", "bull"):
-            files[f"district_forecast_{sc}_{slug}.csv"] = _DISTRICT_FC[(sc, district)]
-    label = "all_districts" if district == "all" else DISTRICT_SLUGS[district]
-    return dcc.send_bytes(_zip_dfs(files), f"ahpi_district_forecast_{label}.zip")
+        scenario = _choice(q, "scenario", ("bear", "bull"), default="base")
+        fc_year  = int(q.get("year", 2027))
+        if fc_year not in FC_YEARS:
+            raise ValueError(f"bad forecast year {fc_year}")
+        build = lambda: _build_forecast_geojson(scenario, fc_year)[0]
+        args, fname = ("forecast", scenario, fc_year), \
+            f"accra_forecast_growth_{scenario}_{fc_year}.geojson"
+
+    def write(path: str) -> None:
+        with open(path, "w") as fh:
+            json.dump(build(), fh, separators=(",", ":"))
+    return args, fname, write
+
+
+_EXPORTS = {
+    "overview":          _export_overview,
+    "macro":             _export_macro,
+    "commodities":       _export_commodities,
+    "districts":         _export_districts,
+    "prime":             _export_prime,
+    "forecast":          _export_forecast,
+    "prime-forecast":    _export_prime_forecast,
+    "district-forecast": _export_district_forecast,
+    "geojson":           _export_geojson,
+}
+
+
+@server.route("/downloads/<export>")
+def serve_download(export):
+    """Stream an export from disk, building it on the first request per data version."""
+    if export not in _EXPORTS:
+        abort(404)
+    try:
+        args, fname, write = _EXPORTS[export](request.args)
+    except (ValueError, TypeError) as exc:
+        abort(400, description=str(exc))
+    fh, etag = cached_file(export, args, DATA_VERSION, os.path.splitext(fname)[1], write)
+    return send_file(fh, as_attachment=True, download_name=fname,
+                     etag=etag, conditional=True)
+
+
+# Download links: "/downloads/<export>?<controls>"
+app.clientside_callback(
+    """
+    function(yr, segment) {
+        return "/downloads/overview?" + new URLSearchParams(
+            {start: yr[0], end: yr[1], segment: segment || "mid"});
+    }
+    """,
+    Output("dl-overview-btn", "href"),
+    Input("year-range",       "value"),
+    Input("overview-segment", "value"),
+)
+
+app.clientside_callback(
+    """
+    function(yr, vars) {
+        return "/downloads/macro?" + new URLSearchParams(
+            {start: yr[0], end: yr[1], vars: (vars || []).join(",")});
+    }
+    """,
+    Output("dl-macro-btn", "href"),
+    Input("year-range",    "value"),
+    Input("macro-vars",    "value"),
+)
+
+app.clientside_callback(
+    """
+    function(yr) {
+        return "/downloads/commodities?" + new URLSearchParams({start: yr[0], end: yr[1]});
+    }
+    """,
+    Output("dl-commodities-btn", "href"),
+    Input("year-range",          "value"),
+)
+
+app.clientside_callback(
+    """
+    function(yr, district) {
+        return "/downloads/districts?" + new URLSearchParams(
+            {start: yr[0], end: yr[1], district: district || "all"});
+    }
+    """,
+    Output("dl-districts-btn",  "href"),
+    Input("year-range",         "value"),
+    Input("district-selector",  "value"),
+)
+
+app.clientside_callback(
+    """
+    function(yr, area) {
+        return "/downloads/prime?" + new URLSearchParams(
+            {start: yr[0], end: yr[1], area: area || "all"});
+    }
+    """,
+    Output("dl-prime-btn",   "href"),
+    Input("year-range",      "value"),
+    Input("prime-selector",  "value"),
+)
+
+app.clientside_callback(
+    """
+    function(area) {
+        return "/downloads/prime-forecast?" + new URLSearchParams({area: area || "all"});
+    }
+    """,
+    Output("dl-prime-forecast-btn", "href"),
+    Input("prime-fc-area",          "value"),
+)
+
+app.clientside_callback(
+    """
+    function(district) {
+        return "/downloads/district-forecast?" + new URLSearchParams(
+            {district: district || "all"});
+    }
+    """,
+    Output("dl-district-forecast-btn", "href"),
+    Input("district-fc-area",          "value"),
+)
 
 
 # ── forecast-tab year-selector callbacks ──────────────────────────────────────
@@ -4378,9 +4675,12 @@ def dl_district_forecast(_, district):
     Output("forecast-targets",         "children"),
     Output("forecast-targets-heading", "children"),
     Input("forecast-year", "value"),
+    Input("tab-forecast-open", "data"),
     prevent_initial_call=False,
 )
-def update_forecast_targets(year):
+def update_forecast_targets(year, opened):
+    if not opened:
+        raise PreventUpdate
     year = year or 2026
     return _build_fc_targets_div(year), f"Dec {year} AHPI targets by scenario"
 
@@ -4393,13 +4693,21 @@ def update_forecast_targets(year):
     Input("prime-fc-ci",   "value"),
     Input("prime-fc-area", "value"),
     Input("prime-fc-year", "value"),
+    Input("tab-prime-forecast-open", "data"),
     prevent_initial_call=False,
 )
-def update_prime_forecast(show_ci, area, year):
+def update_prime_forecast(show_ci, area, year, opened):
+    if not opened:
+        raise PreventUpdate
     area = area or "all"
     year = year or 2026
+    fig  = _switched_figure("prime_forecast", (area,),
+                            lambda: build_prime_forecast_fig(area, show_ci=True),
+                            {"ci": bool(show_ci)}, _only_switched("prime-fc-ci"))
+    if isinstance(fig, Patch):
+        return fig, dash.no_update, dash.no_update, dash.no_update
     return (
-        build_prime_forecast_fig(area, show_ci=bool(show_ci)),
+        fig,
         _build_prime_metrics_div(area),
         _build_prime_targets_div(area, year),
         f"Dec {year} AHPI targets by scenario",
@@ -4414,13 +4722,21 @@ def update_prime_forecast(show_ci, area, year):
     Input("district-fc-ci",   "value"),
     Input("district-fc-area", "value"),
     Input("district-fc-year", "value"),
+    Input("tab-district-forecast-open", "data"),
     prevent_initial_call=False,
 )
-def update_district_forecast(show_ci, district, year):
+def update_district_forecast(show_ci, district, year, opened):
+    if not opened:
+        raise PreventUpdate
     district = district or "all"
     year     = year or 2026
+    fig      = _switched_figure("district_forecast", (district,),
+                                lambda: build_district_forecast_fig(district, show_ci=True),
+                                {"ci": bool(show_ci)}, _only_switched("district-fc-ci"))
+    if isinstance(fig, Patch):
+        return fig, dash.no_update, dash.no_update, dash.no_update
     return (
-        build_district_forecast_fig(district, show_ci=bool(show_ci)),
+        fig,
         _build_district_metrics_div(district),
         _build_district_targets_div(district, year),
         f"Dec {year} AHPI targets by scenario",
@@ -4434,9 +4750,12 @@ def update_district_forecast(show_ci, district, year):
     Output("inv-buy-fx-display",    "children"),
     Input("inv-market",   "value"),
     Input("inv-buy-year", "value"),
+    Input("tab-invest-open", "data"),
     prevent_initial_call=False,
 )
-def update_inv_buy_info(market, buy_year):
+def update_inv_buy_info(market, buy_year, opened):
+    if not opened:
+        raise PreventUpdate
     row = _get_hist_dec(market or "composite", buy_year or 2020)
     if row is None:
         return "—", "—", "—"
@@ -4453,9 +4772,12 @@ def update_inv_buy_info(market, buy_year):
     Input("inv-buy-year",  "value"),
     Input("inv-sell-year", "value"),
     Input("inv-sqm",       "value"),
+    Input("tab-invest-open", "data"),
     prevent_initial_call=False,
 )
-def update_inv_results(market, buy_year, sell_year, sqm):
+def update_inv_results(market, buy_year, sell_year, sqm, opened):
+    if not opened:
+        raise PreventUpdate
     market   = market   or "composite"
     buy_year = buy_year or 2020
     sell_year = sell_year or 2027
@@ -4465,82 +4787,51 @@ def update_inv_results(market, buy_year, sell_year, sqm):
         return html.Div("Sell year must be after buy year.",
                         style={"color": C["red"], "padding": "20px"})
 
-    buy_row = _get_hist_dec(market, buy_year)
-    if buy_row is None:
+    if not _INV_SURFACE.has_history(market, buy_year):
         return html.Div("No historical data for this market / buy year.",
                         style={"color": C["muted"], "padding": "20px"})
 
-    buy_ghs = float(buy_row.get("price_ghs_per_sqm", 0))
-    buy_usd = float(buy_row.get("price_usd_per_sqm", 0))
-    buy_fx  = float(buy_row.get("exchange_rate_ghs_usd", 1))
-    buy_ahpi = float(buy_row.get("y", 100))
-
     cols = []
     for sc in ("bear", "base", "bull"):
         color, _, label = SCENARIO_STYLES[sc]
-        fc_row = _get_fc_dec(market, sc, sell_year)
-        if fc_row is None:
+        r = _INV_SURFACE.lookup(market, buy_year, sell_year, sc, sqm)
+        if r is None:
             cols.append(_scenario_col(sc, label, color,
                                       [html.Div("No forecast data", style={"color": C["muted"]})]))
             continue
 
-        sell_ahpi = float(fc_row["yhat"])
-        sell_ahpi_lo = float(fc_row["yhat_lower"])
-        sell_ahpi_hi = float(fc_row["yhat_upper"])
-        sell_fx   = SCENARIO_FX[sc]
-
-        # Property values
-        sell_ghs  = buy_ghs * (sell_ahpi / buy_ahpi) if buy_ahpi else 0
-        sell_usd  = sell_ghs / sell_fx if sell_fx else 0
-
-        total_buy_ghs  = buy_ghs  * sqm
-        total_sell_ghs = sell_ghs * sqm
-        total_buy_usd  = buy_usd  * sqm
-        total_sell_usd = sell_usd * sqm
-
-        ghs_ret  = (total_sell_ghs - total_buy_ghs) / total_buy_ghs * 100 if total_buy_ghs else 0
-        usd_ret  = (total_sell_usd - total_buy_usd) / total_buy_usd * 100 if total_buy_usd else 0
-        ghs_cagr = ((total_sell_ghs / total_buy_ghs) ** (1 / years) - 1) * 100 if total_buy_ghs else 0
-        usd_cagr = ((total_sell_usd / total_buy_usd) ** (1 / years) - 1) * 100 if total_buy_usd else 0
-
-        # Benchmarks
-        tbill_rate  = SCENARIO_TBILL[sc] / 100
-        tbill_final = total_buy_ghs * (1 + tbill_rate) ** years
-        tbill_ret   = (tbill_final - total_buy_ghs) / total_buy_ghs * 100
-
-        usd_dep_final = total_buy_usd * (1 + USD_DEPOSIT_RATE / 100) ** years
-        usd_dep_ret   = (usd_dep_final - total_buy_usd) / total_buy_usd * 100
-
         # Colour helpers
-        ghs_col = C["green"] if ghs_ret >= 0 else C["red"]
-        usd_col = C["green"] if usd_ret >= 0 else C["red"]
-        vs_tbill = "outperforms" if ghs_ret > tbill_ret else "underperforms"
-        vs_usd   = "outperforms" if usd_ret > usd_dep_ret else "underperforms"
+        ghs_col = C["green"] if r["ghs_ret"] >= 0 else C["red"]
+        usd_col = C["green"] if r["usd_ret"] >= 0 else C["red"]
+        vs_tbill = "outperforms" if r["ghs_ret"] > r["tbill_ret"] else "underperforms"
+        vs_usd   = "outperforms" if r["usd_ret"] > r["usd_dep_ret"] else "underperforms"
 
         cols.append(_scenario_col(sc, label, color, [
             _result_card("AHPI at sell",
-                         f"{sell_ahpi:.1f}  [{sell_ahpi_lo:.1f}–{sell_ahpi_hi:.1f}]",
-                         f"90% CI · was {buy_ahpi:.1f} at purchase", color),
+                         f"{r['sell_ahpi']:.1f}  [{r['sell_ahpi_lo']:.1f}–{r['sell_ahpi_hi']:.1f}]",
+                         f"90% CI · was {r['buy_ahpi']:.1f} at purchase", color),
             _result_card("Sell price (GHS/sqm)",
-                         f"GHS {sell_ghs:,.0f}",
-                         f"was GHS {buy_ghs:,.0f}", color),
+                         f"GHS {r['sell_ghs']:,.0f}",
+                         f"was GHS {r['buy_ghs']:,.0f}", color),
             _result_card("Sell price (USD/sqm)",
-                         f"USD {sell_usd:,.0f}",
-                         f"was USD {buy_usd:,.0f}  ·  FX: {sell_fx} GHS/USD", C["blue"]),
+                         f"USD {r['sell_usd']:,.0f}",
+                         f"was USD {r['buy_usd']:,.0f}  ·  FX: {SCENARIO_FX[sc]} GHS/USD", C["blue"]),
             _result_card(f"GHS return  ({sqm} sqm · {years}y)",
-                         f"{ghs_ret:+.1f}%",
-                         f"CAGR {ghs_cagr:+.1f}% p.a.", ghs_col),
+                         f"{r['ghs_ret']:+.1f}%",
+                         f"CAGR {r['ghs_cagr']:+.1f}% p.a.  ·  "
+                         f"GHS {r['total_buy_ghs']:,.0f} → {r['total_sell_ghs']:,.0f}", ghs_col),
             _result_card(f"USD return  ({sqm} sqm · {years}y)",
-                         f"{usd_ret:+.1f}%",
-                         f"CAGR {usd_cagr:+.1f}% p.a.", usd_col),
+                         f"{r['usd_ret']:+.1f}%",
+                         f"CAGR {r['usd_cagr']:+.1f}% p.a.  ·  "
+                         f"USD {r['total_buy_usd']:,.0f} → {r['total_sell_usd']:,.0f}", usd_col),
             html.Div([
                 html.Div("vs Benchmarks", style={"fontSize": "0.7rem", "color": C["muted"],
                                                    "textTransform": "uppercase",
                                                    "marginBottom": "4px"}),
-                html.Div(f"🇬🇭 T-Bill ({SCENARIO_TBILL[sc]}% p.a.): {tbill_ret:+.1f}% total  "
+                html.Div(f"🇬🇭 T-Bill ({SCENARIO_TBILL[sc]}% p.a.): {r['tbill_ret']:+.1f}% total  "
                          f"→ property {vs_tbill}",
                          style={"fontSize": "0.75rem", "color": C["muted"]}),
-                html.Div(f"💵 USD deposit ({USD_DEPOSIT_RATE}% p.a.): {usd_dep_ret:+.1f}% total  "
+                html.Div(f"💵 USD deposit ({USD_DEPOSIT_RATE}% p.a.): {r['usd_dep_ret']:+.1f}% total  "
                          f"→ {vs_usd} in USD terms",
                          style={"fontSize": "0.75rem", "color": C["muted"]}),
             ], style={"backgroundColor": C["hover"], "padding": "8px 12px",
@@ -4550,15 +4841,214 @@ def update_inv_results(market, buy_year, sell_year, sqm):
     return dbc.Row([c for c in cols], className="g-2")
 
 
+def build_return_surface_fig(market: str, metric: str) -> go.Figure:
+    """
+    One heatmap per scenario of metric over every buy year × sell year for
+    market, read straight from the precomputed return surface.
+    """
+    from plotly.subplots import make_subplots
+
+    label, unit = _INV_SURFACE_METRICS[metric]
+    grids = {}
+    for sc in ("bear", "base", "bull"):
+        if metric == "vs_tbill":
+            grids[sc] = (_INV_SURFACE.grid(market, sc, "ghs_ret") -
+                         _INV_SURFACE.grid(market, sc, "tbill_ret"))
+        else:
+            grids[sc] = _INV_SURFACE.grid(market, sc, metric)
+    finite = np.concatenate([g[np.isfinite(g)] for g in grids.values()])
+    bound  = float(np.abs(finite).max()) if finite.size else 1.0
+
+    fig = make_subplots(rows=1, cols=3, shared_yaxes=True, horizontal_spacing=0.03,
+                        subplot_titles=[SCENARIO_STYLES[sc][2] for sc in grids])
+    for i, (sc, z) in enumerate(grids.items(), start=1):
+        fig.add_trace(go.Heatmap(
+            z=z, x=[str(y) for y in FC_YEARS], y=[str(y) for y in _INV_BUY_YEARS],
+            colorscale=[[0.0, C["red"]], [0.5, C["card"]], [1.0, C["green"]]],
+            zmid=0, zmin=-bound, zmax=bound, showscale=(i == 3),
+            texttemplate="%{z:.1f}", textfont=dict(size=8, color=C["text"]),
+            colorbar=dict(title=unit, thickness=12, tickfont=dict(size=9),
+                          outlinecolor=C["border"]),
+            hoverongaps=False,
+            hovertemplate=(f"{SCENARIO_STYLES[sc][2]} · buy %{{y}} → sell Dec %{{x}}"
+                           f"<br>{label}: %{{z:+.1f}} {unit}<extra></extra>"),
+        ), row=1, col=i)
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        hovermode="closest",
+        title=dict(text=f"<b>{label}</b>  — {'Composite Mid-Market' if market == 'composite' else market}"
+                        f", by buy year (rows) and sell year (columns)",
+                   font_size=13, x=0.01),
+        height=460,
+    )
+    fig.update_xaxes(BASE_XAXIS, title_text="Sell (Dec)")
+    fig.update_yaxes(tickfont=dict(size=10), autorange="reversed")
+    fig.update_yaxes(title_text="Buy (Dec)", row=1, col=1)
+    return fig
+
+
+@app.callback(
+    Output("inv-surface-chart", "figure"),
+    Input("inv-market",         "value"),
+    Input("inv-surface-metric", "value"),
+    Input("tab-invest-open",    "data"),
+    prevent_initial_call=False,
+)
+def update_return_surface(market, metric, opened):
+    if not opened:
+        raise PreventUpdate
+    market = market or "composite"
+    metric = metric if metric in _INV_SURFACE_METRICS else "ghs_cagr"
+    return cached_figure("inv_surface", (market, metric), DATA_VERSION,
+                         lambda: build_return_surface_fig(market, metric))
+
+
+# ── Portfolio valuation callbacks ──────────────────────────────────────────────
+def _fmt_money(ccy: str, v: float) -> str:
+    """GHS 1.23bn / GHS 4.5m / GHS 12,300."""
+    for div, unit in ((1e9, "bn"), (1e6, "m")):
+        if abs(v) >= div:
+            return f"{ccy} {v / div:,.2f}{unit}"
+    return f"{ccy} {v:,.0f}"
+
+
+def _portfolio_market_table(results: pd.DataFrame, limit: int = 15) -> html.Table:
+    """Cost and scenario values per market (largest books first)."""
+    th = {"color": C["muted"], "textAlign": "right", "padding": "6px 12px",
+          "borderBottom": f"1px solid {C['border']}"}
+    td = {"textAlign": "right", "padding": "6px 12px"}
+    header = html.Tr(
+        [html.Th("Market", style={**th, "textAlign": "left"}), html.Th("Holdings", style=th),
+         html.Th("Cost (GHS)", style=th)] +
+        [html.Th(f"{SCENARIO_STYLES[sc][2]} (GHS)", style={**th, "color": SCENARIO_STYLES[sc][0]})
+         for sc in ("bear", "base", "bull")]
+    )
+    rows = [
+        html.Tr(
+            [html.Td(market, style={**td, "textAlign": "left", "color": C["text"],
+                                    "fontWeight": "600"}),
+             html.Td(f"{int(r['holdings']):,}", style={**td, "color": C["muted"]}),
+             html.Td(_fmt_money("GHS", r["cost_ghs"]), style={**td, "color": C["gold"]})] +
+            [html.Td(_fmt_money("GHS", r[f"value_ghs_{sc}"]),
+                     style={**td, "color": SCENARIO_STYLES[sc][0]})
+             for sc in ("bear", "base", "bull")]
+        )
+        for market, r in by_market(results).head(limit).iterrows()
+    ]
+    return html.Table(
+        [html.Thead(header), html.Tbody(rows)],
+        style={"width": "100%", "fontSize": "0.82rem", "borderCollapse": "collapse",
+               "marginTop": "10px"},
+    )
+
+
+@app.callback(
+    Output("pf-holdings", "data"),
+    Output("pf-status",   "children"),
+    Input("pf-upload",    "contents"),
+    State("pf-upload",    "filename"),
+    prevent_initial_call=True,
+)
+def load_portfolio(contents, filename):
+    if not contents:
+        raise PreventUpdate
+    try:
+        holdings = read_holdings(base64.b64decode(contents.split(",", 1)[1]))
+    except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as exc:
+        return None, html.Span(f"Could not read {filename}: {exc}", style={"color": C["red"]})
+    return Serverside(holdings), html.Span(f"{filename}: {len(holdings):,} holdings loaded.",
+                                           style={"color": C["muted"]})
+
+
+@app.callback(
+    Output("pf-results", "children"),
+    Output("pf-dl-btn",  "disabled"),
+    Input("pf-holdings",  "data"),
+    Input("pf-sell-year", "value"),
+    Input("tab-invest-open", "data"),
+    prevent_initial_call=True,
+)
+def update_portfolio_results(holdings, sell_year, opened):
+    if not opened:
+        raise PreventUpdate
+    if holdings is None or not len(holdings):
+        return None, True
+    results = _PORTFOLIO.value(holdings, int(sell_year or 2027))
+    tot     = summarise(results)
+    if not tot["holdings"]:
+        reasons = results["status"].value_counts().head(3)
+        return html.Div("No holding could be valued: " +
+                        "; ".join(f"{n:,} × {why}" for why, n in reasons.items()),
+                        style={"color": C["red"], "fontSize": "0.8rem"}), False
+
+    cols = []
+    for sc in ("bear", "base", "bull"):
+        color, _, label = SCENARIO_STYLES[sc]
+        r       = tot["scenarios"][sc]
+        ghs_col = C["green"] if r["ret_ghs"] >= 0 else C["red"]
+        usd_col = C["green"] if r["ret_usd"] >= 0 else C["red"]
+        cols.append(_scenario_col(sc, label, color, [
+            _result_card(f"Value at Dec {sell_year} (GHS)", _fmt_money("GHS", r["value_ghs"]),
+                         f"cost {_fmt_money('GHS', tot['cost_ghs'])}", color),
+            _result_card(f"Value at Dec {sell_year} (USD)", _fmt_money("USD", r["value_usd"]),
+                         f"cost {_fmt_money('USD', tot['cost_usd'])}  ·  FX: {SCENARIO_FX[sc]} GHS/USD",
+                         C["blue"]),
+            _result_card("GHS return", f"{r['ret_ghs']:+.1f}%",
+                         f"cost-weighted CAGR {r['cagr_ghs']:+.1f}% p.a.", ghs_col),
+            _result_card("USD return", f"{r['ret_usd']:+.1f}%",
+                         f"cost-weighted CAGR {r['cagr_usd']:+.1f}% p.a.", usd_col),
+            html.Div([
+                html.Div("vs Benchmarks", style={"fontSize": "0.7rem", "color": C["muted"],
+                                                   "textTransform": "uppercase",
+                                                   "marginBottom": "4px"}),
+                html.Div(f"🇬🇭 T-Bill ({SCENARIO_TBILL[sc]}% p.a.): {r['tbill_ret']:+.1f}% total  "
+                         f"→ {r['beat_tbill']:.0%} of holdings outperform",
+                         style={"fontSize": "0.75rem", "color": C["muted"]}),
+                html.Div(f"💵 USD deposit ({USD_DEPOSIT_RATE}% p.a.): {r['usd_dep_ret']:+.1f}% total",
+                         style={"fontSize": "0.75rem", "color": C["muted"]}),
+            ], style={"backgroundColor": C["hover"], "padding": "8px 12px",
+                      "borderRadius": "6px", "border": f"1px solid {C['border']}"}),
+        ]))
+
+    note = f"{tot['holdings']:,} holdings valued"
+    if tot["skipped"]:
+        note += f" · {tot['skipped']:,} skipped (see the status column in the download)"
+    return html.Div([
+        html.Div(note, style={"color": C["muted"], "fontSize": "0.75rem", "marginBottom": "8px"}),
+        dbc.Row(cols, className="g-2"),
+        _portfolio_market_table(results),
+    ]), False
+
+
+@app.callback(
+    Output("pf-dl", "data"),
+    Input("pf-dl-btn",    "n_clicks"),
+    State("pf-holdings",  "data"),
+    State("pf-sell-year", "value"),
+    prevent_initial_call=True,
+)
+def download_portfolio(n_clicks, holdings, sell_year):
+    if holdings is None:
+        raise PreventUpdate
+    sell_year = int(sell_year or 2027)
+    results   = _PORTFOLIO.value(holdings, sell_year)
+    return dcc.send_data_frame(results.to_csv, f"AHPI_portfolio_valuation_{sell_year}.csv",
+                               index=False, float_format="%.4f")
+
+
 # ── Mortgage Stress Test callbacks ─────────────────────────────────────────────
 @app.callback(
     Output("mort-value", "value"),
     Input("mort-district", "value"),
     Input("mort-sqm",      "value"),
+    Input("tab-mortgage-open", "data"),
     prevent_initial_call=False,
 )
-def prefill_mort_value(district, sqm):
+def prefill_mort_value(district, sqm, opened):
     """Auto-fill property value from latest AHPI data."""
+    if not opened:
+        raise PreventUpdate
     sqm = sqm or 100
     district = district or DISTRICTS[0]
     row = _get_hist_dec(district, 2024)
@@ -4576,9 +5066,12 @@ def prefill_mort_value(district, sqm):
     Input("mort-term",     "value"),
     Input("mort-rate",     "value"),
     Input("mort-year",     "value"),
+    Input("tab-mortgage-open", "data"),
     prevent_initial_call=False,
 )
-def update_mort_results(district, sqm, prop_value, ltv, term, rate, check_year):
+def update_mort_results(district, sqm, prop_value, ltv, term, rate, check_year, opened):
+    if not opened:
+        raise PreventUpdate
     district   = district   or DISTRICTS[0]
     sqm        = sqm        or 100
     prop_value = prop_value or 300_000
@@ -4674,108 +5167,344 @@ def update_mort_results(district, sqm, prop_value, ltv, term, rate, check_year):
     return dbc.Row([repay_section, stress_section], className="g-2")
 
 
+# ── Mortgage book callbacks ────────────────────────────────────────────────────
+def build_mortgage_book_fig(result, check_year: int) -> go.Figure:
+    """
+    Two panels: the LTV distribution of the outstanding loans at check_year
+    per scenario (pre-binned, so the payload does not grow with the book),
+    and the share of loans above the watch / breach LTV by year.
+    """
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=1, cols=2, column_widths=[0.55, 0.45], horizontal_spacing=0.08,
+                        subplot_titles=(f"LTV distribution · Dec {check_year}",
+                                        "Loans above watch / breach LTV"))
+    dist = result.distribution()
+    for sc in ("bear", "base", "bull"):
+        color, _, label = SCENARIO_STYLES[sc]
+        edges, counts   = result.ltv_histogram(sc, check_year)
+        fig.add_trace(go.Bar(
+            x=edges + 2.5, y=counts, width=5, name=label, marker_color=color, opacity=0.55,
+            legendgroup=sc,
+            hovertemplate=f"{label}: %{{y:,}} loans<br>LTV %{{x:.0f}}% ± 2.5<extra></extra>",
+        ), row=1, col=1)
+        d = dist[dist["scenario"] == sc]
+        fig.add_trace(go.Scatter(
+            x=d["year"], y=d["breach_share"] * 100, mode="lines+markers", name=label,
+            line=dict(color=color, width=2), legendgroup=sc, showlegend=False,
+            hovertemplate=f"{label} · > {BREACH_LTV:.0f}%: %{{y:.1f}}% of loans<extra></extra>",
+        ), row=1, col=2)
+        fig.add_trace(go.Scatter(
+            x=d["year"], y=d["watch_share"] * 100, mode="lines", name=f"{label} (watch)",
+            line=dict(color=color, width=1.5, dash="dot"), legendgroup=sc, showlegend=False,
+            hovertemplate=f"{label} · > {WATCH_LTV:.0f}%: %{{y:.1f}}% of loans<extra></extra>",
+        ), row=1, col=2)
+    for x, dash_style in ((WATCH_LTV, "dot"), (BREACH_LTV, "dash")):
+        fig.add_vline(x=x, line_dash=dash_style, line_color=C["red"], line_width=1,
+                      opacity=0.7, row=1, col=1)
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        barmode="overlay",
+        hovermode="closest",
+        legend=dict(**BASE_LEGEND, orientation="h", x=0.01, y=1.14),
+        height=380,
+    )
+    fig.update_xaxes(BASE_XAXIS)
+    fig.update_yaxes(BASE_YAXIS)
+    fig.update_xaxes(title_text="LTV (%)", row=1, col=1)
+    fig.update_yaxes(title_text="Loans", row=1, col=1)
+    fig.update_xaxes(dtick=1, row=1, col=2)
+    fig.update_yaxes(title_text="% of outstanding loans", row=1, col=2)
+    return fig
+
+
+@app.callback(
+    Output("mb-loans",  "data"),
+    Output("mb-status", "children"),
+    Input("mb-upload",  "contents"),
+    State("mb-upload",  "filename"),
+    prevent_initial_call=True,
+)
+def load_mortgage_book(contents, filename):
+    if not contents:
+        raise PreventUpdate
+    try:
+        loans = read_loans(base64.b64decode(contents.split(",", 1)[1]))
+    except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as exc:
+        return None, html.Span(f"Could not read {filename}: {exc}", style={"color": C["red"]})
+    return Serverside(loans), html.Span(f"{filename}: {len(loans):,} loans loaded.",
+                                        style={"color": C["muted"]})
+
+
+@app.callback(
+    Output("mb-results", "children"),
+    Output("mb-dl-btn",  "disabled"),
+    Input("mb-loans", "data"),
+    Input("mb-year",  "value"),
+    Input("tab-mortgage-open", "data"),
+    prevent_initial_call=True,
+)
+def update_mortgage_book(loans, check_year, opened):
+    if not opened:
+        raise PreventUpdate
+    if loans is None or not len(loans):
+        return None, True
+    check_year = int(check_year or 2027)
+    result     = _MORTGAGE_BOOK.run(loans)
+    cols       = result.columns
+    ok         = result.ok
+    if not ok.any():
+        reasons = pd.Series(cols["status"]).value_counts().head(3)
+        return html.Div("No loan could be tested: " +
+                        "; ".join(f"{n:,} × {why}" for why, n in reasons.items()),
+                        style={"color": C["red"], "fontSize": "0.8rem"}), False
+
+    afford     = pd.Series(cols["affordability"][ok]).value_counts(normalize=True)
+    unaff      = afford.get("unaffordable", 0.0)
+    book_cards = dbc.Row([
+        dbc.Col(_result_card("Loans tested", f"{int(ok.sum()):,}",
+                             f"{int((~ok).sum()):,} skipped" if (~ok).any() else "all rows valid"),
+                md=3),
+        dbc.Col(_result_card("Book at origination", _fmt_money("GHS", np.nansum(cols["loan_ghs"])),
+                             f"avg LTV {np.nanmean(cols['loan_ghs'] / cols['value_ghs']) * 100:.1f}%"),
+                md=3),
+        dbc.Col(_result_card("Median monthly payment",
+                             f"GHS {np.nanmedian(cols['payment_ghs']):,.0f}",
+                             f"median {np.nanmedian(cols['pct_income']):.0f}% of median income"),
+                md=3),
+        dbc.Col(_result_card("Unaffordable loans", f"{unaff:.0%}",
+                             f"> 50% of GHS {GHANA_MEDIAN_INCOME_GHS:,}/mo median income",
+                             C["red"] if unaff > 0.5 else C["orange"] if unaff > 0.3 else C["green"]),
+                md=3),
+    ], className="g-2")
+
+    dist = result.distribution().set_index(["scenario", "year"])
+    stress_cols = []
+    for sc in ("bear", "base", "bull"):
+        color, _, label = SCENARIO_STYLES[sc]
+        r       = dist.loc[(sc, check_year)]
+        ltv_col = C["green"] if r["breach_share"] == 0 else (
+            C["orange"] if r["breach_share"] < 0.05 else C["red"])
+        stress_cols.append(_scenario_col(sc, f"{label} · Dec {check_year}", color, [
+            _result_card("LTV median / p90", f"{r['ltv_p50']:.1f}% / {r['ltv_p90']:.1f}%",
+                         f"{int(r['loans']):,} loans outstanding", color),
+            _result_card("Watch list / underwater",
+                         f"{r['watch_share']:.1%} / {r['breach_share']:.1%}",
+                         f"LTV > {WATCH_LTV:.0f}% / > {BREACH_LTV:.0f}%", ltv_col),
+            _result_card("Balance underwater", _fmt_money("GHS", r["breach_balance"]),
+                         f"shortfall {_fmt_money('GHS', r['shortfall_ghs'])}", ltv_col),
+        ]))
+
+    return html.Div([
+        book_cards,
+        dbc.Row(stress_cols, className="g-2 mt-1"),
+        dcc.Graph(figure=build_mortgage_book_fig(result, check_year),
+                  config={"displayModeBar": False}, className="mt-2"),
+    ]), False
+
+
+@app.callback(
+    Output("mb-dl", "data"),
+    Input("mb-dl-btn", "n_clicks"),
+    State("mb-loans",  "data"),
+    prevent_initial_call=True,
+)
+def download_mortgage_book(n_clicks, loans):
+    if loans is None:
+        raise PreventUpdate
+    table = _MORTGAGE_BOOK.run(loans).loan_table()
+    return dcc.send_data_frame(table.to_csv, "AHPI_mortgage_book_stress_test.csv",
+                               index=False, float_format="%.4f")
+
+
 # ── GIS choropleth callbacks ──────────────────────────────────────────────────
+# Geometry is part of the layout.  The server sends one compact value table
+# covering every slider year whenever the layer / metric / scenario changes;
+# the slider and the animation are then handled entirely in the browser.
+_GIS_METRICS = {
+    "usd_sqm": ("USD / sqm", ""),
+    "ghs_sqm": ("GHS / sqm", ""),
+    "ahpi":    ("AHPI",      " pts"),
+}
+_GIS_YEARS       = list(range(YEARS[0], FC_YEARS[-1] + 1))
+_GIS_FRAME_PROPS = ("fill", "ahpi", "ghs_sqm", "usd_sqm", "projected",
+                    "growth_pct", "fc_ahpi")
+
+
+@lru_cache(maxsize=None)
+def _gis_frame_table(layer: str, metric: str, scenario: str, fc_year: int) -> dict:
+    """
+    Per-year legend and per-area values for one layer setting:
+    {"layer", "frames": {year: {"label", "ticks", "values": {name: {...}}}}}.
+    """
+    frames = {}
+    for year in _GIS_YEARS:
+        if layer == "price":
+            gj, lo, hi = _build_timeline_geojson(year, metric, scenario)
+            if year >= 2025:
+                label, unit = f"AHPI (proj · {scenario.title()}) · Dec {year}", " pts"
+            else:
+                metric_label, unit = _GIS_METRICS[metric]
+                label = f"{metric_label} · Dec {year}"
+        else:
+            # Forecast-growth layer: pre-2025 slider years show the chosen year
+            fc_y = year if year >= 2025 else fc_year
+            gj, lo, hi = _build_forecast_geojson(scenario, fc_y)
+            label, unit = f"AHPI Growth vs Dec 2024 — {scenario.title()} {fc_y}", "%"
+        frames[str(year)] = {
+            "label":  label,
+            "ticks":  [f"{v:,.0f}{unit}" for v in (lo, (lo + hi) / 2, hi)],
+            "values": {feat["properties"]["name"]: {k: feat["properties"][k]
+                                                    for k in _GIS_FRAME_PROPS
+                                                    if k in feat["properties"]}
+                       for feat in gj["features"]},
+        }
+    return {"layer": layer, "frames": frames}
+
+
+def _gis_table_key(layer, price_metric, scenario, fc_year) -> tuple:
+    """
+    Normalise the controls to the inputs the table actually depends on.
+    The values come from the client and key the unbounded lru_caches below,
+    so anything outside the known metrics, scenarios and forecast years
+    falls back to usd_sqm / base / 2027 (and never raises).
+    """
+    scenario = scenario if isinstance(scenario, str) and scenario in SCENARIO_STYLES else "base"
+    if layer == "price":
+        metric = price_metric if isinstance(price_metric, str) and price_metric in _GIS_METRICS \
+            else "usd_sqm"
+        return ("price", metric, scenario, 0)
+    try:
+        year = int(fc_year)
+    except (TypeError, ValueError, OverflowError):
+        year = 2027
+    return ("forecast", "-", scenario, year if year in FC_YEARS else 2027)
+
+
+# Build every table once at start-up (3 metrics × 3 scenarios for the price
+# layer, 3 scenarios × 5 target years for the growth layer).
+for _sc in SCENARIO_STYLES:
+    for _m in _GIS_METRICS:
+        _gis_frame_table(*_gis_table_key("price", _m, _sc, None))
+    for _y in FC_YEARS:
+        _gis_frame_table(*_gis_table_key("forecast", None, _sc, _y))
+
+
 @app.callback(
-    Output("gis-geojson",    "data"),
-    Output("gis-geojson",    "style"),
-    Output("gis-geojson",    "onEachFeature"),
-    Output("gis-legend",     "children"),
-    Output("gis-tile-layer", "url"),
-    Output("gis-tile-layer", "attribution"),
+    Output("gis-frames",     "data"),
+    Output("gis-legend-bar", "style"),
     Input("gis-layer",        "value"),
     Input("gis-price-metric", "value"),
     Input("gis-scenario",     "value"),
     Input("gis-fc-year",      "value"),
-    Input("gis-tiles",        "value"),
-    Input("gis-anim-year",    "value"),
+    Input("tab-map-open",     "data"),
     prevent_initial_call=False,
 )
-def update_gis_map(layer, price_metric, scenario, fc_year, tile_key, anim_year):
-    tile_key  = tile_key or "dark"
-    tile_url, tile_attr = _TILE_URLS.get(tile_key, _TILE_URLS["dark"])
-    scenario  = scenario or "base"
-    anim_year = int(anim_year or 2024)
-
-    _METRIC_MAP = {
-        "usd_sqm": ("usd_sqm", "USD / sqm", ""),
-        "ghs_sqm": ("ghs_sqm", "GHS / sqm", ""),
-        "ahpi":    ("ahpi",    "AHPI",       " pts"),
-    }
-    snap_key, metric_label, unit = _METRIC_MAP.get(price_metric or "usd_sqm",
-                                                    ("usd_sqm", "USD/sqm", ""))
-
-    if layer == "price":
-        # Slider drives the year; 2025+ yields AHPI-only with a projected label
-        gj, lo, hi = _build_timeline_geojson(anim_year, snap_key, scenario)
-        style_fn   = _style_price
-        each_fn    = _on_each_feature_timeline
-        if anim_year >= 2025:
-            legend = _legend_strip(_CS_GOLD_TO_RED, lo, hi,
-                                   f"AHPI (proj · {scenario.title()}) · Dec {anim_year}", " pts")
-        else:
-            legend = _legend_strip(_CS_GOLD_TO_RED, lo, hi,
-                                   f"{metric_label} · Dec {anim_year}", unit)
-    else:
-        # Forecast-growth layer: clamp slider to valid forecast range
-        fc_y = anim_year if anim_year >= 2025 else int(fc_year or 2027)
-        gj, lo, hi = _build_forecast_geojson(scenario, fc_y)
-        style_fn   = _style_forecast
-        each_fn    = _on_each_feature_forecast
-        legend     = _legend_strip(
-            _CS_BLUE_TO_GREEN, lo, hi,
-            f"AHPI Growth vs Dec 2024 — {scenario.title()} {fc_y}", "%")
-
-    return gj, style_fn, each_fn, legend, tile_url, tile_attr
+def update_gis_frames(layer, price_metric, scenario, fc_year, opened):
+    if not opened:
+        raise PreventUpdate
+    key   = _gis_table_key(layer, price_metric, scenario, fc_year)
+    stops = _CS_GOLD_TO_RED if key[0] == "price" else _CS_BLUE_TO_GREEN
+    return _gis_frame_table(*key), _legend_bar_style(stops)
 
 
 @app.callback(
-    Output("gis-dl", "data"),
-    Input("gis-dl-btn",       "n_clicks"),
-    State("gis-layer",        "value"),
-    State("gis-price-metric", "value"),
-    State("gis-scenario",     "value"),
-    State("gis-fc-year",      "value"),
-    prevent_initial_call=True,
+    Output("gis-tile-layer", "url"),
+    Output("gis-tile-layer", "attribution"),
+    Input("gis-tiles", "value"),
+    prevent_initial_call=False,
 )
-def download_geojson(n_clicks, layer, price_metric, scenario, fc_year):
-    fc_year  = int(fc_year or 2027)
-    scenario = scenario or "base"
-    _METRIC_MAP = {
-        "usd_sqm": "usd_sqm",
-        "ghs_sqm": "ghs_sqm",
-        "ahpi":    "ahpi",
+def update_gis_tiles(tile_key):
+    return _TILE_URLS.get(tile_key or "dark", _TILE_URLS["dark"])
+
+
+# Slider / animation frame: restyle via hideout, no server round-trip.
+app.clientside_callback(
+    """
+    function(year, table) {
+        var nu = window.dash_clientside.no_update;
+        if (!table || !table.frames) {
+            return [nu, nu, nu, nu, nu];
+        }
+        var f = table.frames[String(year)] || table.frames['2024'];
+        var frame = {layer: table.layer, year: year, values: f.values};
+        window.ahpiGisFrame = frame;
+        return [frame, f.label, f.ticks[0], f.ticks[1], f.ticks[2]];
     }
-    snap_key = _METRIC_MAP.get(price_metric or "usd_sqm", "usd_sqm")
+    """,
+    Output("gis-geojson",      "hideout"),
+    Output("gis-legend-label", "children"),
+    Output("gis-legend-lo",    "children"),
+    Output("gis-legend-mid",   "children"),
+    Output("gis-legend-hi",    "children"),
+    Input("gis-anim-year", "value"),
+    Input("gis-frames",    "data"),
+)
 
-    if layer == "price":
-        gj, _, _ = _build_price_geojson(snap_key)
-        fname    = f"accra_price_heatmap_{snap_key}.geojson"
-    else:
-        gj, _, _ = _build_forecast_geojson(scenario, fc_year)
-        fname    = f"accra_forecast_growth_{scenario}_{fc_year}.geojson"
 
-    return dcc.send_bytes(
-        json.dumps(gj, indent=2).encode(),
-        fname,
-    )
+app.clientside_callback(
+    """
+    function(layer, metric, scenario, year) {
+        return "/downloads/geojson?" + new URLSearchParams({
+            layer: layer || "price", metric: metric || "usd_sqm",
+            scenario: scenario || "base", year: year || 2027});
+    }
+    """,
+    Output("gis-dl-btn",       "href"),
+    Input("gis-layer",         "value"),
+    Input("gis-price-metric",  "value"),
+    Input("gis-scenario",      "value"),
+    Input("gis-fc-year",       "value"),
+)
 
 
 # ── Market Report PDF callback ────────────────────────────────────────────────
+# Runs as a background job; finished PDFs are kept in the shared figure cache
+# keyed by (market, report_year, DATA_VERSION), so a repeat request returns
+# on the first progress poll.
+_PDF_PROGRESS_ON  = {"display": "flex", "height": "14px", "marginTop": "10px",
+                     "fontSize": "0.7rem"}
+_PDF_PROGRESS_OFF = {"display": "none"}
+
+
 @app.callback(
     Output("report-pdf-dl",      "data"),
     Output("report-preview",     "children"),
     Input("report-pdf-btn",      "n_clicks"),
     State("report-market",       "value"),
     State("report-year",         "value"),
+    background=True,
+    progress=[Output("report-progress", "value"), Output("report-progress", "label")],
+    running=[
+        (Output("report-pdf-btn",  "disabled"), True, False),
+        (Output("report-progress", "style"), _PDF_PROGRESS_ON, _PDF_PROGRESS_OFF),
+    ],
+    interval=500,
     prevent_initial_call=True,
 )
-def generate_pdf_report(n_clicks, market, report_year):
+def generate_pdf_report(set_progress, n_clicks, market, report_year):
     market      = market or "composite"
     report_year = int(report_year or 2027)
     label       = "Composite Mid-Market" if market == "composite" else market
 
+    def _progress(step: int, total: int, stage: str) -> None:
+        set_progress((round(100 * step / total), stage))
+
+    built = {}
+
+    def _build() -> bytes | None:
+        # a report whose chart failed to render is sent but not cached, so the
+        # next request retries the chart instead of reusing a chartless PDF
+        built["pdf"] = generate_market_pdf(market, report_year, progress=_progress)
+        charted = contains("chart_png", (market, *REPORT_CHART_SIZE), DATA_VERSION)
+        return built["pdf"] if charted else None
+
     try:
-        pdf_bytes = generate_market_pdf(market, report_year)
+        set_progress((0, "Queued"))
+        pdf_bytes = cached_bytes("report_pdf", (market, report_year), DATA_VERSION,
+                                 _build) or built["pdf"]
+        set_progress((100, "Done"))
         filename  = f"AHPI_Report_{label.replace(' ', '_').replace('/', '-')}_{report_year}.pdf"
         preview   = html.Div([
             html.Div("Report generated successfully.", style={"color": C["green"],
@@ -4798,9 +5527,12 @@ def generate_pdf_report(n_clicks, market, report_year):
     Output("snap-card-container", "children"),
     Input("snap-market",          "value"),
     Input("snap-year",            "value"),
+    Input("tab-snapshot-open",    "data"),
     prevent_initial_call=False,
 )
-def update_snapshot_card(market, snap_year):
+def update_snapshot_card(market, snap_year, opened):
+    if not opened:
+        raise PreventUpdate
     market    = market or "composite"
     snap_year = int(snap_year or 2027)
     label     = "Composite Mid-Market" if market == "composite" else market
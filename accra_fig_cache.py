@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · cross-worker figure cache
+===========================================
+Disk-backed LRU memo for the dashboard's figure builders and generated
+files (PDF reports, chart images, bulk downloads).  Both gunicorn workers
+open the same diskcache directory (SQLite index + value files), so an entry
+built by one worker is served from cache by the other.
+
+Figure entries hold the compacted figure JSON (accra_payload) and small
+files the raw bytes.  Bulk downloads are staged in .cache/downloads and
+then stored in the cache as file-backed values, so they count towards the
+size limit and LRU eviction deletes them.  Every entry is keyed by
+(name, arguments, data version).  The data version is a content hash of
+every input file the dashboard reads at import time (and of the dashboard
+and payload-compaction sources), so retraining, a new collector run or a
+deploy with changed builders never serves a stale figure.
+
+Configuration (environment)
+---------------------------
+  AHPI_CACHE_DIR         cache root        (default .cache/ next to this file)
+  AHPI_FIG_CACHE_MB      size limit in MB  (default 256)
+  AHPI_FIG_CACHE=0       bypass the cache  (always build)
+
+Usage
+-----
+  from accra_fig_cache import cached_bytes, cached_figure, data_version
+  VERSION = data_version()
+  fig = cached_figure("heatmap", (yr_range,), VERSION,
+                      lambda: build_heatmap_fig(filter_df(*yr_range)))
+  pdf = cached_bytes("report_pdf", (market, year), VERSION,
+                     lambda: generate_market_pdf(market, year))
+  fh, etag = cached_file("forecast_zip", (), VERSION, ".zip",
+                         lambda p: write_zip(p))
+
+  python accra_fig_cache.py info     # entries, size, hit / miss counts
+  python accra_fig_cache.py clear
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import BinaryIO, Callable
+
+import diskcache
+import plotly.io as pio
+
+from accra_payload import compact_figure
+
+BASE_DIR  = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("AHPI_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+FILES_DIR = os.path.join(CACHE_DIR, "downloads")
+SIZE_MB   = int(os.environ.get("AHPI_FIG_CACHE_MB", "256"))
+ENABLED   = os.environ.get("AHPI_FIG_CACHE", "1") != "0"
+
+# Files whose contents the cached figures, charts, PDFs and downloads depend
+# on: the data, and every module that builds or shapes a cached output
+VERSION_GLOBS = [
+    os.path.join(BASE_DIR, "data", "*.csv"),
+    os.path.join(BASE_DIR, "data", "*.geojson"),
+    os.path.join(BASE_DIR, "forecasts", "*.csv"),
+    os.path.join(BASE_DIR, "accra_bundle.py"),
+    os.path.join(BASE_DIR, "accra_chart_render.py"),
+    os.path.join(BASE_DIR, "accra_dashboard.py"),
+    os.path.join(BASE_DIR, "accra_mortgage_book.py"),
+    os.path.join(BASE_DIR, "accra_payload.py"),
+    os.path.join(BASE_DIR, "accra_portfolio.py"),
+    os.path.join(BASE_DIR, "accra_report.py"),
+]
+
+_cache: diskcache.Cache | None = None
+
+
+def get_cache() -> diskcache.Cache:
+    """Open (once per process) the shared figure cache."""
+    global _cache
+    if _cache is None:
+        _cache = diskcache.Cache(
+            os.path.join(CACHE_DIR, "figures"),
+            size_limit=SIZE_MB * 1024 ** 2,
+            eviction_policy="least-recently-used",
+            statistics=True,
+        )
+    return _cache
+
+
+def close() -> None:
+    """Drop this process's connection (e.g. after a fork)."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def data_version(patterns: list[str] | None = None) -> str:
+    """Short content hash over every file matched by patterns."""
+    h = hashlib.blake2b(digest_size=8)
+    for path in sorted(p for pat in (patterns or VERSION_GLOBS) for p in glob.glob(pat)):
+        h.update(os.path.relpath(path, BASE_DIR).encode())
+        with open(path, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+def _key(name: str, args: tuple, version: str) -> str:
+    return f"{name}|{version}|{json.dumps(args, sort_keys=True, default=str)}"
+
+
+def cached_figure(name: str, args: tuple, version: str,
+                  build: Callable[[], object]) -> dict:
+    """
+    Return the figure for (name, args, version) as a plain dict, building and
+    storing its JSON on a miss.  args must be JSON-serialisable callback
+    inputs; build takes no arguments and returns a plotly Figure.  Figures
+    are compacted (accra_payload) before they are stored.
+    """
+    if not ENABLED:
+        return _compact_json(build())
+    cache = get_cache()
+    key   = _key(name, args, version)
+    text  = cache.get(key)
+    if text is None:
+        fig  = _compact_json(build())
+        text = json.dumps(fig, separators=(",", ":"))
+        cache.set(key, text, tag=name)
+        return fig
+    return json.loads(text)
+
+
+def _compact_json(fig) -> dict:
+    return compact_figure(json.loads(pio.to_json(fig, validate=False)))
+
+
+def cached_bytes(name: str, args: tuple, version: str,
+                 build: Callable[[], bytes | None]) -> bytes | None:
+    """Return the bytes stored for (name, args, version), building on a miss."""
+    if not ENABLED:
+        return build()
+    cache = get_cache()
+    key   = _key(name, args, version)
+    data  = cache.get(key)
+    if data is None:
+        data = build()
+        if data is not None:
+            cache.set(key, data, tag=name)
+    return data
+
+
+def cached_file(name: str, args: tuple, version: str, suffix: str,
+                write: Callable[[str], None]) -> tuple[BinaryIO, str]:
+    """
+    Return (open binary file, ETag) for (name, args, version).  On a miss
+    write(path) streams the file to a staging path under FILES_DIR, which is
+    then moved into the cache as a file-backed value: it counts towards
+    SIZE_MB and eviction deletes it.  The ETag is a hash of the cache key
+    (the content is fixed by name, arguments and data version).  When the
+    cache is bypassed the staged file is unlinked once opened.
+    """
+    os.makedirs(FILES_DIR, exist_ok=True)
+    key  = _key(name, args, version)
+    etag = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    if ENABLED:
+        fh = get_cache().get(key, read=True)
+        if fh is not None:
+            return fh, etag
+
+    fd, tmp = tempfile.mkstemp(dir=FILES_DIR, suffix=suffix + ".part")
+    os.close(fd)
+    try:
+        write(tmp)
+        if not ENABLED:
+            fh = open(tmp, "rb")
+            return fh, etag
+        with open(tmp, "rb") as src:
+            get_cache().set(key, src, read=True, tag=name)
+    finally:
+        os.remove(tmp)                   # an open handle stays readable (POSIX)
+    fh = get_cache().get(key, read=True)
+    if fh is None:                       # evicted at once (entry above the size limit)
+        raise OSError(f"{name} export does not fit in the {SIZE_MB} MB cache")
+    return fh, etag
+
+
+def contains(name: str, args: tuple, version: str) -> bool:
+    """True if (name, args, version) is cached (always False when bypassed)."""
+    return ENABLED and _key(name, args, version) in get_cache()
+
+
+def main() -> None:
+    ap  = argparse.ArgumentParser(description="Dashboard figure cache")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("info", help="entries, size and hit / miss counts")
+    sub.add_parser("clear", help="remove every cached figure and download file")
+    args = ap.parse_args()
+
+    cache = get_cache()
+    sep   = "─" * 50
+    print(f"\n  AHPI · Figure Cache\n  {sep}")
+    if args.cmd == "clear":
+        print(f"  Removed {cache.clear()} entries")
+        for path in glob.glob(os.path.join(FILES_DIR, "*")):
+            os.remove(path)
+    hits, misses = cache.stats()
+    print(f"  dir        {cache.directory}")
+    print(f"  entries    {len(cache):>8}")
+    print(f"  size       {cache.volume() / 1024 ** 2:>8.1f} MB  (limit {SIZE_MB} MB)")
+    print(f"  hits       {hits:>8}")
+    print(f"  misses     {misses:>8}")
+    print(f"  version    {data_version()}\n")
+
+
+if __name__ == "__main__":
+    main()
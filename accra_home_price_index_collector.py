@@ -63,6 +63,8 @@ import warnings
 import numpy as np
 import pandas as pd
 
+from ahpi_telemetry import stage, track_run
+
 warnings.filterwarnings("ignore")
 
 # ─── Configuration ────────────────────────────────────────────────────────────
@@ -523,6 +525,7 @@ def build_ahpi(price_usd_monthly, exchange_rate_monthly, base_year=BASE_YEAR):
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
+@track_run("accra_home_price_index_collector")
 def main():
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
 
@@ -539,6 +542,7 @@ def main():
 
     # ── Step 1: Attempt live World Bank fetch, fall back to embedded data ──
     print("\n[1/4] Loading macroeconomic indicators …")
+    stage("fetch_macro")
     macro_data = {}
     for col, code in WB_INDICATORS.items():
         live = fetch_worldbank_annual(code)
@@ -551,6 +555,7 @@ def main():
 
     # ── Step 2: Commodity prices – try FRED, else use embedded ────────────
     print("\n[2/4] Loading commodity prices …")
+    stage("fetch_commodities")
     fred_map = {
         "gold_price_usd":  "GOLDAMGBD228NLBM",   # LBMA gold, monthly avg
         "oil_brent_usd":   "DCOILBRENTEU",         # Brent crude, daily → monthly
@@ -569,6 +574,7 @@ def main():
 
     # ── Step 3: Property price data – try web scraping first ──────────────
     print("\n[3/4] Loading Accra property price data …")
+    stage("fetch_prices")
     price_usd_annual = dict(ANNUAL_DATA["price_usd_per_sqm"])   # start with embedded
 
     numbeo_price = fetch_numbeo_accra()
@@ -588,6 +594,7 @@ def main():
 
     # ── Step 4: Build monthly DataFrame ───────────────────────────────────
     print("\n[4/4] Building monthly time-series …")
+    stage("build", "composite")
     df = pd.DataFrame({"ds": dates})
     df = df.set_index("ds")
 
@@ -660,6 +667,7 @@ def main():
             df[col] = df[col].round(4)
 
     # ── Save ──────────────────────────────────────────────────────────────
+    stage("persist", "composite")
     df.to_csv(OUTPUT_PATH, index=False)
 
     print(f"\n{'─'*64}")
@@ -680,6 +688,7 @@ def main():
 
     # ── Per-district price series ──────────────────────────────────────────────
     print("\n[5/5] Building per-district price series …")
+    stage("build", "district")
     years_frac = np.array(
         [(d.year - START_YEAR) + (d.month - 1) / 12 for d in dates]
     )
@@ -708,6 +717,7 @@ def main():
             f"  |  Dec 2024 AHPI = {ahpi_dist.iloc[-1]:.1f}"
         )
 
+    stage("persist", "district")
     df_districts = pd.DataFrame(district_records)
     df_districts.to_csv(DISTRICT_OUTPUT_PATH, index=False)
     print(f"\n  Saved → {DISTRICT_OUTPUT_PATH}")
@@ -719,6 +729,7 @@ def main():
 
     # ── Prime-area price series ────────────────────────────────────────────────
     print("\n[6/6] Building prime-area price series …")
+    stage("build", "prime")
     prime_records = []
     for area, annual_usd in PRIME_CONFIGS.items():
         price_usd_prime_raw = annual_dict_to_monthly(annual_usd, dates)
@@ -742,6 +753,7 @@ def main():
             f"  |  USD/sqm 2024 = {usd_2024:,}"
         )
 
+    stage("persist", "prime")
     df_prime = pd.DataFrame(prime_records)
     df_prime.to_csv(PRIME_OUTPUT_PATH, index=False)
     print(f"\n  Saved → {PRIME_OUTPUT_PATH}")
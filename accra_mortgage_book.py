@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · mortgage book stress test
+===========================================
+Runs the Mortgage Stress Test tab's single-loan arithmetic over a whole
+loan book: every loan × scenario × December checkpoint year is computed as
+numpy array operations, so a book of 100k loans is one pass per scenario.
+
+Per loan
+--------
+  payment      annuity on value × LTV over the term at the loan rate, and
+               its share of the median household income (affordable ≤ 30%,
+               stretched ≤ 50%, unaffordable above)
+  schedule     outstanding balance at each December checkpoint and the
+               interest paid in that calendar year
+  collateral   origination value indexed by the district AHPI: forecast
+               AHPI (Dec year, per scenario) / AHPI (origination month)
+  LTV          balance / collateral; above WATCH_LTV the loan is on the
+               watch list, above BREACH_LTV the collateral no longer
+               covers the loan.  First watch and breach years per scenario
+
+Loans CSV
+---------
+  district     a mid-market district (prime areas are accepted too)
+  sqm          floor area
+  value        property value at origination (GHS); blank uses sqm × the
+               district's GHS/sqm in the origination month
+  ltv          loan-to-value at origination (%)
+  term         years
+  rate         annual interest rate (%)
+  origination  YYYY-MM
+  loan_id      optional; the row number otherwise
+
+Rows that cannot be tested keep a "status" explaining why.
+
+Usage
+-----
+  engine = MortgageBookEngine(history, dec_fc, years=[2025, …], median_income=4000)
+  result = engine.run(read_loans(csv_bytes))
+  result.loan_table()        # one row per loan, for export
+  result.distribution()      # LTV percentiles and breach shares per scenario × year
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from accra_portfolio import SCENARIOS, STATUS_OK, MonthlyHistory, month_index
+
+WATCH_LTV  = 80.0
+BREACH_LTV = 100.0
+
+REQUIRED_COLS = ("district", "sqm", "value", "ltv", "term", "rate", "origination")
+LTV_BINS      = np.arange(0, 155, 5)     # histogram bins (%); the last bin is open
+
+
+# ── loans ─────────────────────────────────────────────────────────────────────
+
+def read_loans(data: bytes | str) -> pd.DataFrame:
+    """
+    Parse a loans CSV into the REQUIRED_COLS plus loan_id.  Raises
+    ValueError if a required column is missing.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    df = pd.read_csv(io.StringIO(data), dtype=str, keep_default_na=False)
+    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+    out = df[list(REQUIRED_COLS)].copy()
+    out.insert(0, "loan_id", df["loan_id"] if "loan_id" in df.columns
+               else pd.Series(np.arange(1, len(df) + 1)).astype(str))
+    return out
+
+
+# ── annuity arithmetic ────────────────────────────────────────────────────────
+
+def annuity_payment(principal: np.ndarray, monthly_rate: np.ndarray,
+                    n_payments: np.ndarray) -> np.ndarray:
+    """Level monthly payment; straight-line when the rate is zero."""
+    growth = (1 + monthly_rate) ** n_payments
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(monthly_rate > 0,
+                        principal * monthly_rate * growth / (growth - 1),
+                        principal / n_payments)
+
+
+def balance_after(principal: np.ndarray, monthly_rate: np.ndarray, payment: np.ndarray,
+                  n_payments: np.ndarray, paid: np.ndarray) -> np.ndarray:
+    """
+    Outstanding balance after paid payments (broadcasts; paid is clipped to
+    [0, n_payments], so a matured loan has a zero balance).
+    """
+    k      = np.clip(paid, 0, n_payments)
+    growth = (1 + monthly_rate) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bal = np.where(monthly_rate > 0,
+                       principal * growth - payment * (growth - 1) / monthly_rate,
+                       principal * (1 - k / n_payments))
+    return np.where(k >= n_payments, 0.0, np.maximum(bal, 0.0))
+
+
+# ── results ───────────────────────────────────────────────────────────────────
+
+class BookResult:
+    """
+    Arrays of one stress-test run: per loan (n,), per loan × year (n, Y)
+    and, for collateral and LTV, {scenario: (n, Y)}.  Rows whose status is
+    not ok are NaN throughout.
+    """
+
+    def __init__(self, years: list[int], columns: dict,
+                 balance: np.ndarray, interest: np.ndarray,
+                 collateral: dict[str, np.ndarray], ltv: dict[str, np.ndarray]):
+        self.years      = years
+        self.columns    = columns
+        self.ok         = columns["status"] == STATUS_OK
+        self.balance    = balance
+        self.interest   = interest
+        self.collateral = collateral
+        self.ltv        = ltv
+
+    def _first_year(self, sc: str, threshold: float) -> np.ndarray:
+        """First checkpoint year with LTV above threshold (NaN if none)."""
+        over = self.ltv[sc] > threshold
+        year = np.asarray(self.years, dtype=float)[over.argmax(axis=1)]
+        return np.where(over.any(axis=1), year, np.nan)
+
+    def loan_table(self) -> pd.DataFrame:
+        """One row per loan: payment, yearly schedule, collateral and LTV paths."""
+        cols = dict(self.columns)
+        for j, y in enumerate(self.years):
+            cols[f"balance_{y}"]  = self.balance[:, j]
+            cols[f"interest_{y}"] = self.interest[:, j]
+        for sc in SCENARIOS:
+            for j, y in enumerate(self.years):
+                cols[f"collateral_{sc}_{y}"] = self.collateral[sc][:, j]
+                cols[f"ltv_{sc}_{y}"]        = self.ltv[sc][:, j]
+            with np.errstate(invalid="ignore"):
+                cols[f"max_ltv_{sc}"] = np.nanmax(self.ltv[sc], axis=1, initial=-np.inf)
+            cols[f"max_ltv_{sc}"]      = np.where(self.ok, cols[f"max_ltv_{sc}"], np.nan)
+            cols[f"first_watch_{sc}"]  = self._first_year(sc, WATCH_LTV)
+            cols[f"first_breach_{sc}"] = self._first_year(sc, BREACH_LTV)
+        return pd.DataFrame(cols)
+
+    def distribution(self) -> pd.DataFrame:
+        """
+        Per scenario × year over the loans still outstanding: count, LTV
+        percentiles, watch / breach shares, balance in breach and the
+        collateral shortfall (balance above collateral, summed).
+        """
+        rows = []
+        for sc in SCENARIOS:
+            for j, y in enumerate(self.years):
+                live = self.ok & (self.balance[:, j] > 0)
+                ltv  = self.ltv[sc][live, j]
+                bal  = self.balance[live, j]
+                col  = self.collateral[sc][live, j]
+                pct  = np.percentile(ltv, [10, 50, 90, 99]) if len(ltv) else [np.nan] * 4
+                rows.append({
+                    "scenario":       sc,
+                    "year":           y,
+                    "loans":          int(live.sum()),
+                    "balance_ghs":    float(bal.sum()),
+                    "ltv_p10":        pct[0],
+                    "ltv_p50":        pct[1],
+                    "ltv_p90":        pct[2],
+                    "ltv_p99":        pct[3],
+                    "watch_share":    float((ltv > WATCH_LTV).mean()) if len(ltv) else 0.0,
+                    "breach_share":   float((ltv > BREACH_LTV).mean()) if len(ltv) else 0.0,
+                    "breach_balance": float(bal[ltv > BREACH_LTV].sum()),
+                    "shortfall_ghs":  float(np.maximum(bal - col, 0).sum()),
+                })
+        return pd.DataFrame(rows)
+
+    def ltv_histogram(self, sc: str, year: int) -> tuple[np.ndarray, np.ndarray]:
+        """(bin lower edges, loan counts) of the outstanding loans' LTV in year."""
+        j    = self.years.index(year)
+        live = self.ok & (self.balance[:, j] > 0)
+        ltv  = np.minimum(self.ltv[sc][live, j], LTV_BINS[-1] - 1e-9)
+        counts, _ = np.histogram(ltv, bins=LTV_BINS)
+        return LTV_BINS[:-1], counts
+
+
+# ── engine ────────────────────────────────────────────────────────────────────
+
+class MortgageBookEngine:
+    """
+    Stress-tests a loan book against the December forecast cube (dec_fc:
+    accra_dashboard.DecemberCube) at each checkpoint year, using the shared
+    MonthlyHistory for origination AHPI and GHS/sqm.
+    """
+
+    def __init__(self, history: MonthlyHistory, dec_fc, years: list[int],
+                 median_income: float):
+        self.history       = history
+        self.dec_fc        = dec_fc
+        self.years         = list(years)
+        self.median_income = median_income
+        # (scenario) → (markets, years) forecast AHPI, built once
+        self._fc = {sc: np.stack([history.forecast(dec_fc, sc, y) for y in self.years], axis=1)
+                    for sc in SCENARIOS}
+
+    def run(self, loans: pd.DataFrame) -> BookResult:
+        """Stress-test every loan of a read_loans() table."""
+        h     = self.history
+        num   = {c: pd.to_numeric(loans[c], errors="coerce").to_numpy(float)
+                 for c in ("sqm", "value", "ltv", "term", "rate")}
+        month = month_index(loans["origination"])
+        mi, ti, known, inside = h.locate(loans["district"], month)
+
+        orig_ahpi = np.where(known & inside, h.ahpi[mi, ti], np.nan)
+        value     = np.where(num["value"] > 0, num["value"], num["sqm"] * h.ghs_sqm[mi, ti])
+        status = np.select(
+            [~known, np.isnan(month), ~inside | ~(orig_ahpi > 0),
+             ~(value > 0), ~((num["ltv"] > 0) & (num["ltv"] <= 150)),
+             ~(num["term"] > 0), ~(num["rate"] >= 0),
+             ~np.isfinite(self._fc["base"][mi, 0])],
+            ["unknown district", "bad origination month", "no AHPI for origination month",
+             "no value (give the property value)", "bad LTV", "bad term", "bad rate",
+             "no forecast for district"],
+            STATUS_OK,
+        )
+        ok = status == STATUS_OK
+
+        loan    = np.where(ok, value * num["ltv"] / 100, np.nan)
+        r       = num["rate"] / 100 / 12
+        n       = np.round(num["term"] * 12)
+        payment = annuity_payment(loan, r, n)
+        income  = payment / self.median_income * 100
+
+        # Months paid by each December checkpoint (n, Y), and by the December before
+        dec   = np.array([y * 12 + 11 for y in self.years], dtype=float)
+        paid  = dec[None, :] - month[:, None]
+        bal   = balance_after(loan[:, None], r[:, None], payment[:, None], n[:, None], paid)
+        prev  = balance_after(loan[:, None], r[:, None], payment[:, None], n[:, None], paid - 12)
+        k_yr  = np.clip(paid, 0, n[:, None]) - np.clip(paid - 12, 0, n[:, None])
+        interest = payment[:, None] * k_yr - (prev - bal)
+
+        collateral, ltv = {}, {}
+        for sc in SCENARIOS:
+            collateral[sc] = value[:, None] * self._fc[sc][mi] / orig_ahpi[:, None]
+            ltv[sc]        = np.where(ok[:, None], bal / collateral[sc] * 100, np.nan)
+            collateral[sc] = np.where(ok[:, None], collateral[sc], np.nan)
+
+        afford = np.select([income <= 30, income <= 50], ["affordable", "stretched"],
+                           "unaffordable")
+        columns = {
+            "loan_id":        loans["loan_id"].to_numpy(),
+            "district":       h.names(mi, known, loans["district"]),
+            "origination":    loans["origination"].to_numpy(),
+            "status":         status,
+            "value_ghs":      np.where(ok, value, np.nan),
+            "loan_ghs":       loan,
+            "payment_ghs":    payment,
+            "total_interest": payment * n - loan,
+            "pct_income":     income,
+            "affordability":  np.where(ok, afford, ""),
+        }
+        bal      = np.where(ok[:, None], bal, np.nan)
+        interest = np.where(ok[:, None], interest, np.nan)
+        return BookResult(self.years, columns, bal, interest, collateral, ltv)
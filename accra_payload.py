@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · compact figure payloads
+=========================================
+Shrinks the figure JSON the dashboard sends to the browser.  Applied by the
+figure cache (accra_fig_cache.cached_figure) before a figure is stored, so
+each figure is compacted once per data version.
+
+  rounding     numeric trace arrays are rounded to SIG_DIGITS significant
+               digits of the array's largest value; 2-D arrays (customdata)
+               by their own columns' largest values, since one row can mix
+               an index (~655) with a price per sqm (~63,657).  Significant
+               digits alone can cut into what a hover shows (a gold price
+               of 1284.58 at 5 digits is 1284.6), so an array shown with a
+               fixed number of decimals — %{y:.2f} in the hovertemplate or
+               texttemplate, or the axis hoverformat — keeps one more
+               decimal than it shows, and a value the rounding would move
+               across a display tie is sent unrounded
+  typed arrays numeric x / y / z / customdata arrays are sent as base64
+               typed arrays ({"dtype", "bdata", "shape"}), which plotly.js
+               decodes without parsing one JSON number per point; float32
+               when the rounded values survive it and no fixed decimals
+               are shown, float64 otherwise.
+               Midnight ISO timestamps are cut to plain dates
+  decimation   a line trace with more points than its subplot has pixels
+               (FIG_WIDTH × x-axis domain) keeps, per pixel-wide bucket,
+               the first, minimum, maximum and last point, so peaks,
+               troughs and the line's shape survive
+
+Filled polygons (confidence bands), markers-only traces and non-scatter
+traces are never decimated.
+
+Configuration (environment)
+---------------------------
+  AHPI_COMPACT=0         send figures unchanged
+  AHPI_PAYLOAD_SIG       significant digits kept         (default 5)
+  AHPI_PAYLOAD_WIDTH     nominal figure width in pixels  (default 1400)
+
+Usage
+-----
+  from accra_payload import compact_figure
+  fig = compact_figure(json.loads(pio.to_json(figure)))
+"""
+
+import base64
+import math
+import os
+import re
+
+import numpy as np
+
+ENABLED    = os.environ.get("AHPI_COMPACT", "1") != "0"
+SIG_DIGITS = int(os.environ.get("AHPI_PAYLOAD_SIG", "5"))
+FIG_WIDTH  = int(os.environ.get("AHPI_PAYLOAD_WIDTH", "1400"))
+
+NUMERIC_KEYS = ("x", "y", "z", "customdata")
+_MIDNIGHT    = "T00:00:00"
+_SHOWN       = re.compile(r"%\{(x|y|z|customdata)(?:\[(\d+)\])?:[^}]*?\.(\d+)([f%])\}")
+_FORMAT      = re.compile(r"\.(\d+)([f%])$")
+
+
+# ── typed arrays ──────────────────────────────────────────────────────────────
+
+def _decode(value: dict) -> np.ndarray:
+    """A plotly typed-array spec back to a numpy array."""
+    arr = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+    if "shape" in value:
+        arr = arr.reshape([int(n) for n in str(value["shape"]).split(",")])
+    return arr
+
+
+def _encode(arr: np.ndarray) -> dict:
+    spec = {"dtype": arr.dtype.str.lstrip("<|="),
+            "bdata": base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode("ascii")}
+    if arr.ndim > 1:
+        spec["shape"] = ",".join(str(n) for n in arr.shape)
+    return spec
+
+
+def _numeric(value) -> np.ndarray | None:
+    """value as a float array if it is a numeric list or typed array, else None."""
+    if isinstance(value, dict) and "bdata" in value:
+        return _decode(value).astype(np.float64)
+    if not isinstance(value, list) or not value:
+        return None
+    try:
+        arr = np.array(value, dtype=np.float64)      # None → NaN
+    except (TypeError, ValueError):
+        return None
+    if arr.dtype != np.float64 or arr.ndim > 2:
+        return None
+    flat = value if arr.ndim == 1 else [v for row in value for v in row]
+    if any(isinstance(v, (str, bool)) for v in flat):
+        return None
+    return arr
+
+
+def _decimals(arr: np.ndarray, digits: int, shown: int | None) -> int | None:
+    """Decimals for digits significant digits of arr's largest value, at least shown + 1."""
+    finite = arr[np.isfinite(arr)]
+    top    = float(np.abs(finite).max()) if finite.size else 0.0
+    places = digits - 1 - math.floor(math.log10(top)) if top else None
+    if shown is not None:
+        places = shown + 1 if places is None else max(places, shown + 1)
+    return places
+
+
+def round_sig(arr: np.ndarray, digits: int = SIG_DIGITS, shown=None) -> np.ndarray:
+    """
+    Round to digits significant digits of the array's largest finite value,
+    keeping at least shown + 1 decimals and leaving any value whose shown
+    digits would change unrounded; a 2-D array column by column, with shown
+    a {column: decimals} dict.
+    """
+    if arr.ndim == 2:
+        if not arr.shape[1]:
+            return arr
+        shown = shown or {}
+        return np.column_stack([round_sig(col, digits, shown.get(i))
+                                for i, col in enumerate(arr.T)])
+    places = _decimals(arr, digits, shown)
+    if places is None:
+        return arr
+    out = np.round(arr, places)
+    if shown is not None:                 # a value on a display tie keeps its digits
+        fmt   = f".{shown}f"
+        moved = [i for i in np.flatnonzero(np.isfinite(arr))
+                 if format(out[i], fmt) != format(arr[i], fmt)]
+        out[moved] = arr[moved]
+    return out
+
+
+def pack(arr: np.ndarray, digits: int = SIG_DIGITS, shown=None) -> dict:
+    """
+    Rounded arr as a typed array: float32 if it holds the rounded values,
+    else float64.  Arrays with shown decimals stay float64: float32 can move
+    a value across a display tie (12.35 → 12.3500004 shows as 12.4).
+    """
+    arr = round_sig(arr, digits, shown)
+    f4  = arr.astype(np.float32)
+    ok  = np.isfinite(arr)
+    if shown in (None, {}) and np.allclose(f4[ok], arr[ok], rtol=10.0 ** -(digits + 1), atol=0):
+        return _encode(f4)
+    return _encode(arr)
+
+
+def shown_decimals(trace: dict, layout: dict | None = None) -> dict:
+    """
+    Decimals the browser shows for each numeric key of trace: {key: n} for
+    1-D arrays, {"customdata": {column: n}}, from fixed-point fields
+    (.Nf, .N%) in the hover / text templates and the axis hoverformat.
+    """
+    out: dict = {}
+
+    def note(key, col, places, kind):
+        n = int(places) + (2 if kind == "%" else 0)
+        if col is None:
+            out[key] = max(out.get(key, n), n)
+        else:
+            cols = out.setdefault(key, {})
+            if isinstance(cols, dict):
+                cols[int(col)] = max(cols.get(int(col), n), n)
+
+    for tpl in ("hovertemplate", "texttemplate"):
+        text = trace.get(tpl)
+        for key, col, places, kind in _SHOWN.findall(text if isinstance(text, str) else ""):
+            note(key, col or None, places, kind)
+    for key in ("x", "y"):
+        axis = key + "axis" + trace.get(key + "axis", key)[1:]
+        fmt  = _FORMAT.search((layout or {}).get(axis, {}).get("hoverformat") or "")
+        if fmt:
+            note(key, None, *fmt.groups())
+    return out
+
+
+# ── decimation ────────────────────────────────────────────────────────────────
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Indices kept by min/max decimation: per bucket of consecutive points the
+    first, minimum, maximum and last, in their original order.
+    """
+    n = len(y)
+    if buckets <= 0 or n <= 4 * buckets:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    keep  = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        seg = y[lo:hi]
+        if np.isfinite(seg).any():
+            i_min = lo + int(np.nanargmin(seg))
+            i_max = lo + int(np.nanargmax(seg))
+        else:
+            i_min = i_max = lo
+        keep += [lo, i_min, i_max, hi - 1]
+    return np.unique(keep)
+
+
+def _axis_pixels(layout: dict, trace: dict) -> int:
+    axis   = "xaxis" + trace.get("xaxis", "x")[1:]
+    domain = layout.get(axis, {}).get("domain", [0, 1])
+    return max(int(FIG_WIDTH * (domain[1] - domain[0])), 1)
+
+
+def _decimable(trace: dict) -> bool:
+    return (trace.get("type", "scatter") in ("scatter", "scattergl")
+            and trace.get("fill") not in ("toself", "tonext")
+            and "lines" in trace.get("mode", "lines")
+            and isinstance(trace.get("x"), (list, dict)))
+
+
+def decimate(trace: dict, pixels: int) -> None:
+    """Min/max-decimate a line trace in place to about pixels points."""
+    y = _numeric(trace.get("y"))
+    if y is None or y.ndim != 1 or len(y) <= pixels:
+        return
+    keep = minmax_indices(y, pixels // 4)
+    if len(keep) == len(y):
+        return
+    for key in ("x", "y", "customdata", "text", "hovertext"):
+        value = trace.get(key)
+        arr   = _numeric(value) if isinstance(value, dict) else None
+        if arr is not None:
+            trace[key] = arr[keep].tolist()
+        elif isinstance(value, list) and len(value) == len(y):
+            trace[key] = [value[i] for i in keep]
+
+
+# ── figures ───────────────────────────────────────────────────────────────────
+
+def _short_dates(value):
+    if (isinstance(value, list) and value and isinstance(value[0], str)
+            and all(isinstance(v, str) and v.endswith(_MIDNIGHT) for v in value)):
+        return [v[:-len(_MIDNIGHT)] for v in value]
+    return value
+
+
+def compact_trace(trace: dict, pixels: int | None = None, layout: dict | None = None) -> dict:
+    """Decimate (if pixels is given), round and typed-array-encode one trace in place."""
+    if pixels is not None and _decimable(trace):
+        decimate(trace, pixels)
+    shown = shown_decimals(trace, layout)
+    for key in NUMERIC_KEYS:
+        if key not in trace:
+            continue
+        arr = _numeric(trace[key])
+        if arr is not None:
+            places = shown.get(key)
+            if arr.ndim == 2 and isinstance(places, int):      # heatmap z: every column
+                places = dict.fromkeys(range(arr.shape[1]), places)
+            elif arr.ndim != 2 and isinstance(places, dict):
+                places = None
+            trace[key] = pack(arr, shown=places)
+        else:
+            trace[key] = _short_dates(trace[key])
+    return trace
+
+
+def compact_figure(fig: dict) -> dict:
+    """Compact every trace of a figure dict (as from pio.to_json) in place."""
+    if not ENABLED:
+        return fig
+    layout = fig.get("layout", {})
+    for trace in fig.get("data", []):
+        compact_trace(trace, _axis_pixels(layout, trace), layout)
+    return fig
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · portfolio valuation
+=====================================
+Values a whole book of holdings under the bear / base / bull scenarios with
+the Investment tab's arithmetic, vectorised over holdings: every market's
+monthly AHPI history and GHS/sqm price are held as dense arrays, the sell
+AHPI comes from the December forecast cube, and each scenario is a handful
+of numpy expressions over the full book.
+
+Per holding and scenario
+------------------------
+  cost        price paid (GHS), or sqm × the market's GHS/sqm in the
+              purchase month; in USD at that month's GHS/USD rate
+  value       cost × AHPI(Dec sell year) / AHPI(purchase month), in USD at
+              the scenario exchange rate
+  return      total and CAGR over the holding period, GHS and USD
+  benchmarks  cost compounded at the scenario T-bill rate (GHS) and at the
+              USD deposit rate (USD) over the same period
+
+Holdings CSV
+------------
+  market          composite, a district or a prime area (case-insensitive)
+  sqm             floor area
+  purchase_month  YYYY-MM (a full date is accepted; the day is ignored)
+  price           optional: GHS paid; blank uses sqm × market GHS/sqm
+
+Rows that cannot be valued keep a "status" explaining why and are left out
+of the totals.
+
+ReturnSurface precomputes the single-property calculator (one market, buy
+year, sell year) for every combination, so the Investment tab's callback
+and its buy × sell heatmap are lookups.
+
+Usage
+-----
+  history  = MonthlyHistory({"composite": df, "Adenta": adenta, …}, df)
+  engine   = PortfolioEngine(history, dec_fc, SCENARIO_FX, SCENARIO_TBILL, 5.0)
+  holdings = read_holdings(csv_bytes)
+  results  = engine.value(holdings, sell_year=2027)
+  totals   = summarise(results)
+  surface  = ReturnSurface(dec_hist, dec_fc, markets, range(2010, 2025), FC_YEARS, …)
+  surface.lookup("Adenta", 2020, 2027, "base", sqm=100)
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+SCENARIOS = ("bear", "base", "bull")
+
+REQUIRED_COLS = ("market", "sqm", "purchase_month")
+PRICE_ALIASES = ("price", "price_ghs", "purchase_price")
+
+STATUS_OK = "ok"
+
+
+# ── holdings ──────────────────────────────────────────────────────────────────
+
+def read_holdings(data: bytes | str) -> pd.DataFrame:
+    """
+    Parse a holdings CSV into (market, sqm, purchase_month, price) columns.
+    Raises ValueError if a required column is missing.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    df = pd.read_csv(io.StringIO(data), dtype=str, keep_default_na=False)
+    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+    price = next((c for c in PRICE_ALIASES if c in df.columns), None)
+    out = df[list(REQUIRED_COLS)].copy()
+    out["price"] = df[price] if price else ""
+    return out
+
+
+def month_index(s: pd.Series) -> np.ndarray:
+    """YYYY-MM[-DD] strings → year * 12 + month - 1 (NaN where unparseable)."""
+    s     = s.str.strip()
+    year  = pd.to_numeric(s.str[:4], errors="coerce").to_numpy(float)
+    month = pd.to_numeric(s.str[5:7].str.rstrip("-/"), errors="coerce").to_numpy(float)
+    ok    = s.str[4].isin(["-", "/"]).to_numpy() & (month >= 1) & (month <= 12)
+    return np.where(ok, year * 12 + month - 1, np.nan)
+
+
+def _frame_months(frame: pd.DataFrame) -> np.ndarray:
+    return (frame["ds"].dt.year * 12 + frame["ds"].dt.month - 1).to_numpy(int)
+
+
+# ── monthly history ───────────────────────────────────────────────────────────
+
+class MonthlyHistory:
+    """
+    Every market's monthly AHPI and GHS/sqm as dense (market, month) arrays
+    plus the monthly GHS/USD rate, built once at start-up and shared by the
+    portfolio and mortgage-book engines.
+
+    history  {market: frame with ds, y and (optionally) price_ghs_per_sqm}
+    fx       composite frame with ds and exchange_rate_ghs_usd
+    """
+
+    def __init__(self, history: dict[str, pd.DataFrame], fx: pd.DataFrame):
+        self.markets = list(history)
+        self._m      = {m.lower(): i for i, m in enumerate(self.markets)}
+        months       = {m: _frame_months(f) for m, f in history.items()}
+        self.first   = min(int(t.min()) for t in months.values())
+        span         = max(int(t.max()) for t in months.values()) - self.first + 1
+
+        self.ahpi    = np.full((len(self.markets), span), np.nan)
+        self.ghs_sqm = np.full((len(self.markets), span), np.nan)
+        for i, (market, frame) in enumerate(history.items()):
+            t = months[market] - self.first
+            self.ahpi[i, t] = frame["y"].to_numpy(float)
+            if "price_ghs_per_sqm" in frame.columns:
+                self.ghs_sqm[i, t] = frame["price_ghs_per_sqm"].to_numpy(float)
+        self.fx = np.full(span, np.nan)
+        t    = _frame_months(fx) - self.first
+        keep = (t >= 0) & (t < span)
+        self.fx[t[keep]] = fx["exchange_rate_ghs_usd"].to_numpy(float)[keep]
+
+    def locate(self, market: pd.Series, month: np.ndarray) -> tuple[np.ndarray, np.ndarray,
+                                                                     np.ndarray, np.ndarray]:
+        """
+        (market index, month index, known market, month in history) for
+        market names (case-insensitive) and month_index() values; indices
+        are 0 where not found.
+        """
+        mi     = market.str.strip().str.lower().map(self._m)
+        known  = mi.notna().to_numpy()
+        t      = month - self.first
+        inside = (t >= 0) & (t < self.ahpi.shape[1])
+        return (mi.fillna(0).to_numpy(int), np.where(inside, t, 0).astype(int),
+                known, inside)
+
+    def names(self, mi: np.ndarray, known: np.ndarray, raw: pd.Series) -> np.ndarray:
+        """Canonical market names where known, the raw input elsewhere."""
+        return np.where(known, np.array(self.markets, dtype=object)[mi], raw.to_numpy())
+
+    def forecast(self, dec_fc, scenario: str, year: int, field: str = "yhat") -> np.ndarray:
+        """dec_fc December field per market, in self.markets order (NaN where absent)."""
+        return _aligned(dec_fc, self.markets, scenario, year, field)
+
+
+def _aligned(cube, markets: list[str], scenario: str, year: int, field: str) -> np.ndarray:
+    """cube.slab() reordered to markets (NaN for a market the cube lacks)."""
+    slab = cube.slab(scenario, year, field)
+    idx  = np.array([cube.markets.index(m) if m in cube.markets else -1 for m in markets])
+    return np.where(idx >= 0, slab[idx], np.nan)
+
+
+# ── engine ────────────────────────────────────────────────────────────────────
+
+class PortfolioEngine:
+    """
+    value() prices a holdings table in one vectorised pass per scenario
+    from the shared MonthlyHistory and the December forecast cube
+    (dec_fc: accra_dashboard.DecemberCube).
+    """
+
+    def __init__(self, history: MonthlyHistory, dec_fc,
+                 scenario_fx: dict[str, float], scenario_tbill: dict[str, float],
+                 usd_deposit_rate: float):
+        self.history          = history
+        self.dec_fc           = dec_fc
+        self.scenario_fx      = scenario_fx
+        self.scenario_tbill   = scenario_tbill
+        self.usd_deposit_rate = usd_deposit_rate
+
+    def value(self, holdings: pd.DataFrame, sell_year: int) -> pd.DataFrame:
+        """
+        Value every holding at December of sell_year.  Returns one row per
+        holding: status, cost and per-scenario value / return / CAGR /
+        benchmark columns (returns and CAGRs in %, NaN unless status is ok).
+        """
+        h      = self.history
+        sqm    = pd.to_numeric(holdings["sqm"], errors="coerce").to_numpy(float)
+        price  = pd.to_numeric(holdings["price"], errors="coerce").to_numpy(float)
+        month  = month_index(holdings["purchase_month"])
+        mi, ti, known, inside = h.locate(holdings["market"], month)
+        found  = known & inside
+
+        buy_ahpi = np.where(found, h.ahpi[mi, ti], np.nan)
+        cost_ghs = np.where(price > 0, price, sqm * h.ghs_sqm[mi, ti])
+        cost_usd = np.where(found, cost_ghs / h.fx[ti], np.nan)
+        years    = (sell_year * 12 + 11 - month) / 12
+        sell     = {sc: h.forecast(self.dec_fc, sc, sell_year)[mi] for sc in SCENARIOS}
+
+        status = np.select(
+            [~known, np.isnan(month), ~(sqm > 0), ~(buy_ahpi > 0), ~(cost_usd > 0),
+             ~(years > 0), ~np.isfinite(sell["base"])],
+            ["unknown market", "bad purchase month", "bad sqm", "no AHPI for purchase month",
+             "no price (give the price paid)", "sell year not after purchase",
+             "no forecast for market"],
+            STATUS_OK,
+        )
+        ok       = status == STATUS_OK
+        years    = np.where(ok, years, np.nan)
+        cost_ghs = np.where(ok, cost_ghs, np.nan)
+        cost_usd = np.where(ok, cost_usd, np.nan)
+
+        cols = {
+            "market":         h.names(mi, known, holdings["market"]),
+            "sqm":            sqm,
+            "purchase_month": holdings["purchase_month"].to_numpy(),
+            "status":         status,
+            "years":          years,
+            "buy_ahpi":       np.where(ok, buy_ahpi, np.nan),
+            "cost_ghs":       cost_ghs,
+            "cost_usd":       cost_usd,
+        }
+        for sc in SCENARIOS:
+            value_ghs = cost_ghs * sell[sc] / buy_ahpi
+            value_usd = value_ghs / self.scenario_fx[sc]
+            tbill     = cost_ghs * (1 + self.scenario_tbill[sc] / 100) ** years
+            cols[f"value_ghs_{sc}"] = value_ghs
+            cols[f"value_usd_{sc}"] = value_usd
+            cols[f"ret_ghs_{sc}"]   = (value_ghs / cost_ghs - 1) * 100
+            cols[f"ret_usd_{sc}"]   = (value_usd / cost_usd - 1) * 100
+            cols[f"cagr_ghs_{sc}"]  = ((value_ghs / cost_ghs) ** (1 / years) - 1) * 100
+            cols[f"cagr_usd_{sc}"]  = ((value_usd / cost_usd) ** (1 / years) - 1) * 100
+            cols[f"tbill_ghs_{sc}"] = tbill
+            cols[f"tbill_ret_{sc}"] = (tbill / cost_ghs - 1) * 100
+        usd_dep = cost_usd * (1 + self.usd_deposit_rate / 100) ** years
+        cols["usd_deposit_usd"] = usd_dep
+        cols["usd_deposit_ret"] = (usd_dep / cost_usd - 1) * 100
+        return pd.DataFrame(cols)
+
+
+# ── return surface ────────────────────────────────────────────────────────────
+
+SURFACE_FIELDS = ("buy_ahpi", "buy_ghs", "buy_usd", "sell_ahpi", "sell_ahpi_lo", "sell_ahpi_hi",
+                  "sell_ghs", "sell_usd", "ghs_ret", "usd_ret", "ghs_cagr", "usd_cagr",
+                  "tbill_ret", "usd_dep_ret")
+PER_SQM_FIELDS = ("buy_ghs", "buy_usd", "sell_ghs", "sell_usd")
+
+
+class ReturnSurface:
+    """
+    The Investment tab's single-property calculation for every market ×
+    buy year × sell year × scenario, as one array[m, b, s, k, field] built
+    at start-up from the December cubes (dec_hist / dec_fc:
+    accra_dashboard.DecemberCube).  Returns, CAGRs and benchmarks do not
+    depend on the floor area; the PER_SQM_FIELDS are per sqm and scale
+    linearly with it.  A lookup is an index; grid() is a whole buy × sell
+    table for the heatmap.
+    """
+
+    def __init__(self, dec_hist, dec_fc, markets: list[str], buy_years: list[int],
+                 sell_years: list[int], scenario_fx: dict[str, float],
+                 scenario_tbill: dict[str, float], usd_deposit_rate: float):
+        self.markets    = list(markets)
+        self.buy_years  = list(buy_years)
+        self.sell_years = list(sell_years)
+        self.fields     = {f: i for i, f in enumerate(SURFACE_FIELDS)}
+        self._m = {m: i for i, m in enumerate(self.markets)}
+        self._b = {y: i for i, y in enumerate(self.buy_years)}
+        self._s = {y: i for i, y in enumerate(self.sell_years)}
+
+        def hist(field):                                            # (M, B, 1, 1)
+            return np.stack([_aligned(dec_hist, self.markets, "hist", y, field)
+                             for y in self.buy_years], axis=1)[:, :, None, None]
+
+        def fc(field):                                              # (M, 1, S, K)
+            return np.stack([np.stack([_aligned(dec_fc, self.markets, sc, y, field)
+                                       for sc in SCENARIOS], axis=1)
+                             for y in self.sell_years], axis=1)[:, None, :, :]
+
+        buy_ahpi = hist("y")
+        buy_ghs  = np.nan_to_num(hist("price_ghs_per_sqm"))          # row.get(…, 0)
+        buy_usd  = np.nan_to_num(hist("price_usd_per_sqm"))
+        sell     = fc("yhat")
+        fx       = np.array([scenario_fx[sc] for sc in SCENARIOS])
+        tbill    = np.array([scenario_tbill[sc] for sc in SCENARIOS]) / 100
+        years    = (np.array(self.sell_years)[None, :] -
+                    np.array(self.buy_years)[:, None])[None, :, :, None]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sell_ghs = np.where(buy_ahpi != 0, buy_ghs * (sell / buy_ahpi), 0.0)
+            sell_usd = np.where(fx != 0, sell_ghs / fx, 0.0)
+            growth_g = sell_ghs / buy_ghs
+            growth_u = sell_usd / buy_usd
+            cols = {
+                "buy_ahpi":     buy_ahpi,
+                "buy_ghs":      buy_ghs,
+                "buy_usd":      buy_usd,
+                "sell_ahpi":    sell,
+                "sell_ahpi_lo": fc("yhat_lower"),
+                "sell_ahpi_hi": fc("yhat_upper"),
+                "sell_ghs":     sell_ghs,
+                "sell_usd":     sell_usd,
+                "ghs_ret":      (growth_g - 1) * 100,
+                "usd_ret":      (growth_u - 1) * 100,
+                "ghs_cagr":     (growth_g ** (1 / years) - 1) * 100,
+                "usd_cagr":     (growth_u ** (1 / years) - 1) * 100,
+                "tbill_ret":    ((1 + tbill) ** years - 1) * 100,
+                "usd_dep_ret":  ((1 + usd_deposit_rate / 100) ** years - 1) * 100,
+            }
+        shape = (len(self.markets), len(self.buy_years), len(self.sell_years), len(SCENARIOS))
+        self.values = np.stack([np.broadcast_to(cols[f], shape) for f in SURFACE_FIELDS],
+                               axis=-1)
+        self.has_buy  = np.isfinite(buy_ahpi[:, :, 0, 0])           # (M, B)
+        self.has_sell = np.isfinite(sell[:, 0, :, :])               # (M, S, K)
+
+    def has_history(self, market: str, buy_year: int) -> bool:
+        m, b = self._m.get(market), self._b.get(buy_year)
+        return m is not None and b is not None and bool(self.has_buy[m, b])
+
+    def lookup(self, market: str, buy_year: int, sell_year: int, scenario: str,
+               sqm: float = 1.0) -> dict | None:
+        """
+        The calculator's figures for one combination, per-sqm fields scaled
+        to sqm, or None without a buy row or a forecast.
+        """
+        m, b, s = self._m.get(market), self._b.get(buy_year), self._s.get(sell_year)
+        if m is None or b is None or s is None:
+            return None
+        k = SCENARIOS.index(scenario)
+        if not (self.has_buy[m, b] and self.has_sell[m, s, k]):
+            return None
+        row = dict(zip(SURFACE_FIELDS, self.values[m, b, s, k].tolist()))
+        for f in PER_SQM_FIELDS:
+            row[f"total_{f}"] = row[f] * sqm
+        return row
+
+    def grid(self, market: str, scenario: str, field: str) -> np.ndarray:
+        """field for every (buy year, sell year) of market; NaN where undefined."""
+        m, k = self._m[market], SCENARIOS.index(scenario)
+        ok   = self.has_buy[m][:, None] & self.has_sell[m, :, k][None, :]
+        return np.where(ok, self.values[m, :, :, k, self.fields[field]], np.nan)
+
+
+# ── totals ────────────────────────────────────────────────────────────────────
+
+def summarise(results: pd.DataFrame) -> dict:
+    """
+    Portfolio totals per scenario over the valued holdings: cost, value,
+    total return, cost-weighted CAGR, benchmark totals and the share of
+    holdings beating the T-bill.  Also the holding and skipped-row counts.
+    """
+    ok   = results[results["status"] == STATUS_OK]
+    cost_ghs, cost_usd = ok["cost_ghs"].sum(), ok["cost_usd"].sum()
+    usd_dep = ok["usd_deposit_usd"].sum()
+    out = {"holdings": len(ok), "skipped": len(results) - len(ok),
+           "cost_ghs": cost_ghs, "cost_usd": cost_usd, "scenarios": {}}
+    for sc in SCENARIOS:
+        value_ghs = ok[f"value_ghs_{sc}"].sum()
+        value_usd = ok[f"value_usd_{sc}"].sum()
+        tbill     = ok[f"tbill_ghs_{sc}"].sum()
+        out["scenarios"][sc] = {
+            "value_ghs":    value_ghs,
+            "value_usd":    value_usd,
+            "ret_ghs":      (value_ghs / cost_ghs - 1) * 100 if cost_ghs else 0.0,
+            "ret_usd":      (value_usd / cost_usd - 1) * 100 if cost_usd else 0.0,
+            "cagr_ghs":     float(np.average(ok[f"cagr_ghs_{sc}"], weights=ok["cost_ghs"]))
+                            if cost_ghs else 0.0,
+            "cagr_usd":     float(np.average(ok[f"cagr_usd_{sc}"], weights=ok["cost_usd"]))
+                            if cost_usd else 0.0,
+            "tbill_ret":    (tbill / cost_ghs - 1) * 100 if cost_ghs else 0.0,
+            "usd_dep_ret":  (usd_dep / cost_usd - 1) * 100 if cost_usd else 0.0,
+            "beat_tbill":   float((ok[f"value_ghs_{sc}"] > ok[f"tbill_ghs_{sc}"]).mean())
+                            if len(ok) else 0.0,
+        }
+    return out
+
+
+def by_market(results: pd.DataFrame) -> pd.DataFrame:
+    """Holdings, cost and scenario values (GHS) summed per market, largest cost first."""
+    ok   = results[results["status"] == STATUS_OK]
+    cols = ["cost_ghs"] + [f"value_ghs_{sc}" for sc in SCENARIOS]
+    agg  = ok.groupby("market")[cols].sum()
+    agg.insert(0, "holdings", ok.groupby("market").size())
+    return agg.sort_values("cost_ghs", ascending=False)
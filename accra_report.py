@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Accra Dashboard · PDF market reports
+====================================
+ReportLab layout for the downloadable market reports.  The dashboard
+gathers the figures for one market and forecast year and passes them in as
+a plain dict, so this module (and reportlab itself) is imported only when
+the first report is generated, not when a gunicorn worker starts.
+
+Report fields
+-------------
+  label, family      display name and market family ("prime area", …)
+  report_year        forecast horizon (December of this year)
+  hist_now/hist_prev latest and previous December rows (y, price_*_per_sqm), or None
+  forecasts          {scenario: December forecast row (yhat, yhat_lower/upper) or None}
+  scenario_fx        {scenario: GHS/USD assumption}
+  accuracy           (MAE, RMSE, MAPE) on the test set, or None
+  chart_size         (width, height) of the chart PNG, for its aspect ratio
+
+Usage
+-----
+  from accra_report import build_market_pdf
+  pdf = build_market_pdf(report, lambda: png_bytes, progress=None)
+"""
+
+import datetime
+import io
+from typing import Callable
+
+from reportlab.lib import colors as rl_colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
+    HRFlowable, Image as RLImage,
+)
+
+_PDF_BG       = rl_colors.HexColor("#0d1117")
+_PDF_CARD     = rl_colors.HexColor("#161b22")
+_PDF_GOLD     = rl_colors.HexColor("#d4a017")
+_PDF_TEXT     = rl_colors.HexColor("#e6edf3")
+_PDF_MUTED    = rl_colors.HexColor("#8b949e")
+_PDF_GREEN    = rl_colors.HexColor("#3fb950")
+_PDF_RED      = rl_colors.HexColor("#f85149")
+_PDF_BLUE     = rl_colors.HexColor("#58a6ff")
+_PDF_BORDER   = rl_colors.HexColor("#30363d")
+
+
+def _pdf_styles():
+    base = getSampleStyleSheet()
+    styles = {
+        "title": ParagraphStyle("title", fontName="Helvetica-Bold", fontSize=18,
+                                textColor=_PDF_GOLD, alignment=TA_LEFT, spaceAfter=4),
+        "subtitle": ParagraphStyle("subtitle", fontName="Helvetica", fontSize=10,
+                                   textColor=_PDF_MUTED, alignment=TA_LEFT, spaceAfter=10),
+        "section": ParagraphStyle("section", fontName="Helvetica-Bold", fontSize=11,
+                                  textColor=_PDF_GOLD, alignment=TA_LEFT,
+                                  spaceBefore=10, spaceAfter=4),
+        "body": ParagraphStyle("body", fontName="Helvetica", fontSize=8.5,
+                               textColor=_PDF_TEXT, alignment=TA_LEFT, spaceAfter=3),
+        "small": ParagraphStyle("small", fontName="Helvetica", fontSize=7.5,
+                                textColor=_PDF_MUTED, alignment=TA_LEFT),
+        "cell": ParagraphStyle("cell", fontName="Helvetica", fontSize=8,
+                               textColor=_PDF_TEXT),
+        "cell_bold": ParagraphStyle("cell_bold", fontName="Helvetica-Bold", fontSize=8,
+                                    textColor=_PDF_GOLD),
+        "right": ParagraphStyle("right", fontName="Helvetica", fontSize=8,
+                                textColor=_PDF_TEXT, alignment=TA_RIGHT),
+        "disclaimer": ParagraphStyle("disclaimer", fontName="Helvetica-Oblique", fontSize=7,
+                                     textColor=_PDF_MUTED, alignment=TA_CENTER, spaceAfter=4),
+    }
+    return styles
+
+
+PDF_STEPS = ["Snapshot", "Scenario forecasts", "Model accuracy",
+             "Rendering chart", "Building PDF"]
+
+
+def build_market_pdf(report: dict, chart_png: Callable[[], bytes | None],
+                     progress: Callable[[int, int, str], None] | None = None) -> bytes:
+    """
+    Lay out the 2-3 page PDF market report described by *report* (see the
+    module docstring).  chart_png is called once, at the chart stage, and
+    returns PNG bytes or None.  progress, if given, is called as
+    progress(step, total, label) before each stage in PDF_STEPS.
+    """
+    def _step(i: int) -> None:
+        if progress is not None:
+            progress(i, len(PDF_STEPS), PDF_STEPS[i])
+
+    buf = io.BytesIO()
+    W, H = A4
+    doc = SimpleDocTemplate(
+        buf, pagesize=A4,
+        leftMargin=18*mm, rightMargin=18*mm,
+        topMargin=16*mm, bottomMargin=16*mm,
+    )
+
+    styles = _pdf_styles()
+    story  = []
+
+    label, family = report["label"], report["family"]
+    report_year   = report["report_year"]
+
+    # ── Header ──────────────────────────────────────────────────────────────────
+    story.append(Paragraph("ACCRA HOME PRICE INDEX", styles["title"]))
+    story.append(Paragraph(
+        f"Market Report — {label} ({family.title()}) · Forecast Horizon: Dec {report_year}",
+        styles["subtitle"]))
+    story.append(Paragraph(
+        f"Generated: {datetime.date.today().strftime('%d %B %Y')}  ·  "
+        "Source: AHPI Prophet v2.1  ·  Base year: 2015 = 100",
+        styles["small"]))
+    story.append(HRFlowable(width="100%", thickness=0.5,
+                            color=_PDF_GOLD, spaceAfter=8))
+
+    # ── Current snapshot (latest historical Dec) ─────────────────────────────
+    _step(0)
+    story.append(Paragraph("Current Market Snapshot (Dec 2024)", styles["section"]))
+
+    hist_2024 = report["hist_now"]
+    hist_2023 = report["hist_prev"]
+
+    if hist_2024 is not None:
+        ahpi_now  = float(hist_2024.get("y", "—"))
+        ghs_sqm   = hist_2024.get("price_ghs_per_sqm")
+        usd_sqm   = hist_2024.get("price_usd_per_sqm")
+        if hist_2023 is not None:
+            ahpi_prev = float(hist_2023.get("y", ahpi_now))
+            yoy_pct   = (ahpi_now - ahpi_prev) / ahpi_prev * 100 if ahpi_prev else 0
+            yoy_str   = f"{yoy_pct:+.1f}% YoY"
+        else:
+            yoy_str = "—"
+
+        snap_data = [
+            [Paragraph("Metric", styles["cell_bold"]),
+             Paragraph("Value", styles["cell_bold"]),
+             Paragraph("Note", styles["cell_bold"])],
+            [Paragraph("AHPI (Dec 2024)", styles["cell"]),
+             Paragraph(f"{ahpi_now:.1f}", styles["cell"]),
+             Paragraph(yoy_str, styles["cell"])],
+        ]
+        if ghs_sqm is not None:
+            snap_data.append([
+                Paragraph("GHS / sqm", styles["cell"]),
+                Paragraph(f"GHS {float(ghs_sqm):,.0f}", styles["cell"]),
+                Paragraph("", styles["cell"]),
+            ])
+        if usd_sqm is not None:
+            snap_data.append([
+                Paragraph("USD / sqm", styles["cell"]),
+                Paragraph(f"USD {float(usd_sqm):,.0f}", styles["cell"]),
+                Paragraph("At 2024 GHS/USD rate", styles["cell"]),
+            ])
+
+        col_w = [(W - 36*mm) * f for f in (0.45, 0.25, 0.30)]
+        snap_tbl = Table(snap_data, colWidths=col_w, repeatRows=1)
+        snap_tbl.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), _PDF_GOLD),
+            ("TEXTCOLOR",  (0, 0), (-1, 0), _PDF_BG),
+            ("BACKGROUND", (0, 1), (-1, -1), _PDF_CARD),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [_PDF_CARD, _PDF_BG]),
+            ("GRID",       (0, 0), (-1, -1), 0.3, _PDF_BORDER),
+            ("TOPPADDING",  (0, 0), (-1, -1), 4),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ("LEFTPADDING", (0, 0), (-1, -1), 6),
+        ]))
+        story.append(snap_tbl)
+        story.append(Spacer(1, 8))
+    else:
+        story.append(Paragraph("No historical data available for Dec 2024.", styles["body"]))
+
+    # ── Scenario Forecast Table ──────────────────────────────────────────────
+    _step(1)
+    story.append(Paragraph(f"Scenario Forecasts — Dec {report_year}", styles["section"]))
+    story.append(Paragraph(
+        "Three economic scenarios modelled with Facebook Prophet. "
+        "Bear assumes continued GHS/USD depreciation (→ 20). "
+        "Base assumes gradual stabilisation (→ 15). "
+        "Bull assumes cedi recovery (→ 12). 90% credible interval shown.",
+        styles["small"]))
+    story.append(Spacer(1, 4))
+
+    fc_rows = [
+        [Paragraph("Scenario", styles["cell_bold"]),
+         Paragraph(f"Dec {report_year} AHPI", styles["cell_bold"]),
+         Paragraph("Lower (90%)", styles["cell_bold"]),
+         Paragraph("Upper (90%)", styles["cell_bold"]),
+         Paragraph("GHS/USD Assumption", styles["cell_bold"])],
+    ]
+    sc_label_map = {"bear": "Bear", "base": "Base", "bull": "Bull"}
+    sc_color_map = {"bear": _PDF_RED, "base": _PDF_BLUE, "bull": _PDF_GREEN}
+    for sc in ("bear", "base", "bull"):
+        fc_row = report["forecasts"].get(sc)
+        if fc_row is not None:
+            fc_rows.append([
+                Paragraph(sc_label_map[sc], styles["cell"]),
+                Paragraph(f"{float(fc_row['yhat']):.1f}", styles["cell"]),
+                Paragraph(f"{float(fc_row['yhat_lower']):.1f}", styles["cell"]),
+                Paragraph(f"{float(fc_row['yhat_upper']):.1f}", styles["cell"]),
+                Paragraph(f"{report['scenario_fx'][sc]:.1f}", styles["cell"]),
+            ])
+        else:
+            fc_rows.append([Paragraph(sc_label_map[sc], styles["cell"])] + [Paragraph("—", styles["cell"])] * 4)
+
+    fc_col_w = [(W - 36*mm) * f for f in (0.18, 0.20, 0.20, 0.20, 0.22)]
+    fc_tbl = Table(fc_rows, colWidths=fc_col_w, repeatRows=1)
+    fc_style = [
+        ("BACKGROUND", (0, 0), (-1, 0), _PDF_GOLD),
+        ("TEXTCOLOR",  (0, 0), (-1, 0), _PDF_BG),
+        ("GRID",       (0, 0), (-1, -1), 0.3, _PDF_BORDER),
+        ("TOPPADDING",  (0, 0), (-1, -1), 4),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+        ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ]
+    for i, sc in enumerate(("bear", "base", "bull"), start=1):
+        fc_style.append(("BACKGROUND", (0, i), (0, i), sc_color_map[sc]))
+        fc_style.append(("TEXTCOLOR",  (0, i), (0, i), _PDF_BG))
+        row_bg = _PDF_CARD if i % 2 == 1 else _PDF_BG
+        fc_style.append(("BACKGROUND", (1, i), (-1, i), row_bg))
+    fc_tbl.setStyle(TableStyle(fc_style))
+    story.append(fc_tbl)
+    story.append(Spacer(1, 8))
+
+    # ── Model accuracy metrics ───────────────────────────────────────────────
+    _step(2)
+    story.append(Paragraph("Model Accuracy (2023–2024 Test Set)", styles["section"]))
+
+    accuracy = report["accuracy"]
+    if accuracy is not None:
+        mae, rmse, mape = accuracy
+        acc_data = [
+            [Paragraph("MAE", styles["cell_bold"]),
+             Paragraph("RMSE", styles["cell_bold"]),
+             Paragraph("MAPE", styles["cell_bold"])],
+            [Paragraph(f"{mae:.2f} pts", styles["cell"]),
+             Paragraph(f"{rmse:.2f} pts", styles["cell"]),
+             Paragraph(f"{mape:.1f}%", styles["cell"])],
+        ]
+        acc_col_w = [(W - 36*mm) / 3] * 3
+        acc_tbl = Table(acc_data, colWidths=acc_col_w, repeatRows=1)
+        acc_tbl.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), _PDF_GOLD),
+            ("TEXTCOLOR",  (0, 0), (-1, 0), _PDF_BG),
+            ("BACKGROUND", (0, 1), (-1, -1), _PDF_CARD),
+            ("GRID",       (0, 0), (-1, -1), 0.3, _PDF_BORDER),
+            ("TOPPADDING",  (0, 0), (-1, -1), 4),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+            ("LEFTPADDING", (0, 0), (-1, -1), 6),
+            ("ALIGN",      (0, 0), (-1, -1), "CENTER"),
+        ]))
+        story.append(acc_tbl)
+    else:
+        story.append(Paragraph("Accuracy metrics unavailable.", styles["body"]))
+
+    story.append(Spacer(1, 10))
+
+    # ── Forecast chart ───────────────────────────────────────────────────────
+    _step(3)
+    story.append(Paragraph("Historical AHPI & Scenario Forecasts", styles["section"]))
+
+    png_bytes = chart_png()
+    if png_bytes:
+        img_buf = io.BytesIO(png_bytes)
+        chart_w = W - 36*mm
+        chart_h = chart_w * report["chart_size"][1] / report["chart_size"][0]
+        story.append(RLImage(img_buf, width=chart_w, height=chart_h))
+    else:
+        story.append(Paragraph("Chart unavailable (kaleido not configured).", styles["small"]))
+
+    story.append(Spacer(1, 10))
+
+    # ── Disclaimer ───────────────────────────────────────────────────────────
+    story.append(HRFlowable(width="100%", thickness=0.4, color=_PDF_BORDER, spaceAfter=4))
+    story.append(Paragraph(
+        "This report is generated from the Accra Home Price Index (AHPI) model for informational purposes only. "
+        "Forecasts are probabilistic outputs of a Facebook Prophet model trained on historical data. "
+        "They do not constitute financial, investment, or legal advice. "
+        "Past performance does not guarantee future results. "
+        "Always conduct independent due diligence before making property investment decisions.",
+        styles["disclaimer"],
+    ))
+
+    _step(4)
+    doc.build(story)
+    return buf.getvalue()
@@ -20,6 +20,7 @@ Outputs (per district, slug = snake_case district name)
   forecasts/district_test_eval_{slug}.csv    — test-set yhat vs actuals
   forecasts/district_forecast_{scen}_{slug}.csv — Bear/Base/Bull forecasts
   forecasts/district_test_summary.csv        — cross-district accuracy table
+  forecasts/ahpi_forecasts.sqlite            — same rows in the consolidated store
 
 Usage
 -----
@@ -37,6 +38,10 @@ from prophet.serialize import model_to_json
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import StandardScaler
 
+from accra_chart_render import warm_after_training
+from ahpi_forecast_store import model_fingerprint, write_forecast, write_test_eval
+from ahpi_telemetry import stage, track_run
+
 warnings.filterwarnings("ignore")
 
 # ── paths ──────────────────────────────────────────────────────────────────────
@@ -192,6 +197,7 @@ def evaluate_district(model: Prophet, df_scaled: pd.DataFrame) -> tuple[dict, pd
 
 # ── main ──────────────────────────────────────────────────────────────────────
 
+@track_run("ahpi_district_prophet")
 def main() -> None:
     os.makedirs(MODELS_DIR,    exist_ok=True)
     os.makedirs(FORECASTS_DIR, exist_ok=True)
@@ -199,6 +205,7 @@ def main() -> None:
     sep = "─" * 55
     print(f"\n  AHPI Mid-Market Districts · Prophet Training (per-district)\n  {sep}")
 
+    stage("load")
     macro, dist_all = load_data()
     print(f"\n  Main dataset    : {len(macro)} rows  "
           f"({macro['ds'].min().strftime('%Y-%m')} → {macro['ds'].max().strftime('%Y-%m')})")
@@ -207,6 +214,7 @@ def main() -> None:
     print(f"  Regressors ({len(REGRESSORS)}): {', '.join(REGRESSORS)}")
 
     # Shared scalers (regressors are identical national macro data)
+    stage("scale")
     sample      = district_df(dist_all, DISTRICTS[0])
     scaler_eval = fit_scaler(sample[sample["ds"] <= TRAIN_END])
     scaler_full = fit_scaler(sample)
@@ -233,19 +241,23 @@ def main() -> None:
               f"mean={df_d['y'].mean():.1f}  max={df_d['y'].max():.1f}")
 
         # Evaluation model (2010-2022)
+        stage("scale", slug)
         df_sc_eval = apply_scaler(df_d, scaler_eval)
         df_train   = df_sc_eval[df_sc_eval["ds"] <= TRAIN_END]
         print(f"    [1/3] Training evaluation model  "
               f"(n_train={train_n}, n_test={test_n})")
+        stage("eval_fit", slug)
         m_eval = build_model()
         m_eval.fit(df_train[["ds", "y"] + REGRESSORS])
 
         # Test-set evaluation
+        stage("evaluate", slug)
         metrics, eval_df = evaluate_district(m_eval, df_sc_eval)
         print(f"          MAE={metrics['MAE']:.2f}  "
               f"RMSE={metrics['RMSE']:.2f}  MAPE={metrics['MAPE']:.1f}%")
         eval_df.to_csv(
             os.path.join(FORECASTS_DIR, f"district_test_eval_{slug}.csv"), index=False)
+        write_test_eval("district", slug, eval_df, district, metrics)
         summary_rows.append({
             "district": district, "slug": slug,
             "mae": round(metrics["MAE"], 2),
@@ -255,13 +267,16 @@ def main() -> None:
 
         # Production model (full 2010-2024)
         print(f"    [2/3] Fitting production model (n={len(df_d)})")
+        stage("prod_fit", slug)
         df_sc_full = apply_scaler(df_d, scaler_full)
         m_prod     = build_model()
         m_prod.fit(df_sc_full[["ds", "y"] + REGRESSORS])
+        model_json = model_to_json(m_prod)
 
         # Scenario forecasts
         print(f"    [3/3] Forecasting {FORECAST_MONTHS} months → 2026-12:")
         for sc_name, scenario in SCENARIOS.items():
+            stage("predict", slug, scenario=sc_name)
             future = make_future_df(df_d_infl, df_sc_full, scaler_full, scenario)
             fc     = m_prod.predict(future)
             fc_out = fc[fc["ds"] > df_d["ds"].max()][
@@ -273,15 +288,18 @@ def main() -> None:
                 os.path.join(FORECASTS_DIR, f"district_forecast_{sc_name}_{slug}.csv"),
                 index=False,
             )
+            write_forecast("district", slug, sc_name, fc_out, model=model_fingerprint(model_json))
             dec26 = fc_out.iloc[-1]
             print(f"          {sc_name.upper():5s}  Dec 2026: {dec26['yhat']:>7.1f}"
                   f"  [{dec26['yhat_lower']:.1f} – {dec26['yhat_upper']:.1f}]")
 
         # Persist production model
+        stage("persist", slug)
         with open(os.path.join(MODELS_DIR, f"district_prophet_{slug}.json"), "w") as fh:
-            fh.write(model_to_json(m_prod))
+            fh.write(model_json)
 
     # Summary
+    stage("persist")
     print(f"\n  {sep}")
     summary_df = pd.DataFrame(summary_rows)
     summary_df.to_csv(os.path.join(FORECASTS_DIR, "district_test_summary.csv"), index=False)
@@ -306,3 +324,4 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
+    warm_after_training()
@@ -1,32 +1,60 @@
 #!/usr/bin/env python3
 """
-AHPI – Extend Forecast Horizon to 60 Months (Jan 2025 → Dec 2029)
-==================================================================
+AHPI – Extend / Shorten Forecast Horizons (default 60 months, Jan 2025 → Dec 2029)
+==================================================================================
 Loads the already-trained Prophet models (no re-training needed) and
-generates 60-month scenario forecast CSVs for all 12 models:
-  - 1 composite mid-market
-  - 6 prime areas
-  - 5 mid-market districts
+rewrites scenario forecast CSVs for any subset of the 12 models:
+  - 1 composite mid-market      (segment "ahpi")
+  - 6 prime areas               (segment "prime"    or "prime:{slug}")
+  - 5 mid-market districts      (segment "district" or "district:{slug}")
+
+Months already present in a forecast CSV are kept as-is and only the
+missing months are added (shortening just truncates).  The model still
+predicts the whole horizon and the new months are taken from that, since
+Prophet's trend uncertainty grows from the first predicted month; a
+tail-only prediction would restart it and narrow the new months' bands.  The forecast store
+records a fingerprint of the model JSON behind each CSV; a CSV predicted by
+a different model is recomputed in full (one with no fingerprint recorded
+is kept and adopted).  Files whose content would not change are not
+rewritten, and the store is refreshed whenever its copy is missing or out
+of date.  Segments are processed in parallel worker processes.
+
+Segments of one family may end up on different horizons; the bundle's
+family aggregates average each month over the segments that have it.
 
 Outputs
 -------
-  forecasts/ahpi_forecast_{bear,base,bull}.csv          (60 rows)
-  forecasts/prime_forecast_{sc}_{slug}.csv              (60 rows × 18)
-  forecasts/district_forecast_{sc}_{slug}.csv           (60 rows × 15)
+  forecasts/ahpi_forecast_{bear,base,bull}.csv          (horizon rows)
+  forecasts/prime_forecast_{sc}_{slug}.csv              (horizon rows × 18)
+  forecasts/district_forecast_{sc}_{slug}.csv           (horizon rows × 15)
 
 Usage
 -----
-  python ahpi_extend_forecasts.py
+  python ahpi_extend_forecasts.py                                 # all, 60 months
+  python ahpi_extend_forecasts.py --horizon 84 --segment prime
+  python ahpi_extend_forecasts.py --segment district:tema --scenario base --horizon 36
+  python ahpi_extend_forecasts.py --recompute --workers 4
+
+Library
+-------
+  from ahpi_extend_forecasts import extend_forecasts
+  extend_forecasts(84, segments=["ahpi", "prime:east_legon"], scenarios=["base"])
 """
 
+import argparse
 import os
 import pickle
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
 from prophet.serialize import model_from_json
 
+import ahpi_telemetry
+from ahpi_forecast_store import COMPOSITE, model_fingerprint, read_forecast_state, write_forecast
+from ahpi_telemetry import end_stage, stage, track_run
+
 warnings.filterwarnings("ignore")
 
 BASE_DIR      = os.path.dirname(os.path.abspath(__file__))
@@ -46,6 +74,7 @@ REGRESSORS = [
 ]
 
 FORECAST_MONTHS = 60   # Jan 2025 → Dec 2029
+FC_COLS         = ["ds", "yhat", "yhat_lower", "yhat_upper", "trend"]
 
 SCENARIOS = {
     "bear": {"exchange_rate_ghs_usd": 20.0, "inflation_cpi_pct": 31.0,
@@ -69,6 +98,8 @@ DISTRICT_SLUGS = {
     "Tema": "tema", "Dome": "dome", "Kasoa": "kasoa",
 }
 
+FAMILY_SLUGS = {"prime": PRIME_SLUGS, "district": DISTRICT_SLUGS}
+
 
 def _linear_extrap(series: np.ndarray, n: int) -> np.ndarray:
     t = np.arange(len(series))
@@ -78,8 +109,11 @@ def _linear_extrap(series: np.ndarray, n: int) -> np.ndarray:
 
 def make_future_df(df_orig: pd.DataFrame, scaler, scenario: dict,
                    n_months: int = FORECAST_MONTHS) -> pd.DataFrame:
-    """Build full future DataFrame for model.predict()."""
-    from sklearn.preprocessing import StandardScaler  # noqa
+    """
+    Scaled regressors for the n_months after the last observed month.
+    Each row depends only on its position in the horizon, so any tail of
+    this frame equals the same rows of a longer one.
+    """
     last_date    = df_orig["ds"].max()
     future_dates = pd.date_range(
         start=last_date + pd.DateOffset(months=1),
@@ -101,30 +135,8 @@ def make_future_df(df_orig: pd.DataFrame, scaler, scenario: dict,
         else:
             raw_future[col] = _linear_extrap(recent[col].values, n_months)
 
-    # Scale future regressors
-    raw_future_scaled = raw_future.copy()
-    raw_future_scaled[REGRESSORS] = scaler.transform(raw_future[REGRESSORS])
-
-    # Historical period (already scaled at train time) — reconstruct
-    df_hist = df_orig.copy()
-    df_hist[REGRESSORS] = scaler.transform(df_orig[REGRESSORS])
-    hist = df_hist[["ds"] + REGRESSORS]
-
-    full = pd.concat([hist, raw_future_scaled[["ds"] + REGRESSORS]], ignore_index=True)
-    return full
-
-
-def predict_and_save(model, df_orig: pd.DataFrame, scaler,
-                     scenario: dict, out_path: str) -> pd.Series:
-    future  = make_future_df(df_orig, scaler, scenario)
-    fc      = model.predict(future)
-    fc_out  = fc[fc["ds"] > df_orig["ds"].max()][
-        ["ds", "yhat", "yhat_lower", "yhat_upper", "trend"]
-    ].copy().reset_index(drop=True)
-    for col in ["yhat", "yhat_lower", "yhat_upper", "trend"]:
-        fc_out[col] = fc_out[col].round(2)
-    fc_out.to_csv(out_path, index=False)
-    return fc_out.iloc[-1]
+    raw_future[REGRESSORS] = scaler.transform(raw_future[REGRESSORS])
+    return raw_future[["ds"] + REGRESSORS]
 
 
 def load_model(path: str):
@@ -137,63 +149,189 @@ def load_scaler(path: str):
         return pickle.load(f)
 
 
-def main() -> None:
-    sep = "─" * 54
-    print(f"\n  AHPI – Extending Forecasts to {FORECAST_MONTHS} months "
-          f"(Jan 2025 → Dec 2029)\n  {sep}")
+# ── segment resolution ────────────────────────────────────────────────────────
+
+def resolve_segments(segments: list[str] | None = None) -> list[tuple[str, str]]:
+    """
+    Expand segment specs into (family, slug) pairs.
+    "ahpi" → composite; "prime" / "district" → every area; "prime:{slug}" → one.
+    """
+    specs = segments or ["ahpi", "prime", "district"]
+    out: list[tuple[str, str]] = []
+    for spec in specs:
+        family, _, slug = spec.partition(":")
+        if family == "ahpi":
+            pairs = [("ahpi", "")]
+        elif family in FAMILY_SLUGS:
+            slugs = list(FAMILY_SLUGS[family].values())
+            if slug and slug not in slugs:
+                raise ValueError(f"Unknown {family} slug '{slug}' (expected one of {slugs})")
+            pairs = [(family, s) for s in ([slug] if slug else slugs)]
+        else:
+            raise ValueError(f"Unknown segment '{spec}' (expected ahpi, prime[:slug], district[:slug])")
+        out.extend(p for p in pairs if p not in out)
+    return out
 
-    df = pd.read_csv(DATA_PATH, parse_dates=["ds"])
 
-    # ── 1. Composite mid-market ───────────────────────────────────────────────
-    print(f"\n  Composite mid-market")
-    m_comp    = load_model(os.path.join(MODELS_DIR, "ahpi_prophet_model.json"))
-    sc_comp   = load_scaler(os.path.join(MODELS_DIR, "ahpi_scaler.pkl"))
-
-    for sc_name, scenario in SCENARIOS.items():
-        out = os.path.join(FORECASTS_DIR, f"ahpi_forecast_{sc_name}.csv")
-        last = predict_and_save(m_comp, df, sc_comp, scenario, out)
-        print(f"    {sc_name.upper():<5}  Dec 2029: {last['yhat']:>8.1f}"
-              f"  [{last['yhat_lower']:.1f} – {last['yhat_upper']:.1f}]")
-
-    # ── 2. Prime areas ────────────────────────────────────────────────────────
-    print(f"\n  Prime areas  (shared scaler)")
-    sc_prime  = load_scaler(os.path.join(MODELS_DIR, "prime_scaler.pkl"))
-    df_prime  = pd.read_csv(PRIME_PATH, parse_dates=["ds"])
-    # Join macro columns so make_future_df can use them for OLS extrapolation
-    df_macro  = df[["ds", "inflation_cpi_pct"] + REGRESSORS]
-
-    for area, slug in PRIME_SLUGS.items():
-        m_area = load_model(os.path.join(MODELS_DIR, f"prime_prophet_{slug}.json"))
-        # Use macro data from composite df for regressor extrapolation
-        df_area = (
-            df_prime[df_prime["district"] == area][["ds", "y"]]
-            .merge(df_macro, on="ds", how="left")
-        )
-        print(f"    {area}")
-        for sc_name, scenario in SCENARIOS.items():
-            out  = os.path.join(FORECASTS_DIR, f"prime_forecast_{sc_name}_{slug}.csv")
-            last = predict_and_save(m_area, df_area, sc_prime, scenario, out)
-            print(f"      {sc_name.upper():<5}  Dec 2029: {last['yhat']:.1f}")
-
-    # ── 3. Mid-market districts ───────────────────────────────────────────────
-    print(f"\n  Mid-market districts  (shared scaler)")
-    sc_dist   = load_scaler(os.path.join(MODELS_DIR, "district_scaler.pkl"))
-    df_dist   = pd.read_csv(DISTRICT_PATH, parse_dates=["ds"])
-
-    for district, slug in DISTRICT_SLUGS.items():
-        m_dist = load_model(os.path.join(MODELS_DIR, f"district_prophet_{slug}.json"))
-        df_d = (
-            df_dist[df_dist["district"] == district][["ds", "y"]]
-            .merge(df_macro, on="ds", how="left")
-        )
-        print(f"    {district}")
-        for sc_name, scenario in SCENARIOS.items():
-            out  = os.path.join(FORECASTS_DIR, f"district_forecast_{sc_name}_{slug}.csv")
-            last = predict_and_save(m_dist, df_d, sc_dist, scenario, out)
-            print(f"      {sc_name.upper():<5}  Dec 2029: {last['yhat']:.1f}")
+def _paths(family: str, slug: str) -> tuple[str, str]:
+    """Return (model path, scaler path) for a segment."""
+    if family == "ahpi":
+        return (os.path.join(MODELS_DIR, "ahpi_prophet_model.json"),
+                os.path.join(MODELS_DIR, "ahpi_scaler.pkl"))
+    return (os.path.join(MODELS_DIR, f"{family}_prophet_{slug}.json"),
+            os.path.join(MODELS_DIR, f"{family}_scaler.pkl"))
+
+
+def forecast_path(family: str, slug: str, scenario: str) -> str:
+    if family == "ahpi":
+        return os.path.join(FORECASTS_DIR, f"ahpi_forecast_{scenario}.csv")
+    return os.path.join(FORECASTS_DIR, f"{family}_forecast_{scenario}_{slug}.csv")
+
 
+def _segment_history(family: str, slug: str) -> pd.DataFrame:
+    """Observed history with the macro columns make_future_df needs."""
+    df = pd.read_csv(DATA_PATH, parse_dates=["ds"])
+    if family == "ahpi":
+        return df
+    df_macro = df[["ds", "inflation_cpi_pct"] + REGRESSORS]
+    panel    = pd.read_csv(PRIME_PATH if family == "prime" else DISTRICT_PATH,
+                           parse_dates=["ds"])
+    name     = {v: k for k, v in FAMILY_SLUGS[family].items()}[slug]
+    return (panel[panel["district"] == name][["ds", "y"]]
+            .merge(df_macro, on="ds", how="left"))
+
+
+# ── per-segment worker ────────────────────────────────────────────────────────
+
+def _extend_segment(family: str, slug: str, scenarios: list[str],
+                    horizon: int, recompute: bool,
+                    run_id: str | None = None) -> list[dict]:
+    """Bring every requested scenario CSV of one segment to `horizon` rows."""
+    if run_id is not None:                 # worker process: join the parent run
+        ahpi_telemetry.attach("ahpi_extend_forecasts", run_id)
+    segment = slug or "composite"
+    stage("load", segment)
+    model_path, scaler_path = _paths(family, slug)
+    with open(model_path) as fh:
+        model_json = fh.read()
+    fingerprint = model_fingerprint(model_json)
+    df_orig     = _segment_history(family, slug)
+    model = scaler = None
+    results: list[dict] = []
+
+    for sc_name in scenarios:
+        out_path = forecast_path(family, slug, sc_name)
+        existing = pd.DataFrame(columns=FC_COLS)
+        old_text = None
+        stored_model, stored_rows = read_forecast_state(family, slug or COMPOSITE, sc_name)
+        if os.path.exists(out_path):
+            with open(out_path) as fh:
+                old_text = fh.read()
+            # Months predicted by a different model are stale
+            if not recompute and stored_model in (None, fingerprint):
+                existing = pd.read_csv(out_path, parse_dates=["ds"])[FC_COLS]
+
+        kept   = existing.head(horizon)
+        n_new  = horizon - len(kept)
+        if n_new > 0:
+            stage("predict", segment, scenario=sc_name, months=n_new)
+            if model is None:
+                model, scaler = model_from_json(model_json), load_scaler(scaler_path)
+            future = make_future_df(df_orig, scaler, SCENARIOS[sc_name], horizon)
+            fc     = model.predict(future)
+            fc_new = fc[FC_COLS].iloc[len(kept):].reset_index(drop=True)
+            for col in FC_COLS[1:]:
+                fc_new[col] = fc_new[col].round(2)
+            kept = pd.concat([kept, fc_new], ignore_index=True) if len(kept) else fc_new
+
+        stage("persist", segment, scenario=sc_name)
+        new_text = kept.to_csv(index=False)
+        changed  = new_text != old_text
+        if changed:
+            with open(out_path, "w") as fh:
+                fh.write(new_text)
+        if changed or stored_model != fingerprint or stored_rows != len(kept):
+            write_forecast(family, slug or COMPOSITE, sc_name, kept, model=fingerprint)
+        last = kept.iloc[-1]
+        results.append({
+            "family": family, "slug": slug, "scenario": sc_name,
+            "path": out_path, "rows": len(kept),
+            "kept": len(kept) - max(n_new, 0), "predicted": max(n_new, 0),
+            "written": changed,
+            "last_ds": last["ds"], "yhat": float(last["yhat"]),
+            "yhat_lower": float(last["yhat_lower"]), "yhat_upper": float(last["yhat_upper"]),
+        })
+    end_stage()
+    return results
+
+
+def extend_forecasts(horizon: int = FORECAST_MONTHS,
+                     segments: list[str] | None = None,
+                     scenarios: list[str] | None = None,
+                     workers: int | None = None,
+                     recompute: bool = False) -> list[dict]:
+    """
+    Set the forecast horizon of the selected (segment, scenario) CSVs.
+
+    segments  : specs accepted by resolve_segments (default: all 12 models)
+    scenarios : subset of SCENARIOS (default: all three)
+    workers   : worker processes (default: one per segment up to CPU count;
+                1 runs in-process)
+    recompute : ignore existing months and predict the whole horizon
+
+    Returns one result dict per CSV (rows kept / predicted, written or not).
+    """
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1 month")
+    pairs     = resolve_segments(segments)
+    scenarios = scenarios or list(SCENARIOS)
+    unknown   = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {unknown}")
+    workers = workers or min(len(pairs), os.cpu_count() or 1)
+
+    if workers <= 1:
+        batches = [_extend_segment(f, s, scenarios, horizon, recompute) for f, s in pairs]
+    else:
+        run    = ahpi_telemetry.current()
+        run_id = run.run_id if run else None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extend_segment, f, s, scenarios, horizon, recompute, run_id)
+                       for f, s in pairs]
+            batches = [fut.result() for fut in futures]
+    return [r for batch in batches for r in batch]
+
+
+@track_run("ahpi_extend_forecasts")
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Extend or shorten forecast horizons")
+    ap.add_argument("--horizon", type=int, default=FORECAST_MONTHS,
+                    help=f"months after the last observation (default {FORECAST_MONTHS})")
+    ap.add_argument("--segment", action="append",
+                    help="ahpi | prime[:slug] | district[:slug]  (repeatable; default all)")
+    ap.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                    help="scenario(s) to update (default all)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--recompute", action="store_true",
+                    help="re-predict existing months instead of keeping them")
+    args = ap.parse_args()
+
+    sep = "─" * 54
+    print(f"\n  AHPI – Setting forecast horizon to {args.horizon} months\n  {sep}\n")
+
+    results = extend_forecasts(args.horizon, args.segment, args.scenario,
+                               args.workers, args.recompute)
+    for r in results:
+        label = "composite" if r["family"] == "ahpi" else f"{r['family']}:{r['slug']}"
+        state = "written  " if r["written"] else "unchanged"
+        print(f"    {label:<30} {r['scenario'].upper():<5} {state}"
+              f"  kept={r['kept']:>3}  new={r['predicted']:>3}"
+              f"  {pd.Timestamp(r['last_ds']):%b %Y}: {r['yhat']:>8.1f}"
+              f"  [{r['yhat_lower']:.1f} – {r['yhat_upper']:.1f}]")
+
+    n_written = sum(r["written"] for r in results)
     print(f"\n  {sep}")
-    print(f"  Done. All forecasts extended to Dec 2029.\n")
+    print(f"  Done. {n_written} of {len(results)} forecast files rewritten.\n")
 
 
 if __name__ == "__main__":
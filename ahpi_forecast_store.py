@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+AHPI Forecast Store · one indexed SQLite file for every forecast output
+=======================================================================
+Consolidates the ~50 per-model CSVs in forecasts/ into a single SQLite
+database.  The training scripts and the extension step write to it next to
+their CSVs; consumers read any slice with one primary-key lookup instead of
+opening files one by one.
+
+Tables (all WITHOUT ROWID, clustered on the primary key)
+--------------------------------------------------------
+  forecast   (family, area, scenario, ds) → yhat, yhat_lower, yhat_upper, trend
+  test_eval  (family, area, ds)           → y, yhat, yhat_lower, yhat_upper, residual
+  metrics    (family, area)               → name, mae, rmse, mape_pct
+  forecast_model (family, area, scenario) → model (fingerprint of the model
+                                            JSON that produced the forecast)
+  meta       key → value                  (version: bumped on every write)
+
+  family ∈ {"ahpi", "district", "prime"}; area is the model slug
+  ("composite" for the ahpi family); ds is an ISO date string.
+
+Outputs
+-------
+  forecasts/ahpi_forecasts.sqlite
+
+Usage
+-----
+  python ahpi_forecast_store.py rebuild     # (re)load every CSV in forecasts/
+  python ahpi_forecast_store.py info        # row counts and version
+
+  from ahpi_forecast_store import read_forecast
+  read_forecast("prime", area="east_legon", scenario="base", start="2027-01-01")
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+BASE_DIR      = os.path.dirname(os.path.abspath(__file__))
+FORECASTS_DIR = os.path.join(BASE_DIR, "forecasts")
+STORE_PATH    = os.path.join(FORECASTS_DIR, "ahpi_forecasts.sqlite")
+
+FAMILIES      = ("ahpi", "district", "prime")
+COMPOSITE     = "composite"
+FC_FIELDS     = ["yhat", "yhat_lower", "yhat_upper", "trend"]
+EVAL_FIELDS   = ["y", "yhat", "yhat_lower", "yhat_upper", "residual"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecast (
+    family TEXT NOT NULL, area TEXT NOT NULL, scenario TEXT NOT NULL, ds TEXT NOT NULL,
+    yhat REAL, yhat_lower REAL, yhat_upper REAL, trend REAL,
+    PRIMARY KEY (family, area, scenario, ds)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS test_eval (
+    family TEXT NOT NULL, area TEXT NOT NULL, ds TEXT NOT NULL,
+    y REAL, yhat REAL, yhat_lower REAL, yhat_upper REAL, residual REAL,
+    PRIMARY KEY (family, area, ds)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS metrics (
+    family TEXT NOT NULL, area TEXT NOT NULL, name TEXT,
+    mae REAL, rmse REAL, mape_pct REAL,
+    PRIMARY KEY (family, area)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS forecast_model (
+    family TEXT NOT NULL, area TEXT NOT NULL, scenario TEXT NOT NULL, model TEXT NOT NULL,
+    PRIMARY KEY (family, area, scenario)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+
+
+# ── connection ────────────────────────────────────────────────────────────────
+
+def _connect(path: str | None = None) -> sqlite3.Connection:
+    path = path or STORE_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    con = sqlite3.connect(path, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")     # readers never block the writer
+    con.executescript(_SCHEMA)
+    return con
+
+
+@contextmanager
+def _writer(path: str | None = None):
+    """One transaction per write call; bumps the store version on commit."""
+    with closing(_connect(path)) as con:
+        with con:
+            yield con
+            con.execute(
+                "INSERT INTO meta VALUES ('version', '1') ON CONFLICT(key) "
+                "DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+            con.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('updated', ?)",
+                (datetime.now(timezone.utc).isoformat(timespec="seconds"),))
+
+
+def _iso(ds: pd.Series) -> list[str]:
+    return pd.to_datetime(ds).dt.strftime("%Y-%m-%d").tolist()
+
+
+def _check_family(family: str) -> None:
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown family '{family}' (expected one of {FAMILIES})")
+
+
+def model_fingerprint(model_json: str) -> str:
+    """Short content hash of a serialised Prophet model."""
+    return hashlib.blake2b(model_json.encode(), digest_size=8).hexdigest()
+
+
+# ── writers ───────────────────────────────────────────────────────────────────
+
+def write_forecast(family: str, area: str, scenario: str, df: pd.DataFrame,
+                   path: str | None = None, model: str | None = None) -> None:
+    """
+    Replace the stored forecast for (family, area, scenario) with df.
+    model is the fingerprint of the model that predicted it; without one
+    the recorded fingerprint is left as it is.
+    """
+    _check_family(family)
+    rows = zip([family] * len(df), [area] * len(df), [scenario] * len(df), _iso(df["ds"]),
+               *(df[c].astype(float).tolist() for c in FC_FIELDS))
+    with _writer(path) as con:
+        con.execute("DELETE FROM forecast WHERE family=? AND area=? AND scenario=?",
+                    (family, area, scenario))
+        con.executemany("INSERT INTO forecast VALUES (?,?,?,?,?,?,?,?)", rows)
+        if model is not None:
+            con.execute("INSERT OR REPLACE INTO forecast_model VALUES (?,?,?,?)",
+                        (family, area, scenario, model))
+
+
+def write_test_eval(family: str, area: str, df: pd.DataFrame,
+                    name: str | None = None, metrics: dict | None = None,
+                    path: str | None = None) -> None:
+    """
+    Replace the test-set evaluation for (family, area).  metrics uses the
+    training scripts' keys (MAE, RMSE, MAPE); omitted metrics are derived
+    from the evaluation rows.
+    """
+    _check_family(family)
+    if metrics is None:
+        err     = df["y"] - df["yhat"]
+        metrics = {"MAE":  float(err.abs().mean()),
+                   "RMSE": float((err ** 2).mean() ** 0.5),
+                   "MAPE": float((err / df["y"]).abs().mean() * 100)}
+    rows = zip([family] * len(df), [area] * len(df), _iso(df["ds"]),
+               *(df[c].astype(float).tolist() for c in EVAL_FIELDS))
+    with _writer(path) as con:
+        con.execute("DELETE FROM test_eval WHERE family=? AND area=?", (family, area))
+        con.executemany("INSERT INTO test_eval VALUES (?,?,?,?,?,?,?,?)", rows)
+        con.execute("INSERT OR REPLACE INTO metrics VALUES (?,?,?,?,?,?)",
+                    (family, area, name or area,
+                     round(metrics["MAE"], 2), round(metrics["RMSE"], 2),
+                     round(metrics["MAPE"], 1)))
+
+
+# ── readers ───────────────────────────────────────────────────────────────────
+
+def _query(sql: str, params: list, path: str | None, parse_ds: bool = True) -> pd.DataFrame:
+    with closing(_connect(path)) as con:
+        df = pd.read_sql_query(sql, con, params=params)
+    if parse_ds and "ds" in df.columns:
+        df["ds"] = pd.to_datetime(df["ds"])
+    return df
+
+
+def _where(family: str, **keys) -> tuple[str, list]:
+    """Equality on leading key columns, range on ds — a single index seek."""
+    clauses, params = ["family = ?"], [family]
+    for col, val in keys.items():
+        if col in ("start", "end") or val is None:
+            continue
+        if isinstance(val, (list, tuple, set)):
+            clauses.append(f"{col} IN ({','.join('?' * len(val))})")
+            params.extend(val)
+        else:
+            clauses.append(f"{col} = ?")
+            params.append(val)
+    if keys.get("start") is not None:
+        clauses.append("ds >= ?")
+        params.append(pd.Timestamp(keys["start"]).strftime("%Y-%m-%d"))
+    if keys.get("end") is not None:
+        clauses.append("ds <= ?")
+        params.append(pd.Timestamp(keys["end"]).strftime("%Y-%m-%d"))
+    return " AND ".join(clauses), params
+
+
+def read_forecast(family: str, area: str | list[str] | None = None,
+                  scenario: str | list[str] | None = None,
+                  start=None, end=None, path: str | None = None) -> pd.DataFrame:
+    """Forecast rows for any slice; area / scenario accept a value or a list."""
+    _check_family(family)
+    where, params = _where(family, area=area, scenario=scenario, start=start, end=end)
+    return _query(f"SELECT * FROM forecast WHERE {where} ORDER BY area, scenario, ds",
+                  params, path)
+
+
+def read_test_eval(family: str, area: str | list[str] | None = None,
+                   path: str | None = None) -> pd.DataFrame:
+    _check_family(family)
+    where, params = _where(family, area=area)
+    return _query(f"SELECT * FROM test_eval WHERE {where} ORDER BY area, ds", params, path)
+
+
+def read_metrics(family: str | None = None, path: str | None = None) -> pd.DataFrame:
+    if family is None:
+        return _query("SELECT * FROM metrics ORDER BY family, area", [], path, parse_ds=False)
+    _check_family(family)
+    return _query("SELECT * FROM metrics WHERE family = ? ORDER BY area", [family],
+                  path, parse_ds=False)
+
+
+def read_forecast_state(family: str, area: str, scenario: str,
+                        path: str | None = None) -> tuple[str | None, int]:
+    """
+    (fingerprint of the model recorded for the stored forecast or None,
+    number of stored rows) for one (family, area, scenario).
+    """
+    _check_family(family)
+    key = (family, area, scenario)
+    with closing(_connect(path)) as con:
+        row = con.execute("SELECT model FROM forecast_model WHERE family=? AND area=? "
+                          "AND scenario=?", key).fetchone()
+        n   = con.execute("SELECT COUNT(*) FROM forecast WHERE family=? AND area=? "
+                          "AND scenario=?", key).fetchone()[0]
+    return (row[0] if row else None), n
+
+
+def store_version(path: str | None = None) -> int:
+    """Monotonic write counter (0 for an empty store)."""
+    if not os.path.exists(path or STORE_PATH):
+        return 0
+    with closing(_connect(path)) as con:
+        row = con.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+# ── rebuild from CSVs ─────────────────────────────────────────────────────────
+
+_FC_RE   = re.compile(r"^(district|prime)_forecast_(bear|base|bull)_(.+)\.csv$")
+_EVAL_RE = re.compile(r"^(district|prime)_test_eval_(.+)\.csv$")
+
+
+def rebuild(forecasts_dir: str = FORECASTS_DIR, path: str | None = None) -> dict:
+    """Load every forecast / test-eval CSV in forecasts_dir into the store."""
+    counts = {"forecast": 0, "test_eval": 0}
+    names: dict[tuple[str, str], str] = {}
+    for family, col in (("district", "district"), ("prime", "area")):
+        summary = os.path.join(forecasts_dir, f"{family}_test_summary.csv")
+        if os.path.exists(summary):
+            for _, r in pd.read_csv(summary).iterrows():
+                names[(family, r["slug"])] = r[col]
+
+    for f in sorted(glob.glob(os.path.join(forecasts_dir, "*.csv"))):
+        base = os.path.basename(f)
+        if m := re.match(r"^ahpi_forecast_(bear|base|bull)\.csv$", base):
+            write_forecast("ahpi", COMPOSITE, m.group(1), pd.read_csv(f), path)
+            counts["forecast"] += 1
+        elif m := _FC_RE.match(base):
+            write_forecast(m.group(1), m.group(3), m.group(2), pd.read_csv(f), path)
+            counts["forecast"] += 1
+        elif base == "ahpi_test_eval.csv":
+            write_test_eval("ahpi", COMPOSITE, pd.read_csv(f), "Mid-Market Composite",
+                            path=path)
+            counts["test_eval"] += 1
+        elif m := _EVAL_RE.match(base):
+            fam, slug = m.group(1), m.group(2)
+            write_test_eval(fam, slug, pd.read_csv(f), names.get((fam, slug)), path=path)
+            counts["test_eval"] += 1
+    return counts
+
+
+def main() -> None:
+    ap  = argparse.ArgumentParser(description="AHPI forecast store")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("rebuild", help="load every CSV in forecasts/ into the store")
+    sub.add_parser("info", help="row counts and version")
+    args = ap.parse_args()
+
+    sep = "─" * 50
+    print(f"\n  AHPI · Forecast Store\n  {sep}")
+    if args.cmd == "rebuild":
+        counts = rebuild()
+        print(f"  Loaded {counts['forecast']} forecast and {counts['test_eval']} "
+              f"test-eval files")
+        print(f"  Saved → forecasts/{os.path.basename(STORE_PATH)}")
+    with closing(_connect()) as con:
+        for table in ("forecast", "test_eval", "metrics"):
+            n = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"  {table:<10} {n:>6} rows")
+    print(f"  version    {store_version():>6}\n")
+
+
+if __name__ == "__main__":
+    main()
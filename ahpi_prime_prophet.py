@@ -23,6 +23,7 @@ Outputs (per area, slug = snake_case area name)
   forecasts/prime_test_eval_{slug}.csv     — test-set yhat vs actuals
   forecasts/prime_forecast_{scen}_{slug}.csv — Bear/Base/Bull forecasts
   forecasts/prime_test_summary.csv         — cross-area accuracy comparison
+  forecasts/ahpi_forecasts.sqlite          — same rows in the consolidated store
 
 Usage
 -----
@@ -41,6 +42,10 @@ from prophet.serialize import model_to_json
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import StandardScaler
 
+from accra_chart_render import warm_after_training
+from ahpi_forecast_store import model_fingerprint, write_forecast, write_test_eval
+from ahpi_telemetry import stage, track_run
+
 warnings.filterwarnings("ignore")
 
 # ── paths ──────────────────────────────────────────────────────────────────────
@@ -222,6 +227,7 @@ def evaluate_area(model: Prophet, df_scaled: pd.DataFrame) -> tuple[dict, pd.Dat
 
 # ── main ──────────────────────────────────────────────────────────────────────
 
+@track_run("ahpi_prime_prophet")
 def main() -> None:
     os.makedirs(MODELS_DIR,    exist_ok=True)
     os.makedirs(FORECASTS_DIR, exist_ok=True)
@@ -230,6 +236,7 @@ def main() -> None:
     print(f"\n  AHPI Prime Areas · Prophet Training (per-area)\n  {sep}")
 
     # ── 1. Load ───────────────────────────────────────────────────────────────
+    stage("load")
     macro, prime = load_data()
     print(f"\n  Main dataset : {len(macro)} rows  "
           f"({macro['ds'].min().strftime('%Y-%m')} → {macro['ds'].max().strftime('%Y-%m')})")
@@ -239,6 +246,7 @@ def main() -> None:
 
     # ── 2. Shared scaler (regressors are national macro — same across all areas)
     # Fit evaluation scaler on training rows (from any area, macro is identical)
+    stage("scale")
     sample_area   = area_df(prime, AREAS[0])
     train_raw     = sample_area[sample_area["ds"] <= TRAIN_END]
     scaler_eval   = fit_scaler(train_raw)
@@ -271,21 +279,25 @@ def main() -> None:
               f"mean={df_area['y'].mean():.1f}  max={df_area['y'].max():.1f}")
 
         # ── 3a. Evaluation model (2010-2022) ──────────────────────────────────
+        stage("scale", slug)
         df_scaled_eval = apply_scaler(df_area, scaler_eval)
         df_train_sc    = df_scaled_eval[df_scaled_eval["ds"] <= TRAIN_END]
 
         print(f"    [1/3] Training evaluation model  "
               f"(n_train={train_n}, n_test={test_n})")
+        stage("eval_fit", slug)
         m_eval = build_model()
         m_eval.fit(df_train_sc[["ds", "y"] + REGRESSORS])
 
         # ── 3b. Test-set evaluation ────────────────────────────────────────────
+        stage("evaluate", slug)
         metrics, eval_df = evaluate_area(m_eval, df_scaled_eval)
         print(f"          MAE={metrics['MAE']:.2f}  "
               f"RMSE={metrics['RMSE']:.2f}  MAPE={metrics['MAPE']:.1f}%")
 
         eval_path = os.path.join(FORECASTS_DIR, f"prime_test_eval_{slug}.csv")
         eval_df.to_csv(eval_path, index=False)
+        write_test_eval("prime", slug, eval_df, area, metrics)
 
         summary_rows.append({
             "area": area, "slug": slug,
@@ -296,13 +308,16 @@ def main() -> None:
 
         # ── 3c. Production model (full 2010-2024) ─────────────────────────────
         print(f"    [2/3] Fitting production model (n={len(df_area)})")
+        stage("prod_fit", slug)
         df_scaled_full = apply_scaler(df_area, scaler_full)
         m_prod = build_model()
         m_prod.fit(df_scaled_full[["ds", "y"] + REGRESSORS])
+        model_json = model_to_json(m_prod)
 
         # ── 3d. Scenario forecasts ─────────────────────────────────────────────
         print(f"    [3/3] Forecasting {FORECAST_MONTHS} months → 2026-12:")
         for sc_name, scenario in SCENARIOS.items():
+            stage("predict", slug, scenario=sc_name)
             future = make_future_df(df_area_with_infl, df_scaled_full,
                                     scaler_full, scenario)
             fc = m_prod.predict(future)
@@ -316,17 +331,20 @@ def main() -> None:
             out_path = os.path.join(FORECASTS_DIR,
                                     f"prime_forecast_{sc_name}_{slug}.csv")
             fc_out.to_csv(out_path, index=False)
+            write_forecast("prime", slug, sc_name, fc_out, model=model_fingerprint(model_json))
 
             dec26 = fc_out.iloc[-1]
             print(f"          {sc_name.upper():5s}  Dec 2026: {dec26['yhat']:>7.1f}"
                   f"  [{dec26['yhat_lower']:.1f} – {dec26['yhat_upper']:.1f}]")
 
         # ── 3e. Persist production model ──────────────────────────────────────
+        stage("persist", slug)
         model_path = os.path.join(MODELS_DIR, f"prime_prophet_{slug}.json")
         with open(model_path, "w") as fh:
-            fh.write(model_to_json(m_prod))
+            fh.write(model_json)
 
     # ── 4. Cross-area summary ─────────────────────────────────────────────────
+    stage("persist")
     print(f"\n  {sep}")
     summary_df = pd.DataFrame(summary_rows)
     summary_path = os.path.join(FORECASTS_DIR, "prime_test_summary.csv")
@@ -353,3 +371,4 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
+    warm_after_training()
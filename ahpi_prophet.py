@@ -15,6 +15,7 @@ Outputs
   forecasts/ahpi_forecast_bear.csv  — Bear scenario (continued depreciation)
   forecasts/ahpi_forecast_base.csv  — Base scenario (gradual stabilisation)
   forecasts/ahpi_forecast_bull.csv  — Bull scenario (cedi recovery)
+  forecasts/ahpi_forecasts.sqlite   — same rows in the consolidated forecast store
 
 Usage
 -----
@@ -34,6 +35,10 @@ from prophet.serialize import model_to_json
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import StandardScaler
 
+from accra_chart_render import warm_after_training
+from ahpi_forecast_store import model_fingerprint, write_forecast, write_test_eval
+from ahpi_telemetry import stage, track_run
+
 warnings.filterwarnings("ignore")
 
 # ── paths ──────────────────────────────────────────────────────────────────────
@@ -205,6 +210,7 @@ def evaluate(model: Prophet, df_scaled: pd.DataFrame) -> tuple[dict, pd.DataFram
 
 # ── main ──────────────────────────────────────────────────────────────────────
 
+@track_run("ahpi_prophet")
 def main() -> None:
     os.makedirs(MODELS_DIR,    exist_ok=True)
     os.makedirs(FORECASTS_DIR, exist_ok=True)
@@ -213,6 +219,7 @@ def main() -> None:
     print(f"\n  AHPI Mid-Market · Prophet Training\n  {sep}")
 
     # ── 1. Load ───────────────────────────────────────────────────────────────
+    stage("load", "composite")
     df = load_data()
     print(f"\n  Data  : {len(df)} rows  "
           f"({df['ds'].min().strftime('%Y-%m')} → {df['ds'].max().strftime('%Y-%m')})")
@@ -221,6 +228,7 @@ def main() -> None:
     print(f"  Regressors ({len(REGRESSORS)}): {', '.join(REGRESSORS)}")
 
     # ── 2. Scaler — fit on TRAINING rows only to prevent leakage ─────────────
+    stage("scale", "composite")
     df_train_raw = df[df["ds"] <= TRAIN_END]
     scaler       = fit_scaler(df_train_raw)
 
@@ -233,11 +241,13 @@ def main() -> None:
     print(f"  [1/4] Training evaluation model  "
           f"(2010-01 → {TRAIN_END[:7]}, n={len(df_train_sc)})")
 
+    stage("eval_fit", "composite")
     m_eval = build_model()
     m_eval.fit(df_train_sc[["ds", "y"] + REGRESSORS])
 
     # ── 4. Test-set evaluation (2023-2024) ────────────────────────────────────
     print(f"  [2/4] Evaluating on test set  ({TEST_START[:7]} → 2024-12, n={len(df) - len(df_train_sc)})")
+    stage("evaluate", "composite")
     metrics, eval_df = evaluate(m_eval, df_scaled)
 
     print(f"\n        MAE  = {metrics['MAE']:.2f}  index points")
@@ -246,11 +256,13 @@ def main() -> None:
 
     eval_path = os.path.join(FORECASTS_DIR, "ahpi_test_eval.csv")
     eval_df.to_csv(eval_path, index=False)
+    write_test_eval("ahpi", "composite", eval_df, "Mid-Market Composite", metrics)
     print(f"\n        Saved → forecasts/ahpi_test_eval.csv")
 
     # ── 5. Cross-validation (optional — uses ~2-3 min) ────────────────────────
     print(f"\n  {sep}")
     print(f"  [3/4] Prophet cross-validation  (initial=3y, period=6m, horizon=12m)")
+    stage("cv", "composite")
     try:
         df_cv = cross_validation(
             m_eval,
@@ -275,15 +287,19 @@ def main() -> None:
     print(f"  [4/4] Fitting production model on full dataset (n={len(df)})")
 
     # Re-fit scaler on full data for maximum representativeness in forecasting
+    stage("prod_fit", "composite")
     scaler_full = fit_scaler(df)
     df_scaled_full = apply_scaler(df, scaler_full)
 
     m_prod = build_model()
     m_prod.fit(df_scaled_full[["ds", "y"] + REGRESSORS])
+    # Serialised now so the forecasts record the fingerprint of the saved model
+    model_json = model_to_json(m_prod)
 
     # ── 7. Scenario forecasts ─────────────────────────────────────────────────
     print(f"\n        Forecasting {FORECAST_MONTHS} months (2025-01 → 2026-12):\n")
     for name, scenario in SCENARIOS.items():
+        stage("predict", "composite", scenario=name)
         future = make_future_df(df, df_scaled_full, scaler_full, scenario)
         fc     = m_prod.predict(future)
 
@@ -298,6 +314,7 @@ def main() -> None:
 
         out_path = os.path.join(FORECASTS_DIR, f"ahpi_forecast_{name}.csv")
         fc_out.to_csv(out_path, index=False)
+        write_forecast("ahpi", "composite", name, fc_out, model=model_fingerprint(model_json))
 
         dec26 = fc_out.iloc[-1]
         print(f"        {name.upper():5s}  Dec 2026 AHPI: {dec26['yhat']:>7.1f}"
@@ -305,11 +322,12 @@ def main() -> None:
               f"  → forecasts/ahpi_forecast_{name}.csv")
 
     # ── 8. Persist model + scaler ─────────────────────────────────────────────
+    stage("persist", "composite")
     model_path  = os.path.join(MODELS_DIR, "ahpi_prophet_model.json")
     scaler_path = os.path.join(MODELS_DIR, "ahpi_scaler.pkl")
 
     with open(model_path, "w") as fh:
-        fh.write(model_to_json(m_prod))
+        fh.write(model_json)
 
     with open(scaler_path, "wb") as fh:
         pickle.dump(scaler_full, fh)
@@ -322,3 +340,4 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
+    warm_after_training()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+AHPI Regressor Selection · forward selection on cached CV folds
+===============================================================
+Replaces hand-picking of the Prophet regressor set with an automated,
+reproducible search over every macro / commodity column produced by the
+collector.
+
+  1. Rank   — vectorised Pearson ρ of every candidate with the target, then
+              partial ρ conditioned on the regressors already selected
+              (one least-squares solve residualises all candidates at once).
+  2. Screen — at each step only the SCREEN_K candidates with the highest
+              |partial ρ| are refitted.
+  3. Refit  — candidate models are fitted in parallel worker processes and
+              scored by mean MAPE over expanding-window CV folds.  The folds
+              (train / test splits with every candidate pre-scaled on its own
+              training rows) are built once and shipped to each worker once.
+  4. Stop   — forward selection ends when the best relative MAPE gain drops
+              below MIN_GAIN, or MAX_REGRESSORS is reached.
+
+Segments
+--------
+  composite — mid-market composite AHPI (accra_home_price_index.csv)
+  district  — mean of the 5 mid-market districts (shared regressor set)
+  prime     — mean of the 6 prime areas          (shared regressor set)
+
+The derived price_ghs_per_sqm / price_usd_per_sqm columns are the target in
+other units and are never candidates.  The CV folds stop at TRAIN_END so the
+2023-2024 test window of the training scripts stays unseen.
+
+Outputs
+-------
+  models/selected_regressors.json  — chosen set, CV scores and step log
+                                     per segment (other segments preserved)
+
+Usage
+-----
+  python ahpi_regressor_select.py                      # all segments
+  python ahpi_regressor_select.py --segment prime      # one segment
+  python ahpi_regressor_select.py --workers 4 --max-regressors 6
+"""
+
+import argparse
+import json
+import logging
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+
+from ahpi_prophet import CHANGEPOINTS, REGRESSORS, TRAIN_END
+
+warnings.filterwarnings("ignore")
+logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+# ── paths ──────────────────────────────────────────────────────────────────────
+BASE_DIR      = os.path.dirname(os.path.abspath(__file__))
+MAIN_DATA     = os.path.join(BASE_DIR, "data", "accra_home_price_index.csv")
+DISTRICT_DATA = os.path.join(BASE_DIR, "data", "accra_district_prices.csv")
+PRIME_DATA    = os.path.join(BASE_DIR, "data", "accra_prime_prices.csv")
+MODELS_DIR    = os.path.join(BASE_DIR, "models")
+OUTPUT_PATH   = os.path.join(MODELS_DIR, "selected_regressors.json")
+
+SEGMENTS = ["composite", "district", "prime"]
+
+# Target expressed in other units — never a regressor
+EXCLUDED_COLUMNS = {"ds", "y", "price_ghs_per_sqm", "price_usd_per_sqm"}
+
+# ── search configuration ──────────────────────────────────────────────────────
+CV_CUTOFFS     = ["2016-12-01", "2017-12-01", "2018-12-01",
+                  "2019-12-01", "2020-12-01", "2021-12-01"]
+CV_HORIZON     = 12          # months scored after each cutoff
+SCREEN_K       = 6           # candidates refitted per forward step
+MAX_REGRESSORS = 8
+MIN_GAIN       = 0.02        # stop when best relative MAPE gain < 2 %
+
+
+# ── data ──────────────────────────────────────────────────────────────────────
+
+def candidate_columns(macro: pd.DataFrame) -> list[str]:
+    """Every numeric collector column that is not the target in disguise."""
+    return [c for c in macro.columns
+            if c not in EXCLUDED_COLUMNS and pd.api.types.is_numeric_dtype(macro[c])]
+
+
+def load_segment(segment: str) -> tuple[pd.DataFrame, list[str]]:
+    """Return (frame with ds, y and all candidates, candidate names)."""
+    macro      = pd.read_csv(MAIN_DATA, parse_dates=["ds"])
+    candidates = candidate_columns(macro)
+    if segment == "composite":
+        df = macro[["ds", "y"] + candidates]
+    else:
+        path  = DISTRICT_DATA if segment == "district" else PRIME_DATA
+        panel = pd.read_csv(path, parse_dates=["ds"])
+        y     = panel.groupby("ds", as_index=False)["y"].mean()
+        df    = y.merge(macro[["ds"] + candidates], on="ds", how="left")
+    return df.sort_values("ds").reset_index(drop=True), candidates
+
+
+# ── vectorised ranking ────────────────────────────────────────────────────────
+
+def _standardise(a: np.ndarray) -> np.ndarray:
+    std = a.std(axis=0)
+    std[std == 0] = np.nan
+    return (a - a.mean(axis=0)) / std
+
+
+def pearson_rank(y: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """ρ(y, X[:, j]) for every column j in one matrix product."""
+    return _standardise(X).T @ _standardise(y[:, None])[:, 0] / len(y)
+
+
+def partial_rank(y: np.ndarray, X: np.ndarray, selected: list[int]) -> np.ndarray:
+    """
+    Partial ρ(y, X[:, j] | X[:, selected]) for every column j.
+    y and all candidates are residualised on [1, X_selected] with a single
+    multi-RHS least-squares solve; selected columns come back as NaN.
+    """
+    Z   = np.column_stack([np.ones(len(y))] + [X[:, i] for i in selected])
+    Y   = np.column_stack([y, X])
+    beta, *_ = np.linalg.lstsq(Z, Y, rcond=None)
+    R   = Y - Z @ beta
+    rho = pearson_rank(R[:, 0], R[:, 1:])
+    rho[selected] = np.nan
+    return rho
+
+
+# ── CV folds ──────────────────────────────────────────────────────────────────
+
+def build_folds(df: pd.DataFrame, candidates: list[str]) -> list[dict]:
+    """
+    Expanding-window folds.  Each candidate is standardised on the fold's own
+    training rows, so any subset of columns can be used without rescaling.
+    """
+    folds = []
+    for cutoff in pd.to_datetime(CV_CUTOFFS):
+        if cutoff > pd.Timestamp(TRAIN_END):
+            continue
+        train = df[df["ds"] <= cutoff]
+        test  = df[(df["ds"] > cutoff)].head(CV_HORIZON)
+        mu    = train[candidates].mean()
+        sd    = train[candidates].std(ddof=0).replace(0, 1.0)
+        tr, te = train.copy(), test.copy()
+        tr[candidates] = (train[candidates] - mu) / sd
+        te[candidates] = (test[candidates] - mu) / sd
+        folds.append({
+            "train":        tr.reset_index(drop=True),
+            "test":         te.reset_index(drop=True),
+            "changepoints": [c for c in CHANGEPOINTS if pd.Timestamp(c) < cutoff],
+        })
+    return folds
+
+
+_FOLDS: list[dict] = []
+
+
+def _init_worker(folds: list[dict]) -> None:
+    global _FOLDS
+    _FOLDS = folds
+    warnings.filterwarnings("ignore")
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+
+def _fit_score(regressors: tuple[str, ...]) -> float:
+    """Mean test MAPE (%) of the regressor set across the cached folds."""
+    mapes = []
+    for fold in _FOLDS:
+        m = Prophet(
+            changepoints=fold["changepoints"],
+            changepoint_prior_scale=0.5,
+            seasonality_mode="multiplicative",
+            yearly_seasonality=True,
+            weekly_seasonality=False,
+            daily_seasonality=False,
+            uncertainty_samples=0,
+        )
+        for reg in regressors:
+            m.add_regressor(reg)
+        cols = ["ds", "y"] + list(regressors)
+        m.fit(fold["train"][cols])
+        fc     = m.predict(fold["test"][cols])
+        y_true = fold["test"]["y"].values
+        mapes.append(np.mean(np.abs((y_true - fc["yhat"].values) / y_true)) * 100)
+    return float(np.mean(mapes))
+
+
+# ── forward selection ─────────────────────────────────────────────────────────
+
+def select_segment(segment: str, workers: int,
+                   max_regressors: int = MAX_REGRESSORS) -> dict:
+    df, candidates = load_segment(segment)
+    folds = build_folds(df, candidates)
+
+    train = df[df["ds"] <= TRAIN_END]
+    y, X  = train["y"].to_numpy(float), train[candidates].to_numpy(float)
+    rho   = pearson_rank(y, X)
+    ranking = [{"column": c, "pearson": round(float(r), 3)}
+               for c, r in sorted(zip(candidates, rho), key=lambda t: -abs(t[1]))]
+
+    # Folds are shipped to each worker once, not with every task
+    pool = ProcessPoolExecutor(max_workers=workers,
+                               initializer=_init_worker, initargs=(folds,))
+    try:
+        best_score = pool.submit(_fit_score, ()).result()
+        baseline   = best_score
+        print(f"    baseline (no regressors)  CV MAPE = {baseline:.2f}%")
+
+        chosen: list[int] = []
+        steps:  list[dict] = []
+        while len(chosen) < max_regressors:
+            partial = partial_rank(y, X, chosen)
+            order   = [j for j in np.argsort(-np.nan_to_num(np.abs(partial), nan=-1.0))
+                       if not np.isnan(partial[j])][:SCREEN_K]
+            if not order:
+                break
+            sets    = [tuple(candidates[i] for i in chosen + [j]) for j in order]
+            scores  = list(pool.map(_fit_score, sets))
+            k       = int(np.argmin(scores))
+            gain    = (best_score - scores[k]) / best_score
+            steps.append({
+                "added":       candidates[order[k]],
+                "cv_mape_pct": round(scores[k], 3),
+                "gain_pct":    round(gain * 100, 2),
+                "candidates":  {candidates[j]: {"partial": round(float(partial[j]), 3),
+                                                "cv_mape_pct": round(s, 3)}
+                                for j, s in zip(order, scores)},
+            })
+            if gain < MIN_GAIN:
+                print(f"    stop: best gain {gain * 100:.2f}% "
+                      f"({candidates[order[k]]}) < {MIN_GAIN * 100:.0f}%")
+                steps[-1]["accepted"] = False
+                break
+            steps[-1]["accepted"] = True
+            chosen.append(order[k])
+            best_score = scores[k]
+            print(f"    + {candidates[order[k]]:<26} CV MAPE = {best_score:.2f}%  "
+                  f"(gain {gain * 100:.1f}%)")
+    finally:
+        pool.shutdown()
+
+    return {
+        "regressors":        [candidates[i] for i in chosen],
+        "cv_mape_pct":       round(best_score, 3),
+        "baseline_mape_pct": round(baseline, 3),
+        "hand_picked":       REGRESSORS,
+        "n_folds":           len(folds),
+        "ranking":           ranking,
+        "steps":             steps,
+    }
+
+
+def load_selection(path: str = OUTPUT_PATH) -> dict:
+    """Return the saved selection per segment ({} if none has been run)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Forward regressor selection")
+    ap.add_argument("--segment", choices=SEGMENTS, action="append",
+                    help="segment(s) to select for (default: all)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--max-regressors", type=int, default=MAX_REGRESSORS)
+    args = ap.parse_args()
+
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    sep = "─" * 50
+    print(f"\n  AHPI · Forward Regressor Selection\n  {sep}")
+
+    result = load_selection()
+    for i, segment in enumerate(args.segment or SEGMENTS, 1):
+        print(f"\n  {sep}")
+        print(f"  [{i}/{len(args.segment or SEGMENTS)}] Segment: {segment}")
+        sel = select_segment(segment, args.workers, args.max_regressors)
+        sel["generated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        result[segment]  = sel
+        print(f"    selected ({len(sel['regressors'])}): {', '.join(sel['regressors'])}")
+
+    with open(OUTPUT_PATH, "w") as fh:
+        json.dump(result, fh, indent=2)
+
+    print(f"\n  {sep}")
+    print("  Saved → models/selected_regressors.json")
+    print("\n  Done.\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+AHPI Training Telemetry · per-stage wall / CPU time and peak RSS
+================================================================
+Structured run telemetry for the collector, the three Prophet training
+scripts and the forecast-extension step.  Each script's main() is wrapped
+with @track_run, and stage() marks the start of the next stage (closing the
+previous one), so instrumenting a script never re-indents its body.
+
+Every closed stage appends one JSON line:
+
+  {"type": "stage", "run_id": ..., "script": ..., "stage": "eval_fit",
+   "segment": "east_legon", "wall_s": 1.93, "cpu_s": 2.41,
+   "peak_rss_mb": 412.6, "children_peak_rss_mb": 0.0, ...}
+
+and every finished run appends a "run" line with totals and status.
+
+Peak RSS is per stage on Linux (the VmHWM high-water mark is reset through
+/proc/self/clear_refs at each stage start); elsewhere it falls back to the
+process-lifetime maximum from getrusage.  CPU time includes reaped child
+processes (Prophet cross-validation, extension workers).
+
+Stage vocabulary: load, scale, eval_fit, evaluate, cv, prod_fit, predict,
+persist (plus fetch_* / build_* in the collector).
+
+Outputs
+-------
+  forecasts/telemetry.jsonl   — append-only (override with AHPI_TELEMETRY_PATH)
+
+Usage
+-----
+  python ahpi_telemetry.py list                          # recent runs
+  python ahpi_telemetry.py report                        # last 2 runs per script
+  python ahpi_telemetry.py report --script ahpi_prime_prophet --runs 3 --segments
+"""
+
+import argparse
+import functools
+import json
+import os
+import socket
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:                       # Windows
+    resource = None
+
+BASE_DIR       = os.path.dirname(os.path.abspath(__file__))
+FORECASTS_DIR  = os.path.join(BASE_DIR, "forecasts")
+TELEMETRY_PATH = os.environ.get("AHPI_TELEMETRY_PATH",
+                                os.path.join(FORECASTS_DIR, "telemetry.jsonl"))
+
+_RUSAGE_KB = sys.platform != "darwin"     # ru_maxrss unit: kB on Linux, bytes on macOS
+
+
+# ── memory probes ─────────────────────────────────────────────────────────────
+
+def _proc_status_mb(field: str) -> float | None:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak() -> bool:
+    """Reset the kernel RSS high-water mark; False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _rusage_peak_mb(who) -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024 if _RUSAGE_KB else peak / 1024 ** 2
+
+
+def _cpu_seconds() -> float:
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# ── run / stage recording ─────────────────────────────────────────────────────
+
+class RunTelemetry:
+    """One script invocation; stages are sequential and non-overlapping."""
+
+    def __init__(self, script: str, run_id: str | None = None,
+                 path: str | None = None, record_run: bool = True) -> None:
+        self.script     = script
+        self.run_id     = run_id or uuid.uuid4().hex[:12]
+        self.path       = path or TELEMETRY_PATH
+        self.record_run = record_run
+        self.started    = datetime.now(timezone.utc)
+        self._t0        = time.perf_counter()
+        self._cpu0      = _cpu_seconds()
+        self._open: dict | None = None
+        self._peak_mb   = 0.0
+
+    # ── stages ────────────────────────────────────────────────────────────────
+    def stage(self, name: str, segment: str | None = None, **extra) -> None:
+        """Close the open stage (if any) and start `name`."""
+        self.end_stage()
+        self._open = {
+            "name":      name,
+            "segment":   segment,
+            "extra":     extra,
+            "ts":        datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "t0":        time.perf_counter(),
+            "cpu0":      _cpu_seconds(),
+            "per_stage": _reset_peak(),
+        }
+
+    def end_stage(self) -> None:
+        st, self._open = self._open, None
+        if st is None:
+            return
+        peak = _proc_status_mb("VmHWM") if st["per_stage"] else None
+        if peak is None:
+            peak = _rusage_peak_mb(resource.RUSAGE_SELF) if resource else None
+        if peak is not None:
+            self._peak_mb = max(self._peak_mb, peak)
+        self._write({
+            "type":                 "stage",
+            "run_id":               self.run_id,
+            "script":               self.script,
+            "stage":                st["name"],
+            "segment":              st["segment"],
+            "ts":                   st["ts"],
+            "wall_s":               round(time.perf_counter() - st["t0"], 4),
+            "cpu_s":                round(_cpu_seconds() - st["cpu0"], 4),
+            "peak_rss_mb":          None if peak is None else round(peak, 1),
+            "peak_scope":           "stage" if st["per_stage"] else "process",
+            "rss_mb":               _round(_proc_status_mb("VmRSS")),
+            "children_peak_rss_mb": _round(_rusage_peak_mb(resource.RUSAGE_CHILDREN)
+                                           if resource else None),
+            **st["extra"],
+        })
+
+    def finish(self, status: str = "ok", error: str | None = None) -> None:
+        self.end_stage()
+        if not self.record_run:
+            return
+        lifetime = _rusage_peak_mb(resource.RUSAGE_SELF) if resource else None
+        self._write({
+            "type":        "run",
+            "run_id":      self.run_id,
+            "script":      self.script,
+            "ts":          self.started.isoformat(timespec="seconds"),
+            "status":      status,
+            "error":       error,
+            "wall_s":      round(time.perf_counter() - self._t0, 3),
+            "cpu_s":       round(_cpu_seconds() - self._cpu0, 3),
+            "peak_rss_mb": _round(max(self._peak_mb, lifetime or 0.0)),
+            "argv":        sys.argv[1:],
+            "host":        socket.gethostname(),
+            "pid":         os.getpid(),
+        })
+
+    def _write(self, record: dict) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # One write per line in append mode, so concurrent workers interleave
+        # whole records rather than fragments.
+        with open(self.path, "a") as fh:
+            fh.write(json.dumps(record, default=str) + "\n")
+
+
+def _round(v: float | None) -> float | None:
+    return None if v is None else round(v, 1)
+
+
+_CURRENT: RunTelemetry | None = None
+
+
+def current() -> RunTelemetry | None:
+    return _CURRENT
+
+
+def stage(name: str, segment: str | None = None, **extra) -> None:
+    """Start a stage on the active run (no-op outside a tracked run)."""
+    if _CURRENT is not None:
+        _CURRENT.stage(name, segment, **extra)
+
+
+def end_stage() -> None:
+    if _CURRENT is not None:
+        _CURRENT.end_stage()
+
+
+def attach(script: str, run_id: str | None) -> RunTelemetry:
+    """
+    Join a parent run from a worker process: stage lines share the parent's
+    run_id and no separate run line is written.
+    """
+    global _CURRENT
+    _CURRENT = RunTelemetry(script, run_id=run_id, record_run=False)
+    return _CURRENT
+
+
+def track_run(script: str):
+    """Decorator for a script's main(): opens a run and records its outcome."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            global _CURRENT
+            parent, _CURRENT = _CURRENT, RunTelemetry(script)
+            run = _CURRENT
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                run.finish("error", f"{type(e).__name__}: {e}")
+                raise
+            else:
+                run.finish("ok")
+                return result
+            finally:
+                _CURRENT = parent
+        return wrapper
+    return deco
+
+
+# ── reporting ─────────────────────────────────────────────────────────────────
+
+def load_records(path: str | None = None) -> list[dict]:
+    path = path or TELEMETRY_PATH
+    if not os.path.exists(path):
+        return []
+    out = []
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                try:
+                    out.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue                 # torn line from a killed process
+    return out
+
+
+def _runs_by_script(records: list[dict]) -> dict[str, list[dict]]:
+    runs: dict[str, list[dict]] = defaultdict(list)
+    for r in records:
+        if r["type"] == "run":
+            runs[r["script"]].append(r)
+    for lst in runs.values():
+        lst.sort(key=lambda r: r["ts"])
+    return runs
+
+
+def stage_table(records: list[dict], run_id: str,
+                by_segment: bool = False) -> dict[tuple, dict]:
+    """Aggregate a run's stage lines: summed wall / CPU, max peak RSS."""
+    agg: dict[tuple, dict] = {}
+    for r in records:
+        if r["type"] != "stage" or r["run_id"] != run_id:
+            continue
+        key = (r["stage"], r.get("segment") or "") if by_segment else (r["stage"],)
+        a = agg.setdefault(key, {"wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": 0.0, "n": 0})
+        a["wall_s"] += r["wall_s"]
+        a["cpu_s"]  += r["cpu_s"]
+        a["peak_rss_mb"] = max(a["peak_rss_mb"], r.get("peak_rss_mb") or 0.0)
+        a["n"] += 1
+    return agg
+
+
+def _delta(new: float, old: float) -> str:
+    if not old:
+        return "    —"
+    return f"{(new - old) / old * 100:+5.0f}%"
+
+
+def report(script: str | None = None, n_runs: int = 2,
+           by_segment: bool = False, path: str | None = None) -> None:
+    records = load_records(path)
+    runs    = _runs_by_script(records)
+    if script:
+        runs = {script: runs.get(script, [])}
+    if not any(runs.values()):
+        print("  No telemetry recorded yet.")
+        return
+
+    for name, lst in sorted(runs.items()):
+        chosen = lst[-n_runs:]
+        if not chosen:
+            continue
+        tables = [stage_table(records, r["run_id"], by_segment) for r in chosen]
+        keys   = list(dict.fromkeys(k for t in tables for k in t))
+
+        print(f"\n  {name}")
+        print(f"  {'─' * 72}")
+        for r in chosen:
+            print(f"    run {r['run_id']}  {r['ts']}  {r['status']:<5}  "
+                  f"wall={r['wall_s']:>8.1f}s  cpu={r['cpu_s']:>8.1f}s  "
+                  f"peak={r['peak_rss_mb'] or 0:>7.1f} MB")
+        label_w = 34 if by_segment else 14
+        head = "".join(f"  {'wall':>8} {'cpu':>8} {'MB':>7}" for _ in chosen)
+        print(f"\n    {'stage':<{label_w}}{head}  {'Δwall':>6}  {'ΔMB':>6}")
+        for k in keys:
+            label = " / ".join(p for p in k if p)
+            cells = ""
+            for t in tables:
+                a = t.get(k)
+                cells += (f"  {a['wall_s']:>8.2f} {a['cpu_s']:>8.2f} {a['peak_rss_mb']:>7.1f}"
+                          if a else f"  {'—':>8} {'—':>8} {'—':>7}")
+            first, last = tables[0].get(k), tables[-1].get(k)
+            deltas = (f"  {_delta(last['wall_s'], first['wall_s']):>6}"
+                      f"  {_delta(last['peak_rss_mb'], first['peak_rss_mb']):>6}"
+                      if first and last and len(tables) > 1 else "")
+            print(f"    {label:<{label_w}}{cells}{deltas}")
+    print()
+
+
+def list_runs(limit: int = 20, path: str | None = None) -> None:
+    runs = sorted((r for r in load_records(path) if r["type"] == "run"),
+                  key=lambda r: r["ts"])[-limit:]
+    for r in runs:
+        print(f"  {r['ts']}  {r['run_id']}  {r['script']:<34} {r['status']:<5}"
+              f"  {r['wall_s']:>8.1f}s  {r['peak_rss_mb'] or 0:>7.1f} MB")
+
+
+def main() -> None:
+    ap  = argparse.ArgumentParser(description="AHPI training telemetry")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_rep = sub.add_parser("report", help="compare the most recent runs per script")
+    p_rep.add_argument("--script")
+    p_rep.add_argument("--runs", type=int, default=2)
+    p_rep.add_argument("--segments", action="store_true", help="break stages down by segment")
+    p_rep.add_argument("--path")
+    p_lst = sub.add_parser("list", help="list recorded runs")
+    p_lst.add_argument("--limit", type=int, default=20)
+    p_lst.add_argument("--path")
+    args = ap.parse_args()
+
+    if args.cmd == "report":
+        report(args.script, args.runs, args.segments, args.path)
+    else:
+        list_runs(args.limit, args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Callback Metrics Benchmark · instrumentation overhead and /metrics output
+=========================================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+with the metrics directory and slow log in a temporary directory, and
+measures what the callback instrumentation (accra_callback_metrics) costs
+and checks what it records:
+
+  overhead  — a no-op callback called bare and through timed(); the
+              difference is the per-call cost of counting
+  signature — timed() keeps each callback's argument names as
+              inspect.getfullargspec sees them (DashProxy's transforms
+              map inputs to arguments by name)
+  flush     — writing this worker's counters; collect() + render() as
+              served at /metrics
+  requests  — the Investment calculator driven through the Flask test
+              client (POST /_dash-update-component), tab open and closed.
+              The ok / prevented counts, response-size count and the slow
+              log (threshold lowered to 0 for this pass) must match the
+              requests sent, and GET /metrics must serve them
+
+Results are appended to benchmarks/results/callback_metrics.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_callback_metrics.py
+  python benchmarks/bench_callback_metrics.py --requests 200
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+_TMP     = tempfile.mkdtemp(prefix="ahpi-metrics-")
+os.environ["AHPI_METRICS_DIR"] = os.path.join(_TMP, "metrics")
+os.environ["AHPI_SLOW_LOG"]    = os.path.join(_TMP, "slow_callbacks.jsonl")
+os.environ["AHPI_FIG_CACHE"] = "0"
+
+import accra_callback_metrics as metrics  # noqa: E402
+import accra_dashboard as dash_app  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "callback_metrics.jsonl")
+
+
+# ── overhead ──────────────────────────────────────────────────────────────────
+
+def _noop(x):
+    return x
+
+
+def _median_ns(fn, n: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        samples.append((time.perf_counter() - t0) / n * 1e9)
+    return statistics.median(samples)
+
+
+# ── requests ──────────────────────────────────────────────────────────────────
+
+def _inv_request(sqm: float, opened: bool) -> dict:
+    """A /_dash-update-component body for update_inv_results."""
+    values = {"inv-market": "composite", "inv-buy-year": 2015, "inv-sell-year": 2027,
+              "inv-sqm": sqm, "tab-invest-open": opened}
+    return {
+        "output":         "inv-results.children",
+        "outputs":        {"id": "inv-results", "property": "children"},
+        "inputs":         [{"id": k, "property": "data" if k.startswith("tab-") else "value",
+                            "value": v} for k, v in values.items()],
+        "changedPropIds": ["inv-sqm.value"],
+        "state":          [],
+    }
+
+
+def _slow_records() -> list[dict]:
+    try:
+        with open(metrics.SLOW_LOG_PATH) as fh:
+            return [json.loads(line) for line in fh]
+    except OSError:
+        return []
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Callback metrics benchmark")
+    ap.add_argument("--requests", type=int, default=100,
+                    help="calculator requests per pass (default 100)")
+    ap.add_argument("--repeat", type=int, default=7)
+    args = ap.parse_args()
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Callback Metrics Benchmark\n  {sep}")
+
+    # Overhead per call, outside a request (no slow log: threshold unchanged)
+    metrics.reset()
+    n        = 100_000
+    t_bare   = _median_ns(_noop, n, args.repeat)
+    t_timed  = _median_ns(metrics.timed(_noop), n, args.repeat)
+    overhead = (t_timed - t_bare) / 1e3
+    print(f"  bare call            {t_bare / 1e3:>8.2f} µs")
+    print(f"  timed call           {t_timed / 1e3:>8.2f} µs   (+{overhead:.2f} µs)")
+
+    t0 = time.perf_counter()
+    metrics.flush()
+    flush_ms = (time.perf_counter() - t0) * 1e3
+    t0 = time.perf_counter()
+    metrics.render(metrics.collect())
+    scrape_ms = (time.perf_counter() - t0) * 1e3
+    print(f"  flush                {flush_ms:>8.2f} ms")
+    print(f"  collect + render     {scrape_ms:>8.2f} ms")
+
+    # Real requests: every call slow, so each one is logged
+    metrics.reset()
+    metrics.SLOW_MS = 0.0
+    client  = dash_app.server.test_client()
+    sent    = {"ok": 0, "prevented": 0}
+    wall_ms = []
+    for i in range(args.requests):
+        opened = i % 4 != 0
+        t0 = time.perf_counter()
+        resp = client.post("/_dash-update-component", json=_inv_request(50 + i, opened))
+        wall_ms.append((time.perf_counter() - t0) * 1e3)
+        sent["ok" if opened else "prevented"] += resp.status_code == (200 if opened else 204)
+
+    stats  = metrics.collect().get("update_inv_results", metrics._new_entry())
+    page   = client.get("/metrics")
+    body   = page.get_data(as_text=True)
+    slow   = [r for r in _slow_records() if r["callback"] == "update_inv_results"]
+    calls  = sum(stats["calls"].values())
+    spec   = inspect.getfullargspec
+    checks = {
+        "signature":           spec(metrics.timed(dash_app.update_inv_results)).args
+                               == spec(dash_app.update_inv_results).args != [],
+        "status codes":        sum(sent.values()) == args.requests,
+        "ok count":            stats["calls"]["ok"] == sent["ok"],
+        "prevented count":     stats["calls"]["prevented"] == sent["prevented"],
+        "no errors":           stats["calls"]["error"] == 0,
+        "response sizes":      sum(stats["bytes"]) == args.requests,
+        "slow log":            len(slow) == args.requests and all(
+            r["triggered"] == ["inv-sqm.value"] and "inv-market.value" in r["inputs"] for r in slow),
+        "/metrics served":     page.status_code == 200
+                               and page.headers["Content-Type"] == metrics.CONTENT_TYPE
+                               and f'ahpi_callback_calls_total{{callback="update_inv_results",'
+                                   f'outcome="ok"}} {sent["ok"]}' in body,
+    }
+    ok = all(checks.values())
+    print(f"\n  {args.requests} calculator requests "
+          f"({sent['ok']} ok, {sent['prevented']} prevented)")
+    print(f"  request wall time    {statistics.median(wall_ms):>8.2f} ms median")
+    print(f"  handler time         {stats['latency_sum'] / max(calls, 1) * 1e3:>8.2f} ms mean")
+    print(f"  response size        {stats['bytes_sum'] / args.requests / 1024:>8.2f} kB mean")
+    print(f"  /metrics page        {len(body) / 1024:>8.1f} kB\n")
+    for name, passed in checks.items():
+        print(f"  {name:<20} {'✓' if passed else '✗'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":           datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":       platform.python_version(),
+            "platform":     platform.platform(),
+            "overhead_us":  round(overhead, 3),
+            "flush_ms":     round(flush_ms, 3),
+            "scrape_ms":    round(scrape_ms, 3),
+            "requests":     args.requests,
+            "wall_ms":      round(statistics.median(wall_ms), 3),
+            "handler_ms":   round(stats["latency_sum"] / max(calls, 1) * 1e3, 3),
+            "checks":       checks,
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/callback_metrics.jsonl\n")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
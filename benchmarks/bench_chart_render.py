@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Chart Render Benchmark · per-call Chromium vs the warm renderer pool
+====================================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and renders report charts (accra_dashboard._chart_fig at the report size)
+to PNG three ways:
+
+  cold   — pio.to_image in this process with no renderer running; with
+           kaleido 1.x every call launches and closes its own Chromium
+  start  — the first batch on accra_chart_render's pool, one chart per
+           worker: the workers start and each starts its renderer
+           (kaleido's sync server under 1.x)
+  warm   — render_png on the started pool, one chart at a time: the
+           latency a report pays on a chart-cache miss
+
+No render server is used (AHPI_KALEIDO_SOCKET points at an empty
+directory), so the pool is this process's own.  Every render must return a
+PNG.  Results are appended to benchmarks/results/chart_render.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_chart_render.py
+  python benchmarks/bench_chart_render.py --cold 5 --warm 40
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ["AHPI_FIG_CACHE"]      = "0"
+os.environ["AHPI_KALEIDO_SOCKET"] = os.path.join(tempfile.mkdtemp(prefix="ahpi-render-"),
+                                                 "none.sock")
+
+import plotly.io as pio  # noqa: E402
+
+import accra_chart_render as render  # noqa: E402
+import accra_dashboard as dash_app  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "chart_render.jsonl")
+PNG_MAGIC    = b"\x89PNG"
+
+
+def _ms(fn) -> tuple[float, object]:
+    """(milliseconds, fn()); a render that raises returns None."""
+    t0 = time.perf_counter()
+    try:
+        out = fn()
+    except Exception as exc:
+        print(f"  ✗ {type(exc).__name__}: {str(exc).splitlines()[0] if str(exc) else ''}")
+        out = None
+    return (time.perf_counter() - t0) * 1e3, out
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Report chart render benchmark")
+    ap.add_argument("--cold", type=int, default=3, help="cold renders (default 3)")
+    ap.add_argument("--warm", type=int, default=20, help="warm renders (default 20)")
+    args = ap.parse_args()
+
+    d       = dash_app
+    w, h    = d.REPORT_CHART_SIZE
+    markets = [m["value"] for m in d._MARKET_OPTS]
+    figs    = [d._chart_fig(markets[i % len(markets)], w, h)
+               for i in range(max(args.cold, args.warm, render.POOL_SIZE))]
+    pngs    = []
+
+    cold_ms = []
+    for fig in figs[:args.cold]:
+        ms, png = _ms(lambda: pio.to_image(fig, format="png", width=w, height=h))
+        cold_ms.append(ms)
+        pngs.append(png)
+
+    start_ms, first = _ms(lambda: render.render_many(
+        {i: (fig, w, h) for i, fig in enumerate(figs[:render.POOL_SIZE])}))
+    pngs += list((first or {}).values())
+
+    warm_ms = []
+    for fig in figs[:args.warm]:
+        ms, png = _ms(lambda: render.render_png(fig, w, h))
+        warm_ms.append(ms)
+        pngs.append(png)
+    render.shutdown()
+
+    ok = all(isinstance(p, bytes) and p.startswith(PNG_MAGIC) for p in pngs)
+    cold, warm = statistics.median(cold_ms), statistics.median(warm_ms)
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Chart Render Benchmark\n  {sep}")
+    print(f"  {w}×{h} px report chart · {render.POOL_SIZE} pool workers\n")
+    print(f"  cold (per-call Chromium)  {cold:>9.1f} ms median  ({args.cold} renders)")
+    print(f"  pool start + first batch  {start_ms:>9.1f} ms")
+    speedup = f", {cold / max(warm, 1e-9):.1f}× faster than cold" if ok else ""
+    print(f"  warm (render_png)         {warm:>9.1f} ms median  ({args.warm} renders{speedup})")
+    print(f"  every render a PNG        {'✓' if ok else '✗'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "pool_size": render.POOL_SIZE,
+            "cold_ms":   round(cold, 1),
+            "start_ms":  round(start_ms, 1),
+            "warm_ms":   round(warm, 1),
+            "ok":        ok,
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/chart_render.jsonl\n")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
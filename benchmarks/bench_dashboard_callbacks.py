@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Dashboard Callback Benchmarks · year-range filtering and slider callbacks
+=========================================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and measures what one move of the year-range slider costs:
+
+  filter     — the original boolean-mask + .copy() filters vs the
+               YearIndex slices, over every (start, end) year pair; both
+               must return the same rows
+  moments    — correlation matrix and OLS fit from the RangeMoments prefix
+               sums vs DataFrame.corr() / linreg() on the rows (max abs
+               difference must stay below --tol)
+  callbacks  — wall time of the eight slider-driven callbacks
+               (update_kpis … update_prime) per year range; each slices
+               only the frames it builds from
+
+Results are appended to benchmarks/results/dashboard_callbacks.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_dashboard_callbacks.py
+  python benchmarks/bench_dashboard_callbacks.py --repeat 50
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import accra_dashboard as dash_app  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "dashboard_callbacks.jsonl")
+
+
+# ── reference (mask-based) filters ────────────────────────────────────────────
+
+def _mask(df: pd.DataFrame, start_yr: int, end_yr: int) -> pd.DataFrame:
+    return df[(df["ds"].dt.year >= start_yr) & (df["ds"].dt.year <= end_yr)].copy()
+
+
+def _mask_panel(df: pd.DataFrame, start_yr: int, end_yr: int, area: str = "all") -> pd.DataFrame:
+    dff = _mask(df, start_yr, end_yr)
+    return dff if area == "all" else dff[dff["district"] == area]
+
+
+def _same_rows(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    key = [c for c in ("ds", "district") if c in a.columns]
+    a = a.sort_values(key).reset_index(drop=True)
+    b = b.sort_values(key).reset_index(drop=True)
+    return a.equals(b)
+
+
+def _filter_cases() -> list[tuple[str, callable, callable]]:
+    """(name, mask-based reference, indexed filter) for every frame the slider touches."""
+    cases = [
+        ("composite", lambda s, e: _mask(dash_app.DF, s, e), dash_app.filter_df),
+        ("prime_full", lambda s, e: _mask(dash_app.DF_PRIME_FULL, s, e),
+         dash_app.filter_df_prime_full),
+        ("district/all", lambda s, e: _mask_panel(dash_app.DF_DISTRICT, s, e),
+         dash_app.filter_df_district),
+        ("prime/all", lambda s, e: _mask_panel(dash_app.DF_PRIME, s, e),
+         dash_app.filter_df_prime),
+    ]
+    d, p = dash_app.DISTRICTS[0], dash_app.PRIME_AREAS[0]
+    cases += [
+        (f"district/{d}", lambda s, e: _mask_panel(dash_app.DF_DISTRICT, s, e, d),
+         lambda s, e: dash_app.filter_df_district(s, e, d)),
+        (f"prime/{p}", lambda s, e: _mask_panel(dash_app.DF_PRIME, s, e, p),
+         lambda s, e: dash_app.filter_df_prime(s, e, p)),
+    ]
+    return cases
+
+
+def _time_us(fn, ranges: list[tuple[int, int]], repeat: int) -> float:
+    """Median microseconds per call across all ranges."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for s, e in ranges:
+            fn(s, e)
+        samples.append((time.perf_counter() - t0) / len(ranges) * 1e6)
+    return statistics.median(samples)
+
+
+# ── range statistics ──────────────────────────────────────────────────────────
+
+def bench_moments(ranges: list[tuple[int, int]]) -> dict:
+    """Max abs difference and total time, rescanning rows vs prefix sums."""
+    mom  = dash_app._DF_MOMENTS
+    cols = [c for c in dash_app.DF.columns if c not in ("ds", "population_total")]
+    pairs = [("exchange_rate_ghs_usd", "y"), ("gold_price_usd", "price_usd_per_sqm"),
+             ("inflation_cpi_pct", "lending_rate_pct")]
+    out = {"corr_max_diff": 0.0, "fit_max_rel_diff": 0.0,
+           "scan_ms": 0.0, "prefix_ms": 0.0}
+    for s, e in ranges:
+        dff    = dash_app.filter_df(s, e)
+        lo, hi = dash_app._DF_IDX.rows(s, e)
+
+        t0 = time.perf_counter()
+        ref_corr = dff[cols].corr().values
+        ref_fits = [dash_app.linreg(dff[x].values.astype(float), dff[y].values.astype(float))
+                    for x, y in pairs]
+        t1 = time.perf_counter()
+        corr = mom.corr(lo, hi, cols)
+        fits = [mom.linreg(lo, hi, x, y) for x, y in pairs]
+        t2 = time.perf_counter()
+        out["scan_ms"]   += (t1 - t0) * 1e3
+        out["prefix_ms"] += (t2 - t1) * 1e3
+
+        if not np.array_equal(np.isnan(ref_corr), np.isnan(corr)):
+            out["corr_max_diff"] = float("inf")
+        else:
+            ok = ~np.isnan(ref_corr)
+            diff = float(np.abs(ref_corr[ok] - corr[ok]).max()) if ok.any() else 0.0
+            out["corr_max_diff"] = max(out["corr_max_diff"], diff)
+        for ref, got in zip(ref_fits, fits):
+            if (ref[0] is None) != (got[0] is None):
+                out["fit_max_rel_diff"] = float("inf")
+                continue
+            for a, b in zip(ref, got):
+                if a is not None:
+                    rel = abs(a - b) / max(abs(a), 1.0)
+                    out["fit_max_rel_diff"] = max(out["fit_max_rel_diff"], rel)
+    return out
+
+
+# ── slider-driven callbacks ───────────────────────────────────────────────────
+
+def _slider_callbacks() -> list[tuple[str, callable]]:
+    """(name, fn(year_range)) for every callback the year-range slider drives (tabs opened)."""
+    x_var, y_var = "exchange_rate_ghs_usd", "y"
+    return [
+        ("update_kpis",        lambda r: dash_app.update_kpis(r, "mid")),
+        ("update_ahpi",        lambda r: dash_app.update_ahpi(r, [], ["show"], "mid", True)),
+        ("update_macro",       lambda r: dash_app.update_macro(
+            r, ["exchange_rate_ghs_usd", "inflation_cpi_pct"], False, True)),
+        ("update_commodities", lambda r: dash_app.update_commodities(r, True)),
+        ("update_scatter",     lambda r: dash_app.update_scatter(r, x_var, y_var, True)),
+        ("update_heatmap",     lambda r: dash_app.update_heatmap(r, True)),
+        ("update_district",    lambda r: dash_app.update_district(r, "all", True, True)),
+        ("update_prime",       lambda r: dash_app.update_prime(r, "all", True, True)),
+    ]
+
+
+def bench_callbacks(ranges: list[tuple[int, int]], repeat: int) -> dict[str, float]:
+    """Median milliseconds per call for each slider-driven callback."""
+    samples: dict[str, list[float]] = {}
+    for _ in range(repeat):
+        for r in ranges:
+            for name, fn in _slider_callbacks():
+                t0 = time.perf_counter()
+                fn(list(r))
+                samples.setdefault(name, []).append((time.perf_counter() - t0) * 1e3)
+    return {name: statistics.median(v) for name, v in samples.items()}
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Dashboard callback benchmarks")
+    ap.add_argument("--repeat", type=int, default=20,
+                    help="repetitions of the filter sweep (default 20)")
+    ap.add_argument("--callback-repeat", type=int, default=1,
+                    help="repetitions of the callback sweep (default 1)")
+    ap.add_argument("--tol", type=float, default=1e-9,
+                    help="allowed difference for prefix-sum statistics (default 1e-9)")
+    args = ap.parse_args()
+
+    years  = dash_app.YEARS
+    ranges = [(s, e) for s, e in itertools.product(years, years) if s <= e]
+    sep    = "─" * 62
+
+    print(f"\n  AHPI · Dashboard Callback Benchmarks\n  {sep}")
+    print(f"  {len(ranges)} year ranges ({years[0]}–{years[-1]})\n")
+    print(f"  {'filter':<26} {'mask µs':>10} {'slice µs':>10} {'speed-up':>9}  ok")
+
+    results = {"filters": {}, "callbacks_ms": {}}
+    for name, ref, fast in _filter_cases():
+        ok = all(_same_rows(ref(s, e), fast(s, e)) for s, e in ranges)
+        t_mask  = _time_us(ref, ranges, args.repeat)
+        t_slice = _time_us(fast, ranges, args.repeat)
+        results["filters"][name] = {"mask_us": round(t_mask, 1),
+                                    "slice_us": round(t_slice, 1), "equal": ok}
+        print(f"  {name:<26} {t_mask:>10.1f} {t_slice:>10.1f} "
+              f"{t_mask / t_slice:>8.1f}×  {'✓' if ok else '✗'}")
+
+    m = bench_moments(ranges)
+    results["moments"] = m
+    m_ok = m["corr_max_diff"] <= args.tol and m["fit_max_rel_diff"] <= args.tol
+    print(f"\n  {'statistics (all ranges)':<26} {'scan ms':>10} {'prefix ms':>10} {'speed-up':>9}  ok")
+    print(f"  {'corr matrix + 3 OLS fits':<26} {m['scan_ms']:>10.1f} {m['prefix_ms']:>10.1f} "
+          f"{m['scan_ms'] / m['prefix_ms']:>8.1f}×  {'✓' if m_ok else '✗'}")
+    print(f"  max |Δρ| = {m['corr_max_diff']:.2e}   max rel Δfit = {m['fit_max_rel_diff']:.2e}")
+
+    print(f"\n  {'callback':<26} {'median ms':>10}")
+    results["callbacks_ms"] = bench_callbacks(ranges, args.callback_repeat)
+    for name, ms in results["callbacks_ms"].items():
+        print(f"  {name:<26} {ms:>10.2f}")
+    total = sum(results["callbacks_ms"].values())
+    print(f"  {'one slider move (sum)':<26} {total:>10.2f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "ranges":   len(ranges),
+            **results,
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/dashboard_callbacks.jsonl\n")
+
+    if not m_ok or not all(f["equal"] for f in results["filters"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
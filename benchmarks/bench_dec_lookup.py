@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+December Lookup Benchmark · masked DataFrame rows vs the December cubes
+=======================================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and compares, for every (market, scenario, year) the calculators can ask
+for, the original lookups with the dense December cubes:
+
+  mask   — the December row found by a boolean mask over the forecast
+           frame (last row past the horizon), and the historical row from
+           per-market dicts of iterrows() Series
+  cube   — _get_fc_dec / _get_hist_dec on the DecemberCube arrays
+
+Every field must agree exactly.  The benchmark also times the callbacks
+that sit on these lookups (investment and mortgage results, snapshot card,
+target cards and the forecast map layer) over every market / year choice.
+
+A shorter-horizon check rebuilds the forecast cube with one district's
+forecasts cut --cut-years short of the others (a segment left on an older
+horizon): its lookups must still match the masked frames (the final row
+past its own horizon), and every district target card must render on it.
+
+Results are appended to benchmarks/results/dec_lookup.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_dec_lookup.py
+  python benchmarks/bench_dec_lookup.py --repeat 20
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import accra_dashboard as dash_app  # noqa: E402
+from accra_bundle import DEC_FC_FIELDS, DEC_HIST_FIELDS, dec_cube  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "dec_lookup.jsonl")
+SCENARIOS    = ("bear", "base", "bull")
+
+
+# ── reference (mask-based) lookups ────────────────────────────────────────────
+
+def _fc_frame(market: str, scenario: str) -> pd.DataFrame | None:
+    d = dash_app
+    if market == "composite":
+        return {"bear": d.DF_FC_BEAR, "base": d.DF_FC_BASE, "bull": d.DF_FC_BULL}[scenario]
+    if market == "prime/all":
+        return d._PRIME_FC_AGG[scenario]
+    if market == "district/all":
+        return d._DISTRICT_FC_AGG[scenario]
+    if market in d.DISTRICTS:
+        return d._DISTRICT_FC.get((scenario, market))
+    return d._PRIME_FC.get((scenario, market))
+
+
+def _mask_dec(df_fc: pd.DataFrame, year: int) -> pd.Series:
+    mask = (df_fc["ds"].dt.year == year) & (df_fc["ds"].dt.month == 12)
+    rows = df_fc[mask]
+    return rows.iloc[0] if len(rows) else df_fc.iloc[-1]
+
+
+def ref_fc_dec(market: str, scenario: str, year: int) -> pd.Series | None:
+    df_fc = _fc_frame(market, scenario)
+    return None if df_fc is None else _mask_dec(df_fc, year)
+
+
+def ref_hist_tables() -> dict[str, dict[int, pd.Series]]:
+    d   = dash_app
+    out = {"composite": {int(r["ds"].year): r
+                         for _, r in d.DF[d.DF["ds"].dt.month == 12].iterrows()}}
+    for panel in (d.DF_DISTRICT, d.DF_PRIME):
+        for name, grp in panel.groupby("district"):
+            out[name] = {int(r["ds"].year): r
+                         for _, r in grp[grp["ds"].dt.month == 12].iterrows()}
+    return out
+
+
+def _same(ref, got, fields: list[str]) -> bool:
+    if ref is None or got is None:
+        return ref is None and got is None
+    for f in fields:
+        a = ref.get(f)
+        b = got.get(f)
+        if a is None or (isinstance(a, float) and math.isnan(a)):
+            if b is not None:
+                return False
+        elif b is None or float(a) != b:
+            return False
+    return True
+
+
+# ── shorter horizon ───────────────────────────────────────────────────────────
+
+def check_short_horizon(markets: list[str], cut_years: int) -> dict:
+    """
+    The forecast cube rebuilt with the first district's forecasts ending
+    cut_years before the others: lookups against the masked frames, and the
+    district target cards rendered on it.
+    """
+    d      = dash_app
+    area   = d.DISTRICTS[0]
+    frames = {(sc, m): _fc_frame(m, sc) for m in markets for sc in SCENARIOS
+              if _fc_frame(m, sc) is not None}
+    cutoff = frames[("base", area)]["ds"].max().year - cut_years
+    for sc in SCENARIOS:
+        frame = frames[(sc, area)]
+        frames[(sc, area)] = frame[frame["ds"].dt.year <= cutoff]
+    cube = d.DecemberCube(*dec_cube(frames, DEC_FC_FIELDS, last_slot=True))
+
+    years   = range(d.FC_YEARS[0], d.FC_YEARS[-1] + 2)
+    lookups = all(_same(_mask_dec(frame, y), cube.row(m, sc, y), DEC_FC_FIELDS)
+                  for (sc, m), frame in frames.items() for y in years)
+    saved, d._DEC_FC = d._DEC_FC, cube
+    try:
+        for a in ["all"] + d.DISTRICTS:
+            for y in d.FC_YEARS:
+                d._build_district_targets_div(a, y)
+        cards = True
+    except Exception as exc:
+        print(f"  ✗ target cards: {type(exc).__name__}: {exc}")
+        cards = False
+    finally:
+        d._DEC_FC = saved
+    return {"area": area, "ends": cutoff, "lookups": lookups, "cards": cards}
+
+
+# ── timing ────────────────────────────────────────────────────────────────────
+
+def _median_us(fn, args: list[tuple], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for a in args:
+            fn(*a)
+        samples.append((time.perf_counter() - t0) / len(args) * 1e6)
+    return statistics.median(samples)
+
+
+def _callbacks() -> list[tuple[str, callable, list[tuple]]]:
+    """(name, fn, argument tuples) for the callbacks built on December lookups."""
+    d       = dash_app
+    markets = [m["value"] for m in d._MARKET_OPTS]
+    years   = d.FC_YEARS
+    return [
+        ("update_inv_results", d.update_inv_results,
+         [(m, 2020, y, 100, True) for m in markets for y in years]),
+        ("update_mort_results", d.update_mort_results,
+         [(dist, 100, 1_500_000, 70, 20, 28, y, True) for dist in d.DISTRICTS for y in years]),
+        ("update_snapshot_card", d.update_snapshot_card,
+         [(m, y, True) for m in markets for y in years]),
+        ("_build_prime_targets_div", d._build_prime_targets_div,
+         [(a, y) for a in ["all"] + d.PRIME_AREAS for y in years]),
+        ("_build_district_targets_div", d._build_district_targets_div,
+         [(a, y) for a in ["all"] + d.DISTRICTS for y in years]),
+        ("_build_forecast_geojson", d._build_forecast_geojson.__wrapped__,
+         [(sc, y) for sc in SCENARIOS for y in years]),
+    ]
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="December lookup benchmark")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--cut-years", type=int, default=2,
+                    help="years the shorter-horizon district ends early (default 2)")
+    args = ap.parse_args()
+
+    d        = dash_app
+    fc_mkts  = ["composite", "prime/all", "district/all"] + d.DISTRICTS + d.PRIME_AREAS
+    fc_keys  = [(m, sc, y) for m in fc_mkts for sc in SCENARIOS
+                for y in range(d.FC_YEARS[0], d.FC_YEARS[-1] + 2)]     # one past the horizon
+    hist_ref = ref_hist_tables()
+    h_keys   = [(m, y) for m in hist_ref for y in d.YEARS]
+
+    fc_ok = all(_same(ref_fc_dec(*k), d._get_fc_dec(*k), DEC_FC_FIELDS) for k in fc_keys)
+    h_ok  = all(_same(hist_ref[m].get(y), d._get_hist_dec(m, y),
+                      [f for f in DEC_HIST_FIELDS if f in hist_ref[m][d.YEARS[-1]]])
+                for m, y in h_keys)
+
+    sep = "─" * 62
+    print(f"\n  AHPI · December Lookup Benchmark\n  {sep}")
+    print(f"  {'lookup':<28} {'keys':>6} {'mask µs':>10} {'cube µs':>10}  ok")
+    results = {"lookups": {}, "callbacks_us": {}}
+    t_mask = _median_us(ref_fc_dec, fc_keys, args.repeat)
+    t_cube = _median_us(d._get_fc_dec, fc_keys, args.repeat)
+    results["lookups"]["forecast"] = {"keys": len(fc_keys), "mask_us": round(t_mask, 2),
+                                      "cube_us": round(t_cube, 2), "equal": fc_ok}
+    print(f"  {'forecast (market,sc,year)':<28} {len(fc_keys):>6} {t_mask:>10.2f} "
+          f"{t_cube:>10.2f}  {'✓' if fc_ok else '✗'}")
+    t_dict = _median_us(lambda m, y: hist_ref[m].get(y), h_keys, args.repeat)
+    t_cube = _median_us(d._get_hist_dec, h_keys, args.repeat)
+    results["lookups"]["history"] = {"keys": len(h_keys), "dict_us": round(t_dict, 2),
+                                     "cube_us": round(t_cube, 2), "equal": h_ok}
+    print(f"  {'history (market,year)':<28} {len(h_keys):>6} {t_dict:>10.2f} "
+          f"{t_cube:>10.2f}  {'✓' if h_ok else '✗'}")
+
+    short = check_short_horizon(fc_mkts, args.cut_years)
+    results["short_horizon"] = short
+    short_ok = short["lookups"] and short["cards"]
+    print(f"\n  shorter horizon: {short['area']} ends {short['ends']}")
+    print(f"  {'lookups':<28} {'✓' if short['lookups'] else '✗'}")
+    print(f"  {'district target cards':<28} {'✓' if short['cards'] else '✗'}")
+
+    print(f"\n  {'callback':<28} {'calls':>6} {'median µs':>10}")
+    for name, fn, calls in _callbacks():
+        us = _median_us(fn, calls, args.repeat)
+        results["callbacks_us"][name] = round(us, 1)
+        print(f"  {name:<28} {len(calls):>6} {us:>10.1f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            **results,
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/dec_lookup.jsonl\n")
+
+    if not (fc_ok and h_ok and short_ok):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Figure Patch Benchmark · full-figure vs dash.Patch switch updates
+=================================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and measures the response payload of every show / hide switch on the
+dashboard, over the full year range:
+
+  full   — the figure JSON the callback sent before partial updates: the
+           builder re-run with the new switch state and serialised whole
+  patch  — the dash.Patch the callback now sends when only the switch
+           changed (visible flags of the tagged traces, shapes and
+           annotations)
+
+Each switch is flipped off → on → off.  Every patch is also applied to
+the figure on screen and the result compared with the full figure for the
+new state, so a mis-tagged part fails the run.  The figure cache is
+bypassed (AHPI_FIG_CACHE=0).
+
+Results are appended to benchmarks/results/figure_patches.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_figure_patches.py
+"""
+
+import copy
+import json
+import os
+import platform
+import sys
+import warnings
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ["AHPI_FIG_CACHE"] = "0"
+
+import plotly.io as pio  # noqa: E402
+
+import accra_dashboard as dash_app  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "figure_patches.jsonl")
+
+
+# ── switches ──────────────────────────────────────────────────────────────────
+
+def _switches() -> list[tuple[str, callable, callable, str]]:
+    """
+    (name, full(on) → the figure before partial updates, tagged() → figure
+    with every part present, toggle group) for every switch.
+    """
+    d  = dash_app
+    yr = (d.YEARS[0], d.YEARS[-1])
+    sl = {"df": d.filter_df(*yr), "prime_full": d.filter_df_prime_full(*yr),
+          "district": d.filter_df_district(*yr), "prime": d.filter_df_prime(*yr)}
+    return [
+        ("ahpi-events",
+         lambda on: d.build_ahpi_fig(sl["df"], [], on, dff_prime_full=sl["prime_full"]),
+         lambda: d.build_ahpi_fig(sl["df"], ["ghs", "usd"], True,
+                                  dff_prime_full=sl["prime_full"]), "events"),
+        ("ahpi-overlays (GHS)",
+         lambda on: d.build_ahpi_fig(sl["df"], ["ghs"] if on else [], True,
+                                     dff_prime_full=sl["prime_full"]),
+         lambda: d.build_ahpi_fig(sl["df"], ["ghs", "usd"], True,
+                                  dff_prime_full=sl["prime_full"]), "ghs"),
+        ("district-events",
+         lambda on: d.build_district_comparison_fig(sl["district"], show_events=on),
+         lambda: d.build_district_comparison_fig(sl["district"]), "events"),
+        ("prime-events",
+         lambda on: d.build_prime_comparison_fig(sl["prime"], show_events=on),
+         lambda: d.build_prime_comparison_fig(sl["prime"]), "events"),
+        ("forecast-ci",
+         lambda on: d.build_forecast_fig(show_ci=on),
+         lambda: d.build_forecast_fig(show_ci=True), "ci"),
+        ("prime-fc-ci",
+         lambda on: d.build_prime_forecast_fig("all", show_ci=on),
+         lambda: d.build_prime_forecast_fig("all", show_ci=True), "ci"),
+        ("district-fc-ci",
+         lambda on: d.build_district_forecast_fig("all", show_ci=on),
+         lambda: d.build_district_forecast_fig("all", show_ci=True), "ci"),
+    ]
+
+
+def _apply(fig: dict, patch_json: dict) -> dict:
+    """Apply the Assign operations of a serialised Patch to fig, as the browser does."""
+    fig = copy.deepcopy(fig)
+    for op in patch_json["operations"]:
+        assert op["operation"] == "Assign", op["operation"]
+        node = fig
+        for key in op["location"][:-1]:
+            node = node[key]
+        node[op["location"][-1]] = op["params"]["value"]
+    return fig
+
+
+def measure(full, tagged, group) -> dict:
+    base    = json.loads(pio.to_json(tagged(), validate=False))
+    screen  = dash_app._with_toggles(copy.deepcopy(base), {group: False})
+    full_b, patch_b, ok = [], [], True
+    for on in (True, False):
+        full_b.append(len(pio.to_json(full(on), validate=False)))
+        patch = dash_app._toggle_patch(base, {group: on}).to_plotly_json()
+        patch_b.append(len(json.dumps(patch)))
+        screen = _apply(screen, patch)
+        ok    &= screen == dash_app._with_toggles(copy.deepcopy(base), {group: on})
+    return {"full_bytes": round(sum(full_b) / len(full_b)),
+            "patch_bytes": round(sum(patch_b) / len(patch_b)),
+            "parts": len(dash_app._toggle_paths(base, group)), "equal": ok}
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    sep = "─" * 62
+    print(f"\n  AHPI · Figure Patch Benchmark\n  {sep}")
+    print(f"  {'switch':<22} {'parts':>6} {'full B':>10} {'patch B':>9} {'smaller':>9}  ok")
+
+    results = {}
+    for name, full, tagged, group in _switches():
+        r = results[name] = measure(full, tagged, group)
+        print(f"  {name:<22} {r['parts']:>6} {r['full_bytes']:>10,} {r['patch_bytes']:>9,} "
+              f"{r['full_bytes'] / max(r['patch_bytes'], 1):>8.0f}×  {'✓' if r['equal'] else '✗'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "switches": results,
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/figure_patches.jsonl\n")
+
+    if not all(r["equal"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+First-Render Benchmark · eager vs lazy tab rendering
+====================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and plays a first load of /dashboard through the Flask test client: the
+render_page request, then every server callback the Dash renderer fires on
+load, each as a POST to /_dash-update-component with the layout's default
+values.  A callback whose input is the output of another initial callback
+is sent after it, with the value that callback returned (as the renderer
+does for mort-value → mort-results).  Requests go one at a time, as a
+single sync worker serves them, in the renderer's registration order:
+
+  eager  — every "<tab>-open" store True, as before lazy tabs
+  lazy   — only the start tab's store True (what the clientside callback on
+           main-tabs sets); the other tabs' callbacks answer 204
+
+For each mode it reports the callbacks that built output, the time to first
+chart (from the render_page request until the start tab's first figure
+arrives) and the time until every initial callback has answered.  The
+figure cache is bypassed (AHPI_FIG_CACHE=0) so both modes pay full build
+cost, and one discarded eager load runs first so the in-process memos are
+warm for both.  Every request must answer 200 or 204.
+
+Results are appended to benchmarks/results/first_render.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_first_render.py
+  python benchmarks/bench_first_render.py --tab tab-forecast --repeat 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ["AHPI_FIG_CACHE"] = "0"
+
+import accra_dashboard as dash_app  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "first_render.jsonl")
+PATHNAME     = "/dashboard"
+
+
+# ── requests ──────────────────────────────────────────────────────────────────
+
+def _layout_values() -> dict:
+    """{(component id, prop): value} for every string-id component on /dashboard."""
+    values = {}
+    for root in (dash_app.app.layout, dash_app._DASHBOARD_LAYOUT):
+        for c in root._traverse():
+            cid = getattr(c, "id", None)
+            if isinstance(cid, str):
+                for prop in c._prop_names:
+                    values[(cid, prop)] = getattr(c, prop, None)
+    values[("url", "pathname")] = PATHNAME
+    return values
+
+
+def _outputs(dep: dict) -> list[dict]:
+    """The {"id", "property"} outputs of a /_dash-dependencies entry."""
+    spec = dep["output"]
+    outs = spec[2:-2].split("...") if spec.startswith("..") else [spec]
+    return [dict(zip(("id", "property"), o.rsplit(".", 1))) for o in outs]
+
+
+def _initial_callbacks(values: dict) -> list[dict]:
+    """Server callbacks the renderer fires on a first load of /dashboard."""
+    ids  = {cid for cid, _ in values}
+    deps = dash_app.app.server.test_client().get("/_dash-dependencies").get_json()
+    return [d for d in deps
+            if not d["prevent_initial_call"] and not d["clientside_function"]
+            and all(i["id"] in ids for i in d["inputs"] + d["state"])]
+
+
+def _body(dep: dict, values: dict) -> dict:
+    """A /_dash-update-component body for *dep* with the current values."""
+    outs = _outputs(dep)
+    item = lambda x: {**x, "value": values.get((x["id"], x["property"]))}
+    return {
+        "output":         dep["output"],
+        "outputs":        outs if dep["output"].startswith("..") else outs[0],
+        "inputs":         [item(i) for i in dep["inputs"]],
+        "state":          [item(s) for s in dep["state"]],
+        "changedPropIds": [],
+    }
+
+
+# ── first load ────────────────────────────────────────────────────────────────
+
+def first_load(client, deps: list[dict], start_tab: str, lazy: bool) -> dict:
+    """Play one first load; time to first chart, total time and per-callback records."""
+    values = _layout_values()
+    for tab in dash_app.LAZY_TABS:
+        values[(f"{tab}-open", "data")] = not lazy or tab == start_tab
+
+    pending  = list(deps)
+    records  = []
+    first_ms = None
+    t0 = time.perf_counter()
+    while pending:
+        waiting = {(o["id"], o["property"]) for d in pending for o in _outputs(d)}
+        dep     = next((d for d in pending
+                        if not any((i["id"], i["property"]) in waiting for i in d["inputs"])),
+                       pending[0])
+        pending.remove(dep)
+        t1   = time.perf_counter()
+        resp = client.post("/_dash-update-component", json=_body(dep, values))
+        now  = time.perf_counter()
+        if resp.status_code == 200:
+            for cid, props in resp.get_json()["response"].items():
+                values.update({(cid, p): v for p, v in props.items()})
+        tab_cb = any(i["id"] == f"{start_tab}-open" for i in dep["inputs"])
+        if first_ms is None and tab_cb and ".figure" in dep["output"] and resp.status_code == 200:
+            first_ms = (now - t0) * 1e3
+        records.append({"output": dep["output"], "status": resp.status_code,
+                        "ms": (now - t1) * 1e3})
+    return {"first_ms": first_ms, "total_ms": (time.perf_counter() - t0) * 1e3,
+            "records": records}
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Eager vs lazy first-render benchmark")
+    ap.add_argument("--tab", default="tab-overview", choices=dash_app.LAZY_TABS,
+                    help="tab active on first load (default tab-overview)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    client = dash_app.app.server.test_client()
+    deps   = _initial_callbacks(_layout_values())
+    first_load(client, deps, args.tab, lazy=False)
+
+    sep = "─" * 62
+    print(f"\n  AHPI · First-Render Benchmark\n  {sep}")
+    print(f"  {PATHNAME} · start tab {args.tab} · {len(deps)} initial callbacks · "
+          f"{args.repeat} repeats\n")
+    print(f"  {'mode':<8} {'built':>6} {'first chart ms':>16} {'all callbacks ms':>18}")
+
+    results, ok = {}, True
+    for mode in ("eager", "lazy"):
+        runs  = [first_load(client, deps, args.tab, lazy=(mode == "lazy"))
+                 for _ in range(args.repeat)]
+        codes = [r["status"] for run in runs for r in run["records"]]
+        ok   &= all(c in (200, 204) for c in codes) and all(run["first_ms"] for run in runs)
+        first = statistics.median(run["first_ms"] or float("nan") for run in runs)
+        total = statistics.median(run["total_ms"] for run in runs)
+        built = sum(r["status"] == 200 for r in runs[0]["records"])
+        results[mode] = {"built": built, "first_chart_ms": round(first, 1),
+                         "total_ms": round(total, 1),
+                         "callbacks_ms": {r["output"]: round(r["ms"], 2)
+                                          for r in runs[-1]["records"]}}
+        print(f"  {mode:<8} {built:>6} {first:>16.1f} {total:>18.1f}")
+
+    print(f"\n  every request 200 / 204, first chart built  {'✓' if ok else '✗'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "start_tab": args.tab,
+            "ok":        ok,
+            **results,
+        }) + "\n")
+    print("  Saved → benchmarks/results/first_render.jsonl\n")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
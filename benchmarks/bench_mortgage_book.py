@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Mortgage Book Benchmark · vectorised loan-book stress test
+==========================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and stress-tests synthetic loan books with the mortgage-book engine
+(accra_mortgage_book):
+
+  parse    — read_loans() on the CSV bytes, as uploaded
+  run      — MortgageBookEngine.run(): payments, December balances,
+             collateral and LTV for every loan × scenario × year
+  outputs  — distribution() and loan_table(), as rendered and exported
+
+A random sample of loans is replayed one at a time: the payment with the
+Mortgage tab's formula, the balance by stepping through every monthly
+payment, and the collateral from masked DataFrame lookups.  Every
+balance, interest, collateral and LTV value must agree.
+
+Results are appended to benchmarks/results/mortgage_book.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_mortgage_book.py
+  python benchmarks/bench_mortgage_book.py --rows 1000 100000 --sample 50
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import accra_dashboard as dash_app  # noqa: E402
+from accra_mortgage_book import read_loans  # noqa: E402
+from accra_portfolio import SCENARIOS  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "mortgage_book.jsonl")
+
+
+# ── loans ─────────────────────────────────────────────────────────────────────
+
+def synthetic_csv(n: int, seed: int = 0) -> bytes:
+    """n random loans over every district and month; half with a stated value."""
+    rng    = np.random.default_rng(seed)
+    d      = dash_app
+    ds     = d.DF["ds"]
+    months = pd.date_range(ds.min(), ds.max(), freq="MS").strftime("%Y-%m").to_numpy()
+    sqm    = rng.integers(40, 400, n)
+    value  = np.where(rng.random(n) < 0.5, (sqm * rng.uniform(1_000, 9_000, n)).round(), np.nan)
+    df = pd.DataFrame({
+        "loan_id":     [f"L{i:07d}" for i in range(n)],
+        "district":    np.array(d.DISTRICTS, dtype=object)[rng.integers(0, len(d.DISTRICTS), n)],
+        "sqm":         sqm,
+        "value":       pd.Series(value).map(lambda v: "" if np.isnan(v) else f"{v:.0f}"),
+        "ltv":         rng.choice([50, 60, 70, 80, 90], n),
+        "term":        rng.choice([10, 15, 20, 25], n),
+        "rate":        rng.uniform(15, 35, n).round(1),
+        "origination": months[rng.integers(0, len(months), n)],
+    })
+    return df.to_csv(index=False).encode()
+
+
+# ── scalar reference ──────────────────────────────────────────────────────────
+
+def scalar_loan(loan: pd.Series) -> dict:
+    """One loan: Mortgage-tab payment, month-by-month balance, masked lookups."""
+    d      = dash_app
+    month  = pd.Timestamp(loan["origination"] + "-01")
+    panel  = d.DF_DISTRICT[d.DF_DISTRICT["district"] == loan["district"]]
+    row    = panel[panel["ds"] == month].iloc[0]
+    value  = float(loan["value"]) if loan["value"] else float(loan["sqm"]) * row["price_ghs_per_sqm"]
+    amount = value * float(loan["ltv"]) / 100
+    r      = float(loan["rate"]) / 100 / 12
+    n      = int(round(float(loan["term"]) * 12))
+    pmt    = amount * r * (1 + r) ** n / ((1 + r) ** n - 1) if r > 0 else amount / n
+
+    out, bal, k = {}, amount, 0
+    for y in d.FC_YEARS:
+        target   = y * 12 + 11 - (month.year * 12 + month.month - 1)
+        interest = 0.0
+        while k < min(target, n):
+            if k >= target - 12:                  # payments in calendar year y
+                interest += bal * r
+            bal       = bal * (1 + r) - pmt
+            k        += 1
+        if k >= n:
+            bal = 0.0
+        out[f"balance_{y}"]  = max(bal, 0.0)
+        out[f"interest_{y}"] = interest
+        for sc in SCENARIOS:
+            coll = value * d._get_fc_dec(loan["district"], sc, y)["yhat"] / float(row["y"])
+            out[f"collateral_{sc}_{y}"] = coll
+            out[f"ltv_{sc}_{y}"]        = max(bal, 0.0) / coll * 100
+    out["payment_ghs"] = pmt
+    return out
+
+
+def check(loans: pd.DataFrame, table: pd.DataFrame, sample: int) -> bool:
+    ok  = table.index[table["status"] == "ok"]
+    idx = np.random.default_rng(1).choice(ok, min(sample, len(ok)), replace=False)
+    for i in idx:
+        for col, want in scalar_loan(loans.loc[i]).items():
+            got = table.at[i, col]
+            if not math.isclose(got, want, rel_tol=1e-7, abs_tol=1e-4):
+                print(f"  ✗ loan {loans.at[i, 'loan_id']} {col}: {got} != {want}")
+                return False
+    return True
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Mortgage book stress-test benchmark")
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--sample", type=int, default=100,
+                    help="loans replayed with the scalar reference (default 100)")
+    args = ap.parse_args()
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Mortgage Book Benchmark\n  {sep}")
+    print(f"  checkpoints Dec {dash_app.FC_YEARS[0]}–{dash_app.FC_YEARS[-1]} · "
+          f"{len(SCENARIOS)} scenarios\n")
+    print(f"  {'loans':>9} {'parse s':>9} {'run s':>9} {'outputs s':>10} {'loans/s':>12}  ok")
+
+    runs = []
+    for n in args.rows:
+        data = synthetic_csv(n)
+        t0 = time.perf_counter()
+        loans  = read_loans(data)
+        t1 = time.perf_counter()
+        result = dash_app._MORTGAGE_BOOK.run(loans)
+        t2 = time.perf_counter()
+        result.distribution()
+        table  = result.loan_table()
+        t3 = time.perf_counter()
+        ok = check(loans, table, args.sample)
+        runs.append({"loans": n, "parse_s": round(t1 - t0, 4), "run_s": round(t2 - t1, 4),
+                     "outputs_s": round(t3 - t2, 4), "tested": int(result.ok.sum()),
+                     "equal": ok})
+        print(f"  {n:>9,} {t1 - t0:>9.3f} {t2 - t1:>9.3f} {t3 - t2:>10.3f} "
+              f"{n / max(t2 - t1, 1e-9):>12,.0f}  {'✓' if ok else '✗'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "runs":     runs,
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/mortgage_book.jsonl\n")
+
+    if not all(r["equal"] for r in runs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
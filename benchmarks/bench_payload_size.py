@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Payload Benchmark · compact figure encoding
+===========================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and compares, for every figure the dashboard caches, the JSON it used to
+send with the compacted payload (accra_payload):
+
+  raw      — pio.to_json of the built figure
+  compact  — rounded, typed-array encoded and decimated (as cached)
+
+Sizes are reported plain and gzip-compressed (as sent with compression).
+Every compacted numeric array is decoded again and compared with the
+original, 2-D arrays column by column; the relative error must stay
+below --tol (the rounding precision) for the run to pass.  Decimated
+traces are compared point by point on the indices they kept.
+
+Hover values are checked as the user sees them: every fixed-point field in
+a hovertemplate (%{customdata[1]:,.0f}, %{y:.1f}, ...) is formatted from
+the raw and the compacted arrays, and the two texts must be identical.
+
+Results are appended to benchmarks/results/payload_size.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_payload_size.py
+  python benchmarks/bench_payload_size.py --width 800
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import re
+import sys
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ["AHPI_FIG_CACHE"] = "0"
+
+import plotly.io as pio  # noqa: E402
+
+import accra_dashboard as dash_app  # noqa: E402
+import accra_payload  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "payload_size.jsonl")
+
+
+def _figures() -> list[tuple[str, callable]]:
+    """(name, build()) for every cached dashboard figure, over the full year range."""
+    d   = dash_app
+    yr  = (d.YEARS[0], d.YEARS[-1])
+    dff = d.filter_df(*yr)
+    sl  = {"prime_full": d.filter_df_prime_full(*yr),
+           "district": d.filter_df_district(*yr), "prime": d.filter_df_prime(*yr)}
+    return [
+        ("ahpi",        lambda: d.build_ahpi_fig(dff, ["ghs", "usd"], True,
+                                                 dff_prime_full=sl["prime_full"])),
+        ("macro",       lambda: d.build_macro_fig(dff, list(d.MACRO_META), True)),
+        ("macro_grid",  lambda: d.build_macro_grid(dff)),
+        ("commodity",   lambda: d.build_commodity_fig(dff)),
+        ("heatmap",     lambda: d.build_heatmap_fig(dff)),
+        ("map",         lambda: d.build_map_fig("both")),
+        ("district_all", lambda: d.build_district_comparison_fig(sl["district"])),
+        ("prime_all",   lambda: d.build_prime_comparison_fig(sl["prime"])),
+        ("forecast",    lambda: d.build_forecast_fig(show_ci=True)),
+        ("prime_forecast", lambda: d.build_prime_forecast_fig("all", show_ci=True)),
+        ("district_forecast", lambda: d.build_district_forecast_fig("all", show_ci=True)),
+    ]
+
+
+def _max_rel_err(raw: dict, packed: dict) -> float:
+    """Largest relative error between the raw and the compacted numeric arrays."""
+    worst = 0.0
+    for t_raw, t_new in zip(raw.get("data", []), packed.get("data", [])):
+        for key in accra_payload.NUMERIC_KEYS:
+            a, b = accra_payload._numeric(t_raw.get(key)), accra_payload._numeric(t_new.get(key))
+            if a is None or b is None or a.shape != b.shape:
+                continue                          # non-numeric, or decimated
+            for col_a, col_b in (zip(a.T, b.T) if a.ndim == 2 else [(a, b)]):
+                ok = np.isfinite(col_a)
+                if not np.array_equal(ok, np.isfinite(col_b)):
+                    return float("inf")
+                if ok.any():
+                    top   = np.abs(col_a[ok]).max() or 1.0
+                    worst = max(worst, float(np.abs(col_a[ok] - col_b[ok]).max() / top))
+    return worst
+
+
+_HOVER_FIELD = re.compile(r"%\{(x|y|z|customdata)(?:\[(\d+)\])?:(,?\.\d+f)\}")
+
+
+def _hover_mismatches(raw: dict, packed: dict) -> tuple[int, int]:
+    """
+    (values checked, values whose shown text changed) over every
+    fixed-point hovertemplate field with a numeric array.
+    """
+    checked = bad = 0
+    for t_raw, t_new in zip(raw.get("data", []), packed.get("data", [])):
+        for key, col, fmt in _HOVER_FIELD.findall(t_raw.get("hovertemplate") or ""):
+            a, b = accra_payload._numeric(t_raw.get(key)), accra_payload._numeric(t_new.get(key))
+            if a is None or b is None or a.shape != b.shape:
+                continue
+            if col:
+                if a.ndim != 2 or int(col) >= a.shape[1]:
+                    continue
+                a, b = a[:, int(col)], b[:, int(col)]
+            for va, vb in zip(a.ravel(), b.ravel()):
+                if not (np.isfinite(va) and np.isfinite(vb)):
+                    continue
+                checked += 1
+                bad     += format(va, fmt) != format(vb, fmt)
+    return checked, bad
+
+
+def _points(fig: dict) -> int:
+    n = 0
+    for trace in fig.get("data", []):
+        y = accra_payload._numeric(trace.get("y"))
+        n += 0 if y is None else y.shape[0]
+    return n
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compact figure payload benchmark")
+    ap.add_argument("--width", type=int, default=accra_payload.FIG_WIDTH,
+                    help=f"nominal figure width in pixels (default {accra_payload.FIG_WIDTH})")
+    ap.add_argument("--tol", type=float, default=10.0 ** -(accra_payload.SIG_DIGITS - 1),
+                    help="allowed relative error of compacted values")
+    args = ap.parse_args()
+    accra_payload.FIG_WIDTH = args.width
+
+    sep = "─" * 78
+    print(f"\n  AHPI · Payload Benchmark\n  {sep}")
+    print(f"  {accra_payload.SIG_DIGITS} significant digits · {args.width} px nominal width\n")
+    print(f"  {'figure':<18} {'raw kB':>8} {'compact':>8} {'raw gz':>8} {'gz':>7} "
+          f"{'points':>11} {'max rel err':>12} {'hover':>9}  ok")
+
+    results, total_raw, total_new = {}, 0, 0
+    for name, build in _figures():
+        raw_text = pio.to_json(build(), validate=False)
+        raw      = json.loads(raw_text)
+        packed   = accra_payload.compact_figure(json.loads(raw_text))
+        new_text = json.dumps(packed, separators=(",", ":"))
+        err      = _max_rel_err(raw, packed)
+        hovers, hover_bad = _hover_mismatches(raw, packed)
+        ok       = err <= args.tol and hover_bad == 0
+        r = results[name] = {
+            "raw_bytes":     len(raw_text),
+            "compact_bytes": len(new_text),
+            "raw_gzip":      len(gzip.compress(raw_text.encode())),
+            "compact_gzip":  len(gzip.compress(new_text.encode())),
+            "points_raw":    _points(raw),
+            "points_sent":   _points(packed),
+            "max_rel_err":   err,
+            "hover_values":  hovers,
+            "hover_moved":   hover_bad,
+            "ok":            ok,
+        }
+        total_raw += r["raw_bytes"]
+        total_new += r["compact_bytes"]
+        print(f"  {name:<18} {r['raw_bytes'] / 1024:>8.1f} {r['compact_bytes'] / 1024:>8.1f} "
+              f"{r['raw_gzip'] / 1024:>8.1f} {r['compact_gzip'] / 1024:>7.1f} "
+              f"{r['points_raw']:>5}→{r['points_sent']:<5} {err:>12.1e} "
+              f"{hovers - hover_bad:>4}/{hovers:<4}  {'✓' if ok else '✗'}")
+
+    print(f"\n  all figures: {total_raw / 1024:.1f} kB → {total_new / 1024:.1f} kB "
+          f"({total_raw / max(total_new, 1):.1f}× smaller)")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":         datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":     platform.python_version(),
+            "platform":   platform.platform(),
+            "width":      args.width,
+            "sig_digits": accra_payload.SIG_DIGITS,
+            "figures":    results,
+        }) + "\n")
+    print("  Saved → benchmarks/results/payload_size.jsonl\n")
+
+    if not all(r["ok"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
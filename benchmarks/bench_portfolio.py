@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Portfolio Benchmark · vectorised book valuation
+===============================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and values synthetic holdings books with the portfolio engine
+(accra_portfolio):
+
+  parse    — read_holdings() on the CSV bytes, as uploaded
+  value    — PortfolioEngine.value() under bear / base / bull
+  summary  — summarise() + by_market(), as rendered on the Investment tab
+
+A random sample of holdings is re-valued one at a time with the Investment
+tab's scalar arithmetic over DataFrame lookups; every value, return, CAGR
+and benchmark must agree.  The run fails if valuing the largest book takes
+longer than --budget seconds.
+
+Results are appended to benchmarks/results/portfolio.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_portfolio.py
+  python benchmarks/bench_portfolio.py --rows 1000 100000 1000000 --sell-year 2029
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import accra_dashboard as dash_app  # noqa: E402
+from accra_portfolio import SCENARIOS, by_market, read_holdings, summarise  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "portfolio.jsonl")
+CHECKED      = ["cost_ghs", "cost_usd"] + [
+    f"{k}_{sc}" for sc in SCENARIOS
+    for k in ("value_ghs", "value_usd", "ret_ghs", "ret_usd", "cagr_ghs", "cagr_usd", "tbill_ghs")
+] + ["usd_deposit_usd"]
+
+
+# ── holdings ──────────────────────────────────────────────────────────────────
+
+def synthetic_csv(n: int, seed: int = 0) -> bytes:
+    """n random holdings over every market and month; a third priced explicitly."""
+    rng     = np.random.default_rng(seed)
+    d       = dash_app
+    markets = np.array(["composite"] + d.DISTRICTS + d.PRIME_AREAS, dtype=object)
+    ds      = d.DF["ds"]
+    months  = pd.date_range(ds.min(), ds.max(), freq="MS").strftime("%Y-%m").to_numpy()
+    market  = markets[rng.integers(0, len(markets), n)]
+    sqm     = rng.integers(40, 600, n)
+    price   = np.where(rng.random(n) < 1 / 3, (sqm * rng.uniform(2_000, 30_000, n)).round(), np.nan)
+    price   = np.where(market == "composite", (sqm * rng.uniform(2_000, 30_000, n)).round(), price)
+    df = pd.DataFrame({"market": market, "sqm": sqm,
+                       "purchase_month": months[rng.integers(0, len(months), n)],
+                       "price": pd.Series(price).map(lambda v: "" if np.isnan(v) else f"{v:.0f}")})
+    return df.to_csv(index=False).encode()
+
+
+# ── scalar reference ──────────────────────────────────────────────────────────
+
+def _history(market: str) -> pd.DataFrame:
+    d = dash_app
+    if market == "composite":
+        return d.DF
+    panel = d.DF_DISTRICT if market in d.DISTRICTS else d.DF_PRIME
+    return panel[panel["district"] == market]
+
+
+def scalar_value(h: pd.Series, sell_year: int) -> dict:
+    """One holding with the Investment tab's per-row arithmetic."""
+    d     = dash_app
+    month = pd.Timestamp(h["purchase_month"] + "-01")
+    frame = _history(h["market"])
+    row   = frame[frame["ds"] == month].iloc[0]
+    fx    = float(d.DF.loc[d.DF["ds"] == month, "exchange_rate_ghs_usd"].iloc[0])
+    sqm   = float(h["sqm"])
+    cost_ghs = float(h["price"]) if h["price"] else sqm * float(row["price_ghs_per_sqm"])
+    cost_usd = cost_ghs / fx
+    years    = (sell_year * 12 + 11 - (month.year * 12 + month.month - 1)) / 12
+    out = {"cost_ghs": cost_ghs, "cost_usd": cost_usd,
+           "usd_deposit_usd": cost_usd * (1 + d.USD_DEPOSIT_RATE / 100) ** years}
+    for sc in SCENARIOS:
+        sell_ghs = cost_ghs * d._get_fc_dec(h["market"], sc, sell_year)["yhat"] / float(row["y"])
+        sell_usd = sell_ghs / d.SCENARIO_FX[sc]
+        out[f"value_ghs_{sc}"] = sell_ghs
+        out[f"value_usd_{sc}"] = sell_usd
+        out[f"ret_ghs_{sc}"]   = (sell_ghs - cost_ghs) / cost_ghs * 100
+        out[f"ret_usd_{sc}"]   = (sell_usd - cost_usd) / cost_usd * 100
+        out[f"cagr_ghs_{sc}"]  = ((sell_ghs / cost_ghs) ** (1 / years) - 1) * 100
+        out[f"cagr_usd_{sc}"]  = ((sell_usd / cost_usd) ** (1 / years) - 1) * 100
+        out[f"tbill_ghs_{sc}"] = cost_ghs * (1 + d.SCENARIO_TBILL[sc] / 100) ** years
+    return out
+
+
+def check(holdings: pd.DataFrame, results: pd.DataFrame, sell_year: int, sample: int) -> bool:
+    ok  = results.index[results["status"] == "ok"]
+    idx = np.random.default_rng(1).choice(ok, min(sample, len(ok)), replace=False)
+    for i in idx:
+        ref = scalar_value(holdings.loc[i], sell_year)
+        for col in CHECKED:
+            if not math.isclose(results.at[i, col], ref[col], rel_tol=1e-9, abs_tol=1e-9):
+                print(f"  ✗ holding {i} {col}: {results.at[i, col]} != {ref[col]}")
+                return False
+    return True
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Portfolio valuation benchmark")
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--sell-year", type=int, default=2027)
+    ap.add_argument("--sample", type=int, default=300,
+                    help="holdings re-valued with the scalar reference (default 300)")
+    ap.add_argument("--budget", type=float, default=1.0,
+                    help="seconds allowed to value the largest book (default 1.0)")
+    args = ap.parse_args()
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Portfolio Benchmark\n  {sep}")
+    print(f"  sell year {args.sell_year}\n")
+    print(f"  {'rows':>9} {'parse s':>9} {'value s':>9} {'summary s':>10} {'rows/s':>12}  ok")
+
+    runs = []
+    for n in args.rows:
+        data = synthetic_csv(n)
+        t0 = time.perf_counter()
+        holdings = read_holdings(data)
+        t1 = time.perf_counter()
+        results  = dash_app._PORTFOLIO.value(holdings, args.sell_year)
+        t2 = time.perf_counter()
+        summarise(results)
+        by_market(results)
+        t3 = time.perf_counter()
+        ok = check(holdings, results, args.sell_year, args.sample)
+        runs.append({"rows": n, "parse_s": round(t1 - t0, 4), "value_s": round(t2 - t1, 4),
+                     "summary_s": round(t3 - t2, 4),
+                     "valued": int((results["status"] == "ok").sum()), "equal": ok})
+        print(f"  {n:>9,} {t1 - t0:>9.3f} {t2 - t1:>9.3f} {t3 - t2:>10.3f} "
+              f"{n / max(t2 - t1, 1e-9):>12,.0f}  {'✓' if ok else '✗'}")
+
+    within = runs[-1]["value_s"] <= args.budget
+    print(f"\n  {runs[-1]['rows']:,} rows valued in {runs[-1]['value_s']:.3f} s "
+          f"(budget {args.budget:.1f} s) {'✓' if within else '✗'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "sell_year": args.sell_year,
+            "runs":      runs,
+        }) + "\n")
+    print("  Saved → benchmarks/results/portfolio.jsonl\n")
+
+    if not (within and all(r["equal"] for r in runs)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
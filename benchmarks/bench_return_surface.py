@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Return Surface Benchmark · per-call arithmetic vs the precomputed surface
+=========================================================================
+Imports accra_dashboard (data is loaded at import time, as under gunicorn)
+and compares, for every market × buy year × sell year × scenario of the
+Investment tab, the calculator's former per-call arithmetic with the
+precomputed ReturnSurface (accra_portfolio):
+
+  scalar   — December rows looked up and the returns, CAGRs and
+             benchmarks computed in Python for one combination
+  surface  — ReturnSurface.lookup(): an index into the array
+
+Every field of every cell must agree, the composite included.  Also timed:
+building the surface, the update_inv_results callback over every
+combination and the buy × sell heatmap figure.
+
+Results are appended to benchmarks/results/return_surface.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_return_surface.py
+  python benchmarks/bench_return_surface.py --repeat 20
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ["AHPI_FIG_CACHE"] = "0"
+
+import accra_dashboard as dash_app  # noqa: E402
+from accra_portfolio import SCENARIOS, ReturnSurface  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "return_surface.jsonl")
+
+
+# ── scalar reference ──────────────────────────────────────────────────────────
+
+def scalar_returns(market: str, buy_year: int, sell_year: int, sc: str, sqm: float) -> dict | None:
+    """The Investment tab's former per-call arithmetic for one combination."""
+    d       = dash_app
+    buy_row = d._get_hist_dec(market, buy_year)
+    fc_row  = d._get_fc_dec(market, sc, sell_year)
+    if buy_row is None or fc_row is None:
+        return None
+    years    = sell_year - buy_year
+    buy_ghs  = float(buy_row.get("price_ghs_per_sqm", 0))
+    buy_usd  = float(buy_row.get("price_usd_per_sqm", 0))
+    buy_ahpi = float(buy_row.get("y", 100))
+    sell_ahpi = float(fc_row["yhat"])
+    sell_fx   = d.SCENARIO_FX[sc]
+    sell_ghs  = buy_ghs * (sell_ahpi / buy_ahpi) if buy_ahpi else 0
+    sell_usd  = sell_ghs / sell_fx if sell_fx else 0
+    total_buy_ghs, total_sell_ghs = buy_ghs * sqm, sell_ghs * sqm
+    total_buy_usd, total_sell_usd = buy_usd * sqm, sell_usd * sqm
+    tbill_final   = total_buy_ghs * (1 + d.SCENARIO_TBILL[sc] / 100) ** years
+    usd_dep_final = total_buy_usd * (1 + d.USD_DEPOSIT_RATE / 100) ** years
+    return {
+        "buy_ahpi":       buy_ahpi,
+        "sell_ahpi":      sell_ahpi,
+        "sell_ahpi_lo":   float(fc_row["yhat_lower"]),
+        "sell_ahpi_hi":   float(fc_row["yhat_upper"]),
+        "sell_ghs":       sell_ghs,
+        "sell_usd":       sell_usd,
+        "total_sell_ghs": total_sell_ghs,
+        "ghs_ret":        (total_sell_ghs - total_buy_ghs) / total_buy_ghs * 100,
+        "usd_ret":        (total_sell_usd - total_buy_usd) / total_buy_usd * 100,
+        "ghs_cagr":       ((total_sell_ghs / total_buy_ghs) ** (1 / years) - 1) * 100,
+        "usd_cagr":       ((total_sell_usd / total_buy_usd) ** (1 / years) - 1) * 100,
+        "tbill_ret":      (tbill_final - total_buy_ghs) / total_buy_ghs * 100,
+        "usd_dep_ret":    (usd_dep_final - total_buy_usd) / total_buy_usd * 100,
+    }
+
+
+def _combinations() -> list[tuple]:
+    d = dash_app
+    return [(m["value"], b, s, sc) for m in d._MARKET_OPTS for b in d._INV_BUY_YEARS
+            for s in d.FC_YEARS for sc in SCENARIOS]
+
+
+def _median_us(fn, args: list[tuple], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for a in args:
+            fn(*a)
+        samples.append((time.perf_counter() - t0) / len(args) * 1e6)
+    return statistics.median(samples)
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Investment return surface benchmark")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--sqm", type=float, default=120)
+    args = ap.parse_args()
+
+    d       = dash_app
+    surface = d._INV_SURFACE
+    combos  = _combinations()
+    ok, checked = True, 0
+    for market, b, s, sc in combos:
+        ref = scalar_returns(market, b, s, sc, args.sqm)
+        got = surface.lookup(market, b, s, sc, args.sqm)
+        if (ref is None) != (got is None):
+            print(f"  ✗ {market} {b}→{s} {sc}: found {got is not None}, expected {ref is not None}")
+            ok = False
+            continue
+        for field, want in (ref or {}).items():
+            checked += 1
+            if not math.isclose(got[field], want, rel_tol=1e-9, abs_tol=1e-9):
+                print(f"  ✗ {market} {b}→{s} {sc} {field}: {got[field]} != {want}")
+                ok = False
+
+    t0 = time.perf_counter()
+    ReturnSurface(d._DEC_HIST, d._DEC_FC, [m["value"] for m in d._MARKET_OPTS],
+                  d._INV_BUY_YEARS, d.FC_YEARS, d.SCENARIO_FX, d.SCENARIO_TBILL,
+                  d.USD_DEPOSIT_RATE)
+    build_ms = (time.perf_counter() - t0) * 1e3
+
+    sqm      = args.sqm
+    t_scalar = _median_us(lambda *c: scalar_returns(*c, sqm), combos, args.repeat)
+    t_lookup = _median_us(lambda *c: surface.lookup(*c, sqm), combos, args.repeat)
+    calls    = [(m["value"], b, s, sqm, True) for m in d._MARKET_OPTS
+                for b in d._INV_BUY_YEARS for s in d.FC_YEARS]
+    t_cb     = _median_us(d.update_inv_results, calls, max(args.repeat // 5, 1))
+    figs     = [(m["value"], k) for m in d._MARKET_OPTS for k in d._INV_SURFACE_METRICS]
+    t_fig    = _median_us(d.build_return_surface_fig, figs, 1) / 1e3
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Return Surface Benchmark\n  {sep}")
+    print(f"  combinations         {len(combos):>8,}   fields checked {checked:,}  "
+          f"{'✓' if ok else '✗'}")
+    print(f"  surface build        {build_ms:>8.2f} ms  "
+          f"({surface.values.nbytes / 1024:.0f} kB)")
+    print(f"  scalar arithmetic    {t_scalar:>8.2f} µs / combination")
+    print(f"  surface lookup       {t_lookup:>8.2f} µs / combination "
+          f"({t_scalar / max(t_lookup, 1e-9):.0f}× faster)")
+    print(f"  update_inv_results   {t_cb:>8.1f} µs / call")
+    print(f"  heatmap figure       {t_fig:>8.2f} ms / build")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":           datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":       platform.python_version(),
+            "platform":     platform.platform(),
+            "combinations": len(combos),
+            "equal":        ok,
+            "build_ms":     round(build_ms, 3),
+            "scalar_us":    round(t_scalar, 2),
+            "lookup_us":    round(t_lookup, 2),
+            "callback_us":  round(t_cb, 1),
+            "figure_ms":    round(t_fig, 2),
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/return_surface.jsonl\n")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+AHPI Training Benchmarks · synthetic N areas × M months × K regressors
+======================================================================
+Generates synthetic AHPI-shaped panels (same columns as
+data/accra_home_price_index.csv and data/accra_district_prices.csv), runs
+the real end-to-end main() of ahpi_district_prophet.py / ahpi_prime_prophet.py
+against them in a scratch directory, and reads the per-stage timings back
+from the run telemetry (see ahpi_telemetry.py).
+
+Each case reports:
+  fit_s      — eval_fit + prod_fit
+  predict_s  — evaluate + predict (test-set and scenario predictions)
+  total_s    — whole main() wall time
+  peak_mb    — peak RSS over the run
+
+Results are appended to benchmarks/results/training.jsonl.  --save-baseline
+stores the current numbers per case; --compare fails (exit 1) when fit or
+predict time exceeds the baseline by more than --tolerance.
+
+Usage
+-----
+  python benchmarks/bench_training.py                                 # default grid
+  python benchmarks/bench_training.py --areas 5 20 --months 120 180 --regressors 6 12
+  python benchmarks/bench_training.py --save-baseline
+  python benchmarks/bench_training.py --compare --tolerance 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import ahpi_forecast_store  # noqa: E402
+import ahpi_telemetry  # noqa: E402
+
+warnings.filterwarnings("ignore")
+logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+RESULTS_DIR   = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH  = os.path.join(RESULTS_DIR, "training.jsonl")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "training_baseline.json")
+
+# Column layout of data/accra_home_price_index.csv
+MACRO_COLUMNS = [
+    "gdp_growth_pct", "gdp_per_capita_usd", "cpi_index", "inflation_cpi_pct",
+    "exchange_rate_ghs_usd", "lending_rate_pct", "unemployment_pct",
+    "urban_pop_pct", "population_total", "remittances_pct_gdp", "fdi_pct_gdp",
+    "credit_private_pct_gdp", "gross_capital_form_pct", "govt_debt_pct_gdp",
+    "broad_money_pct_gdp", "gold_price_usd", "cocoa_price_usd", "oil_brent_usd",
+]
+
+# Regressor pool, production set first.  inflation_cpi_pct is excluded:
+# the scripts always join it separately for the CPI compounding step.
+REGRESSOR_POOL = [
+    "exchange_rate_ghs_usd", "cpi_index", "urban_pop_pct", "broad_money_pct_gdp",
+    "gold_price_usd", "cocoa_price_usd",
+] + [c for c in MACRO_COLUMNS if c not in {
+    "exchange_rate_ghs_usd", "cpi_index", "urban_pop_pct", "broad_money_pct_gdp",
+    "gold_price_usd", "cocoa_price_usd", "inflation_cpi_pct"}]
+
+LAST_MONTH  = "2024-12-01"     # scripts hold out 2023-2024 as the test set
+MIN_MONTHS  = 48
+
+DEFAULT_GRID = {"areas": [5], "months": [180], "regressors": [6]}
+
+FIT_STAGES     = {"eval_fit", "prod_fit"}
+PREDICT_STAGES = {"evaluate", "predict"}
+
+
+# ── synthetic data ────────────────────────────────────────────────────────────
+
+def make_panels(n_areas: int, n_months: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (macro frame, area panel) ending Dec 2024 with n_months rows per area."""
+    if n_months < MIN_MONTHS:
+        raise ValueError(f"n_months must be ≥ {MIN_MONTHS} (24 test months + training)")
+    rng   = np.random.default_rng(seed)
+    ds    = pd.date_range(end=LAST_MONTH, periods=n_months, freq="MS")
+    t     = np.arange(n_months) / 12
+    season = 1 + 0.02 * np.sin(2 * np.pi * ds.month / 12)
+
+    macro = pd.DataFrame({"ds": ds})
+    for i, col in enumerate(MACRO_COLUMNS):
+        level = 10 ** rng.uniform(0, 3)
+        drift = rng.uniform(-0.05, 0.25)
+        macro[col] = level * np.exp(drift * t) * (1 + rng.normal(0, 0.01, n_months))
+    fx = macro["exchange_rate_ghs_usd"].to_numpy()
+    usd_sqm = 800 * np.exp(0.03 * t) * season * (1 + rng.normal(0, 0.008, n_months))
+    ghs_sqm = usd_sqm * fx
+    macro.insert(1, "y", np.round(ghs_sqm / ghs_sqm[min(60, n_months - 1)] * 100, 2))
+    macro["price_ghs_per_sqm"] = np.round(ghs_sqm)
+    macro["price_usd_per_sqm"] = np.round(usd_sqm)
+
+    frames = []
+    for a in range(n_areas):
+        mult  = rng.uniform(0.6, 2.5) * np.exp(rng.uniform(-0.01, 0.03) * t)
+        a_usd = usd_sqm * mult * (1 + rng.normal(0, 0.01, n_months))
+        a_ghs = a_usd * fx
+        frames.append(pd.DataFrame({
+            "ds":                ds,
+            "district":          f"Area {a + 1:03d}",
+            "y":                 np.round(a_ghs / ghs_sqm[min(60, n_months - 1)] * 100, 2),
+            "price_ghs_per_sqm": np.round(a_ghs).astype(int),
+            "price_usd_per_sqm": np.round(a_usd).astype(int),
+        }))
+    return macro, pd.concat(frames, ignore_index=True)
+
+
+# ── running the real training scripts ─────────────────────────────────────────
+
+@contextlib.contextmanager
+def _patched(module, **attrs):
+    saved = {k: getattr(module, k) for k in attrs}
+    for k, v in attrs.items():
+        setattr(module, k, v)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(module, k, v)
+
+
+def run_case(family: str, n_areas: int, n_months: int, n_regressors: int,
+             seed: int = 0) -> dict:
+    """Train + predict one synthetic case through the family's main()."""
+    if family == "district":
+        import ahpi_district_prophet as mod
+        names_attr, slugs_attr, data_attr = "DISTRICTS", "DISTRICT_SLUGS", "DISTRICT_DATA"
+    else:
+        import ahpi_prime_prophet as mod
+        names_attr, slugs_attr, data_attr = "AREAS", "AREA_SLUGS", "PRIME_DATA"
+
+    macro, panel = make_panels(n_areas, n_months, seed)
+    names = list(dict.fromkeys(panel["district"]))
+    first = macro["ds"].iloc[0]
+    cps   = [c for c in mod.CHANGEPOINTS if first < pd.Timestamp(c) < pd.Timestamp(mod.TRAIN_END)]
+
+    with tempfile.TemporaryDirectory(prefix="ahpi_bench_") as tmp:
+        macro_path = os.path.join(tmp, "macro.csv")
+        panel_path = os.path.join(tmp, "panel.csv")
+        tel_path   = os.path.join(tmp, "telemetry.jsonl")
+        macro.to_csv(macro_path, index=False)
+        panel.to_csv(panel_path, index=False)
+
+        with _patched(mod, **{
+            names_attr:      names,
+            slugs_attr:      {n: n.lower().replace(" ", "_") for n in names},
+            data_attr:       panel_path,
+            "MAIN_DATA":     macro_path,
+            "MODELS_DIR":    os.path.join(tmp, "models"),
+            "FORECASTS_DIR": os.path.join(tmp, "forecasts"),
+            "REGRESSORS":    REGRESSOR_POOL[:n_regressors],
+            "CHANGEPOINTS":  cps,
+        }), _patched(ahpi_telemetry, TELEMETRY_PATH=tel_path), \
+                _patched(ahpi_forecast_store, STORE_PATH=os.path.join(tmp, "store.sqlite")), \
+                contextlib.redirect_stdout(io.StringIO()):
+            mod.main()
+
+        records = ahpi_telemetry.load_records(tel_path)
+
+    run    = next(r for r in records if r["type"] == "run")
+    stages = [r for r in records if r["type"] == "stage"]
+    return {
+        "family":     family,
+        "areas":      n_areas,
+        "months":     n_months,
+        "regressors": n_regressors,
+        "fit_s":      round(sum(r["wall_s"] for r in stages if r["stage"] in FIT_STAGES), 3),
+        "predict_s":  round(sum(r["wall_s"] for r in stages if r["stage"] in PREDICT_STAGES), 3),
+        "total_s":    run["wall_s"],
+        "cpu_s":      run["cpu_s"],
+        "peak_mb":    run["peak_rss_mb"],
+    }
+
+
+# ── results / regression check ────────────────────────────────────────────────
+
+def case_id(r: dict) -> str:
+    return f"{r['family']}/N{r['areas']}/M{r['months']}/K{r['regressors']}"
+
+
+def _git_sha() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_results(results: list[dict]) -> None:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    meta = {
+        "ts":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git":      _git_sha(),
+        "python":   platform.python_version(),
+        "platform": platform.platform(),
+    }
+    with open(RESULTS_PATH, "a") as fh:
+        for r in results:
+            fh.write(json.dumps({**meta, "case": case_id(r), **r}) + "\n")
+
+
+def save_baseline(results: list[dict]) -> None:
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as fh:
+            baseline = json.load(fh)
+    baseline.update({case_id(r): r for r in results})
+    with open(BASELINE_PATH, "w") as fh:
+        json.dump(baseline, fh, indent=2)
+
+
+def compare(results: list[dict], tolerance: float) -> list[str]:
+    """Return regression messages for fit / predict times beyond tolerance."""
+    if not os.path.exists(BASELINE_PATH):
+        return []
+    with open(BASELINE_PATH) as fh:
+        baseline = json.load(fh)
+    failures = []
+    for r in results:
+        base = baseline.get(case_id(r))
+        if not base:
+            continue
+        for key in ("fit_s", "predict_s"):
+            if base[key] and r[key] > base[key] * (1 + tolerance):
+                failures.append(f"{case_id(r)} {key}: {r[key]:.2f}s vs baseline "
+                                f"{base[key]:.2f}s (+{(r[key] / base[key] - 1) * 100:.0f}%)")
+    return failures
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="AHPI training benchmarks")
+    ap.add_argument("--family", choices=["district", "prime"], action="append")
+    ap.add_argument("--areas", type=int, nargs="+", default=DEFAULT_GRID["areas"])
+    ap.add_argument("--months", type=int, nargs="+", default=DEFAULT_GRID["months"])
+    ap.add_argument("--regressors", type=int, nargs="+", default=DEFAULT_GRID["regressors"])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="allowed relative slowdown vs baseline (default 0.25)")
+    args = ap.parse_args()
+
+    if max(args.regressors) > len(REGRESSOR_POOL):
+        ap.error(f"at most {len(REGRESSOR_POOL)} regressors are available")
+
+    sep = "─" * 78
+    print(f"\n  AHPI · Training Benchmarks\n  {sep}")
+    print(f"  {'case':<28} {'fit s':>8} {'predict s':>10} {'total s':>9} {'cpu s':>8} {'peak MB':>9}")
+
+    results = []
+    for family, n, m, k in itertools.product(args.family or ["district", "prime"],
+                                             args.areas, args.months, args.regressors):
+        r = run_case(family, n, m, k, args.seed)
+        results.append(r)
+        print(f"  {case_id(r):<28} {r['fit_s']:>8.2f} {r['predict_s']:>10.2f} "
+              f"{r['total_s']:>9.2f} {r['cpu_s']:>8.2f} {r['peak_mb'] or 0:>9.1f}")
+
+    save_results(results)
+    print("\n  Saved → benchmarks/results/training.jsonl")
+    if args.save_baseline:
+        save_baseline(results)
+        print("  Saved → benchmarks/results/training_baseline.json")
+
+    if args.compare:
+        failures = compare(results, args.tolerance)
+        print(f"\n  {sep}")
+        if failures:
+            print("  Regressions:")
+            for f in failures:
+                print(f"    ✗ {f}")
+            sys.exit(1)
+        print(f"  No fit / predict regressions beyond {args.tolerance * 100:.0f}%.")
+    print()
+
+
+if __name__ == "__main__":
+    main()
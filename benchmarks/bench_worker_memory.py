@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Worker Memory Benchmark · per-worker cost of gunicorn workers
+=============================================================
+Starts gunicorn with 1, 2 and 4 workers (--workers), in two modes:
+
+  fork-each  — every worker imports accra_dashboard itself (no preload),
+               as before gunicorn.conf.py
+  preload    — gunicorn.conf.py: the master loads the app, builds the
+               shared state and freezes it, then forks
+
+Each server is warmed with a few requests per worker (index page, layout,
+one bulk download).  The benchmark then sums the proportional set size
+(PSS, from /proc/<pid>/smaps_rollup) of the master and every worker.  PSS
+splits each shared page between the processes mapping it, so the sum is
+the memory the server really uses.  For each mode it reports the total and
+the marginal cost of one more worker (least-squares slope over the worker
+counts).  Linux only.
+
+Results are appended to benchmarks/results/worker_memory.jsonl.
+
+Usage
+-----
+  python benchmarks/bench_worker_memory.py
+  python benchmarks/bench_worker_memory.py --workers 1 2 4 8 --port 8765
+"""
+
+import argparse
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+BASE_DIR     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "worker_memory.jsonl")
+
+WARM_PATHS = ["/", "/_dash-layout", "/downloads/forecast"]
+
+
+# ── /proc ─────────────────────────────────────────────────────────────────────
+
+def pss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    return 0
+
+
+def children(pid: int) -> list[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as fh:
+        return [int(p) for p in fh.read().split()]
+
+
+# ── server ────────────────────────────────────────────────────────────────────
+
+def _get(url: str) -> None:
+    with urllib.request.urlopen(url, timeout=120) as resp:
+        resp.read()
+
+
+def measure(n_workers: int, preload: bool, port: int, settle: float) -> dict:
+    """Start gunicorn, warm every worker, and sum PSS across its processes."""
+    cmd = [sys.executable, "-m", "gunicorn", "accra_dashboard:server",
+           "--workers", str(n_workers), "--bind", f"127.0.0.1:{port}"]
+    # --config /dev/null keeps gunicorn from picking up gunicorn.conf.py
+    cmd += ["--config", os.path.join(BASE_DIR, "gunicorn.conf.py") if preload else "/dev/null"]
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base     = f"http://127.0.0.1:{port}"
+        deadline = time.time() + 300
+        while True:
+            try:
+                _get(base + "/")
+                break
+            except OSError:
+                if proc.poll() is not None or time.time() > deadline:
+                    raise RuntimeError("gunicorn did not start")
+                time.sleep(0.5)
+        for _ in range(n_workers * 2):
+            for path in WARM_PATHS:
+                _get(base + path)
+        time.sleep(settle)
+
+        workers = children(proc.pid)
+        master  = pss_kb(proc.pid)
+        per     = [pss_kb(w) for w in workers]
+        return {"workers": len(workers), "master_mb": round(master / 1024, 1),
+                "worker_mb": [round(p / 1024, 1) for p in per],
+                "total_mb": round((master + sum(per)) / 1024, 1)}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+
+
+def slope(xs: list[int], ys: list[float]) -> float:
+    """Least-squares MB per additional worker."""
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    den = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den if den else float("nan")
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="gunicorn per-worker memory benchmark")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                    help="worker counts to measure (default 1 2 4)")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--settle", type=float, default=2.0,
+                    help="seconds to wait after warming before sampling (default 2)")
+    args = ap.parse_args()
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Worker Memory Benchmark\n  {sep}")
+    print(f"  {'mode':<10} {'workers':>8} {'master MB':>10} {'worker MB':>10} {'total MB':>10}")
+
+    results = {}
+    for mode in ("fork-each", "preload"):
+        runs = []
+        for n in args.workers:
+            r = measure(n, mode == "preload", args.port, args.settle)
+            runs.append(r)
+            avg = sum(r["worker_mb"]) / max(len(r["worker_mb"]), 1)
+            print(f"  {mode:<10} {r['workers']:>8} {r['master_mb']:>10.1f} "
+                  f"{avg:>10.1f} {r['total_mb']:>10.1f}")
+        per_worker = slope([r["workers"] for r in runs], [r["total_mb"] for r in runs])
+        results[mode] = {"runs": runs, "mb_per_worker": round(per_worker, 1)}
+
+    print()
+    for mode, res in results.items():
+        print(f"  {mode:<10} +{res['mb_per_worker']:.1f} MB per additional worker")
+    ratio = results["fork-each"]["mb_per_worker"] / results["preload"]["mb_per_worker"]
+    print(f"  preload adds {ratio:.1f}× less memory per worker")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            **results,
+        }) + "\n")
+    print("  Saved → benchmarks/results/worker_memory.jsonl\n")
+
+
+if __name__ == "__main__":
+    main()
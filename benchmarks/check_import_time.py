@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Import-Time Budget · accra_dashboard start-up imports
+=====================================================
+Imports accra_dashboard in a fresh interpreter under `python -X importtime`
+(as each gunicorn worker does at boot) and parses the per-module timings
+the interpreter writes to stderr.  Note that the dashboard also loads its
+data bundle at import, so the total covers the whole worker start-up, not
+only module loading.
+
+Checks
+------
+  budget     total cumulative import time of accra_dashboard must stay
+             below --budget-ms (median of --repeat fresh interpreters)
+  deferred   none of the on-demand subsystems may be imported at start-up:
+             PDF reports (reportlab, accra_report) and chart export
+             (kaleido, accra_chart_render)
+
+Prints the slowest top-level imports, exits 1 when a check fails, and
+appends the result to benchmarks/results/import_time.jsonl.
+
+Usage
+-----
+  python benchmarks/check_import_time.py
+  python benchmarks/check_import_time.py --budget-ms 2500 --repeat 5 --top 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+BASE_DIR     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "import_time.jsonl")
+
+# Top-level packages that must load on first use only
+DEFERRED = ["reportlab", "kaleido", "accra_report", "accra_chart_render"]
+
+
+# ── measurement ───────────────────────────────────────────────────────────────
+
+def measure(module: str = "accra_dashboard") -> list[tuple[str, int, int, int]]:
+    """
+    Import *module* in a fresh interpreter; one (name, self µs, cumulative µs,
+    depth) tuple per imported module, in the order -X importtime reports them.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        tail = [ln for ln in proc.stderr.splitlines() if not ln.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(tail[-20:]))
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def deferred_hits(rows: list[tuple[str, int, int, int]]) -> list[str]:
+    """Deferred modules (or their submodules) imported at start-up."""
+    names = {r[0] for r in rows}
+    return [m for m in DEFERRED if any(n == m or n.startswith(m + ".") for n in names)]
+
+
+# ── main ──────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="accra_dashboard import-time budget")
+    ap.add_argument("--budget-ms", type=float, default=3000.0,
+                    help="maximum cumulative import time in ms (default 3000)")
+    ap.add_argument("--repeat", type=int, default=3,
+                    help="fresh interpreters to measure (default 3)")
+    ap.add_argument("--top", type=int, default=15,
+                    help="slowest top-level imports to list (default 15)")
+    args = ap.parse_args()
+
+    runs   = [measure() for _ in range(args.repeat)]
+    totals = [next(r[2] for r in run if r[0] == "accra_dashboard") / 1e3 for run in runs]
+    total  = statistics.median(totals)
+    rows   = runs[-1]
+    hits   = deferred_hits(rows)
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Import-Time Budget\n  {sep}")
+    print(f"  {args.repeat} fresh interpreters · {len(rows)} modules imported\n")
+
+    # accra_dashboard's direct imports (depth 1) and interpreter-level ones (depth 0)
+    top = sorted((r for r in rows if r[3] <= 1 and r[0] != "accra_dashboard"),
+                 key=lambda r: r[2], reverse=True)[:args.top]
+    print(f"  {'module':<40} {'cumulative ms':>14}")
+    for name, _, cum_us, _ in top:
+        print(f"  {name:<40} {cum_us / 1e3:>14.1f}")
+
+    budget_ok = total <= args.budget_ms
+    print(f"\n  accra_dashboard  {total:>8.1f} ms   budget {args.budget_ms:.0f} ms  "
+          f"{'✓' if budget_ok else '✗'}")
+    print(f"  deferred         {'none imported ✓' if not hits else '✗ ' + ', '.join(hits)}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "total_ms":  round(total, 1),
+            "runs_ms":   [round(t, 1) for t in totals],
+            "budget_ms": args.budget_ms,
+            "modules":   len(rows),
+            "deferred_imported": hits,
+            "top_ms":    {name: round(cum_us / 1e3, 1) for name, _, cum_us, _ in top},
+        }) + "\n")
+    print("  Saved → benchmarks/results/import_time.jsonl\n")
+
+    if not budget_ok or hits:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
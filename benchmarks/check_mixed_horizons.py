@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Mixed-Horizon Check · one segment extended, then the bundle rebuilt
+===================================================================
+Copies forecasts/ to a temporary directory and points the extension step,
+the forecast store and the data bundle at the copy, then:
+
+  extend    — ahpi_extend_forecasts for one district (default tema) to
+              --horizon months, so its family now mixes horizons; the
+              existing months must be kept, only the new ones predicted
+  again     — the same extension a second time: nothing predicted,
+              nothing rewritten (the store's model fingerprint matches)
+  store     — the stored forecast has the CSV's rows and the fingerprint
+              of the model JSON
+  bundle    — accra_bundle.build() succeeds; the family aggregate covers
+              the longest horizon and every month is the mean of the
+              districts that have it
+  import    — accra_dashboard imports on that bundle, and the family's
+              target cards render for every area and forecast year
+
+Exits 1 when a check fails and appends the result to
+benchmarks/results/mixed_horizons.jsonl.
+
+Usage
+-----
+  python benchmarks/check_mixed_horizons.py
+  python benchmarks/check_mixed_horizons.py --segment district:kasoa --horizon 36
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ["AHPI_FIG_CACHE"] = "0"
+
+import accra_bundle  # noqa: E402
+import ahpi_extend_forecasts as ext  # noqa: E402
+import ahpi_forecast_store as store  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+RESULTS_DIR  = os.path.join(BASE_DIR, "benchmarks", "results")
+RESULTS_PATH = os.path.join(RESULTS_DIR, "mixed_horizons.jsonl")
+
+
+def _redirect(tmp: str) -> str:
+    """Point the extension step, the store and the bundle at a copy of forecasts/."""
+    forecasts = os.path.join(tmp, "forecasts")
+    shutil.copytree(ext.FORECASTS_DIR, forecasts)
+    ext.FORECASTS_DIR            = forecasts
+    store.STORE_PATH             = os.path.join(forecasts, "ahpi_forecasts.sqlite")
+    accra_bundle.FORECASTS_DIR   = forecasts
+    accra_bundle.BUNDLE_DIR      = os.path.join(tmp, "bundle")
+    accra_bundle.SOURCE_GLOBS[:] = [os.path.join(accra_bundle.DATA_DIR, "*.csv"),
+                                    os.path.join(forecasts, "*.csv")]
+    store.rebuild(forecasts)
+    return forecasts
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Mixed forecast horizons within a family")
+    ap.add_argument("--segment", default="district:tema")
+    ap.add_argument("--horizon", type=int, default=72)
+    args = ap.parse_args()
+
+    family, _, slug = args.segment.partition(":")
+    if family not in ("district", "prime") or not slug:
+        ap.error("--segment must be district:<slug> or prime:<slug>")
+    tmp = tempfile.mkdtemp(prefix="ahpi-horizons-")
+    try:
+        forecasts = _redirect(tmp)
+        before = {sc: len(pd.read_csv(ext.forecast_path(family, slug, sc))) for sc in ext.SCENARIOS}
+
+        first  = ext.extend_forecasts(args.horizon, [args.segment], workers=1)
+        second = ext.extend_forecasts(args.horizon, [args.segment], workers=1)
+        with open(ext._paths(family, slug)[0]) as fh:
+            fingerprint = store.model_fingerprint(fh.read())
+        states = {r["scenario"]: store.read_forecast_state(family, slug, r["scenario"])
+                  for r in first}
+
+        path   = accra_bundle.build()
+        bundle = accra_bundle.open_bundle(path)
+        agg_ok = True
+        for sc in ext.SCENARIOS:
+            frames = [pd.read_csv(f, parse_dates=["ds"])
+                      for f in sorted(glob.glob(os.path.join(forecasts,
+                                                             f"{family}_forecast_{sc}_*.csv")))]
+            ref = (pd.concat(frames).groupby("ds")["yhat"].mean())
+            agg = bundle.table(f"{family}_fc_agg_{sc}").set_index("ds")["yhat"]
+            agg_ok &= len(agg) == max(len(f) for f in frames) and np.allclose(
+                agg.to_numpy(), ref.reindex(agg.index).to_numpy())
+
+        # The dashboard loads accra_bundle.load(), which now finds the redirected bundle
+        import accra_dashboard as dash_app
+        build   = (dash_app._build_district_targets_div if family == "district"
+                   else dash_app._build_prime_targets_div)
+        areas   = ["all"] + list(ext.FAMILY_SLUGS[family])
+        targets = [build(area, year) for area in areas for year in dash_app.FC_YEARS]
+
+        checks = {
+            "extend":  all(r["rows"] == args.horizon
+                           and r["kept"] == min(before[r["scenario"]], args.horizon)
+                           for r in first),
+            "again":   all(r["predicted"] == 0 and not r["written"] for r in second),
+            "store":   all(st == (fingerprint, args.horizon) for st in states.values()),
+            "bundle":  agg_ok,
+            "import":  len(targets) == len(areas) * len(dash_app.FC_YEARS),
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    sep = "─" * 62
+    print(f"\n  AHPI · Mixed-Horizon Check\n  {sep}")
+    print(f"  {args.segment} → {args.horizon} months "
+          f"(was {sorted(set(before.values()))} months)\n")
+    for name, passed in checks.items():
+        print(f"  {name:<10} {'✓' if passed else '✗'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(RESULTS_PATH, "a") as fh:
+        fh.write(json.dumps({
+            "ts":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "segment":  args.segment,
+            "horizon":  args.horizon,
+            "checks":   checks,
+        }) + "\n")
+    print("\n  Saved → benchmarks/results/mixed_horizons.jsonl\n")
+
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
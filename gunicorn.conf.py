@@ -0,0 +1,63 @@
+"""
+Accra Dashboard · gunicorn configuration
+========================================
+Loads the dashboard once in the master and forks the workers from it, so
+every worker shares the master's read-only data instead of building its
+own copy:
+
+  preload      accra_dashboard is imported before the fork; the bundle
+               mapping, its DataFrames and the map layers are built once
+               (accra_dashboard.prepare_fork) and shared copy-on-write
+  gc.freeze    the garbage collector is disabled while the app loads and
+               every object is moved to the permanent generation just
+               before the fork, so a worker's collections never write to
+               (and so never copy) the pages holding the shared objects
+  renderer     the report chart render server (accra_chart_render.serve)
+               is started alongside the master and stopped with it, so
+               report jobs reuse its warm kaleido pool
+
+A worker only adds its own request state and caches on top of the master,
+so raising WEB_CONCURRENCY costs little memory per worker; see
+benchmarks/bench_worker_memory.py.
+
+Configuration (environment)
+---------------------------
+  WEB_CONCURRENCY        worker processes     (default 2)
+  PORT                   listen port          (default 8050)
+  AHPI_RENDER_SERVER=0   don't start the render server
+
+Usage
+-----
+  gunicorn accra_dashboard:server --config gunicorn.conf.py
+"""
+
+import gc
+import os
+
+bind        = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+workers     = int(os.environ.get("WEB_CONCURRENCY", "2"))
+preload_app = True
+
+# Collections during the import would only churn objects the workers share
+gc.disable()
+
+
+def when_ready(server):
+    """Master, after the preload: build the shared state and freeze it."""
+    import accra_dashboard
+    accra_dashboard.prepare_fork()
+    import accra_chart_render
+    server.chart_renderer = accra_chart_render.start_server()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def on_exit(server):
+    renderer = getattr(server, "chart_renderer", None)
+    if renderer is not None:
+        renderer.terminate()
+        renderer.wait(timeout=10)